@@ -0,0 +1,175 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import asyncio
+import json
+import os
+import sys
+
+# Add the src directory to the path so we can import the agent
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents'))
+
+from asgi import OrchestratorApp
+from orchestrator import OrchestratorAgent
+
+
+class WarmableAgent:
+    """Agent that records warm-up and answers after a short async delay."""
+
+    def __init__(self):
+        self.warmed = False
+
+    def warm_up(self):
+        self.warmed = True
+
+    async def process_task_async(self, task_data):
+        await asyncio.sleep(0.01)
+        return {"result": "success", "warmed": self.warmed}
+
+    def process_task(self, task_data):
+        return {"result": "success", "warmed": self.warmed}
+
+
+def call(app, method, path, body=None, headers=()):
+    """Runs one HTTP request through the ASGI app and returns (status, headers, body)."""
+    payload = body if isinstance(body, bytes) else json.dumps(body).encode() if body is not None else b""
+    messages = [{"type": "http.request", "body": payload, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path,
+             "headers": [(k.lower().encode(), v.encode()) for k, v in headers]}
+    asyncio.run(app(scope, receive, send))
+    return sent[0]["status"], dict(sent[0]["headers"]), sent[1:]
+
+
+def body_of(chunks):
+    return b"".join(chunk.get("body", b"") for chunk in chunks)
+
+
+class TestAsgiApp(unittest.TestCase):
+    """Unit tests for the ASGI serving entry point."""
+
+    def setUp(self):
+        self.aiplatform_patch = patch('google.cloud.aiplatform.init')
+        self.credentials_patch = patch('google.auth.default', return_value=(MagicMock(), "test-project-id"))
+        self.aiplatform_patch.start()
+        self.credentials_patch.start()
+        self.research = WarmableAgent()
+        self.agent = OrchestratorAgent(project_id="test-project-id", location="us-central1")
+        self.agent.register_agent("ProductResearchAgent", self.research)
+        self.agent.register_agent("MarketAnalysisAgent", WarmableAgent())
+        self.agent.register_agent("SalesOpportunityAgent", WarmableAgent())
+        self.app = OrchestratorApp(orchestrator_factory=lambda: self.agent, setup_logging=False)
+
+    def tearDown(self):
+        self.agent.close()
+        self.aiplatform_patch.stop()
+        self.credentials_patch.stop()
+
+    def test_lifespan_warms_the_orchestrator_before_serving(self):
+        messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message["type"])
+            if message["type"] == "lifespan.startup.complete":
+                self.assertIs(self.app.orchestrator, self.agent)
+                self.assertTrue(self.research.warmed)
+
+        asyncio.run(self.app({"type": "lifespan"}, receive, send))
+
+        self.assertEqual(sent, ["lifespan.startup.complete", "lifespan.shutdown.complete"])
+        self.assertIsNone(self.app.orchestrator)
+
+    def test_failed_startup_is_reported(self):
+        def broken_factory():
+            raise RuntimeError("no credentials")
+
+        app = OrchestratorApp(orchestrator_factory=broken_factory, setup_logging=False)
+        messages = [{"type": "lifespan.startup"}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(app({"type": "lifespan"}, receive, send))
+
+        self.assertEqual(sent, [{"type": "lifespan.startup.failed", "message": "no credentials"}])
+
+    def test_route_uses_the_async_path(self):
+        status, headers, chunks = call(self.app, "POST", "/route",
+                                       {"query": "research wireless headphones", "request_id": "r1"})
+
+        response = json.loads(body_of(chunks))
+        self.assertEqual(status, 200)
+        self.assertEqual(headers[b"content-type"], b"application/json")
+        self.assertEqual(response["status"], "success")
+        self.assertEqual(response["delegated_to"], "ProductResearchAgent")
+
+    def test_batch_and_workflow(self):
+        status, _, chunks = call(self.app, "POST", "/batch",
+                                 {"queries": ["research headphones", "analyze the tablet market"]})
+        self.assertEqual(status, 200)
+        self.assertEqual([r["delegated_to"] for r in json.loads(body_of(chunks))["responses"]],
+                         ["ProductResearchAgent", "MarketAnalysisAgent"])
+
+        status, _, chunks = call(self.app, "POST", "/workflow", {"query": "find trending gadgets"})
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body_of(chunks))["status"], "success")
+
+    def test_stream_sends_one_chunk_per_event(self):
+        status, headers, chunks = call(self.app, "POST", "/workflow/stream", {"query": "find trending gadgets"},
+                                       headers=[("Accept", "text/event-stream")])
+
+        self.assertEqual(status, 200)
+        self.assertEqual(headers[b"content-type"], b"text/event-stream")
+        events = [chunk["body"].decode() for chunk in chunks if chunk.get("more_body")]
+        self.assertTrue(events[0].startswith("event: workflow_started\n"))
+        self.assertTrue(events[-1].startswith("event: workflow_completed\n"))
+        self.assertEqual(chunks[-1], {"type": "http.response.body", "body": b""})
+
+    def test_health_and_metrics(self):
+        call(self.app, "POST", "/route", {"query": "research wireless headphones"})
+
+        status, _, chunks = call(self.app, "GET", "/healthz")
+        self.assertEqual((status, json.loads(body_of(chunks))), (200, {"state": "ready"}))
+
+        status, headers, chunks = call(self.app, "GET", "/metrics")
+        self.assertEqual(status, 200)
+        self.assertIn(b"agent_span_duration_seconds_bucket", body_of(chunks))
+
+        status, _, chunks = call(self.app, "GET", "/metrics", headers=[("Accept", "application/json")])
+        self.assertIn("route_request", json.loads(body_of(chunks))["latency"])
+
+    def test_bad_requests(self):
+        cases = [
+            (("GET", "/missing", None), 404),
+            (("GET", "/route", None), 405),
+            (("POST", "/route", b"not json"), 400),
+            (("POST", "/route", {"request_id": "r1"}), 400),
+            (("POST", "/route", {"query": "research", "timeout": -1}), 400),
+            (("POST", "/batch", {"queries": []}), 400),
+            (("POST", "/workflow", {"query": "find", "filters": {"max_price": "cheap"}}), 400),
+            (("POST", "/workflow/resume", {}), 400),
+            (("POST", "/workflow/resume", {"workflow_id": "unknown"}), 404),
+            (("POST", "/route", {"query": "x" * (2 * 1024 * 1024)}), 413),
+        ]
+        for (method, path, body), expected in cases:
+            status, _, chunks = call(self.app, method, path, body)
+            self.assertEqual(status, expected, (method, path))
+            self.assertIn("error", json.loads(body_of(chunks)))
+
+
+if __name__ == '__main__':
+    unittest.main()
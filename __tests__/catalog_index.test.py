@@ -0,0 +1,127 @@
+import unittest
+import json
+import os
+import random
+import sys
+import tempfile
+
+# Add the specialized agents directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents/specialized'))
+
+from catalog_index import CatalogIndex, parse_price, tokenize
+from product_research import ProductResearchAgent
+
+PRODUCTS = [
+    {"sku": "HP-1", "name": "SonicWave Pro", "type": "Wireless Headphones", "price": "$129.99", "rating": 4.7,
+     "features": ["Active Noise Cancellation", "40-hour battery", "Bluetooth 5.2"]},
+    {"sku": "HP-2", "name": "AudioPhase X300", "type": "Wireless Headphones", "price": "$199.99", "rating": 4.8,
+     "features": ["Hi-Res Audio", "Spatial sound", "Premium build quality"]},
+    {"sku": "EB-1", "name": "EchoBeats Lite", "type": "Wireless Earbuds", "price": "$89.99", "rating": 4.5,
+     "features": ["Water resistant", "Touch controls", "Compact case"]},
+    {"sku": "SW-1", "name": "TimeKeeper Pro", "type": "Smart Watch", "price": "$249.99", "rating": 4.6,
+     "features": ["Heart rate monitoring", "GPS", "7-day battery"]},
+    {"sku": "FW-1", "name": "FitTrack X2", "type": "Fitness Watch", "price": "$179.99", "rating": 4.4,
+     "features": ["Activity tracking", "Sleep analysis", "Water resistant"]},
+    {"sku": "KT-1", "name": "BrewMaster Kettle", "type": "Electric Kettle", "price": "$39.99",
+     "features": ["Stainless steel", "Auto shut-off"]},
+]
+
+
+class TestCatalogIndex(unittest.TestCase):
+    """Unit tests for the inverted-index product catalog."""
+
+    def setUp(self):
+        self.index = CatalogIndex(PRODUCTS)
+
+    def test_tokenize_and_prices(self):
+        self.assertEqual(tokenize("The best Smart Watches and batteries"), ["smart", "watch", "battery"])
+        self.assertEqual(parse_price("$1,299.99"), 1299.99)
+        self.assertEqual(parse_price(45), 45.0)
+        self.assertNotEqual(parse_price("call us"), parse_price("call us"))  # NaN
+
+    def test_ranks_by_bm25(self):
+        results = self.index.search("noise cancelling wireless headphones")
+
+        self.assertEqual(results[0]["sku"], "HP-1")
+        self.assertEqual({r["sku"] for r in results[:2]}, {"HP-1", "HP-2"})
+        self.assertEqual([r["sku"] for r in results][-1], "EB-1")
+        self.assertTrue(all(a["score"] >= b["score"] for a, b in zip(results, results[1:])))
+
+    def test_filters_on_price_and_rating(self):
+        self.assertEqual([r["sku"] for r in self.index.search("watch", max_price=200)], ["FW-1"])
+        self.assertEqual([r["sku"] for r in self.index.search("wireless", min_rating=4.6)], ["HP-2", "HP-1"])
+        # Products without a rating are excluded by rating filters
+        self.assertEqual(self.index.search("kettle", min_rating=1.0), [])
+        self.assertEqual([r["sku"] for r in self.index.search("", min_price=150)], ["HP-2", "SW-1", "FW-1"])
+
+    def test_unknown_terms_match_nothing(self):
+        self.assertEqual(self.index.search("vacuum cleaner"), [])
+        self.assertEqual(len(self.index.search("wireless", limit=2)), 2)
+
+    def test_pruned_top_k_matches_exhaustive_scoring(self):
+        rng = random.Random(5)
+        words = ["wireless", "smart", "watch", "headphones", "water", "resistant", "battery", "gps", "audio", "pro"]
+        catalog = [{
+            "name": f"Item {i} {rng.choice(words)}",
+            "type": " ".join(rng.sample(words, 2)),
+            "features": rng.sample(words, 3),
+            "price": rng.uniform(10, 300),
+            "rating": round(rng.uniform(3, 5), 1),
+        } for i in range(3000)]
+        index = CatalogIndex(catalog)
+
+        for _ in range(100):
+            terms = list(dict.fromkeys(tokenize(" ".join(rng.sample(words, rng.randint(1, 5))))))
+            accept = index._filter(None, rng.choice([None, 150.0]), None)
+            limit = rng.choice([1, 10, 25])
+            lists = [index._postings[term] for term in terms]
+            pruned = [round(score, 9) for _, score in index._top_k(terms, limit, accept)]
+            exhaustive = [round(score, 9) for _, score in index._top_k_exhaustive(lists, limit, accept)]
+            self.assertEqual(pruned, exhaustive, terms)
+
+    def test_loads_jsonl_and_csv(self):
+        with tempfile.TemporaryDirectory() as directory:
+            jsonl_path = os.path.join(directory, "catalog.jsonl")
+            with open(jsonl_path, "w") as f:
+                f.write("\n".join(json.dumps(p) for p in PRODUCTS) + "\n\n")
+            csv_path = os.path.join(directory, "catalog.csv")
+            with open(csv_path, "w") as f:
+                f.write("sku,name,type,price,rating,features\n")
+                f.write("CSV-1,TimeKeeper Pro,Smart Watch,$249.99,4.6,Heart rate monitoring; GPS\n")
+
+            self.assertEqual(len(CatalogIndex.from_file(jsonl_path)), len(PRODUCTS))
+            result = CatalogIndex.from_file(csv_path).search("gps watch")[0]
+            self.assertEqual(result["features"], ["Heart rate monitoring", "GPS"])
+            self.assertEqual(result["rating"], 4.6)
+            with self.assertRaises(ValueError):
+                CatalogIndex.from_file(os.path.join(directory, "catalog.xml"))
+
+
+class TestProductResearchCatalog(unittest.TestCase):
+    """ProductResearchAgent searches a catalog when one is configured."""
+
+    def test_catalog_search_with_task_filters(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as f:
+            f.write("\n".join(json.dumps(p) for p in PRODUCTS))
+        try:
+            agent = ProductResearchAgent(catalog_path=f.name)
+        finally:
+            os.unlink(f.name)
+
+        response = agent.process_task({"query": "research wireless headphones", "max_price": 150, "limit": 5})
+
+        self.assertEqual(response["result"], "success")
+        self.assertEqual([p["sku"] for p in response["products"]], ["HP-1", "EB-1"])
+        self.assertEqual(response["total_found"], 2)
+        self.assertIn("catalog of 6 products", response["source"])
+
+    def test_simulated_results_without_catalog(self):
+        response = ProductResearchAgent().process_task({"query": "wireless headphones"})
+
+        self.assertEqual(response["products"][0]["name"], "SonicWave Pro")
+        self.assertEqual(response["source"], "Product Research Agent (simulated)")
+
+
+if __name__ == '__main__':
+    unittest.main()
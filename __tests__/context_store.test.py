@@ -0,0 +1,144 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import tempfile
+
+# Add the src directory to the path so we can import the agent
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents'))
+
+from orchestrator import OrchestratorAgent
+from context_store import ContextStore, InMemoryContextStore, SQLiteContextStore
+
+
+class FakeClock:
+    """Manually advanced time source."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestInMemoryContextStore(unittest.TestCase):
+    """Unit tests for the bounded in-memory context store."""
+
+    def test_base_class_is_abstract(self):
+        class IncompleteStore(ContextStore):
+            def get(self, request_id):
+                return None
+
+        with self.assertRaises(TypeError):
+            ContextStore()
+        with self.assertRaises(TypeError):
+            IncompleteStore()
+
+    def test_evicts_least_recently_used(self):
+        store = InMemoryContextStore(max_entries=2)
+        store.set("a", "wireless headphones")
+        store.set("b", "smart watches")
+        store.get("a")
+        store.set("c", "gadgets")
+
+        self.assertIn("a", store)
+        self.assertNotIn("b", store)
+        self.assertIn("c", store)
+        self.assertEqual(len(store), 2)
+        self.assertEqual(store.evictions, 1)
+
+    def test_entries_expire_after_inactivity(self):
+        clock = FakeClock()
+        store = InMemoryContextStore(ttl_seconds=10, clock=clock)
+        store.set("a", "wireless headphones")
+        clock.now += 6
+        self.assertEqual(store.get("a"), "wireless headphones")
+        clock.now += 6
+        # The read above extended the expiry
+        self.assertIn("a", store)
+        clock.now += 11
+        self.assertNotIn("a", store)
+        self.assertIsNone(store.get("a"))
+        self.assertEqual(len(store), 0)
+
+    def test_memory_cap(self):
+        store = InMemoryContextStore(max_bytes=100)
+        for i in range(50):
+            store.set(f"request-{i}", "x" * 20)
+
+        self.assertLessEqual(store.size_bytes, 100)
+        self.assertIn("request-49", store)
+        self.assertNotIn("request-0", store)
+
+
+class TestSQLiteContextStore(unittest.TestCase):
+    """Unit tests for the SQLite-backed context store."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "contexts.db")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_contexts_survive_restart(self):
+        store = SQLiteContextStore(self.path)
+        store.set("a", "wireless headphones")
+        store.close()
+
+        reopened = SQLiteContextStore(self.path)
+        self.assertEqual(reopened.get("a"), "wireless headphones")
+        self.assertIn("a", reopened)
+        reopened.close()
+
+    def test_expiry_and_lru_prune(self):
+        clock = FakeClock()
+        store = SQLiteContextStore(self.path, max_entries=2, ttl_seconds=10, prune_interval=1000, clock=clock)
+        store.set("a", "one")
+        clock.now += 1
+        store.set("b", "two")
+        clock.now += 1
+        store.set("c", "three")
+        clock.now += 1
+        store.get("a")
+        store.prune()
+
+        self.assertEqual(len(store), 2)
+        self.assertNotIn("b", store)
+        clock.now += 20
+        self.assertIsNone(store.get("a"))
+        store.close()
+
+
+class TestOrchestratorContextStore(unittest.TestCase):
+    """The orchestrator keeps conversation contexts in its store."""
+
+    def setUp(self):
+        self.aiplatform_patch = patch('google.cloud.aiplatform.init')
+        self.credentials_patch = patch('google.auth.default', return_value=(MagicMock(), "test-project-id"))
+        self.aiplatform_patch.start()
+        self.credentials_patch.start()
+
+    def tearDown(self):
+        self.aiplatform_patch.stop()
+        self.credentials_patch.stop()
+
+    def test_route_request_uses_store(self):
+        store = InMemoryContextStore(max_entries=3)
+        agent = OrchestratorAgent(project_id="test-project-id", location="us-central1", context_store=store)
+        agent.register_agent("ProductResearchAgent", MagicMock(**{"process_task.return_value": {"result": "success"}}))
+
+        agent.route_request("I'm interested in wireless headphones", request_id="session")
+        response = agent.route_request("What price range are they available in?", request_id="session")
+        self.assertIn("wireless", response["context"])
+        self.assertTrue(agent.has_conversation_context("session"))
+
+        for i in range(10):
+            agent.route_request("find products", request_id=f"other-{i}")
+        self.assertEqual(len(store), 3)
+        self.assertFalse(agent.has_conversation_context("session"))
+        agent.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,193 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the src directory to the path so we can import the agent
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents/specialized'))
+
+import market_analysis
+from market_analysis import MarketAnalysisAgent
+from orchestrator import AgentTimeoutError, OrchestratorAgent
+from result_cache import normalize_task_data
+from search_backend import SearchBackend, SearchTimeoutError
+
+
+class HangingAgent:
+    """Sync agent that blocks until released, like a hung tool call."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.tasks = []
+
+    def process_task(self, task_data):
+        self.tasks.append(task_data)
+        self.release.wait(5)
+        return {"result": "success", "source": "HangingAgent"}
+
+
+class HangingAsyncAgent:
+    """Coroutine agent that never finishes unless cancelled."""
+
+    def __init__(self):
+        self.cancelled = False
+
+    async def process_task_async(self, task_data):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+    def process_task(self, task_data):
+        raise AssertionError("sync path used")
+
+
+class ProductsAgent:
+    def process_task(self, task_data):
+        return {"result": "success", "products": [{"name": "Headphones"}]}
+
+
+class RecordingBackend(SearchBackend):
+    def __init__(self):
+        self.timeouts = []
+
+    def search(self, query, context="", timeout=None):
+        self.timeouts.append(timeout)
+        return market_analysis.simulated_search_results(query, context)
+
+
+class TestRequestDeadlines(unittest.TestCase):
+    """Requests carry a deadline; agents that overrun yield a timed_out response."""
+
+    def setUp(self):
+        self.aiplatform_patch = patch('google.cloud.aiplatform.init')
+        self.credentials_patch = patch('google.auth.default', return_value=(MagicMock(), "test-project-id"))
+        self.aiplatform_patch.start()
+        self.credentials_patch.start()
+        self.agent = OrchestratorAgent(project_id="test-project-id", location="us-central1",
+                                       max_workers=8, request_timeout=0.2)
+        self.hanging = HangingAgent()
+        self.addCleanup(self.hanging.release.set)
+
+    def tearDown(self):
+        self.agent.close()
+        self.aiplatform_patch.stop()
+        self.credentials_patch.stop()
+
+    def test_hung_agent_returns_partial_response(self):
+        self.agent.register_agent("ProductResearchAgent", self.hanging)
+
+        start = time.perf_counter()
+        response = self.agent.route_request("research wireless headphones")
+        elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(response["status"], "partial")
+        self.assertTrue(response["timed_out"])
+        self.assertNotIn("agent_response", response)
+        self.assertNotIn("agent_error", response)
+        self.assertAlmostEqual(self.hanging.tasks[0]["deadline"], time.time(), delta=1.0)
+
+    def test_no_deadline_without_timeout(self):
+        agent = OrchestratorAgent(project_id="test-project-id", location="us-central1")
+        self.addCleanup(agent.close)
+        agent.register_agent("ProductResearchAgent", ProductsAgent())
+
+        response = agent.route_request("research wireless headphones")
+
+        self.assertEqual(response["status"], "success")
+        self.assertNotIn("timed_out", response)
+
+    def test_async_agent_is_cancelled(self):
+        hanging = HangingAsyncAgent()
+        self.agent.register_agent("ProductResearchAgent", hanging)
+
+        response = asyncio.run(self.agent.route_request_async("research wireless headphones", timeout=0.05))
+
+        self.assertTrue(response["timed_out"])
+        self.assertTrue(hanging.cancelled)
+        with self.assertRaises(AgentTimeoutError):
+            asyncio.run(self.agent.delegate_task_async("ProductResearchAgent", {"query": "x", "deadline": time.time() - 1}))
+
+    def test_batch_items_time_out(self):
+        self.agent.register_agent("ProductResearchAgent", self.hanging)
+
+        responses = self.agent.route_batch(["find product a", "find product b"])
+
+        self.assertTrue(all(r["timed_out"] and r["status"] == "partial" for r in responses))
+
+    def test_workflow_keeps_finished_stages(self):
+        self.agent.register_agent("ProductResearchAgent", ProductsAgent())
+        self.agent.register_agent("MarketAnalysisAgent", self.hanging)
+        self.agent.register_agent("ProductEvaluationAgent", ProductsAgent())
+
+        result = self.agent.execute_workflow("wireless headphones")
+
+        self.assertEqual(result["status"], "partial")
+        self.assertTrue(result["timed_out"])
+        self.assertEqual(result["products"], [{"name": "Headphones"}])
+        self.assertEqual(result["stages"]["market_analysis"]["status"], "timed_out")
+        # The evaluation does not need the market analysis, but waits for it past the deadline
+        self.assertEqual(result["stages"]["product_evaluation"]["status"], "timed_out")
+        self.assertNotIn("errors", result)
+
+
+class TestAgentToolDeadlines(unittest.TestCase):
+    """Agents bound their tool calls by the request deadline."""
+
+    def test_shared_search_runs_under_the_backend_timeout(self):
+        backend = RecordingBackend()
+        agent = MarketAnalysisAgent(search_backend=backend)
+
+        agent.process_task({"query": "headphone market", "deadline": time.time() + 2})
+        asyncio.run(agent.process_task_async({"query": "watch market", "deadline": time.time() + 2}))
+
+        # A search may be shared with callers whose deadlines differ
+        self.assertEqual(backend.timeouts, [None, None])
+
+    def test_coalesced_callers_keep_their_own_deadlines(self):
+        with patch('google.cloud.aiplatform.init'), \
+                patch('google.auth.default', return_value=(MagicMock(), "test-project-id")):
+            orchestrator = OrchestratorAgent(project_id="test-project-id", location="us-central1", max_workers=8)
+        self.addCleanup(orchestrator.close)
+        agent = MarketAnalysisAgent()
+        orchestrator.register_agent("MarketAnalysisAgent", agent)
+        request = "smart watch market trends"
+
+        async def run():
+            return await asyncio.gather(orchestrator.route_request_async(request, timeout=0.1),
+                                        orchestrator.route_request_async(request, timeout=5))
+
+        short, long = asyncio.run(run())
+        self.assertTrue(short["timed_out"])
+        self.assertEqual(long["status"], "success")
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            short = pool.submit(orchestrator.route_request, request, timeout=0.1)
+            long = pool.submit(orchestrator.route_request, request, timeout=5)
+            short, long = short.result(), long.result()
+        self.assertTrue(short["timed_out"])
+        self.assertEqual(long["status"], "success")
+        self.assertEqual(agent.get_search_metrics()["executions"], 2)
+
+    def test_simulated_search_stops_at_deadline(self):
+        agent = MarketAnalysisAgent()
+
+        start = time.perf_counter()
+        with self.assertRaises(SearchTimeoutError):
+            agent.process_task({"query": "headphone market", "deadline": time.time() + 0.05})
+        self.assertLess(time.perf_counter() - start, market_analysis.SIMULATED_SEARCH_LATENCY)
+
+    def test_deadline_is_not_part_of_cache_keys(self):
+        self.assertEqual(normalize_task_data({"query": "a", "deadline": 1.0}),
+                         normalize_task_data({"query": "a", "deadline": 2.0}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import threading
+
+# Add the src directory to the path so we can import the agent
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents'))
+
+from orchestrator import OrchestratorAgent, INIT_FAILED, INIT_INITIALIZING, INIT_READY
+
+
+class TestLazyInitialization(unittest.TestCase):
+    """Unit tests for deferred, background Vertex AI initialization."""
+
+    def setUp(self):
+        self.release_init = threading.Event()
+        self.aiplatform_patch = patch('google.cloud.aiplatform.init', side_effect=lambda **kwargs: self.release_init.wait(5))
+        self.credentials_patch = patch('google.auth.default', return_value=(MagicMock(), "test-project-id"))
+        self.mock_aiplatform = self.aiplatform_patch.start()
+        self.mock_credentials = self.credentials_patch.start()
+
+    def tearDown(self):
+        self.release_init.set()
+        self.aiplatform_patch.stop()
+        self.credentials_patch.stop()
+
+    def test_routable_while_initializing(self):
+        agent = OrchestratorAgent(project_id="test-project-id", location="us-central1", lazy_init=True)
+        agent.register_agent("ProductResearchAgent", MagicMock(**{"process_task.return_value": {"result": "success"}}))
+
+        self.assertEqual(agent.get_init_state(), INIT_INITIALIZING)
+        self.assertFalse(agent.is_ready())
+        response = agent.route_request("research wireless headphones")
+        self.assertEqual(response["status"], "success")
+        self.assertEqual(response["delegated_to"], "ProductResearchAgent")
+
+        self.release_init.set()
+        self.assertTrue(agent.wait_until_ready(timeout=5))
+        self.assertEqual(agent.get_init_state(), INIT_READY)
+        self.mock_aiplatform.assert_called_once_with(project="test-project-id", location="us-central1")
+        agent.close()
+
+    def test_failed_background_init_refuses_requests(self):
+        self.mock_aiplatform.side_effect = Exception("Failed to initialize")
+        agent = OrchestratorAgent(project_id="test-project-id", location="us-central1", lazy_init=True)
+
+        self.assertFalse(agent.wait_until_ready(timeout=5))
+        self.assertEqual(agent.get_init_state(), INIT_FAILED)
+        self.assertIn("Failed to initialize", agent.get_status_message())
+        response = agent.route_request("research wireless headphones")
+        self.assertEqual(response["status"], "error")
+        agent.close()
+
+    def test_eager_init_is_default(self):
+        self.release_init.set()
+        agent = OrchestratorAgent(project_id="test-project-id", location="us-central1")
+
+        self.assertEqual(agent.get_init_state(), INIT_READY)
+        self.assertTrue(agent.is_ready())
+        agent.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,200 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+from unittest.mock import patch, MagicMock
+
+# Add the specialized agents directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents/specialized'))
+
+import live_catalog
+from catalog_index import CatalogIndex
+from live_catalog import LiveCatalog, Segment, read_feed
+from orchestrator import OrchestratorAgent
+from product_research import ProductResearchAgent
+from product_store import write_product_store
+from result_cache import TTLCache
+from vector_store import HashedNgramEmbedder
+
+PRODUCTS = [
+    {"sku": "HP-1", "name": "SonicWave Pro", "type": "Wireless Headphones", "price": 129.99, "rating": 4.7,
+     "features": ["Active Noise Cancellation", "Bluetooth 5.2"]},
+    {"sku": "SW-1", "name": "TimeKeeper Pro", "type": "Smart Watch", "price": 249.99, "rating": 4.6,
+     "features": ["Heart rate monitoring", "GPS"]},
+    {"sku": "KT-1", "name": "BrewMaster Kettle", "type": "Electric Kettle", "price": 39.99, "rating": 4.1,
+     "features": ["Stainless steel"]},
+]
+
+
+def write_feed(path, records):
+    with open(path, "w") as f:
+        f.write("\n".join(json.dumps(record) for record in records))
+
+
+class TestLiveCatalog(unittest.TestCase):
+    """Unit tests for incremental catalog ingestion."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.feed_path = os.path.join(self.directory.name, "feed.jsonl")
+        index = CatalogIndex(PRODUCTS)
+        self.catalog = LiveCatalog(Segment.from_catalog(index, index))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def skus(self, query, **filters):
+        return [product["sku"] for product in self.catalog.search(query, **filters)]
+
+    def test_read_feed_yields_chunks(self):
+        write_feed(self.feed_path, [{"sku": f"P-{i}", "name": "Widget"} for i in range(5)]
+                   + [{"op": "delete", "sku": "P-0"}, {"name": "No sku"}])
+
+        chunks = list(read_feed(self.feed_path, chunk_size=3))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 3, 1])
+        self.assertEqual(chunks[1][2], ("delete", "P-0", {"sku": "P-0"}))
+        self.assertIsNone(chunks[2][0][1])
+
+    def test_upserts_and_deletes(self):
+        write_feed(self.feed_path, [
+            {"sku": "HP-1", "name": "SonicWave Pro", "type": "Wireless Headphones", "price": 99.99, "rating": 4.7},
+            {"sku": "HP-2", "name": "AudioPhase X300", "type": "Wireless Headphones", "price": 199.99, "rating": 4.8},
+            {"op": "delete", "sku": "KT-1"},
+            {"op": "delete", "sku": "UNKNOWN"},
+            {"op": "rename", "sku": "SW-1"},
+        ])
+
+        totals = self.catalog.ingest(self.feed_path, chunk_size=2)
+
+        self.assertEqual(totals, {"upserted": 2, "deleted": 1, "skipped": 1})
+        self.assertEqual(len(self.catalog), 3)
+        self.assertEqual(sorted(self.skus("wireless headphones")), ["HP-1", "HP-2"])
+        self.assertEqual(self.skus("headphones", max_price=150), ["HP-1"])
+        self.assertEqual(self.skus("kettle"), [])
+        self.assertEqual(self.skus("", limit=1), ["HP-2"])
+
+    def test_snapshot_is_unaffected_by_later_changes(self):
+        snapshot = self.catalog.snapshot()
+
+        self.catalog.apply([("delete", "SW-1", {}), ("upsert", "KT-1", dict(PRODUCTS[2], price=19.99))])
+
+        self.assertEqual([p["sku"] for p in snapshot.search("smart watch")], ["SW-1"])
+        self.assertEqual(snapshot.search("kettle")[0]["price"], 39.99)
+        self.assertEqual(self.skus("smart watch"), [])
+        self.assertEqual(self.catalog.search("kettle")[0]["price"], 19.99)
+
+    def test_compaction_merges_segments_and_keeps_changes_made_meanwhile(self):
+        for i in range(4):
+            self.catalog.apply([("upsert", f"EB-{i}", {"sku": f"EB-{i}", "name": f"EchoBeats {i}", "type": "Earbuds"})])
+        self.catalog.apply([("delete", "EB-0", {})])
+        self.assertEqual(self.catalog.segment_count, 5)
+
+        # A change that lands while the merged segment is being built
+        original_build = Segment.build
+
+        def build_during_ingest(*args, **kwargs):
+            segment = original_build(*args, **kwargs)
+            if not build_during_ingest.applied:
+                build_during_ingest.applied = True
+                self.catalog.apply([("delete", "EB-1", {})])
+            return segment
+        build_during_ingest.applied = False
+        live_catalog.Segment.build = build_during_ingest
+        try:
+            self.assertTrue(self.catalog.compact())
+        finally:
+            live_catalog.Segment.build = original_build
+
+        self.assertEqual(self.catalog.segment_count, 2)
+        self.assertEqual(sorted(self.skus("earbuds")), ["EB-2", "EB-3"])
+        self.assertEqual(len(self.catalog), 5)
+        # The row deleted meanwhile is dropped by the next compaction
+        self.assertTrue(self.catalog.compact())
+        self.assertEqual(len(self.catalog.snapshot().segments[1]), 2)
+        self.assertFalse(self.catalog.compact())
+
+    def test_too_many_segments_compact_in_background(self):
+        self.catalog.max_segments = 2
+        for i in range(3):
+            self.catalog.apply([("upsert", f"EB-{i}", {"sku": f"EB-{i}", "name": "EchoBeats", "type": "Earbuds"})])
+
+        self.catalog._compaction.join(timeout=5)
+
+        self.assertEqual(self.catalog.segment_count, 2)
+        self.assertEqual(len(self.skus("earbuds")), 3)
+
+
+class TestProductResearchIngestion(unittest.TestCase):
+    """ProductResearchAgent applies feeds to its live catalog."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store_path = os.path.join(self.directory.name, "catalog.pstore")
+        write_product_store(self.store_path, PRODUCTS)
+        self.feed_path = os.path.join(self.directory.name, "feed.jsonl")
+        write_feed(self.feed_path, [
+            {"sku": "EB-1", "name": "EchoBeats Lite", "type": "Wireless Earbuds", "price": 89.99, "rating": 4.5,
+             "features": ["Water resistant"]},
+            {"op": "delete", "sku": "HP-1"},
+        ])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_keyword_catalog(self):
+        agent = ProductResearchAgent(catalog_path=self.store_path)
+
+        agent.ingest(self.feed_path)
+        response = agent.process_task({"query": "wireless"})
+
+        self.assertEqual([p["sku"] for p in response["products"]], ["EB-1"])
+        self.assertIn("catalog of 3 products", response["source"])
+
+    def test_vector_catalog(self):
+        agent = ProductResearchAgent(catalog_path=self.store_path,
+                                     embeddings_path=os.path.join(self.directory.name, "embeddings.npy"))
+
+        agent.ingest(self.feed_path)
+        response = agent.process_task({"query": "wireless earbuds", "max_price": 100})
+
+        self.assertEqual(response["products"][0]["sku"], "EB-1")
+        self.assertNotIn("HP-1", [p["sku"] for p in agent.process_task({"query": "headphones"})["products"]])
+        self.assertIsInstance(agent.live_catalog.embedder, HashedNgramEmbedder)
+
+    def test_orchestrator_ingest_invalidates_cached_results(self):
+        with patch('google.cloud.aiplatform.init'), \
+                patch('google.auth.default', return_value=(MagicMock(), "test-project-id")):
+            orchestrator = OrchestratorAgent(project_id="test-project-id", location="us-central1",
+                                             stage_cache=TTLCache())
+        orchestrator.register_agent("ProductResearchAgent", ProductResearchAgent(catalog_path=self.store_path),
+                                    cache_ttl_seconds=300)
+        self.addCleanup(orchestrator.close)
+        task = {"query": "wireless"}
+
+        self.assertEqual([p["sku"] for p in orchestrator.delegate_task("ProductResearchAgent", task)["products"]],
+                         ["HP-1"])
+        self.assertEqual([p["sku"] for p in orchestrator.execute_workflow("wireless")["products"]], ["HP-1"])
+
+        orchestrator.ingest("ProductResearchAgent", self.feed_path)
+
+        self.assertEqual([p["sku"] for p in orchestrator.delegate_task("ProductResearchAgent", task)["products"]],
+                         ["EB-1"])
+        result = orchestrator.execute_workflow("wireless")
+        self.assertEqual([p["sku"] for p in result["products"]], ["EB-1"])
+        self.assertEqual(result["reused_stages"], [])
+        with self.assertRaises(ValueError):
+            orchestrator.ingest("MarketAnalysisAgent", self.feed_path)
+
+    def test_feed_without_a_catalog(self):
+        agent = ProductResearchAgent()
+
+        agent.ingest(self.feed_path)
+
+        self.assertEqual(agent.process_task({"query": "earbuds"})["products"][0]["name"], "EchoBeats Lite")
+
+
+if __name__ == '__main__':
+    unittest.main()
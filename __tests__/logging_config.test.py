@@ -0,0 +1,98 @@
+import unittest
+import io
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+
+# Add the src directory to the path so we can import the agent
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents'))
+
+from logging_config import (SAMPLED, SamplingFilter, _NonBlockingQueueHandler, _parse_sample_rates,
+                            configure_logging, logging_stats, shutdown_logging)
+from tracing import Tracer
+
+
+class FormattedOn:
+    """Log argument that records which thread formatted it."""
+
+    def __init__(self):
+        self.threads = []
+
+    def __str__(self):
+        self.threads.append(threading.current_thread().name)
+        return "value"
+
+
+class TestLoggingPipeline(unittest.TestCase):
+    """Unit tests for the queue-based, sampled logging setup."""
+
+    def setUp(self):
+        self.stream = io.StringIO()
+        self.logger = logging.getLogger("logging_config_test")
+        self.addCleanup(shutdown_logging)
+
+    def lines(self):
+        shutdown_logging()
+        return [json.loads(line) for line in self.stream.getvalue().splitlines()]
+
+    def test_records_are_formatted_on_the_writer_thread(self):
+        configure_logging(level="INFO", stream=self.stream)
+        argument = FormattedOn()
+
+        self.logger.info("Routed %s", argument, extra={"request_id": "r1"})
+        lines = self.lines()
+
+        self.assertEqual(lines[0]["message"], "Routed value")
+        self.assertEqual(lines[0]["severity"], "INFO")
+        self.assertEqual(lines[0]["request_id"], "r1")
+        self.assertNotIn(threading.current_thread().name, argument.threads)
+
+    def test_only_marked_records_are_sampled(self):
+        configure_logging(level="DEBUG", stream=self.stream, sample_rates={logging.INFO: 0.0})
+
+        for _ in range(10):
+            self.logger.info("per request", extra=SAMPLED)
+        self.logger.info("lifecycle")
+        self.logger.warning("slow agent", extra=SAMPLED)
+        self.logger.debug("debug line", extra=SAMPLED)
+        self.assertEqual(logging_stats()["sampled_out"], 10)
+
+        self.assertEqual([line["message"] for line in self.lines()], ["lifecycle", "slow agent", "debug line"])
+
+    def test_sampling_rate(self):
+        sampler = SamplingFilter({logging.INFO: 0.1}, seed=3)
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "msg", (), None)
+        record.sampled = True
+
+        kept = sum(sampler.filter(record) for _ in range(10000))
+
+        self.assertAlmostEqual(kept / 10000, 0.1, delta=0.02)
+        self.assertEqual(sampler.dropped, 10000 - kept)
+        self.assertEqual(_parse_sample_rates("DEBUG=0.01, INFO=0.5"), {logging.DEBUG: 0.01, logging.INFO: 0.5})
+
+    def test_records_carry_the_trace(self):
+        configure_logging(level="INFO", stream=self.stream)
+        tracer = Tracer()
+
+        with tracer.span("route_request") as span:
+            self.logger.info("inside a span")
+        line = self.lines()[0]
+
+        self.assertEqual((line["trace_id"], line["span_id"]), (span.trace_id, span.span_id))
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = _NonBlockingQueueHandler(queue.Queue(maxsize=2))
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "msg", (), None)
+
+        for _ in range(5):
+            handler.handle(record)
+
+        self.assertEqual(handler.dropped, 3)
+        self.assertEqual(handler.queue.qsize(), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
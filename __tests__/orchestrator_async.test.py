@@ -0,0 +1,103 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import asyncio
+import os
+import sys
+import time
+
+# Add the src directory to the path so we can import the agent
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents/specialized'))
+
+from orchestrator import OrchestratorAgent
+from market_analysis import MarketAnalysisAgent
+
+
+class SlowSyncAgent:
+    """Sync-only agent that blocks its thread like a slow tool call."""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def process_task(self, task_data):
+        time.sleep(self.delay)
+        return {"result": "success", "query": task_data["query"], "source": "SlowSyncAgent"}
+
+
+class TestOrchestratorAsync(unittest.IsolatedAsyncioTestCase):
+    """Unit tests for the async routing and delegation API."""
+
+    def setUp(self):
+        """Create a ready orchestrator with Vertex AI patched out."""
+        self.aiplatform_patch = patch('google.cloud.aiplatform.init')
+        self.credentials_patch = patch('google.auth.default', return_value=(MagicMock(), "test-project-id"))
+        self.aiplatform_patch.start()
+        self.credentials_patch.start()
+        self.agent = OrchestratorAgent(project_id="test-project-id", location="us-central1", max_workers=8)
+        self.assertTrue(self.agent.is_ready())
+
+    def tearDown(self):
+        self.agent.close()
+        self.aiplatform_patch.stop()
+        self.credentials_patch.stop()
+
+    async def test_route_request_async_matches_sync_response(self):
+        """The async path returns the same response shape as route_request."""
+        self.agent.register_agent("ProductResearchAgent", SlowSyncAgent(0))
+
+        response = await self.agent.route_request_async("research wireless headphones", request_id="r1")
+
+        self.assertEqual(response["status"], "success")
+        self.assertEqual(response["action"], "delegation")
+        self.assertEqual(response["delegated_to"], "ProductResearchAgent")
+        self.assertEqual(response["agent_response"]["query"], "research wireless headphones")
+        self.assertTrue(self.agent.has_conversation_context("r1"))
+
+    async def test_sync_agents_run_concurrently_in_executor(self):
+        """Sync-only agents do not serialize concurrent requests."""
+        self.agent.register_agent("ProductResearchAgent", SlowSyncAgent(0.2))
+
+        start = time.perf_counter()
+        responses = await asyncio.gather(*[
+            self.agent.route_request_async(f"find product {i}") for i in range(8)
+        ])
+        elapsed = time.perf_counter() - start
+
+        self.assertTrue(all(r["status"] == "success" for r in responses))
+        self.assertLess(elapsed, 0.2 * 8 / 2)
+
+    async def test_process_task_async_is_preferred(self):
+        """Agents with a coroutine process_task_async are awaited directly."""
+        market_agent = MarketAnalysisAgent()
+        self.agent.register_agent("MarketAnalysisAgent", market_agent)
+
+        with patch.object(market_agent, 'process_task', side_effect=AssertionError("sync path used")):
+            start = time.perf_counter()
+            responses = await asyncio.gather(*[
+                self.agent.delegate_task_async("MarketAnalysisAgent", {"query": "smart watch market trends"})
+                for _ in range(20)
+            ])
+            elapsed = time.perf_counter() - start
+
+        self.assertTrue(all(r["result"] == "success" for r in responses))
+        self.assertIn("Apple", responses[0]["market_data"]["identified_competitors"])
+        self.assertLess(elapsed, 2.0)
+
+    async def test_delegate_task_async_unknown_agent(self):
+        """Delegating to an unregistered agent raises ValueError."""
+        with self.assertRaises(ValueError):
+            await self.agent.delegate_task_async("SalesOpportunityAgent", {"query": "profit"})
+
+    async def test_agent_error_is_reported(self):
+        """Errors raised by the agent are returned as agent_error."""
+        failing_agent = MagicMock()
+        failing_agent.process_task.side_effect = RuntimeError("boom")
+        self.agent.register_agent("ProductResearchAgent", failing_agent)
+
+        response = await self.agent.route_request_async("find product ideas")
+
+        self.assertEqual(response["agent_error"], "boom")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,184 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Add the src directory to the path so we can import the agent
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents/specialized'))
+
+from orchestrator import OrchestratorAgent
+from process_pool import ProcessPoolAgent, WorkerCrashedError
+from product_research import ProductResearchAgent
+from product_store import write_product_store
+
+
+class WorkerAgent:
+    """Agent that reports the process it ran in and misbehaves on request."""
+
+    def __init__(self):
+        self.warmed = False
+        self.leak = []
+        self.catalog_version = 1
+
+    def warm_up(self):
+        self.warmed = True
+
+    def process_task(self, task_data):
+        action = task_data.get("action")
+        if action == "leak":
+            self.leak.append(bytearray(64 * 1024 * 1024))
+        elif action == "crash":
+            os._exit(3)
+        elif action == "fail":
+            raise ValueError("bad task")
+        elif action == "hang":
+            time.sleep(60)
+        return {"result": "success", "pid": os.getpid(), "warmed": self.warmed, "version": self.catalog_version}
+
+    def ingest(self, version):
+        self.catalog_version = version
+        return {"version": version}
+
+    def process_batch(self, tasks):
+        time.sleep(0.2)
+        return [{"pid": os.getpid(), "query": task["query"]} for task in tasks]
+
+
+class TestProcessPoolAgent(unittest.TestCase):
+    """Unit tests for running agents in warm worker processes."""
+
+    def setUp(self):
+        self.agent = WorkerAgent()
+        self.pool = ProcessPoolAgent(self.agent, workers=2, max_worker_memory_mb=48)
+        self.assertTrue(self.pool.warm_up(timeout=30))
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_tasks_run_in_warmed_workers(self):
+        result = self.pool.process_task({"query": "headphones"})
+
+        self.assertNotEqual(result["pid"], os.getpid())
+        self.assertTrue(result["warmed"])
+        self.assertFalse(self.agent.warmed)
+        self.assertEqual(asyncio.run(self.pool.process_task_async({}))["result"], "success")
+        self.assertEqual(self.pool.stats()["completed"], 2)
+
+    def test_batches_are_split_across_workers(self):
+        results = self.pool.process_batch([{"query": f"q{i}"} for i in range(4)])
+
+        self.assertEqual([r["query"] for r in results], ["q0", "q1", "q2", "q3"])
+        self.assertEqual(len({r["pid"] for r in results}), 2)
+
+    def test_worker_over_memory_threshold_is_recycled(self):
+        leaked = self.pool.process_task({"action": "leak"})["pid"]
+
+        pids = {self.pool.process_task({})["pid"] for _ in range(4)}
+
+        self.assertNotIn(leaked, pids)
+        self.assertEqual(self.pool.stats()["recycled"], 1)
+        # The replacement starts after the leaking task's result is returned
+        deadline = time.monotonic() + 10
+        while self.pool.stats()["alive"] < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(self.pool.stats()["alive"], 2)
+
+    def test_errors_and_crashes_are_reported(self):
+        with self.assertRaisesRegex(ValueError, "bad task"):
+            self.pool.process_task({"action": "fail"})
+        with self.assertRaises(WorkerCrashedError):
+            self.pool.process_task({"action": "crash"})
+
+        self.assertEqual(self.pool.process_task({})["result"], "success")
+        self.assertEqual(self.pool.stats()["crashed"], 1)
+
+    def test_hung_worker_times_out_and_is_replaced(self):
+        start = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            self.pool.process_task({"action": "hang", "deadline": time.time() + 0.5})
+
+        self.assertLess(time.monotonic() - start, 5)
+        results = [self.pool.process_task({}) for _ in range(4)]
+        self.assertTrue(all(r["result"] == "success" for r in results))
+        self.assertEqual(self.pool.stats()["timed_out"], 1)
+        self.assertEqual(self.pool.process_batch([]), [])
+
+    def test_ingest_reaches_the_workers(self):
+        self.assertEqual(self.pool.process_task({})["version"], 1)
+
+        self.assertEqual(self.pool.ingest(2), {"version": 2})
+
+        self.assertEqual({self.pool.process_task({})["version"] for _ in range(4)}, {2})
+        self.assertGreaterEqual(self.pool.stats()["recycled"], 1)
+
+
+class TestOrchestratorProcessWorkers(unittest.TestCase):
+    """Unit tests for registering an agent with process workers."""
+
+    def setUp(self):
+        self.aiplatform_patch = patch('google.cloud.aiplatform.init')
+        self.credentials_patch = patch('google.auth.default', return_value=(MagicMock(), "test-project-id"))
+        self.aiplatform_patch.start()
+        self.credentials_patch.start()
+        self.orchestrator = OrchestratorAgent(project_id="test-project-id", location="us-central1")
+        self.orchestrator.register_agent("ProductResearchAgent", WorkerAgent(), process_workers=2,
+                                         cache_ttl_seconds=60)
+
+    def tearDown(self):
+        self.orchestrator.close()
+        self.aiplatform_patch.stop()
+        self.credentials_patch.stop()
+
+    def test_delegation_is_transparent(self):
+        response = self.orchestrator.route_request("research wireless headphones", timeout=30)
+        async_response = asyncio.run(self.orchestrator.route_request_async("research bluetooth speakers"))
+
+        self.assertNotEqual(response["agent_response"]["pid"], os.getpid())
+        self.assertTrue(async_response["agent_response"]["warmed"])
+        self.orchestrator.route_request("research wireless headphones")
+        stats = self.orchestrator.get_process_pool_stats()["ProductResearchAgent"]
+        self.assertEqual((stats["workers"], stats["completed"]), (2, 2))
+
+
+class TestCatalogAgentInWorkers(unittest.TestCase):
+    """Unit tests for shipping a catalog-backed agent to freshly started workers."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        catalog_path = os.path.join(self.directory, "catalog.pstore")
+        write_product_store(catalog_path, [
+            {"sku": f"S{i}", "name": f"Wireless headphones {i}", "type": "Headphones",
+             "price": 20.0 + i, "rating": 4.0, "features": ["bluetooth"]}
+            for i in range(20)
+        ])
+        self.agent = ProductResearchAgent(catalog_path=catalog_path,
+                                          embeddings_path=os.path.join(self.directory, "embeddings.npy"))
+        self.pool = ProcessPoolAgent(self.agent, workers=1)
+
+    def tearDown(self):
+        self.pool.close()
+        shutil.rmtree(self.directory)
+
+    def test_workers_serve_the_same_catalog(self):
+        task = {"query": "wireless headphones", "limit": 3}
+        self.assertEqual(self.pool.process_task(task)["products"], self.agent.process_task(task)["products"])
+
+        feed = os.path.join(self.directory, "feed.jsonl")
+        with open(feed, "w") as f:
+            f.write(json.dumps({"sku": "EB", "name": "EchoBeats wireless headphones", "price": 5.0}))
+        self.pool.ingest(feed)
+
+        task = {"query": "echobeats", "limit": 3}
+        products = self.pool.process_task(task)["products"]
+        self.assertEqual(products, self.agent.process_task(task)["products"])
+        self.assertEqual(products[0]["name"], "EchoBeats wireless headphones")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,195 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add the src directory to the path so we can import the agent
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents/specialized'))
+
+from orchestrator import OrchestratorAgent
+from market_analysis import MarketAnalysisAgent
+from product_evaluation import DEFAULT_WEIGHTS, SIGNALS, ProductEvaluationAgent, ScoreMatrix
+from product_research import ProductResearchAgent
+from sales_opportunity import SalesOpportunityAgent
+
+
+def make_products(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        {"name": f"Widget {i}", "type": "Headphones", "features": ["wireless"] if i % 2 else ["wired"],
+         "price": float(price), "rating": float(rating), "reviews": int(reviews), "score": float(score)}
+        for i, (price, rating, reviews, score) in enumerate(zip(
+            rng.uniform(5, 500, n).round(2), rng.uniform(1, 5, n).round(1),
+            rng.integers(0, 5000, n), rng.random(n)))
+    ]
+
+
+class TestScoreMatrix(unittest.TestCase):
+    """Unit tests for the incremental score matrix."""
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.signals = rng.random((len(SIGNALS), 1000))
+        self.matrix = ScoreMatrix(self.signals.copy(), DEFAULT_WEIGHTS)
+
+    def test_incremental_updates_match_full_recompute(self):
+        rng = np.random.default_rng(2)
+        self.signals[2] = rng.random(1000)
+        self.matrix.update_signal(SIGNALS[2], self.signals[2])
+        weights = dict(DEFAULT_WEIGHTS, market_fit=0.4, relevance=0.1)
+        self.matrix.set_weights(weights)
+
+        expected = np.array([weights[name] for name in SIGNALS]) @ self.signals
+        np.testing.assert_allclose(self.matrix.scores, expected)
+
+    def test_top_k_matches_full_sort(self):
+        top = self.matrix.top_k(25)
+
+        np.testing.assert_array_equal(top, np.argsort(-self.matrix.scores, kind="stable")[:25])
+        np.testing.assert_array_equal(self.matrix.top_k(5000), np.argsort(-self.matrix.scores, kind="stable"))
+        self.assertEqual(len(self.matrix.top_k(0)), 0)
+
+
+class TestProductEvaluationAgent(unittest.TestCase):
+    """Unit tests for the ProductEvaluationAgent."""
+
+    def setUp(self):
+        self.agent = ProductEvaluationAgent()
+
+    def test_ranks_candidates(self):
+        products = [
+            {"name": "Poor", "price": "$30.00", "cost": 27, "rating": 2.1, "reviews": 400, "score": 0.2},
+            {"name": "Strong", "price": "$120.00", "cost": 30, "rating": 4.8, "reviews": 900, "score": 0.9,
+             "features": ["noise cancelling"]},
+            {"name": "Unknown"},
+        ]
+        market = {"market_data": {"identified_trends": ["Noise cancelling"], "identified_competitors": []}}
+
+        result = self.agent.process_task({"query": "evaluate headphones", "products": products,
+                                          "market_analysis": market})
+
+        self.assertEqual(result["result"], "success")
+        self.assertEqual(result["candidates_evaluated"], 3)
+        self.assertEqual(result["top_products"][0]["name"], "Strong")
+        self.assertEqual(result["score"], result["top_products"][0]["score"])
+        self.assertEqual(result["top_products"][0]["signals"]["market_fit"], 1.0)
+        self.assertEqual(result["top_products"][-1]["name"], "Unknown")
+
+    def test_uses_sales_opportunity_output(self):
+        products = [{"name": "Cheap", "price": 20.0, "cost": 18.0}, {"name": "Dear", "price": 200.0, "cost": 20.0}]
+        # The sales agent's estimates win over what the prices alone suggest
+        sales = {"opportunities": [
+            {"name": "Cheap", "margin": 0.6, "estimated_monthly_units": 500},
+            {"name": "Dear", "margin": 0.1, "estimated_monthly_units": None},
+        ]}
+
+        with patch('product_evaluation.estimate_sales') as estimate_sales:
+            result = self.agent.process_task({"products": products, "sales_opportunity": sales})
+
+        estimate_sales.assert_not_called()
+        signals = {p["name"]: p["signals"] for p in result["top_products"]}
+        self.assertGreater(signals["Cheap"]["margin"], signals["Dear"]["margin"])
+        self.assertEqual(signals["Cheap"]["demand"], 1.0)
+        self.assertEqual(signals["Dear"]["demand"], 0.0)
+
+    def test_rescoring_matches_fresh_evaluation(self):
+        products = make_products(2000)
+        market = {"market_data": {"identified_trends": ["wireless audio"], "identified_competitors": ["Sony"]}}
+        first = self.agent.process_task({"products": products})
+
+        rescored = self.agent.process_task({"evaluation_id": first["evaluation_id"], "market_analysis": market,
+                                            "weights": {"margin": 0.4}})
+        fresh = ProductEvaluationAgent(weights=dict(DEFAULT_WEIGHTS, margin=0.4)).process_task(
+            {"products": products, "market_analysis": market})
+
+        self.assertEqual(rescored["evaluation_id"], first["evaluation_id"])
+        self.assertEqual(rescored["top_products"], fresh["top_products"])
+        self.assertEqual(rescored["weights"]["margin"], 0.4)
+
+    def test_signal_overrides_and_errors(self):
+        first = self.agent.process_task({"products": make_products(10)})
+
+        result = self.agent.process_task({"evaluation_id": first["evaluation_id"],
+                                          "signals": {"relevance": [0.0] * 9 + [1.0]}, "limit": 1})
+        self.assertEqual(result["top_products"][0]["signals"]["relevance"], 1.0)
+
+        with self.assertRaises(ValueError):
+            self.agent.process_task({"evaluation_id": first["evaluation_id"], "signals": {"relevance": [1.0]}})
+        with self.assertRaises(ValueError):
+            self.agent.process_task({"evaluation_id": first["evaluation_id"], "weights": {"hype": 1.0}})
+        with self.assertRaises(ValueError):
+            self.agent.process_task({"evaluation_id": "missing"})
+
+    def test_invalid_overrides_leave_the_evaluation_unchanged(self):
+        first = self.agent.process_task({"products": make_products(10)})
+        market = {"market_data": {"identified_trends": ["wireless"], "identified_competitors": []}}
+
+        with self.assertRaises(ValueError):
+            self.agent.process_task({"evaluation_id": first["evaluation_id"], "market_analysis": market,
+                                     "signals": {"relevance": [1.0] * 10, "margin": [1.0]}})
+        with self.assertRaises(ValueError):
+            self.agent.process_task({"evaluation_id": first["evaluation_id"], "signals": {"relevance": [1.0] * 10},
+                                     "weights": {"hype": 1.0}})
+
+        again = self.agent.process_task({"evaluation_id": first["evaluation_id"]})
+        self.assertEqual(again["top_products"], first["top_products"])
+        self.assertEqual(again["weights"], first["weights"])
+
+    def test_evaluations_are_evicted(self):
+        agent = ProductEvaluationAgent(max_evaluations=1)
+        first = agent.process_task({"products": make_products(5)})
+        agent.process_task({"products": make_products(5)})
+
+        with self.assertRaises(ValueError):
+            agent.process_task({"evaluation_id": first["evaluation_id"]})
+
+    def test_100k_candidates_under_a_second(self):
+        products = make_products(100_000)
+        market = {"market_data": {"identified_trends": ["wireless"], "identified_competitors": ["Bose"]}}
+
+        start = time.perf_counter()
+        result = self.agent.process_task({"products": products, "market_analysis": market})
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(result["candidates_evaluated"], 100_000)
+        self.assertEqual(len(result["top_products"]), 10)
+        self.assertLess(elapsed, 1.0)
+
+    def test_workflow_reports_evaluation(self):
+        with patch('google.cloud.aiplatform.init'), \
+                patch('google.auth.default', return_value=(MagicMock(), "test-project-id")):
+            orchestrator = OrchestratorAgent(project_id="test-project-id", location="us-central1")
+        orchestrator.register_agent("ProductResearchAgent", ProductResearchAgent())
+        orchestrator.register_agent("MarketAnalysisAgent", MarketAnalysisAgent())
+        orchestrator.register_agent("SalesOpportunityAgent", SalesOpportunityAgent())
+        orchestrator.register_agent("ProductEvaluationAgent", self.agent)
+        self.addCleanup(orchestrator.close)
+
+        result = orchestrator.execute_workflow("wireless headphones")
+
+        evaluation = result["evaluation"]
+        self.assertEqual(result["stages"]["product_evaluation"]["status"], "success")
+        self.assertEqual(evaluation["candidates_evaluated"], len(result["products"]))
+        self.assertEqual({p["name"] for p in evaluation["top_products"]}, {p["name"] for p in result["products"]})
+
+    def test_workflow_evaluates_without_sales_agent(self):
+        with patch('google.cloud.aiplatform.init'), \
+                patch('google.auth.default', return_value=(MagicMock(), "test-project-id")):
+            orchestrator = OrchestratorAgent(project_id="test-project-id", location="us-central1")
+        orchestrator.register_agent("ProductResearchAgent", ProductResearchAgent())
+        orchestrator.register_agent("ProductEvaluationAgent", self.agent)
+        self.addCleanup(orchestrator.close)
+
+        result = orchestrator.execute_workflow("wireless headphones")
+
+        self.assertEqual(result["stages"]["sales_opportunity"]["status"], "skipped")
+        self.assertEqual(result["stages"]["product_evaluation"]["status"], "success")
+        self.assertEqual(result["evaluation"]["candidates_evaluated"], len(result["products"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import unittest
+import json
+import math
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# Add the specialized agents directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents/specialized'))
+
+from catalog_index import CatalogIndex, read_catalog
+from product_research import ProductResearchAgent
+from product_store import ProductStore, write_product_store
+
+PRODUCTS = [
+    {"sku": "HP-1", "name": "SonicWave Pro", "type": "Wireless Headphones", "price": "$129.99", "rating": 4.7,
+     "features": ["Active Noise Cancellation", "40-hour battery", "Bluetooth 5.2"]},
+    {"sku": "HP-2", "name": "AudioPhase X300", "type": "Wireless Headphones", "price": 199.99, "rating": 4.8,
+     "features": ["Hi-Res Audio", "Bluetooth 5.2"]},
+    {"sku": "KT-1", "name": "BrewMaster Kettle", "type": "Electric Kettle", "price": "$39.99",
+     "features": ["Stainless steel"], "stock": {"warehouse": 12}},
+    {"sku": "NR-1", "name": "Mystery Box", "price": "call us", "rating": "unrated", "features": []},
+]
+
+
+class TestProductStore(unittest.TestCase):
+    """Unit tests for the memory-mapped columnar product store."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "catalog.pstore")
+        self.assertEqual(write_product_store(self.path, PRODUCTS), len(PRODUCTS))
+        self.store = ProductStore(self.path)
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_records_round_trip(self):
+        self.assertEqual(len(self.store), 4)
+        for row, product in enumerate(PRODUCTS):
+            self.assertEqual(self.store.get(row), product)
+        with self.assertRaises(IndexError):
+            self.store.get(4)
+
+    def test_numeric_columns_are_zero_copy_views(self):
+        self.assertEqual(self.store.prices[0], 129.99)
+        self.assertTrue(math.isnan(self.store.prices[3]))
+        self.assertTrue(math.isnan(self.store.ratings[2]))
+
+        prices = np.asarray(self.store.prices)
+        self.assertFalse(prices.flags.owndata)
+        self.assertEqual(prices[1], 199.99)
+        del prices
+
+    def test_open_does_not_see_later_rewrites(self):
+        write_product_store(self.path, PRODUCTS[:1])
+
+        self.assertEqual(len(self.store), 4)
+        self.assertEqual(self.store.get(3)["name"], "Mystery Box")
+        with ProductStore(self.path) as reopened:
+            self.assertEqual(len(reopened), 1)
+
+    def test_rejects_other_files(self):
+        other = os.path.join(self.directory.name, "catalog.jsonl")
+        with open(other, "w") as f:
+            f.write(json.dumps(PRODUCTS[0]) * 3)
+        with self.assertRaises(ValueError):
+            ProductStore(other)
+
+    def test_keyword_index_over_store_matches_file_index(self):
+        jsonl_path = os.path.join(self.directory.name, "catalog.jsonl")
+        with open(jsonl_path, "w") as f:
+            f.write("\n".join(json.dumps(p) for p in PRODUCTS))
+
+        from_store = CatalogIndex(records=self.store)
+        from_file = CatalogIndex.from_file(jsonl_path)
+
+        for query, filters in [("wireless bluetooth", {}), ("kettle", {"max_price": 50}), ("", {"min_rating": 4.7})]:
+            self.assertEqual(from_store.search(query, **filters), from_file.search(query, **filters))
+
+    def test_converts_csv_catalogs(self):
+        csv_path = os.path.join(self.directory.name, "catalog.csv")
+        with open(csv_path, "w") as f:
+            f.write("sku,name,type,price,rating,features\n")
+            f.write("SW-1,TimeKeeper Pro,Smart Watch,$249.99,4.6,Heart rate monitoring; GPS\n")
+        store_path = os.path.join(self.directory.name, "csv.pstore")
+
+        write_product_store(store_path, read_catalog(csv_path))
+
+        with ProductStore(store_path) as store:
+            self.assertEqual(store.get(0), {"sku": "SW-1", "name": "TimeKeeper Pro", "type": "Smart Watch",
+                                            "price": "$249.99", "rating": 4.6,
+                                            "features": ["Heart rate monitoring", "GPS"]})
+
+
+class TestProductResearchStore(unittest.TestCase):
+    """ProductResearchAgent serves results from a product store."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "catalog.pstore")
+        write_product_store(self.path, PRODUCTS)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_keyword_search(self):
+        agent = ProductResearchAgent(catalog_path=self.path)
+
+        response = agent.process_task({"query": "wireless headphones", "max_price": 150})
+
+        self.assertEqual([p["sku"] for p in response["products"]], ["HP-1"])
+        self.assertIsInstance(agent.products, ProductStore)
+
+    def test_vector_search_skips_the_keyword_index(self):
+        agent = ProductResearchAgent(catalog_path=self.path,
+                                     embeddings_path=os.path.join(self.directory.name, "embeddings.npy"))
+
+        response = agent.process_task({"query": "electric kettle", "limit": 1})
+
+        self.assertIsNone(agent.catalog)
+        self.assertEqual(response["products"][0]["sku"], "KT-1")
+        self.assertEqual(response["products"][0]["stock"], {"warehouse": 12})
+
+
+if __name__ == '__main__':
+    unittest.main()
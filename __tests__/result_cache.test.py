@@ -0,0 +1,114 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import asyncio
+import os
+import sys
+
+# Add the src directory to the path so we can import the agent
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents/specialized'))
+
+from orchestrator import OrchestratorAgent
+from result_cache import CachedAgent, TTLCache, normalize_task_data
+from market_analysis import MarketAnalysisAgent
+
+
+class FakeClock:
+    """Manually advanced time source."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache(unittest.TestCase):
+    """Unit tests for the TTL result cache."""
+
+    def test_normalized_keys(self):
+        self.assertEqual(
+            normalize_task_data({"query": "Smart  Watch trends", "context": None}),
+            normalize_task_data({"query": "smart watch trends "}),
+        )
+        self.assertNotEqual(
+            normalize_task_data({"query": "smart watch trends", "context": "fitness"}),
+            normalize_task_data({"query": "smart watch trends"}),
+        )
+        self.assertEqual(
+            normalize_task_data({"query": "a", "deadline": 1.0}, ignore_keys=["deadline"]),
+            normalize_task_data({"query": "a", "deadline": 2.0}, ignore_keys=["deadline"]),
+        )
+
+    def test_expiry_and_lru_eviction(self):
+        clock = FakeClock()
+        cache = TTLCache(max_entries=2, ttl_seconds=10, clock=clock)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), (True, 1))
+        cache.set("c", 3)
+        self.assertEqual(cache.get("b"), (False, None))
+        clock.now += 11
+        self.assertEqual(cache.get("a"), (False, None))
+
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 2)
+        self.assertEqual(stats["evictions"], 1)
+
+    def test_cached_agent_serves_repeats(self):
+        agent = MagicMock()
+        agent.process_task.side_effect = lambda task: {"result": "success", "query": task["query"], "products": ["A"]}
+        cached = CachedAgent(agent)
+
+        first = cached.process_task({"query": "Wireless headphones"})
+        first["products"].append("mutated")
+        second = cached.process_task({"query": "wireless  headphones"})
+
+        agent.process_task.assert_called_once()
+        self.assertEqual(second["products"], ["A"])
+        self.assertEqual(second["query"], "wireless  headphones")
+        self.assertEqual(cached.cache.stats()["hits"], 1)
+
+    def test_cached_agent_keeps_async_interface(self):
+        cached = CachedAgent(MarketAnalysisAgent())
+        self.assertTrue(asyncio.iscoroutinefunction(cached.process_task_async))
+        self.assertFalse(hasattr(CachedAgent(MagicMock(spec=["process_task"])), "process_task_async"))
+
+        async def run_twice():
+            await cached.process_task_async({"query": "smart watch market trends"})
+            return await cached.process_task_async({"query": "smart watch market trends"})
+
+        result = asyncio.run(run_twice())
+        self.assertIn("Apple", result["market_data"]["identified_competitors"])
+        self.assertEqual(cached.cache.stats()["hits"], 1)
+
+
+class TestOrchestratorCacheOptIn(unittest.TestCase):
+    """Agents opt in to caching at register_agent."""
+
+    def setUp(self):
+        self.aiplatform_patch = patch('google.cloud.aiplatform.init')
+        self.credentials_patch = patch('google.auth.default', return_value=(MagicMock(), "test-project-id"))
+        self.aiplatform_patch.start()
+        self.credentials_patch.start()
+
+    def tearDown(self):
+        self.aiplatform_patch.stop()
+        self.credentials_patch.stop()
+
+    def test_register_agent_with_cache(self):
+        agent = OrchestratorAgent(project_id="test-project-id", location="us-central1")
+        research = MagicMock(**{"process_task.return_value": {"result": "success", "products": []}})
+        agent.register_agent("ProductResearchAgent", research, cache_ttl_seconds=60)
+
+        for _ in range(3):
+            agent.delegate_task("ProductResearchAgent", {"query": "find trending gadgets", "context": "trending gadgets"})
+
+        research.process_task.assert_called_once()
+        self.assertEqual(agent.get_cache_stats()["ProductResearchAgent"]["hits"], 2)
+        agent.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import time
+
+# Add the src directory to the path so we can import the agent
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents/specialized'))
+
+from orchestrator import OrchestratorAgent
+from market_analysis import MarketAnalysisAgent
+
+
+class EchoAgent:
+    """Sync-only agent without batch support."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def process_task(self, task_data):
+        self.calls += 1
+        time.sleep(self.delay)
+        if "explode" in task_data["query"]:
+            raise RuntimeError("agent failure")
+        return {"result": "success", "query": task_data["query"]}
+
+
+class TestRouteBatch(unittest.TestCase):
+    """Unit tests for OrchestratorAgent.route_batch."""
+
+    def setUp(self):
+        self.aiplatform_patch = patch('google.cloud.aiplatform.init')
+        self.credentials_patch = patch('google.auth.default', return_value=(MagicMock(), "test-project-id"))
+        self.aiplatform_patch.start()
+        self.credentials_patch.start()
+        self.agent = OrchestratorAgent(project_id="test-project-id", location="us-central1")
+
+    def tearDown(self):
+        self.agent.close()
+        self.aiplatform_patch.stop()
+        self.credentials_patch.stop()
+
+    def test_results_in_input_order_with_per_item_errors(self):
+        research = EchoAgent()
+        self.agent.register_agent("ProductResearchAgent", research)
+        requests = [
+            "research wireless headphones",
+            "Find a profitable niche for a drop shipping business",
+            "explode this product",
+            "Which option has the best profit?",
+            "find trending gadgets",
+        ]
+
+        responses = self.agent.route_batch(requests, request_ids=["a", "b", "c", "d", "e"])
+
+        self.assertEqual([r["request_id"] for r in responses], ["a", "b", "c", "d", "e"])
+        self.assertEqual(responses[0]["agent_response"]["query"], "research wireless headphones")
+        self.assertEqual(responses[1]["action"], "plan_generated")
+        self.assertEqual(responses[2]["agent_error"], "agent failure")
+        self.assertEqual(responses[3]["message"], "No agent available for SalesOpportunityAgent")
+        self.assertEqual(responses[4]["agent_response"]["query"], "find trending gadgets")
+        self.assertEqual(research.calls, 3)
+        self.assertTrue(self.agent.has_conversation_context("e"))
+
+    def test_process_batch_receives_whole_group(self):
+        batch_agent = MagicMock(spec=["process_task", "process_batch"])
+        batch_agent.process_batch.side_effect = lambda tasks: [
+            RuntimeError("bad item") if "bad" in t["query"] else {"query": t["query"]} for t in tasks
+        ]
+        self.agent.register_agent("MarketAnalysisAgent", batch_agent)
+
+        responses = self.agent.route_batch(["market for watches", "bad market", "market for shoes"])
+
+        batch_agent.process_batch.assert_called_once()
+        batch_agent.process_task.assert_not_called()
+        self.assertEqual(len(batch_agent.process_batch.call_args[0][0]), 3)
+        self.assertEqual(responses[0]["agent_response"], {"query": "market for watches"})
+        self.assertEqual(responses[1]["agent_error"], "bad item")
+        self.assertEqual(responses[2]["agent_response"], {"query": "market for shoes"})
+
+    def test_per_item_fallback_runs_concurrently(self):
+        self.agent.register_agent("ProductResearchAgent", EchoAgent(delay=0.2))
+
+        start = time.perf_counter()
+        responses = self.agent.route_batch([f"product idea {i}" for i in range(10)])
+        elapsed = time.perf_counter() - start
+
+        self.assertTrue(all("agent_response" in r for r in responses))
+        self.assertLess(elapsed, 1.0)
+
+    def test_market_batch_shares_searches(self):
+        market = MarketAnalysisAgent()
+        self.agent.register_agent("MarketAnalysisAgent", market, cache_ttl_seconds=60)
+
+        responses = self.agent.route_batch(
+            ["Smart watch market trends", "smart watch market trends?", "Headphone market trends"] * 3
+        )
+
+        self.assertEqual(market.get_search_metrics()["executions"], 2)
+        self.assertTrue(all(r["agent_response"]["result"] == "success" for r in responses))
+        self.assertIn("Apple", responses[1]["agent_response"]["market_data"]["identified_competitors"])
+        self.assertEqual(responses[1]["agent_response"]["query"], "smart watch market trends?")
+
+
+if __name__ == '__main__':
+    unittest.main()
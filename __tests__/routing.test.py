@@ -0,0 +1,96 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import json
+import os
+import sys
+import tempfile
+
+# Add the src directory to the path so we can import the agent
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents'))
+
+from orchestrator import OrchestratorAgent
+from routing import PLAN_TARGET, RoutingTable
+
+
+class TestRoutingTable(unittest.TestCase):
+    """Unit tests for the compiled keyword routing table."""
+
+    def test_default_routes(self):
+        table = RoutingTable()
+        cases = {
+            "Find a profitable niche for a drop shipping business": PLAN_TARGET,
+            "research wireless headphones": "ProductResearchAgent",
+            "Find trending gadgets": "ProductResearchAgent",
+            "What are the latest market trends for smart watches?": "MarketAnalysisAgent",
+            "Which one has better profit?": "SalesOpportunityAgent",
+            "Please evaluate these": "ProductEvaluationAgent",
+            "Tell me something": "ProductResearchAgent",
+        }
+        for request, target in cases.items():
+            self.assertEqual(table.match(request), target, request)
+
+    def test_priority_does_not_depend_on_position(self):
+        table = RoutingTable()
+        # "market" appears first, but product research routes have priority
+        self.assertEqual(table.match("market share of noise-cancelling headphones"), "ProductResearchAgent")
+
+    def test_overlapping_keywords(self):
+        table = RoutingTable([
+            {"target": "A", "keywords": ["she"]},
+            {"target": "B", "keywords": ["he", "hers"]},
+        ], default_target=None)
+        self.assertEqual(table.match("ushers"), "A")
+        self.assertEqual(table.match("the"), "B")
+        self.assertIsNone(table.match("xyz"))
+
+    def test_add_rules_recompiles(self):
+        table = RoutingTable()
+        self.assertEqual(table.match("suggest a warehouse"), "ProductResearchAgent")
+        table.add_rules("LogisticsAgent", ["warehouse"])
+        self.assertEqual(table.match("suggest a warehouse"), "LogisticsAgent")
+
+    def test_from_file(self):
+        config = {
+            "routes": [{"target": "InventoryAgent", "keywords": ["stock level"]}],
+            "default": "MarketAnalysisAgent",
+        }
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump(config, f)
+        try:
+            table = RoutingTable.from_file(f.name)
+        finally:
+            os.unlink(f.name)
+        self.assertEqual(table.match("Check the Stock Level"), "InventoryAgent")
+        self.assertEqual(table.match("anything else"), "MarketAnalysisAgent")
+
+
+class TestOrchestratorRouting(unittest.TestCase):
+    """Routing rules declared at register_agent time."""
+
+    def setUp(self):
+        self.aiplatform_patch = patch('google.cloud.aiplatform.init')
+        self.credentials_patch = patch('google.auth.default', return_value=(MagicMock(), "test-project-id"))
+        self.aiplatform_patch.start()
+        self.credentials_patch.start()
+
+    def tearDown(self):
+        self.aiplatform_patch.stop()
+        self.credentials_patch.stop()
+
+    def test_register_agent_with_keywords(self):
+        agent = OrchestratorAgent(project_id="test-project-id", location="us-central1")
+        logistics = MagicMock(**{"process_task.return_value": {"result": "success"}})
+        agent.register_agent("LogisticsAgent", logistics, routing_keywords=["shipping cost", "warehouse"])
+
+        response = agent.route_request("Estimate shipping cost to Canada")
+
+        self.assertEqual(response["delegated_to"], "LogisticsAgent")
+        logistics.process_task.assert_called_once()
+        # Planning phrases still take precedence
+        plan = agent.route_request("Write a business plan for a warehouse")
+        self.assertEqual(plan["action"], "plan_generated")
+        agent.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
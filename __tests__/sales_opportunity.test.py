@@ -0,0 +1,107 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import math
+import os
+import sys
+
+import numpy as np
+
+# Add the src directory to the path so we can import the agent
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents/specialized'))
+
+from orchestrator import OrchestratorAgent
+from product_research import ProductResearchAgent
+from sales_opportunity import (DEFAULT_COST_RATIO, ELASTICITY_RANGE, FEE_RATE, FULFILMENT_COST,
+                               SalesOpportunityAgent, estimate_sales)
+
+
+class TestEstimateSales(unittest.TestCase):
+    """Unit tests for the vectorized sales estimates."""
+
+    def test_margins_and_missing_columns(self):
+        estimates = estimate_sales(
+            prices=np.array([100.0, 50.0, np.nan]),
+            costs=np.array([40.0, np.nan, 10.0]),
+            ratings=np.array([4.0, np.nan, 5.0]),
+        )
+
+        self.assertAlmostEqual(estimates["unit_profit"][0], 100 * (1 - FEE_RATE) - 40 - FULFILMENT_COST)
+        self.assertAlmostEqual(estimates["cost"][1], 50 * DEFAULT_COST_RATIO)
+        self.assertEqual(list(estimates["cost_estimated"]), [False, True, False])
+        self.assertTrue(math.isnan(estimates["margin"][2]))
+        self.assertEqual(estimates["opportunity_score"][2], 0.0)
+        self.assertEqual(estimates["opportunity_score"].max(), 100.0)
+
+    def test_demand_falls_with_price_and_rises_with_rating(self):
+        estimates = estimate_sales(
+            prices=np.array([20.0, 40.0, 40.0, 80.0]),
+            ratings=np.array([4.0, 4.0, 5.0, 4.0]),
+            reviews=np.array([100, 100, 100, 100]),
+        )
+        units = estimates["monthly_units"]
+
+        self.assertGreater(units[0], units[1])
+        self.assertGreater(units[1], units[3])
+        self.assertGreater(units[2], units[1])
+        self.assertLess(estimates["elasticity"][2], estimates["elasticity"][1])
+        self.assertTrue(np.all((estimates["elasticity"] >= ELASTICITY_RANGE[0]) & (estimates["elasticity"] <= ELASTICITY_RANGE[1])))
+
+    def test_large_sets(self):
+        rng = np.random.default_rng(3)
+        prices = rng.uniform(5, 500, 100_000)
+        estimates = estimate_sales(prices, prices * rng.uniform(0.2, 0.9, len(prices)), rng.uniform(1, 5, len(prices)))
+
+        self.assertEqual(len(estimates["margin"]), len(prices))
+        self.assertFalse(np.isnan(estimates["opportunity_score"]).any())
+
+
+class TestSalesOpportunityAgent(unittest.TestCase):
+    """Unit tests for the SalesOpportunityAgent."""
+
+    def setUp(self):
+        self.agent = SalesOpportunityAgent()
+
+    def test_best_opportunities_first(self):
+        products = [
+            {"name": "Thin margin", "price": "$30.00", "cost": 24, "rating": 4.0},
+            {"name": "Best", "price": "$120.00", "cost": 30, "rating": 4.8, "reviews": 900},
+            {"name": "No price", "rating": 4.9},
+            {"name": "Middle", "price": 60, "rating": 4.2},
+        ]
+
+        result = self.agent.process_task({"query": "profit of gadgets", "products": products, "limit": 2})
+
+        self.assertEqual(result["result"], "success")
+        self.assertEqual([o["name"] for o in result["opportunities"]], ["Best", "Middle"])
+        self.assertEqual(result["products_analyzed"], 3)
+        self.assertEqual(result["profit_potential"], "high")
+        self.assertTrue(result["opportunities"][1]["cost_estimated"])
+        scores = [o["opportunity_score"] for o in result["opportunities"]]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_without_products(self):
+        result = self.agent.process_task({"query": "sales of smart watches"})
+
+        self.assertEqual(result["opportunities"], [])
+        self.assertEqual(result["profit_potential"], "unknown")
+        self.assertIsNone(result["summary"]["median_margin"])
+
+    def test_workflow_reports_sales_potential(self):
+        with patch('google.cloud.aiplatform.init'), \
+                patch('google.auth.default', return_value=(MagicMock(), "test-project-id")):
+            orchestrator = OrchestratorAgent(project_id="test-project-id", location="us-central1")
+        orchestrator.register_agent("ProductResearchAgent", ProductResearchAgent())
+        orchestrator.register_agent("SalesOpportunityAgent", self.agent)
+        self.addCleanup(orchestrator.close)
+
+        result = orchestrator.execute_workflow("wireless headphones")
+
+        sales = result["sales_potential"]
+        self.assertEqual(result["stages"]["sales_opportunity"]["status"], "success")
+        self.assertEqual(sales["products_analyzed"], 3)
+        self.assertEqual({o["name"] for o in sales["opportunities"]}, {p["name"] for p in result["products"]})
+
+
+if __name__ == '__main__':
+    unittest.main()
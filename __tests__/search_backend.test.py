@@ -0,0 +1,127 @@
+import unittest
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the specialized agents directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents/specialized'))
+
+from market_analysis import MarketAnalysisAgent
+from search_backend import HTTPSearchBackend, SearchBackend, SearchError, SearchTimeoutError
+from search_stub import LatencyDistribution, StubSearchServer
+
+
+class SequenceLatency:
+    """Serves the given latencies in order, then the last one."""
+
+    def __init__(self, *latencies):
+        self.latencies = list(latencies)
+        self.lock = threading.Lock()
+
+    def sample(self):
+        with self.lock:
+            return self.latencies.pop(0) if len(self.latencies) > 1 else self.latencies[0]
+
+
+class TestHTTPSearchBackend(unittest.TestCase):
+    """Unit tests for the pooled, hedged search client against the stub server."""
+
+    def test_base_class_requires_search(self):
+        with self.assertRaises(TypeError):
+            SearchBackend()
+
+    def start_server(self, latency):
+        server = StubSearchServer(latency=latency).start()
+        self.addCleanup(server.stop)
+        return server
+
+    def backend(self, server, **options):
+        backend = HTTPSearchBackend(server.url, **options)
+        self.addCleanup(backend.close)
+        return backend
+
+    def test_connections_are_kept_alive(self):
+        server = self.start_server(LatencyDistribution(median_seconds=0.001, seed=1))
+        backend = self.backend(server, hedge=False)
+
+        results = [backend.search("smart watch market trends") for _ in range(5)]
+
+        self.assertIn("Garmin", results[0]["competitors_found"])
+        self.assertEqual(server.requests, 5)
+        self.assertEqual(server.connections, 1)
+        self.assertEqual(backend.stats()["connections_opened"], 1)
+
+    def test_hedged_request_wins_over_a_straggler(self):
+        server = self.start_server(SequenceLatency(0.5, 0.01))
+        backend = self.backend(server, hedge_delay=0.05)
+
+        result = backend.search("headphone market")
+
+        self.assertIn("Sony", result["competitors_found"])
+        self.assertEqual(server.requests, 2)
+        stats = backend.stats()
+        self.assertEqual((stats["hedges"], stats["hedge_wins"]), (1, 1))
+
+    def test_hedge_delay_follows_recent_latencies(self):
+        server = self.start_server(LatencyDistribution(median_seconds=0.002, seed=2))
+        backend = self.backend(server)
+
+        self.assertIsNone(backend.current_hedge_delay())
+        for _ in range(25):
+            backend.search("market trends")
+
+        self.assertGreater(backend.current_hedge_delay(), 0)
+        self.assertIsNone(self.backend(server, hedge=False).current_hedge_delay())
+
+    def test_deadline(self):
+        server = self.start_server(SequenceLatency(0.5))
+        backend = self.backend(server, hedge=False)
+
+        with self.assertRaises(SearchTimeoutError):
+            backend.search("market trends", timeout=0.1)
+        self.assertEqual(backend.stats()["timeouts"], 1)
+
+    def test_concurrency_limit(self):
+        server = self.start_server(SequenceLatency(0.3))
+        backend = self.backend(server, max_concurrency=2, hedge=False)
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            slow = [pool.submit(backend.search, "market trends") for _ in range(2)]
+            while server.requests < 2:
+                threading.Event().wait(0.01)
+            with self.assertRaises(SearchTimeoutError):
+                backend.search("market trends", timeout=0.05)
+            self.assertTrue(all(f.result()["summary"] for f in slow))
+
+    def test_http_errors(self):
+        server = self.start_server(LatencyDistribution(median_seconds=0.001))
+        backend = HTTPSearchBackend(server.url + "/missing", hedge=False)
+        self.addCleanup(backend.close)
+
+        with self.assertRaises(SearchError):
+            backend.search("market trends")
+        with self.assertRaises(ValueError):
+            HTTPSearchBackend("ftp://example.com")
+
+
+class TestMarketAnalysisSearchBackend(unittest.TestCase):
+    """MarketAnalysisAgent calls the configured search backend."""
+
+    def test_agent_uses_backend(self):
+        server = StubSearchServer(latency=LatencyDistribution(median_seconds=0.001)).start()
+        self.addCleanup(server.stop)
+        backend = HTTPSearchBackend(server.url)
+        self.addCleanup(backend.close)
+        agent = MarketAnalysisAgent(search_backend=backend)
+
+        response = agent.process_task({"query": "Headphone market trends"})
+
+        self.assertIn("Bose", response["market_data"]["identified_competitors"])
+        self.assertEqual(server.requests, 1)
+        self.assertEqual(agent.get_search_metrics()["backend_calls"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,177 @@
+import unittest
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+from unittest.mock import patch, MagicMock
+
+# Add the agents directories to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents/specialized'))
+
+import market_analysis
+from market_analysis import MarketAnalysisAgent
+from orchestrator import OrchestratorAgent
+from search_cache import FRESH, MISS, STALE, SearchCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSearchCache(unittest.TestCase):
+    """Unit tests for the stale-while-revalidate search cache."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "search.db")
+        self.clock = FakeClock()
+        self.cache = SearchCache(self.path, soft_ttl_seconds=60, hard_ttl_seconds=600, clock=self.clock)
+
+    def tearDown(self):
+        self.cache.close()
+        self.directory.cleanup()
+
+    def test_soft_and_hard_ttl(self):
+        searches = []
+
+        def search():
+            searches.append(1)
+            return {"summary": f"result {len(searches)}"}
+
+        self.assertEqual(self.cache.fetch("key", search), {"summary": "result 1"})
+        self.clock.now += 30
+        self.assertEqual(self.cache.fetch("key", search), {"summary": "result 1"})
+        self.assertEqual(len(searches), 1)
+
+        # Stale: served immediately, refreshed in the background
+        self.clock.now += 60
+        self.assertEqual(self.cache.fetch("key", search), {"summary": "result 1"})
+        self.cache._refresh_pool.shutdown(wait=True)
+        self.assertEqual(self.cache.lookup("key"), (FRESH, {"summary": "result 2"}))
+
+        # Expired: the caller waits for a new search
+        self.clock.now += 600
+        self.assertEqual(self.cache.lookup("key")[0], MISS)
+        self.assertEqual(self.cache.fetch("key", search), {"summary": "result 3"})
+        self.assertEqual(self.cache.stats(), {"fresh_hits": 2, "stale_hits": 1, "misses": 3,
+                                              "refreshes": 1, "refresh_failures": 0})
+
+    def test_one_refresh_per_key_and_failures_keep_the_stale_result(self):
+        self.cache.store("key", {"summary": "old"})
+        self.clock.now += 120
+        release = threading.Event()
+        calls = []
+
+        def failing_search():
+            calls.append(1)
+            release.wait(5)
+            raise RuntimeError("search quota exceeded")
+
+        for _ in range(3):
+            self.assertEqual(self.cache.fetch("key", failing_search), {"summary": "old"})
+        release.set()
+        self.cache._refresh_pool.shutdown(wait=True)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.cache.lookup("key"), (STALE, {"summary": "old"}))
+        self.assertEqual(self.cache.stats()["refresh_failures"], 1)
+
+    def test_async_refresh(self):
+        self.cache.store("key", {"summary": "old"})
+        self.clock.now += 120
+
+        async def search():
+            return {"summary": "new"}
+
+        first = asyncio.run(self.cache.fetch_async("key", search))
+        # The refresh outlives the loop that triggered it
+        self.cache._refresh_pool.shutdown(wait=True)
+
+        self.assertEqual(first, {"summary": "old"})
+        self.assertEqual(asyncio.run(self.cache.fetch_async("key", search)), {"summary": "new"})
+
+    def test_survives_reopening(self):
+        self.cache.store("key", {"summary": "persisted"})
+        self.cache.close()
+
+        self.cache = SearchCache(self.path, soft_ttl_seconds=60, hard_ttl_seconds=600, clock=self.clock)
+
+        self.assertEqual(self.cache.lookup("key"), (FRESH, {"summary": "persisted"}))
+        with self.assertRaises(ValueError):
+            SearchCache(self.path, soft_ttl_seconds=60, hard_ttl_seconds=30)
+
+    def test_prune_enforces_hard_ttl_and_size(self):
+        self.cache.max_entries = 2
+        for i in range(4):
+            self.cache.store(f"key-{i}", i)
+            self.clock.now += 200
+
+        self.cache.prune()
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.lookup("key-3"), (STALE, 3))
+
+
+class TestMarketAnalysisSearchCache(unittest.TestCase):
+    """MarketAnalysisAgent serves repeated searches from the cache."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.original_latency = market_analysis.SIMULATED_SEARCH_LATENCY
+        market_analysis.SIMULATED_SEARCH_LATENCY = 0
+
+    def tearDown(self):
+        market_analysis.SIMULATED_SEARCH_LATENCY = self.original_latency
+        self.directory.cleanup()
+
+    def test_restarted_agent_starts_warm(self):
+        path = os.path.join(self.directory.name, "search.db")
+        first = MarketAnalysisAgent(search_cache=SearchCache(path))
+        first.process_task({"query": "Smart watch market trends"})
+        first.search_cache.close()
+
+        agent = MarketAnalysisAgent(search_cache=SearchCache(path))
+        response = agent.process_task({"query": "smart watch market trends!"})
+        batch = agent.process_batch([{"query": "smart watch market trends"}])
+        async_response = asyncio.run(agent.process_task_async({"query": "smart watch market trends"}))
+
+        self.assertIn("Garmin", response["market_data"]["identified_competitors"])
+        for other in (batch[0], async_response):
+            self.assertEqual(other["market_data"]["search_summary"], response["market_data"]["search_summary"])
+        metrics = agent.get_search_metrics()
+        self.assertEqual(metrics["executions"], 0)
+        self.assertEqual(metrics["cache_fresh_hits"], 3)
+        agent.search_cache.close()
+
+    def test_stale_hit_through_the_sync_workflow_is_refreshed(self):
+        # A refresh that takes a while would be cancelled with the request's event loop
+        market_analysis.SIMULATED_SEARCH_LATENCY = 0.05
+        clock = FakeClock()
+        cache = SearchCache(os.path.join(self.directory.name, "search.db"), soft_ttl_seconds=60,
+                            hard_ttl_seconds=600, clock=clock)
+        with patch('google.cloud.aiplatform.init'), \
+                patch('google.auth.default', return_value=(MagicMock(), "test-project-id")):
+            orchestrator = OrchestratorAgent(project_id="test-project-id", location="us-central1")
+        self.addCleanup(orchestrator.close)
+        orchestrator.register_agent("MarketAnalysisAgent", MarketAnalysisAgent(search_cache=cache))
+        orchestrator.register_agent("ProductResearchAgent", MagicMock(process_task=lambda task: {"products": []}))
+
+        orchestrator.execute_workflow("smart watch market trends")
+        clock.now += 120
+        orchestrator.execute_workflow("smart watch market trends")
+        cache._refresh_pool.shutdown(wait=True)
+
+        self.assertEqual(cache.lookup("smart watch market trends|")[0], FRESH)
+        self.assertEqual(cache.stats()["refreshes"], 1)
+        self.assertEqual(cache.stats()["refresh_failures"], 0)
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import unittest
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the specialized agents directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents/specialized'))
+
+from market_analysis import MarketAnalysisAgent
+from single_flight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Unit tests for single-flight request coalescing."""
+
+    def test_concurrent_threads_share_one_execution(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        executions = []
+
+        def slow():
+            executions.append(1)
+            started.set()
+            release.wait(5)
+            return {"value": 42}
+
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            leader = pool.submit(flight.do, "key", slow)
+            started.wait(5)
+            followers = [pool.submit(flight.do, "key", slow) for _ in range(4)]
+            while flight.calls < 5:
+                time.sleep(0.01)
+            release.set()
+            results = [leader.result()] + [f.result() for f in followers]
+
+        self.assertEqual(len(executions), 1)
+        self.assertTrue(all(r == {"value": 42} for r in results))
+        self.assertEqual(flight.stats(), {"calls": 5, "executions": 1, "coalesced": 4})
+        # The next call after completion runs again
+        flight.do("key", slow)
+        self.assertEqual(len(executions), 2)
+
+    def test_errors_propagate_to_followers(self):
+        flight = SingleFlight()
+
+        async def failing():
+            await asyncio.sleep(0.05)
+            raise RuntimeError("quota exceeded")
+
+        async def run():
+            return await asyncio.gather(*[flight.do_async("key", failing) for _ in range(3)], return_exceptions=True)
+
+        results = asyncio.run(run())
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+        self.assertEqual(flight.executions, 1)
+
+    def test_cancelled_leader_leaves_followers_running(self):
+        flight = SingleFlight()
+
+        async def slow():
+            await asyncio.sleep(0.1)
+            return "result"
+
+        async def run():
+            leader = asyncio.ensure_future(flight.do_async("key", slow))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(flight.do_async("key", slow))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            return await asyncio.gather(leader, follower, return_exceptions=True)
+
+        leader, follower = asyncio.run(run())
+        self.assertIsInstance(leader, asyncio.CancelledError)
+        self.assertEqual(follower, "result")
+        self.assertEqual(flight.executions, 1)
+
+    def test_each_caller_bounds_its_own_wait(self):
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def slow():
+            release.wait(5)
+            return "result"
+
+        async def slow_async():
+            await asyncio.sleep(0.2)
+            return "result"
+
+        with self.assertRaises(TimeoutError):
+            flight.do("key", slow, timeout=0.05)
+        # The leader's call is still in flight; a follower waits on it, bounded by its own timeout
+        with self.assertRaises(TimeoutError):
+            flight.do("key", slow, timeout=0.05)
+        release.set()
+        self.assertEqual(flight.do("key", slow, timeout=5), "result")
+        self.assertGreaterEqual(flight.coalesced, 1)
+
+        async def run():
+            return await asyncio.gather(flight.do_async("other", slow_async, timeout=0.05),
+                                        flight.do_async("other", slow_async, timeout=5), return_exceptions=True)
+
+        short, long = asyncio.run(run())
+        self.assertIsInstance(short, TimeoutError)
+        self.assertEqual(long, "result")
+
+    def test_shared_call_timeouts_propagate_unchanged(self):
+        flight = SingleFlight()
+        error = TimeoutError("backend timed out")
+
+        async def timing_out():
+            raise error
+
+        with self.assertRaises(TimeoutError) as raised:
+            asyncio.run(flight.do_async("key", timing_out))
+        self.assertIs(raised.exception, error)
+
+
+class TestMarketAnalysisCoalescing(unittest.TestCase):
+    """Identical concurrent market searches run once."""
+
+    def test_async_searches_are_coalesced(self):
+        agent = MarketAnalysisAgent()
+
+        async def run():
+            return await asyncio.gather(*[
+                agent.process_task_async({"query": query})
+                for query in ["Smart watch market trends", "smart watch market trends!"] * 10
+            ])
+
+        start = time.perf_counter()
+        results = asyncio.run(run())
+        elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 1.0)
+        self.assertTrue(all("Apple" in r["market_data"]["identified_competitors"] for r in results))
+        self.assertEqual(agent.get_search_metrics(), {"calls": 20, "executions": 1, "coalesced": 19})
+
+    def test_threaded_searches_are_coalesced(self):
+        agent = MarketAnalysisAgent()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(agent.process_task, [{"query": "headphone market trends"}] * 8))
+
+        self.assertTrue(all(r["result"] == "success" for r in results))
+        self.assertLess(agent.get_search_metrics()["executions"], 8)
+        # Responses don't share mutable lists
+        results[0]["market_data"]["identified_trends"].append("mutated")
+        self.assertNotIn("mutated", results[1]["market_data"]["identified_trends"])
+
+
+if __name__ == '__main__':
+    unittest.main()
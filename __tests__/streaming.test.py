@@ -0,0 +1,155 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import asyncio
+import json
+import os
+import sys
+import time
+
+# Add the src directory to the path so we can import the agent
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents'))
+
+import flask
+
+from orchestrator import OrchestratorAgent
+from streaming import create_streaming_blueprint
+
+
+class DelayedAgent:
+    """Async agent that answers after a fixed delay."""
+
+    def __init__(self, delay, response):
+        self.delay = delay
+        self.response = response
+
+    async def process_task_async(self, task_data):
+        await asyncio.sleep(self.delay)
+        return dict(self.response)
+
+    def process_task(self, task_data):
+        time.sleep(self.delay)
+        return dict(self.response)
+
+
+class TestOrchestratorStreaming(unittest.TestCase):
+    """Unit tests for incremental results from the orchestrator."""
+
+    def setUp(self):
+        self.aiplatform_patch = patch('google.cloud.aiplatform.init')
+        self.credentials_patch = patch('google.auth.default', return_value=(MagicMock(), "test-project-id"))
+        self.aiplatform_patch.start()
+        self.credentials_patch.start()
+        self.agent = OrchestratorAgent(project_id="test-project-id", location="us-central1")
+        self.agent.register_agent("ProductResearchAgent", DelayedAgent(0.0, {"result": "success", "products": [{"name": "A"}]}))
+        self.agent.register_agent("MarketAnalysisAgent", DelayedAgent(0.5, {"result": "success", "market_data": {"search_summary": "Large market"}}))
+        self.agent.register_agent("SalesOpportunityAgent", DelayedAgent(0.05, {"result": "success", "profit_potential": "high"}))
+
+    def tearDown(self):
+        self.agent.close()
+        self.aiplatform_patch.stop()
+        self.credentials_patch.stop()
+
+    def test_workflow_stream_yields_stages_as_they_complete(self):
+        start = time.perf_counter()
+        arrivals = []
+        events = []
+        for event in self.agent.execute_workflow_stream("find trending gadgets"):
+            arrivals.append(time.perf_counter() - start)
+            events.append(event)
+
+        names = [e["event"] for e in events]
+        self.assertEqual(names[0], "workflow_started")
+        self.assertEqual(names[-1], "workflow_completed")
+        stages = [e["stage"] for e in events if e["event"] == "stage_completed"]
+        # The fast sales stage is reported before the slow market stage
+        self.assertEqual(stages[:3], ["product_research", "sales_opportunity", "market_analysis"])
+        self.assertLess(arrivals[2], 0.4)
+
+        sales = events[2]
+        self.assertEqual(sales["result_key"], "sales_potential")
+        self.assertEqual(sales["result"]["profit_potential"], "high")
+        self.assertEqual(events[-1]["status"], "success")
+        self.assertEqual(events[-1]["market_analysis"]["market_data"]["search_summary"], "Large market")
+        self.assertEqual(events[-1]["stages"]["product_evaluation"]["status"], "skipped")
+
+    def test_failed_workflow_ends_the_stream_with_an_error(self):
+        async def collect():
+            return [event async for event in self.agent.execute_workflow_stream_async("find trending gadgets")]
+
+        with patch.object(self.agent.workflow_engine, "run", side_effect=RuntimeError("engine failed")):
+            events = asyncio.run(asyncio.wait_for(collect(), 5))
+
+        self.assertEqual([e["event"] for e in events], ["workflow_started", "error"])
+        self.assertEqual(events[-1]["message"], "engine failed")
+
+    def test_route_stream_sends_routing_decision_first(self):
+        events = list(self.agent.route_request_stream("Analyze the market for smart watches", request_id="r1"))
+
+        self.assertEqual([e["event"] for e in events], ["routed", "agent_response"])
+        self.assertEqual(events[0]["delegated_to"], "MarketAnalysisAgent")
+        self.assertNotIn("agent_response", events[0])
+        self.assertEqual(events[1]["request_id"], "r1")
+        self.assertEqual(events[1]["agent_response"]["market_data"]["search_summary"], "Large market")
+
+    def test_route_stream_plan_is_a_single_event(self):
+        events = list(self.agent.route_request_stream("Find a profitable niche for a drop shipping business"))
+
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["action"], "plan_generated")
+
+
+class TestStreamingEndpoints(unittest.TestCase):
+    """Unit tests for the NDJSON and SSE endpoints."""
+
+    def setUp(self):
+        self.orchestrator = MagicMock()
+        app = flask.Flask(__name__)
+        app.register_blueprint(create_streaming_blueprint(lambda: self.orchestrator))
+        self.client = app.test_client()
+
+    def test_ndjson_by_default(self):
+        self.orchestrator.route_request_stream.return_value = iter([
+            {"event": "routed", "request_id": "r1"},
+            {"event": "agent_response", "request_id": "r1", "agent_response": {"result": "success"}},
+        ])
+
+        response = self.client.post("/stream", json={"query": "find gadgets", "request_id": "r1"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual([line["event"] for line in lines], ["routed", "agent_response"])
+        self.orchestrator.route_request_stream.assert_called_once_with("find gadgets", "r1")
+
+    def test_sse_when_requested(self):
+        self.orchestrator.execute_workflow_stream.return_value = iter([
+            {"event": "workflow_started", "workflow_id": "w1"},
+            {"event": "workflow_completed", "workflow_id": "w1", "status": "success"},
+        ])
+
+        response = self.client.post("/workflow/stream", json={"query": "find gadgets"},
+                                    headers={"Accept": "text/event-stream"})
+
+        self.assertEqual(response.mimetype, "text/event-stream")
+        body = response.get_data(as_text=True)
+        self.assertTrue(body.startswith("event: workflow_started\ndata: "))
+        self.assertIn("event: workflow_completed\n", body)
+
+    def test_errors_after_headers_are_reported_in_band(self):
+        def failing():
+            yield {"event": "routed"}
+            raise RuntimeError("agent crashed")
+        self.orchestrator.route_request_stream.return_value = failing()
+
+        response = self.client.post("/stream", json={"query": "find gadgets"})
+
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual(lines[-1], {"event": "error", "status": "error", "message": "agent crashed"})
+
+    def test_missing_query_is_rejected(self):
+        response = self.client.post("/workflow/stream", json={})
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import asyncio
+import os
+import sys
+import time
+
+# Add the src directory to the path so we can import the agent
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents/specialized'))
+
+import flask
+
+import market_analysis
+from market_analysis import MarketAnalysisAgent
+from metrics import create_metrics_blueprint
+from orchestrator import OrchestratorAgent
+from tracing import STATUS_ERROR, LatencyHistogram, Tracer
+
+
+class SleepyAgent:
+    def __init__(self, delay):
+        self.delay = delay
+
+    def process_task(self, task_data):
+        time.sleep(self.delay)
+        return {"result": "success", "products": []}
+
+
+class TestTracer(unittest.TestCase):
+    """Unit tests for spans and latency histograms."""
+
+    def test_spans_nest_and_record_errors(self):
+        tracer = Tracer()
+
+        with tracer.span("route_request") as root:
+            with tracer.span("delegate", agent="ProductResearchAgent") as child:
+                self.assertIs(tracer.current_span(), child)
+            with self.assertRaises(ValueError):
+                with tracer.span("delegate", agent="MarketAnalysisAgent"):
+                    raise ValueError("boom")
+
+        spans = tracer.exporter.get_finished_spans(root.trace_id)
+        self.assertEqual([span.name for span in spans], ["delegate", "delegate", "route_request"])
+        self.assertTrue(all(span.parent_id == root.span_id for span in spans[:2]))
+        self.assertEqual(spans[1].status, STATUS_ERROR)
+        self.assertIsNone(tracer.current_span())
+        self.assertEqual(len(root.traceparent.split("-")[1]), 32)
+        self.assertEqual(set(tracer.latency_summary()),
+                         {"route_request", "delegate{MarketAnalysisAgent}", "delegate{ProductResearchAgent}"})
+
+    def test_histogram_percentiles(self):
+        histogram = LatencyHistogram(buckets_ms=(10, 100, 1000))
+        for value in [5] * 98 + [50, 5000]:
+            histogram.observe(value)
+
+        self.assertEqual(histogram.percentile(50), 10)
+        self.assertEqual(histogram.percentile(99), 100)
+        self.assertEqual(histogram.percentile(100), 5000)
+        self.assertIsNone(LatencyHistogram().percentile(99))
+
+
+class TestOrchestratorTracing(unittest.TestCase):
+    """The orchestrator traces routing, delegation and tool calls."""
+
+    def setUp(self):
+        self.aiplatform_patch = patch('google.cloud.aiplatform.init')
+        self.credentials_patch = patch('google.auth.default', return_value=(MagicMock(), "test-project-id"))
+        self.aiplatform_patch.start()
+        self.credentials_patch.start()
+        self.original_latency = market_analysis.SIMULATED_SEARCH_LATENCY
+        market_analysis.SIMULATED_SEARCH_LATENCY = 0.01
+        self.agent = OrchestratorAgent(project_id="test-project-id", location="us-central1", request_timeout=5)
+        self.agent.register_agent("MarketAnalysisAgent", MarketAnalysisAgent(tracer=self.agent.tracer))
+        self.agent.register_agent("ProductResearchAgent", SleepyAgent(0.05))
+
+    def tearDown(self):
+        market_analysis.SIMULATED_SEARCH_LATENCY = self.original_latency
+        self.agent.close()
+        self.aiplatform_patch.stop()
+        self.credentials_patch.stop()
+
+    def test_request_trace_reaches_tool_calls(self):
+        self.agent.route_request("smart watch market trends")
+        asyncio.run(self.agent.route_request_async("smart watch market trends"))
+
+        spans = self.agent.tracer.exporter.get_finished_spans()
+        for trace_id in {span.trace_id for span in spans}:
+            names = {span.name for span in self.agent.tracer.exporter.get_finished_spans(trace_id)}
+            self.assertEqual(names, {"route_request", "context.lookup", "routing.match", "context.update",
+                                     "delegate", "tool.search"})
+        tool = next(span for span in spans if span.name == "tool.search")
+        delegate = next(span for span in spans if span.name == "delegate" and span.trace_id == tool.trace_id)
+        self.assertEqual(tool.parent_id, delegate.span_id)
+
+    def test_per_agent_latency_shows_the_slow_agent(self):
+        self.agent.execute_workflow("wireless headphones")
+
+        latency = self.agent.tracer.latency_summary()
+        self.assertEqual(latency["workflow"]["count"], 1)
+        self.assertGreaterEqual(latency["delegate{ProductResearchAgent}"]["p99_ms"], 50)
+
+    def test_metrics_endpoint(self):
+        app = flask.Flask(__name__)
+        app.register_blueprint(create_metrics_blueprint(lambda: self.agent))
+        self.agent.route_request("research wireless headphones")
+
+        with app.test_client() as client:
+            text = client.get("/metrics")
+            data = client.get("/metrics", headers={"Accept": "application/json"}).get_json()
+
+        self.assertEqual(text.status_code, 200)
+        body = text.get_data(as_text=True)
+        self.assertIn('agent_span_duration_seconds_bucket{span="delegate",agent="ProductResearchAgent",le="+Inf"} 1', body)
+        self.assertIn('agent_span_duration_seconds_count{span="route_request"} 1', body)
+        self.assertEqual(data["latency"]["delegate{ProductResearchAgent}"]["count"], 1)
+        self.assertEqual(data["recent_spans"][-1]["name"], "route_request")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# Add the specialized agents directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents/specialized'))
+
+from product_research import ProductResearchAgent
+from vector_store import HashedNgramEmbedder, VectorStore
+
+TEXTS = [
+    "SonicWave Pro Wireless Headphones Active Noise Cancellation",
+    "TimeKeeper Pro Smart Watch GPS Heart rate monitoring",
+    "BrewMaster Electric Kettle Stainless steel",
+    "EchoBeats Lite Wireless Earbuds Water resistant",
+]
+
+
+class TestVectorStore(unittest.TestCase):
+    """Unit tests for the NumPy vector retrieval engine."""
+
+    def setUp(self):
+        self.store = VectorStore.build(TEXTS)
+
+    def test_embeddings_are_deterministic_unit_vectors(self):
+        embedder = HashedNgramEmbedder(dimensions=64)
+        first = embedder.embed(["wireless headphones", ""])
+        second = HashedNgramEmbedder(dimensions=64).embed(["wireless headphones"])
+
+        np.testing.assert_array_equal(first[0], second[0])
+        self.assertAlmostEqual(float(np.linalg.norm(first[0])), 1.0, places=5)
+        self.assertFalse(first[1].any())
+
+    def test_search_ranks_by_similarity(self):
+        results = self.store.search("noise cancelling headphone", k=2)
+
+        self.assertEqual(results[0][0], 0)
+        self.assertGreater(results[0][1], results[-1][1])
+        self.assertEqual(self.store.search("", k=3), [])
+
+    def test_batch_matches_single_queries_and_respects_mask(self):
+        queries = ["smart watch", "kettle", "wireless earbuds"]
+        batch = self.store.search_batch(queries, k=2)
+        for hits, query in zip(batch, queries):
+            single = self.store.search(query, k=2)
+            self.assertEqual([row for row, _ in hits], [row for row, _ in single])
+            np.testing.assert_allclose([score for _, score in hits], [score for _, score in single], rtol=1e-5)
+        self.assertEqual([hits[0][0] for hits in batch], [1, 2, 3])
+
+        mask = np.array([True, False, True, True])
+        self.assertNotIn(1, [row for row, _ in self.store.search("smart watch", k=4, mask=mask)])
+
+    def test_chunked_search_matches_full_scan(self):
+        rng = np.random.default_rng(3)
+        matrix = rng.standard_normal((1000, 32)).astype(np.float32)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+        store = VectorStore(matrix)
+        queries = matrix[:5]
+
+        import vector_store
+        original = vector_store.SEARCH_CHUNK_ROWS
+        vector_store.SEARCH_CHUNK_ROWS = 64
+        try:
+            chunked = store.search_vectors(queries, k=7)
+        finally:
+            vector_store.SEARCH_CHUNK_ROWS = original
+
+        expected = np.argsort(-(queries @ matrix.T), axis=1)[:, :7]
+        self.assertEqual([[row for row, _ in hits] for hits in chunked], expected.tolist())
+
+    def test_save_and_memory_map(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "embeddings.npy")
+            self.store.save(path)
+            loaded = VectorStore.load(path)
+
+            self.assertIsInstance(loaded.matrix, np.memmap)
+            self.assertEqual(loaded.search("electric kettle", k=1)[0][0], 2)
+            with self.assertRaises(ValueError):
+                VectorStore(loaded.matrix, HashedNgramEmbedder(dimensions=16))
+
+
+class TestProductResearchVectorRetrieval(unittest.TestCase):
+    """ProductResearchAgent retrieves by vector similarity when embeddings are configured."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.catalog_path = os.path.join(self.directory.name, "catalog.jsonl")
+        with open(self.catalog_path, "w") as f:
+            for sku, text, price in [("HP-1", TEXTS[0], 129.99), ("SW-1", TEXTS[1], 249.99),
+                                     ("KT-1", TEXTS[2], 39.99), ("EB-1", TEXTS[3], 89.99)]:
+                name, _, rest = text.partition(" ")
+                f.write(json.dumps({"sku": sku, "name": name, "type": rest, "price": price, "rating": 4.5}) + "\n")
+        self.embeddings_path = os.path.join(self.directory.name, "embeddings.npy")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_embeddings_are_built_once_and_reused(self):
+        agent = ProductResearchAgent(self.catalog_path, embeddings_path=self.embeddings_path)
+        self.assertTrue(os.path.exists(self.embeddings_path))
+        modified = os.path.getmtime(self.embeddings_path)
+
+        reopened = ProductResearchAgent(self.catalog_path, embeddings_path=self.embeddings_path)
+        response = reopened.process_task({"query": "noise cancelling headphones", "limit": 1})
+
+        self.assertEqual(os.path.getmtime(self.embeddings_path), modified)
+        self.assertEqual(response["products"][0]["sku"], "HP-1")
+        self.assertIn("vector search over 4 products", response["source"])
+        self.assertEqual(agent.process_task({"query": "smart watch"})["products"][0]["sku"], "SW-1")
+
+    def test_batch_groups_share_one_search(self):
+        agent = ProductResearchAgent(self.catalog_path, embeddings_path=self.embeddings_path)
+        calls = []
+        original = agent.vector_store.search_batch
+        agent.vector_store.search_batch = lambda *args, **kwargs: calls.append(args) or original(*args, **kwargs)
+
+        results = agent.process_batch([
+            {"query": "wireless headphones"},
+            {"query": "electric kettle"},
+            {"query": "wireless audio", "max_price": 100},
+            {"query": "bad limit", "limit": "many"},
+        ])
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(results[0]["products"][0]["sku"], "HP-1")
+        self.assertEqual(results[1]["products"][0]["sku"], "KT-1")
+        self.assertTrue(all(p["price"] <= 100 for p in results[2]["products"]))
+        self.assertIsInstance(results[3], ValueError)
+
+    def test_embeddings_require_a_catalog(self):
+        with self.assertRaises(ValueError):
+            ProductResearchAgent(embeddings_path=self.embeddings_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -173,7 +173,9 @@ class TestVertexOrchestratorAgent(unittest.TestCase):
         
         # Configure return values
         product_research_agent.process_task.return_value = {'products': ['Product A', 'Product B']}
-        market_analysis_agent.process_task.return_value = {'market_size': '$5B'}
+        market_analysis_agent.process_task.return_value = {
+            'result': 'success', 'market_data': {'identified_trends': ['Wireless audio']}
+        }
         sales_opportunity_agent.process_task.return_value = {'profit_potential': 'High'}
         product_evaluation_agent.process_task.return_value = {'score': 85}
         
@@ -194,7 +196,7 @@ class TestVertexOrchestratorAgent(unittest.TestCase):
         
         # Verify the final result includes data from all agents
         self.assertIn('products', result)
-        self.assertIn('market_size', result)
+        self.assertIn('market_data', result['market_analysis'])
         self.assertIn('profit_potential', result)
         self.assertIn('score', result)
 
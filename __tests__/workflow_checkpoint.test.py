@@ -0,0 +1,164 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import asyncio
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Add the src directory to the path so we can import the agent
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents'))
+
+from orchestrator import OrchestratorAgent
+from workflow_checkpoint import WORKFLOW_COMPLETED, UnknownWorkflowError, WorkflowCheckpointStore
+
+
+class FlakyAgent:
+    """Counts calls, fails the first `failures` of them and can be slowed down."""
+
+    def __init__(self, payload, failures=0, delay=0.0):
+        self.payload = payload
+        self.failures = failures
+        self.delay = delay
+        self.calls = 0
+
+    def process_task(self, task_data):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError("backend unavailable")
+        time.sleep(self.delay)
+        return dict(self.payload)
+
+
+class TestWorkflowCheckpointStore(unittest.TestCase):
+    """Unit tests for the SQLite workflow checkpoint store."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "checkpoints", "workflows.db")
+        self.now = 1000.0
+        self.store = WorkflowCheckpointStore(self.path, ttl_seconds=60, clock=lambda: self.now)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.directory)
+
+    def test_checkpoints_survive_reopening(self):
+        self.store.start("wf-1", "wireless headphones", {"max_price": 100})
+        self.store.save_stage("wf-1", "product_research", {"status": "success", "output": {"products": ["A"]}})
+        self.store.close()
+
+        self.store = WorkflowCheckpointStore(self.path, ttl_seconds=60, clock=lambda: self.now)
+        checkpoint = self.store.load("wf-1")
+
+        self.assertEqual(checkpoint["query"], "wireless headphones")
+        self.assertEqual(checkpoint["filters"], {"max_price": 100})
+        self.assertEqual(checkpoint["stages"]["product_research"]["output"], {"products": ["A"]})
+        self.assertIsNone(self.store.load("wf-unknown"))
+
+    def test_workflows_expire_after_their_last_write(self):
+        self.store.start("wf-1", "query")
+        self.now += 50
+        self.store.save_stage("wf-1", "product_research", {"status": "success"})
+        self.store.start("wf-2", "query")
+        self.now += 50
+
+        self.assertIsNotNone(self.store.load("wf-1"))
+        self.now += 20
+        self.assertIsNone(self.store.load("wf-1"))
+        self.store.prune()
+        self.assertEqual(len(self.store), 0)
+
+
+class TestResumeWorkflow(unittest.TestCase):
+    """Tests for OrchestratorAgent.resume_workflow."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "workflows.db")
+        self.aiplatform_patch = patch('google.cloud.aiplatform.init')
+        self.credentials_patch = patch('google.auth.default', return_value=(MagicMock(), "test-project-id"))
+        self.aiplatform_patch.start()
+        self.credentials_patch.start()
+        self.research = FlakyAgent({"products": ["Product A"]})
+        self.market = FlakyAgent({"market_data": {"identified_trends": ["Wireless audio"]}})
+        self.sales = FlakyAgent({"profit_potential": "High"}, failures=1)
+        self.evaluation = FlakyAgent({"score": 85})
+        self.agent = self.build_orchestrator()
+
+    def tearDown(self):
+        self.agent.close()
+        self.aiplatform_patch.stop()
+        self.credentials_patch.stop()
+        shutil.rmtree(self.directory)
+
+    def build_orchestrator(self):
+        agent = OrchestratorAgent(project_id="test-project-id", location="us-central1",
+                                  checkpoint_store=WorkflowCheckpointStore(self.path))
+        agent.register_agent("ProductResearchAgent", self.research)
+        agent.register_agent("MarketAnalysisAgent", self.market)
+        agent.register_agent("SalesOpportunityAgent", self.sales)
+        agent.register_agent("ProductEvaluationAgent", self.evaluation)
+        return agent
+
+    def test_resume_runs_only_the_unfinished_stages(self):
+        first = self.agent.execute_workflow("Find wireless headphones", filters={"max_price": 100})
+        self.assertEqual(first["status"], "partial")
+
+        # A new orchestrator, as after a restart, sharing the checkpoint file
+        self.agent.close()
+        self.agent = self.build_orchestrator()
+        resumed = self.agent.resume_workflow(first["workflow_id"])
+
+        self.assertEqual(resumed["status"], "success")
+        self.assertEqual(resumed["workflow_id"], first["workflow_id"])
+        # The evaluation ran without the failed sales estimates in the first attempt
+        self.assertEqual(resumed["resumed_stages"], ["product_research", "market_analysis", "product_evaluation"])
+        self.assertEqual(resumed["sales_potential"], {"profit_potential": "High"})
+        self.assertEqual(resumed["score"], 85)
+        self.assertEqual((self.research.calls, self.market.calls, self.sales.calls, self.evaluation.calls),
+                         (1, 1, 2, 1))
+        checkpoint = self.agent.checkpoint_store.load(first["workflow_id"])
+        self.assertEqual(checkpoint["status"], WORKFLOW_COMPLETED)
+        self.assertEqual(checkpoint["filters"], {"max_price": 100})
+
+        again = self.agent.resume_workflow(first["workflow_id"])
+        self.assertEqual(len(again["resumed_stages"]), 4)
+        self.assertEqual(self.evaluation.calls, 1)
+
+    def test_resume_after_a_timeout(self):
+        self.sales.failures = 0
+        self.sales.delay = 0.5
+        first = asyncio.run(self.agent.execute_workflow_async("Find products", timeout=0.2))
+        self.assertTrue(first["timed_out"])
+
+        self.sales.delay = 0
+        resumed = self.agent.resume_workflow(first["workflow_id"])
+
+        self.assertEqual(resumed["status"], "success")
+        self.assertIn("market_analysis", resumed["resumed_stages"])
+        self.assertNotIn("sales_opportunity", resumed["resumed_stages"])
+        self.assertEqual(self.market.calls, 1)
+
+    def test_runs_without_checkpoints_when_the_store_fails(self):
+        with patch.object(self.agent.checkpoint_store, "start",
+                          side_effect=sqlite3.OperationalError("database is locked")):
+            result = self.agent.execute_workflow("Find products")
+
+        self.assertEqual(result["stages"]["product_research"]["status"], "success")
+        self.assertEqual(result["stages"]["product_evaluation"]["status"], "success")
+        self.assertIsNone(self.agent.checkpoint_store.load(result["workflow_id"]))
+
+    def test_unknown_workflows(self):
+        with self.assertRaises(UnknownWorkflowError):
+            self.agent.resume_workflow("missing")
+        plain = OrchestratorAgent(project_id="test-project-id", location="us-central1")
+        self.addCleanup(plain.close)
+        with self.assertRaises(UnknownWorkflowError):
+            plain.resume_workflow(self.agent.execute_workflow("Find products")["workflow_id"])
+
+
+if __name__ == '__main__':
+    unittest.main()
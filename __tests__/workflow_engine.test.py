@@ -0,0 +1,229 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import asyncio
+import os
+import sys
+import time
+
+# Add the src directory to the path so we can import the agent
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents/specialized'))
+
+from market_analysis import MarketAnalysisAgent
+from orchestrator import OrchestratorAgent
+from result_cache import TTLCache
+from workflow import WorkflowEngine, WorkflowStage
+
+
+class DelayedAgent:
+    """Sync agent that sleeps before returning a fixed payload."""
+
+    def __init__(self, delay, payload):
+        self.delay = delay
+        self.payload = payload
+        self.tasks = []
+
+    def process_task(self, task_data):
+        self.tasks.append(task_data)
+        time.sleep(self.delay)
+        return dict(self.payload)
+
+
+class TestWorkflowEngine(unittest.TestCase):
+    """Unit tests for the DAG workflow engine."""
+
+    def test_rejects_unknown_inputs_and_cycles(self):
+        with self.assertRaises(ValueError):
+            WorkflowEngine([WorkflowStage("a", "AgentA", inputs=["missing"])])
+        with self.assertRaises(ValueError):
+            WorkflowEngine([
+                WorkflowStage("a", "AgentA", inputs=["b"]),
+                WorkflowStage("b", "AgentB", inputs=["a"]),
+            ])
+
+    def test_independent_stages_run_concurrently(self):
+        engine = WorkflowEngine([
+            WorkflowStage("root", "Root"),
+            WorkflowStage("left", "Left", inputs=["root"]),
+            WorkflowStage("right", "Right", inputs=["root"]),
+            WorkflowStage("join", "Join", inputs=["left", "right"]),
+        ])
+
+        async def run_stage(agent_type, task_data):
+            await asyncio.sleep(0.1)
+            return {"agent": agent_type, "inputs": sorted(k for k in task_data if k != "query")}
+
+        start = time.perf_counter()
+        records = asyncio.run(engine.run("query", run_stage))
+        elapsed = time.perf_counter() - start
+
+        # Critical path is three stages long, not four
+        self.assertLess(elapsed, 0.35)
+        self.assertEqual(records["join"]["output"]["inputs"], ["left", "right"])
+        self.assertEqual(list(records), ["root", "left", "right", "join"])
+        self.assertGreaterEqual(records["join"]["started_ms"], records["left"]["started_ms"] + records["left"]["duration_ms"])
+
+    def test_failed_stage_skips_dependents(self):
+        engine = WorkflowEngine([
+            WorkflowStage("root", "Root"),
+            WorkflowStage("child", "Child", inputs=["root"]),
+        ])
+
+        async def run_stage(agent_type, task_data):
+            raise RuntimeError("root failed")
+
+        records = asyncio.run(engine.run("query", run_stage))
+
+        self.assertEqual(records["root"]["status"], "error")
+        self.assertEqual(records["child"]["status"], "skipped")
+
+    def test_stage_cache_reuses_stages_with_unchanged_inputs(self):
+        engine = WorkflowEngine([
+            WorkflowStage("root", "Root", params=["max_price"]),
+            WorkflowStage("topic", "Topic", key_fields=["query"]),
+            WorkflowStage("join", "Join", inputs=["root", "topic"]),
+        ], stage_cache=TTLCache())
+        calls = []
+
+        async def run_stage(agent_type, task_data):
+            calls.append(agent_type)
+            if agent_type == "Root":
+                return {"items": [1, 2] if task_data.get("max_price") is None else [1]}
+            return {"query": task_data["query"], "agent": agent_type}
+
+        first = asyncio.run(engine.run("Cheap  Phones", run_stage))
+        same = asyncio.run(engine.run("cheap phones", run_stage))
+        refined = asyncio.run(engine.run("cheap phones", run_stage, params={"max_price": 100, "ignored": 1}))
+
+        self.assertEqual(calls.count("Root"), 2)
+        self.assertEqual(calls.count("Topic"), 1)
+        self.assertFalse(any(record["reused"] for record in first.values()))
+        self.assertTrue(all(record["reused"] for record in same.values()))
+        # The cached output echoes the query of the run it is reused by
+        self.assertEqual(same["topic"]["output"], {"query": "cheap phones", "agent": "Topic"})
+        self.assertEqual([name for name, record in refined.items() if record["reused"]], ["topic"])
+        self.assertEqual(refined["root"]["output"], {"items": [1]})
+        self.assertNotEqual(refined["join"]["input_hash"], first["join"]["input_hash"])
+
+
+class TestExecuteWorkflow(unittest.TestCase):
+    """Tests for OrchestratorAgent.execute_workflow on top of the engine."""
+
+    def setUp(self):
+        self.aiplatform_patch = patch('google.cloud.aiplatform.init')
+        self.credentials_patch = patch('google.auth.default', return_value=(MagicMock(), "test-project-id"))
+        self.aiplatform_patch.start()
+        self.credentials_patch.start()
+        self.agent = OrchestratorAgent(project_id="test-project-id", location="us-central1")
+
+    def tearDown(self):
+        self.agent.close()
+        self.aiplatform_patch.stop()
+        self.credentials_patch.stop()
+
+    def test_workflow_latency_follows_critical_path(self):
+        research = DelayedAgent(0.1, {"products": ["Product A", "Product B"]})
+        market = DelayedAgent(0.2, {"market_data": {"identified_trends": ["Wireless audio"]}, "notes": "market"})
+        sales = DelayedAgent(0.2, {"profit_potential": "High", "notes": "sales"})
+        evaluation = DelayedAgent(0.1, {"score": 85})
+        self.agent.register_agent("ProductResearchAgent", research)
+        self.agent.register_agent("MarketAnalysisAgent", market)
+        self.agent.register_agent("SalesOpportunityAgent", sales)
+        self.agent.register_agent("ProductEvaluationAgent", evaluation)
+
+        start = time.perf_counter()
+        result = self.agent.execute_workflow("Find profitable products to sell online")
+        elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 0.55)
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(result["products"], ["Product A", "Product B"])
+        self.assertEqual(result["market_analysis"],
+                         {"market_data": {"identified_trends": ["Wireless audio"]}, "notes": "market"})
+        self.assertEqual(result["sales_potential"], {"profit_potential": "High", "notes": "sales"})
+        self.assertEqual(result["evaluation"], {"score": 85})
+        self.assertEqual(result["score"], 85)
+        # Other agent fields stay under their stage's result key
+        self.assertNotIn("notes", result)
+        self.assertEqual(market.tasks[0]["products"], ["Product A", "Product B"])
+        self.assertEqual(evaluation.tasks[0]["sales_opportunity"], {"profit_potential": "High", "notes": "sales"})
+        for stage in ("product_research", "market_analysis", "sales_opportunity", "product_evaluation"):
+            self.assertEqual(result["stages"][stage]["status"], "success")
+            self.assertIn("duration_ms", result["stages"][stage])
+
+    def test_unregistered_agents_are_skipped(self):
+        self.agent.register_agent("ProductResearchAgent", DelayedAgent(0, {"products": ["Product A"]}))
+        self.agent.register_agent("MarketAnalysisAgent", DelayedAgent(0, {"market_data": {"identified_trends": ["Wireless audio"]}}))
+
+        result = self.agent.execute_workflow("Find profitable wireless headphones to sell online")
+
+        self.assertEqual(result["status"], "success")
+        self.assertIn("products", result)
+        self.assertIn("market_analysis", result)
+        self.assertNotIn("evaluation", result)
+        self.assertEqual(result["stages"]["sales_opportunity"]["status"], "skipped")
+        self.assertEqual(result["stages"]["product_evaluation"]["status"], "skipped")
+
+    def test_stage_error_makes_result_partial(self):
+        failing = MagicMock()
+        failing.process_task.side_effect = RuntimeError("search quota exceeded")
+        self.agent.register_agent("ProductResearchAgent", DelayedAgent(0, {"products": ["Product A"]}))
+        self.agent.register_agent("MarketAnalysisAgent", failing)
+
+        result = self.agent.execute_workflow("Find products")
+
+        self.assertEqual(result["status"], "partial")
+        self.assertEqual(result["errors"], {"market_analysis": "search quota exceeded"})
+
+    def test_refined_workflow_recomputes_only_changed_stages(self):
+        with patch('google.cloud.aiplatform.init'), \
+                patch('google.auth.default', return_value=(MagicMock(), "test-project-id")):
+            agent = OrchestratorAgent(project_id="test-project-id", location="us-central1", stage_cache=TTLCache())
+        self.addCleanup(agent.close)
+        research = MagicMock()
+        research.process_task.side_effect = lambda task: {
+            "products": ["Product A"] if task.get("max_price") else ["Product A", "Product B"]}
+        market = DelayedAgent(0, {"market_data": {"identified_trends": ["Wireless audio"]}})
+        sales = DelayedAgent(0, {"profit_potential": "High"})
+        evaluation = DelayedAgent(0, {"score": 85})
+        agent.register_agent("ProductResearchAgent", research)
+        agent.register_agent("MarketAnalysisAgent", market)
+        agent.register_agent("SalesOpportunityAgent", sales)
+        agent.register_agent("ProductEvaluationAgent", evaluation)
+
+        first = agent.execute_workflow("Find wireless headphones")
+        refined = agent.execute_workflow("Find wireless headphones", filters={"max_price": 100})
+        repeated = agent.execute_workflow("find  wireless headphones", filters={"max_price": 100})
+
+        self.assertEqual(first["reused_stages"], [])
+        self.assertEqual(refined["reused_stages"], ["market_analysis"])
+        self.assertEqual(refined["products"], ["Product A"])
+        self.assertEqual(research.process_task.call_args[0][0]["max_price"], 100)
+        self.assertNotIn("max_price", sales.tasks[-1])
+        self.assertEqual(len(repeated["reused_stages"]), 4)
+        self.assertEqual(repeated["query"], "find  wireless headphones")
+        self.assertEqual((len(market.tasks), len(sales.tasks), len(evaluation.tasks)), (1, 2, 2))
+        self.assertEqual(agent.get_stage_cache_stats()["hits"], 5)
+
+
+    def test_reused_market_analysis_counts_the_current_products(self):
+        with patch('google.cloud.aiplatform.init'), \
+                patch('google.auth.default', return_value=(MagicMock(), "test-project-id")):
+            agent = OrchestratorAgent(project_id="test-project-id", location="us-central1", stage_cache=TTLCache())
+        self.addCleanup(agent.close)
+        research = MagicMock()
+        research.process_task.side_effect = lambda task: {
+            "products": ["A"] if task.get("max_price") else ["A", "B", "C"]}
+        agent.register_agent("ProductResearchAgent", research)
+        agent.register_agent("MarketAnalysisAgent", MarketAnalysisAgent())
+
+        first = agent.execute_workflow("wireless headphones market trends")
+        refined = agent.execute_workflow("wireless headphones market trends", filters={"max_price": 10})
+
+        self.assertEqual(first["market_analysis"]["product_count_analyzed"], 3)
+        self.assertEqual(refined["reused_stages"], ["market_analysis"])
+        self.assertEqual(refined["products"], ["A"])
+        self.assertEqual(refined["market_analysis"]["product_count_analyzed"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,20 @@
+import logging
+
 from flask import Flask, request, jsonify
 
+from src.agents.logging_config import SAMPLED, configure_logging
+from src.agents.metrics import create_metrics_blueprint
+from src.agents.streaming import create_streaming_blueprint
+
+# Queue-based, sampled structured logging for every module (LOG_LEVEL, LOG_SAMPLE_RATES)
+configure_logging()
+logger = logging.getLogger(__name__)
+
 app = Flask(__name__)
+# Incremental results: POST /stream and POST /workflow/stream
+app.register_blueprint(create_streaming_blueprint())
+# Latency histograms and recent trace spans: GET /metrics
+app.register_blueprint(create_metrics_blueprint())
 
 @app.route('/')
 def hello_world():
@@ -15,7 +29,7 @@ def handle_request():
     request_type = data.get('request_type')
     # Basic placeholder logic: Acknowledge receipt
     # In the future, this will involve actual delegation logic
-    print(f"Received request of type: {request_type}")
+    logger.info("Received request of type: %s", request_type, extra=SAMPLED)
 
     # Simulate delegation based on request type
     target_agent = "Unknown Agent"
@@ -0,0 +1,200 @@
+"""Local load test for the HTTP serving stack.
+
+Starts the orchestrator behind each server in a child process and drives it
+with concurrent keep-alive clients:
+
+- flask: the Flask development server (threaded), calling route_request
+- asgi: the ASGI app of src/agents/asgi.py on uvicorn, one process
+- gunicorn: the ASGI app on gunicorn with --workers uvicorn workers,
+  preloaded in the master
+
+Every server uses service.build_orchestrator() with Vertex AI patched out.
+Requests alternate between catalog searches (CPU-bound) and market analyses
+(a simulated search of --search-latency seconds); each query is unique so
+the result caches do not answer them. Reports throughput and latency
+percentiles per server.
+
+Usage:
+    python benchmarks/asgi_load_benchmark.py [--requests 2000] [--concurrency 32]
+        [--search-latency 0.05] [--servers flask,asgi,gunicorn] [--workers 2]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+SAMPLE_REQUESTS = [
+    "research wireless headphones for running {}",
+    "analyze the market trends for smart watches {}",
+]
+
+
+def serve(args) -> None:
+    """Child process: runs one server until killed."""
+    sys.path.insert(0, ROOT)
+    from unittest.mock import MagicMock, patch
+
+    patch('google.cloud.aiplatform.init').start()
+    patch('google.auth.default', return_value=(MagicMock(), "bench-project")).start()
+    os.environ.setdefault("GOOGLE_CLOUD_PROJECT", "bench-project")
+    from src.agents.specialized import market_analysis
+    market_analysis.SIMULATED_SEARCH_LATENCY = args.search_latency
+
+    if args.serve == "flask":
+        import flask
+
+        from src.agents.service import get_orchestrator, warm_up
+
+        warm_up(get_orchestrator())
+        app = flask.Flask(__name__)
+
+        @app.route("/route", methods=["POST"])
+        def route():
+            data = flask.request.get_json()
+            return flask.jsonify(get_orchestrator().route_request(data["query"], data.get("request_id")))
+
+        app.run(host="127.0.0.1", port=args.port, threaded=True)
+    elif args.serve == "asgi":
+        import uvicorn
+
+        from src.agents.asgi import OrchestratorApp
+
+        uvicorn.run(OrchestratorApp(setup_logging=False), host="127.0.0.1", port=args.port,
+                    log_level="warning", access_log=False)
+    else:
+        from gunicorn.app.base import BaseApplication
+
+        from src.agents.asgi import OrchestratorApp
+        from src.agents.service import preload
+
+        class Server(BaseApplication):
+            def load_config(self):
+                for key, value in {"bind": f"127.0.0.1:{args.port}", "workers": args.workers,
+                                   "worker_class": "uvicorn.workers.UvicornWorker", "preload_app": True,
+                                   "loglevel": "warning"}.items():
+                    self.cfg.set(key, value)
+
+            def load(self):
+                return OrchestratorApp(setup_logging=False)
+
+        preload()
+        Server().run()
+
+
+def wait_for_server(port: int, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            connection.request("POST", "/route", json.dumps({"query": "research warm up"}),
+                               {"Content-Type": "application/json"})
+            if connection.getresponse().status == 200:
+                connection.close()
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("Server did not start")
+
+
+def load(port: int, requests: int, concurrency: int) -> dict:
+    latencies = []
+    errors = []
+    counter = iter(range(requests))
+    lock = threading.Lock()
+
+    def client() -> None:
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                break
+            body = json.dumps({"query": SAMPLE_REQUESTS[i % len(SAMPLE_REQUESTS)].format(i), "request_id": f"c{i}"})
+            start = time.perf_counter()
+            try:
+                connection.request("POST", "/route", body, {"Content-Type": "application/json"})
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    errors.append(response.status)
+                if response.will_close:
+                    connection.close()
+            except (OSError, http.client.HTTPException) as e:
+                errors.append(type(e).__name__)
+                connection.close()
+                continue
+            latencies.append(time.perf_counter() - start)
+        connection.close()
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    percentile = lambda p: round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 1)
+    return {
+        "requests": requests,
+        "errors": len(errors),
+        "requests_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": percentile(0.5),
+        "p99_ms": percentile(0.99),
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per server")
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent client connections")
+    parser.add_argument("--search-latency", type=float, default=0.05, help="simulated market search seconds")
+    parser.add_argument("--servers", default="flask,asgi,gunicorn", help="comma-separated servers to test")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn worker processes")
+    parser.add_argument("--serve", choices=("flask", "asgi", "gunicorn"), help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+
+    for server in args.servers.split(","):
+        port = free_port()
+        process = subprocess.Popen(
+            [sys.executable, __file__, "--serve", server, "--port", str(port), "--workers", str(args.workers),
+             "--search-latency", str(args.search_latency)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_for_server(port, process)
+            load(port, min(args.requests, 200), args.concurrency)
+            result = {"server": server, "concurrency": args.concurrency}
+            if server == "gunicorn":
+                result["workers"] = args.workers
+            result.update(load(port, args.requests, args.concurrency))
+            print(json.dumps(result))
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Benchmark for the product catalog index.
+
+Builds a synthetic catalog (or loads --catalog) and measures index build
+time and query latency, with and without price/rating filters.
+
+Usage:
+    python benchmarks/catalog_benchmark.py [--skus 1000000] [--queries 200]
+        [--catalog products.jsonl] [--write-catalog products.jsonl]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents/specialized'))
+
+from catalog_index import CatalogIndex
+
+BRANDS = ["Sonic", "Audio", "Echo", "Time", "Fit", "Volt", "Nova", "Peak", "Aero", "Luma", "Zen", "Orbit"]
+SUFFIXES = ["Wave", "Phase", "Beats", "Keeper", "Track", "Core", "Max", "Lite", "Pro", "Air", "One", "X"]
+PRODUCT_TYPES = [
+    "Wireless Headphones", "Wireless Earbuds", "Smart Watch", "Fitness Watch", "Bluetooth Speaker",
+    "Portable Charger", "Gaming Mouse", "Mechanical Keyboard", "Action Camera", "Smart Lamp",
+    "Coffee Grinder", "Electric Kettle", "Air Fryer", "Yoga Mat", "Travel Backpack", "Desk Organizer",
+]
+FEATURES = [
+    "Active Noise Cancellation", "40-hour battery", "Bluetooth 5.2", "Hi-Res Audio", "Spatial sound",
+    "Water resistant", "Touch controls", "Compact case", "Heart rate monitoring", "GPS", "Sleep analysis",
+    "USB-C fast charging", "RGB lighting", "Stainless steel", "Foldable design", "Voice assistant",
+    "Wireless charging", "Long battery life", "Lightweight", "Premium build quality",
+]
+QUERIES = [
+    "wireless headphones",
+    "noise cancellation headphones with long battery life",
+    "smart watch gps",
+    "water resistant fitness watch",
+    "bluetooth speaker",
+    "usb-c portable charger",
+    "stainless steel electric kettle",
+    "lightweight travel backpack",
+]
+
+
+def synthetic_products(count: int, seed: int = 3):
+    rng = random.Random(seed)
+    for i in range(count):
+        yield {
+            "sku": f"SKU-{i:07d}",
+            "name": f"{rng.choice(BRANDS)}{rng.choice(SUFFIXES)} {rng.randint(1, 999)}",
+            "type": rng.choice(PRODUCT_TYPES),
+            "price": f"${rng.uniform(5, 500):.2f}",
+            "rating": round(rng.uniform(2.5, 5.0), 1),
+            "features": rng.sample(FEATURES, rng.randint(2, 5)),
+        }
+
+
+def latency_summary(latencies):
+    latencies = sorted(latencies)
+    pick = lambda fraction: round(latencies[min(len(latencies) - 1, int(fraction * len(latencies)))], 3)
+    return {"p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skus", type=int, default=1000000, help="synthetic catalog size")
+    parser.add_argument("--queries", type=int, default=200, help="queries per measurement")
+    parser.add_argument("--catalog", help="JSONL or CSV catalog to load instead of a synthetic one")
+    parser.add_argument("--write-catalog", help="write the synthetic catalog to this JSONL path and exit")
+    args = parser.parse_args()
+
+    if args.write_catalog:
+        with open(args.write_catalog, "w", encoding="utf-8") as f:
+            for product in synthetic_products(args.skus):
+                f.write(json.dumps(product) + "\n")
+        return
+
+    start = time.perf_counter()
+    index = CatalogIndex.from_file(args.catalog) if args.catalog else CatalogIndex(synthetic_products(args.skus))
+    print(json.dumps({"products": len(index), "terms": index.vocabulary_size,
+                      "build_s": round(time.perf_counter() - start, 2)}))
+
+    cases = {
+        "top10": {},
+        "top10_price_filter": {"min_price": 50, "max_price": 150},
+        "top10_price_rating_filter": {"max_price": 200, "min_rating": 4.5},
+    }
+    for name, filters in cases.items():
+        latencies = []
+        for i in range(args.queries):
+            query = QUERIES[i % len(QUERIES)]
+            query_start = time.perf_counter()
+            index.search(query, limit=10, **filters)
+            latencies.append((time.perf_counter() - query_start) * 1000)
+        print(json.dumps({"case": name, "queries": args.queries, **latency_summary(latencies)}))
+
+
+if __name__ == '__main__':
+    main()
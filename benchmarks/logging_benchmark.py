@@ -0,0 +1,91 @@
+"""Benchmark for the request-path cost of logging.
+
+Routes the same requests through the orchestrator with logging off, with a
+synchronous stream handler on the root logger (what per-module basicConfig
+calls set up), and with the queue-based, sampled pipeline of
+logging_config.py. Reports the time per request spent on the calling
+thread (best of several rounds); records go to a temporary file so the
+terminal does not skew the numbers.
+
+Usage:
+    python benchmarks/logging_benchmark.py [--requests 20000] [--rounds 5] [--level DEBUG]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from unittest.mock import MagicMock, patch
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents/specialized'))
+
+from logging_config import configure_logging, logging_stats, shutdown_logging
+from orchestrator import OrchestratorAgent
+from product_research import ProductResearchAgent
+
+SAMPLE_REQUESTS = [
+    "research wireless headphones for running",
+    "find kitchen gadgets under fifty dollars",
+    "research smart home lighting products",
+]
+
+
+def route_all(orchestrator, requests) -> float:
+    start = time.perf_counter()
+    for i, request in enumerate(requests):
+        orchestrator.route_request(request, request_id=f"bench-{i % 100}")
+    return time.perf_counter() - start
+
+
+def run(args, mode: str, log_file) -> dict:
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    if mode == "off":
+        root.setLevel(logging.CRITICAL)
+    elif mode == "sync":
+        handler = logging.StreamHandler(log_file)
+        handler.setFormatter(logging.Formatter("%(levelname)s:%(name)s:%(message)s"))
+        root.addHandler(handler)
+        root.setLevel(args.level)
+    else:
+        configure_logging(level=args.level, stream=log_file)
+
+    with patch('google.cloud.aiplatform.init'), \
+            patch('google.auth.default', return_value=(MagicMock(), "bench-project")):
+        orchestrator = OrchestratorAgent(project_id="bench-project", location="us-central1")
+    orchestrator.register_agent("ProductResearchAgent", ProductResearchAgent())
+    requests = [SAMPLE_REQUESTS[i % len(SAMPLE_REQUESTS)] for i in range(args.requests)]
+    route_all(orchestrator, requests[:500])
+    elapsed = min(route_all(orchestrator, requests) for _ in range(args.rounds))
+    result = {
+        "mode": mode,
+        "level": args.level if mode != "off" else None,
+        "requests": args.requests,
+        "us_per_request": round(elapsed / args.requests * 1e6, 1),
+    }
+    if mode == "queue":
+        result.update(logging_stats())
+        shutdown_logging()
+    orchestrator.close()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000, help="routed requests per mode")
+    parser.add_argument("--rounds", type=int, default=5, help="rounds per mode; the fastest is reported")
+    parser.add_argument("--level", default="INFO", help="root log level for the sync and queue modes")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryFile("w") as log_file:
+        for mode in ("off", "sync", "queue"):
+            print(json.dumps(run(args, mode, log_file)))
+
+
+if __name__ == '__main__':
+    main()
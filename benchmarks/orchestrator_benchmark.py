@@ -0,0 +1,264 @@
+"""Benchmark suite for the orchestrator hot paths.
+
+Runs offline: the Vertex AI SDK and Google credentials are replaced by stubs
+and the specialized agents by stand-ins that return realistic payloads after
+an optional simulated latency. Scenarios:
+
+- route_request: a mix of planning, new delegation and follow-up requests
+  (follow-ups reuse an earlier request_id and hit the stored context)
+- delegate_task: direct delegation to an agent
+- execute_workflow: the full multi-agent workflow
+- flask_request: POST /request on app.py
+- flask_stream: POST /stream on the streaming blueprint, body fully consumed
+
+Each scenario reports p50/p95/p99 latency, requests per second, memory growth
+(tracemalloc, measured in a separate pass so tracing does not skew latency)
+and the growth of conversation_contexts. Results are printed as one JSON
+object per line; --output also writes them, with run metadata, to a file so
+runs can be compared before deploying.
+
+Usage:
+    python benchmarks/orchestrator_benchmark.py [--requests 5000] [--agent-latency-ms 0]
+        [--scenarios route_request,execute_workflow] [--output results.json]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+import types
+from typing import Any, Callable, Dict, List
+from unittest.mock import MagicMock
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(REPO_ROOT, 'src/agents'))
+sys.path.append(REPO_ROOT)
+
+PLANNING_REQUESTS = [
+    "Find a profitable niche for a drop shipping business",
+    "Help me find a good product to sell online",
+]
+DELEGATION_REQUESTS = [
+    "research wireless headphones",
+    "What are the latest market trends for smart watches?",
+    "Which of these has the best profit margin for online sales?",
+    "Please evaluate and score these gadgets",
+    "I need information about kitchen appliances under fifty dollars",
+]
+FOLLOW_UP_REQUESTS = [
+    "What about the premium models?",
+    "Show me more products like these",
+    "How big is that market?",
+]
+# Share of planning, new delegation and follow-up requests in the mix
+DEFAULT_MIX = (0.2, 0.5, 0.3)
+SCENARIOS = ["route_request", "delegate_task", "execute_workflow", "flask_request", "flask_stream"]
+
+
+def install_vertex_ai_stub() -> None:
+    """Replaces the Vertex AI SDK and google.auth with offline stubs."""
+    try:
+        import google
+    except ImportError:
+        google = types.ModuleType("google")
+        google.__path__ = []
+        sys.modules["google"] = google
+    try:
+        import google.cloud as google_cloud
+    except ImportError:
+        google_cloud = types.ModuleType("google.cloud")
+        google_cloud.__path__ = []
+        sys.modules["google.cloud"] = google_cloud
+        google.cloud = google_cloud
+
+    aiplatform = types.ModuleType("google.cloud.aiplatform")
+    aiplatform.init = lambda **kwargs: None
+    sys.modules["google.cloud.aiplatform"] = aiplatform
+    google_cloud.aiplatform = aiplatform
+
+    auth = types.ModuleType("google.auth")
+    auth.__path__ = []
+    auth.default = lambda: (MagicMock(), "benchmark-project")
+    exceptions = types.ModuleType("google.auth.exceptions")
+    exceptions.DefaultCredentialsError = type("DefaultCredentialsError", (Exception,), {})
+    auth.exceptions = exceptions
+    sys.modules["google.auth"] = auth
+    sys.modules["google.auth.exceptions"] = exceptions
+    google.auth = auth
+
+
+class StubAgent:
+    """Returns a payload shaped like the simulated agents' responses."""
+
+    def __init__(self, name: str, latency_ms: float):
+        self.name = name
+        self.latency = latency_ms / 1000.0
+
+    def process_task(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
+        if self.latency:
+            time.sleep(self.latency)
+        return {
+            "result": "success",
+            "query": task_data.get("query"),
+            "products": [{"name": f"Product {i}", "price": 20.0 + i, "rating": 4.0 + i / 10} for i in range(5)],
+            "market_data": {"identified_trends": ["Wireless audio"]},
+            "profit_potential": "high",
+            "score": 0.8,
+            "source": f"{self.name} (benchmark stub)",
+        }
+
+
+def build_orchestrator(agent_latency_ms: float):
+    from orchestrator import OrchestratorAgent
+
+    orchestrator = OrchestratorAgent(project_id="benchmark-project", location="us-central1")
+    for name in ("ProductResearchAgent", "MarketAnalysisAgent", "SalesOpportunityAgent", "ProductEvaluationAgent"):
+        orchestrator.register_agent(name, StubAgent(name, agent_latency_ms))
+    return orchestrator
+
+
+def request_mix(count: int, seed: int = 11) -> List[Dict[str, Any]]:
+    """Builds a reproducible sequence of planning, delegation and follow-up requests."""
+    rng = random.Random(seed)
+    planning, delegation, _ = DEFAULT_MIX
+    issued_ids: List[str] = []
+    requests = []
+    for i in range(count):
+        roll = rng.random()
+        if roll < planning:
+            requests.append({"query": rng.choice(PLANNING_REQUESTS), "request_id": f"session-{i}"})
+            issued_ids.append(f"session-{i}")
+        elif roll < planning + delegation or not issued_ids:
+            requests.append({"query": rng.choice(DELEGATION_REQUESTS), "request_id": f"session-{i}"})
+            issued_ids.append(f"session-{i}")
+        else:
+            requests.append({"query": rng.choice(FOLLOW_UP_REQUESTS), "request_id": rng.choice(issued_ids)})
+    return requests
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def scenario_call(name: str, orchestrator) -> Callable[[Dict[str, Any]], Any]:
+    """Returns the function that serves one request in the given scenario."""
+    if name == "route_request":
+        return lambda r: orchestrator.route_request(r["query"], r["request_id"])
+    if name == "delegate_task":
+        return lambda r: orchestrator.delegate_task("MarketAnalysisAgent", {"query": r["query"]})
+    if name == "execute_workflow":
+        return lambda r: orchestrator.execute_workflow(r["query"])
+
+    import flask
+    from streaming import create_streaming_blueprint
+
+    if name == "flask_request":
+        import app as flask_app
+        client = flask_app.app.test_client()
+        return lambda r: client.post("/request", json={"request_type": "product_research", "query": r["query"]}).get_data()
+    if name == "flask_stream":
+        stream_app = flask.Flask("benchmark")
+        stream_app.register_blueprint(create_streaming_blueprint(lambda: orchestrator))
+        client = stream_app.test_client()
+        return lambda r: client.post("/stream", json=r).get_data()
+    raise ValueError(f"Unknown scenario '{name}'")
+
+
+def run_scenario(name: str, requests: List[Dict[str, Any]], agent_latency_ms: float) -> Dict[str, Any]:
+    """Measures one scenario: a timed pass and a memory pass on fresh orchestrators."""
+    # Timed pass
+    orchestrator = build_orchestrator(agent_latency_ms)
+    call = scenario_call(name, orchestrator)
+    for request in requests[:min(50, len(requests))]:
+        call(request)  # warm up imports and caches
+    latencies = []
+    started = time.perf_counter()
+    for request in requests:
+        request_start = time.perf_counter()
+        call(request)
+        latencies.append((time.perf_counter() - request_start) * 1000)
+    elapsed = time.perf_counter() - started
+    orchestrator.close()
+
+    # Memory pass
+    orchestrator = build_orchestrator(agent_latency_ms)
+    call = scenario_call(name, orchestrator)
+    call(requests[0])
+    store = orchestrator.conversation_contexts
+    contexts_before = len(store)
+    context_bytes_before = getattr(store, "size_bytes", None)
+    tracemalloc.start()
+    memory_before, _ = tracemalloc.get_traced_memory()
+    for request in requests:
+        call(request)
+    memory_after, memory_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    contexts_after = len(store)
+    context_bytes_after = getattr(store, "size_bytes", None)
+    orchestrator.close()
+
+    latencies.sort()
+    result = {
+        "scenario": name,
+        "requests": len(requests),
+        "agent_latency_ms": agent_latency_ms,
+        "p50_ms": round(percentile(latencies, 0.50), 4),
+        "p95_ms": round(percentile(latencies, 0.95), 4),
+        "p99_ms": round(percentile(latencies, 0.99), 4),
+        "max_ms": round(latencies[-1], 4),
+        "requests_per_sec": round(len(requests) / elapsed, 1),
+        "memory_growth_kb": round((memory_after - memory_before) / 1024, 1),
+        "memory_peak_kb": round((memory_peak - memory_before) / 1024, 1),
+        "contexts_before": contexts_before,
+        "contexts_after": contexts_after,
+        "contexts_per_1k_requests": round((contexts_after - contexts_before) * 1000 / len(requests), 1),
+    }
+    if context_bytes_before is not None:
+        result["context_bytes_growth"] = context_bytes_after - context_bytes_before
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000, help="requests per scenario")
+    parser.add_argument("--workflow-requests", type=int, default=500,
+                        help="requests for the execute_workflow scenario")
+    parser.add_argument("--agent-latency-ms", type=float, default=0.0, help="simulated latency of each agent call")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated scenarios to run")
+    parser.add_argument("--seed", type=int, default=11, help="seed for the request mix")
+    parser.add_argument("--output", help="also write all results as one JSON document to this path")
+    args = parser.parse_args()
+
+    install_vertex_ai_stub()
+    import logging
+    logging.disable(logging.INFO)  # per-request INFO logs would dominate the measurements
+
+    results = []
+    for name in [s.strip() for s in args.scenarios.split(",") if s.strip()]:
+        count = args.workflow_requests if name == "execute_workflow" else args.requests
+        # app.py prints every request; keep stdout for the JSON results
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            results.append(run_scenario(name, request_mix(count, args.seed), args.agent_latency_ms))
+        print(json.dumps(results[-1]), flush=True)
+
+    if args.output:
+        document = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "arguments": vars(args),
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
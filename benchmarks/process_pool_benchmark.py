@@ -0,0 +1,87 @@
+"""Benchmark for CPU-bound agents registered with process workers.
+
+Registers a stand-in scoring agent (pure-Python scoring of a synthetic
+catalog, holding the GIL like real product ranking would) once in-process
+and once with --workers worker processes, and routes the same concurrent
+requests through route_request_async. Reports requests per second and
+p50/p99 latency; with process workers throughput scales with the cores
+available, while the in-process agent serializes on the GIL.
+
+Usage:
+    python benchmarks/process_pool_benchmark.py [--requests 400] [--concurrency 16]
+        [--workers N] [--products 20000]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from unittest.mock import MagicMock, patch
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents'))
+
+from orchestrator import OrchestratorAgent
+
+
+class ScoringAgent:
+    """Scores every product of a synthetic catalog against the query."""
+
+    def __init__(self, products: int):
+        rng = random.Random(7)
+        self.catalog = [(rng.random() * 100, rng.random() * 5, rng.random()) for _ in range(products)]
+
+    def process_task(self, task_data):
+        weight = (hash(task_data["query"]) % 100) / 100
+        scores = sorted(((rating * 20 - price * 0.3 + demand * 50 * weight, i)
+                         for i, (price, rating, demand) in enumerate(self.catalog)), reverse=True)
+        return {"result": "success", "top": [i for _, i in scores[:10]]}
+
+
+async def drive(orchestrator, requests: int, concurrency: int) -> dict:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await orchestrator.route_request_async(f"research products batch {i}")
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(requests)])
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests_per_s": round(requests / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400, help="routed requests per mode")
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--products", type=int, default=20000, help="synthetic catalog size")
+    args = parser.parse_args()
+
+    agent = ScoringAgent(args.products)
+    for mode, workers in (("in_process", None), ("process_pool", args.workers)):
+        with patch('google.cloud.aiplatform.init'), \
+                patch('google.auth.default', return_value=(MagicMock(), "bench-project")):
+            orchestrator = OrchestratorAgent(project_id="bench-project", location="us-central1")
+        orchestrator.register_agent("ProductResearchAgent", agent, process_workers=workers)
+        if workers:
+            orchestrator.specialized_agents["ProductResearchAgent"].warm_up()
+        result = {"mode": mode, "workers": workers, "cpus": os.cpu_count(), "requests": args.requests}
+        result.update(asyncio.run(drive(orchestrator, args.requests, args.concurrency)))
+        print(json.dumps(result))
+        orchestrator.close()
+
+
+if __name__ == '__main__':
+    main()
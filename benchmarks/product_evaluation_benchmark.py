@@ -0,0 +1,81 @@
+"""Benchmark for the ProductEvaluationAgent scoring and ranking.
+
+For each candidate set size, times:
+
+- task: ProductEvaluationAgent.process_task on product dictionaries,
+  computing every signal and returning the top --top-k candidates
+- full_sort / top_k: ranking the scores with a full argsort versus the
+  partial sort of ScoreMatrix.top_k
+- full_rescore / incremental: recomputing every weighted score after one
+  signal changed versus ScoreMatrix.update_signal
+- rescore_task: a re-scoring task with a new market analysis, which only
+  recomputes the market fit signal
+
+Reports the best of --rounds runs in milliseconds.
+
+Usage:
+    python benchmarks/product_evaluation_benchmark.py [--sizes 10000,100000] [--rounds 5] [--top-k 10]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents/specialized'))
+
+from product_evaluation import DEFAULT_WEIGHTS, SIGNALS, ProductEvaluationAgent, ScoreMatrix
+
+MARKET = {"market_data": {"identified_trends": ["Wireless earbuds", "Noise cancelling"],
+                          "identified_competitors": ["Sony", "Bose"]}}
+
+
+def best_ms(fn, rounds: int) -> float:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return round(min(timings) * 1000, 2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000", help="comma-separated candidate set sizes")
+    parser.add_argument("--rounds", type=int, default=5, help="runs per measurement; the fastest is reported")
+    parser.add_argument("--top-k", type=int, default=10, help="candidates ranked")
+    args = parser.parse_args()
+
+    agent = ProductEvaluationAgent(top_k=args.top_k)
+    rng = np.random.default_rng(0)
+    for size in (int(s) for s in args.sizes.split(",")):
+        products = [
+            {"name": f"Product {i}", "type": "Headphones", "features": ["wireless" if i % 3 else "wired"],
+             "price": f"${p:.2f}", "rating": r, "reviews": int(n), "score": s}
+            for i, (p, r, n, s) in enumerate(zip(rng.uniform(5, 500, size), rng.uniform(1, 5, size).round(1),
+                                                 rng.integers(0, 5000, size), rng.random(size)))
+        ]
+        matrix = ScoreMatrix(rng.random((len(SIGNALS), size)), DEFAULT_WEIGHTS)
+        weights = matrix.weights.copy()
+        new_signal = rng.random(size)
+        evaluation_id = agent.process_task({"products": products})["evaluation_id"]
+
+        print(json.dumps({
+            "candidates": size,
+            "task_ms": best_ms(lambda: agent.process_task({"products": products, "market_analysis": MARKET}),
+                               args.rounds),
+            "full_sort_ms": best_ms(lambda: np.argsort(-matrix.scores, kind="stable")[:args.top_k], args.rounds),
+            "top_k_ms": best_ms(lambda: matrix.top_k(args.top_k), args.rounds),
+            "full_rescore_ms": best_ms(lambda: weights @ matrix.signals, args.rounds),
+            "incremental_ms": best_ms(lambda: matrix.update_signal("market_fit", new_signal), args.rounds),
+            "rescore_task_ms": best_ms(lambda: agent.process_task({"evaluation_id": evaluation_id,
+                                                                   "market_analysis": MARKET}), args.rounds),
+        }))
+
+
+if __name__ == '__main__':
+    main()
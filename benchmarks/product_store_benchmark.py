@@ -0,0 +1,87 @@
+"""Benchmark for the memory-mapped product store.
+
+Compares what a worker process pays at startup to serve a catalog from a
+JSONL file (parsed into per-process Python objects) with a product store
+(mapped, nothing parsed), and how fast records are materialized.
+
+Usage:
+    python benchmarks/product_store_benchmark.py [--skus 200000]
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents/specialized'))
+sys.path.append(os.path.dirname(__file__))
+
+from catalog_benchmark import synthetic_products
+from product_store import ProductStore, write_product_store
+
+SPECIALIZED_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/agents/specialized'))
+
+# Opens a catalog in a fresh interpreter and reports startup time and memory
+CHILD_SCRIPT = r"""
+import json, resource, sys, time
+sys.path.append(sys.argv[1])
+import numpy
+from product_store import ProductStore
+from catalog_index import read_catalog
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+if sys.argv[2].endswith(".pstore"):
+    catalog = ProductStore(sys.argv[2])
+    prices = numpy.asarray(catalog.prices)
+else:
+    catalog = [json.loads(line) for line in read_catalog(sys.argv[2])]
+    prices = numpy.array([p["price"] for p in catalog], dtype=object)
+elapsed = time.perf_counter() - start
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"startup_ms": round(elapsed * 1000, 1), "rss_growth_mb": round((after - before) / 1024, 1)}))
+"""
+
+
+def measure_startup(path: str) -> dict:
+    output = subprocess.run([sys.executable, "-c", CHILD_SCRIPT, SPECIALIZED_DIR, path],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skus", type=int, default=200000, help="synthetic catalog size")
+    parser.add_argument("--reads", type=int, default=20000, help="random records materialized")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        jsonl_path = os.path.join(directory, "catalog.jsonl")
+        store_path = os.path.join(directory, "catalog.pstore")
+        with open(jsonl_path, "w", encoding="utf-8") as f:
+            for product in synthetic_products(args.skus):
+                f.write(json.dumps(product) + "\n")
+        start = time.perf_counter()
+        with open(jsonl_path, encoding="utf-8") as f:
+            write_product_store(store_path, f)
+        convert_s = time.perf_counter() - start
+
+        for name, path in (("jsonl", jsonl_path), ("product_store", store_path)):
+            print(json.dumps({"format": name, "skus": args.skus, "file_mb": round(os.path.getsize(path) / 2**20, 1),
+                              **measure_startup(path)}))
+
+        rng = random.Random(0)
+        rows = [rng.randrange(args.skus) for _ in range(args.reads)]
+        with ProductStore(store_path) as store:
+            start = time.perf_counter()
+            for row in rows:
+                store.get(row)
+            get_us = (time.perf_counter() - start) / args.reads * 1e6
+        print(json.dumps({"convert_s": round(convert_s, 2), "get_us": round(get_us, 2)}))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Micro-benchmark for the compiled routing table.
+
+Measures routing throughput as the number of keyword rules grows, and
+compares it with the linear chain of substring checks the table replaced.
+
+Usage:
+    python benchmarks/routing_benchmark.py [--requests 20000]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents'))
+
+from routing import DEFAULT_ROUTES, RoutingTable
+
+RULE_COUNTS = [5, 50, 500, 2000, 5000]
+SAMPLE_REQUESTS = [
+    "research wireless headphones",
+    "What are the latest market trends for smart watches?",
+    "Which of these has the best profit margin for online sales?",
+    "Please evaluate and score these gadgets",
+    "Find a profitable niche for a drop shipping business",
+    "I need information about kitchen appliances under fifty dollars",
+]
+
+
+def synthetic_routes(rule_count: int, seed: int = 7):
+    """Default routes plus synthetic agents until rule_count keywords exist."""
+    rng = random.Random(seed)
+    routes = [dict(route) for route in DEFAULT_ROUTES]
+    existing = sum(len(route["keywords"]) for route in routes)
+    alphabet = "abcdefghijklmnopqrstuvwxyz"
+    agent_index = 0
+    while existing < rule_count:
+        keywords = []
+        for _ in range(min(20, rule_count - existing)):
+            keywords.append("".join(rng.choice(alphabet) for _ in range(rng.randint(5, 12))))
+        routes.append({"target": f"SyntheticAgent{agent_index}", "keywords": keywords})
+        existing += len(keywords)
+        agent_index += 1
+    return routes
+
+
+def linear_match(routes, text: str):
+    """The previous approach: one substring scan per keyword, route by route."""
+    text = text.lower()
+    for route in routes:
+        for keyword in route["keywords"]:
+            if keyword in text:
+                return route["target"]
+    return "ProductResearchAgent"
+
+
+def measure(fn, requests) -> float:
+    start = time.perf_counter()
+    for request in requests:
+        fn(request)
+    return len(requests) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000, help="routed requests per measurement")
+    args = parser.parse_args()
+
+    requests = [SAMPLE_REQUESTS[i % len(SAMPLE_REQUESTS)] for i in range(args.requests)]
+    results = []
+    for rule_count in RULE_COUNTS:
+        routes = synthetic_routes(rule_count)
+        table = RoutingTable(routes)
+        table.compile()
+        for request in SAMPLE_REQUESTS:
+            assert table.match(request) == linear_match(routes, request), request
+        results.append({
+            "rules": table.rule_count,
+            "compiled_routes_per_sec": round(measure(table.match, requests)),
+            "linear_routes_per_sec": round(measure(lambda r: linear_match(routes, r), requests)),
+        })
+        print(json.dumps(results[-1]))
+
+
+if __name__ == '__main__':
+    main()
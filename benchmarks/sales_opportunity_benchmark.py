@@ -0,0 +1,96 @@
+"""Benchmark for the SalesOpportunityAgent estimates.
+
+For each product set size, times:
+
+- loop: the same estimates computed one product at a time in Python, as a
+  baseline
+- columns: estimate_sales over NumPy price, cost, rating and review columns
+- task: SalesOpportunityAgent.process_task on product dictionaries, i.e.
+  reading the columns out of the records, estimating and formatting the
+  top results
+
+Reports the best of --rounds runs in milliseconds.
+
+Usage:
+    python benchmarks/sales_opportunity_benchmark.py [--sizes 10000,100000] [--rounds 5]
+"""
+
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents/specialized'))
+
+import sales_opportunity as so
+from sales_opportunity import SalesOpportunityAgent, estimate_sales
+
+
+def estimate_loop(prices, costs, ratings, reviews):
+    """Per-product Python version of estimate_sales, without the NaN handling."""
+    median_price = statistics.median(prices)
+    profits = []
+    for price, cost, rating, review_count in zip(prices, costs, ratings, reviews):
+        unit_profit = price * (1 - so.FEE_RATE) - cost - so.FULFILMENT_COST
+        relative_price = price / median_price
+        elasticity = min(max(so.BASE_ELASTICITY * math.sqrt(relative_price)
+                             * (1 - 0.1 * (rating - so.NEUTRAL_RATING)), so.ELASTICITY_RANGE[0]), so.ELASTICITY_RANGE[1])
+        units = (so.BASE_MONTHLY_UNITS * math.exp(so.RATING_DEMAND_WEIGHT * (rating - so.NEUTRAL_RATING))
+                 * (1 + math.log1p(review_count)) * relative_price ** -elasticity)
+        optimal = (elasticity * (cost + so.FULFILMENT_COST) / ((elasticity - 1) * (1 - so.FEE_RATE))
+                   if elasticity > 1 else math.inf)
+        suggested = min(max(optimal, price * so.SUGGESTED_PRICE_RANGE[0]), price * so.SUGGESTED_PRICE_RANGE[1])
+        profits.append((unit_profit / price, elasticity, units, units * unit_profit, suggested))
+    best = max(profit[3] for profit in profits)
+    return [min(max(profit[3] / best * 100, 0.0), 100.0) for profit in profits]
+
+
+def best_ms(fn, rounds: int) -> float:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return round(min(timings) * 1000, 2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000", help="comma-separated product set sizes")
+    parser.add_argument("--rounds", type=int, default=5, help="runs per measurement; the fastest is reported")
+    args = parser.parse_args()
+
+    agent = SalesOpportunityAgent()
+    rng = np.random.default_rng(0)
+    for size in (int(s) for s in args.sizes.split(",")):
+        prices = rng.uniform(5, 500, size).round(2)
+        costs = (prices * rng.uniform(0.2, 0.9, size)).round(2)
+        ratings = rng.uniform(1, 5, size).round(1)
+        reviews = rng.integers(0, 5000, size).astype(np.float64)
+        products = [{"name": f"Product {i}", "price": f"${p:.2f}", "cost": c, "rating": r, "reviews": int(n)}
+                    for i, (p, c, r, n) in enumerate(zip(prices, costs, ratings, reviews))]
+        columns = (prices.tolist(), costs.tolist(), ratings.tolist(), reviews.tolist())
+
+        reference = estimate_loop(*columns)
+        vectorized = estimate_sales(prices, costs, ratings, reviews)["opportunity_score"]
+        assert np.allclose(reference, vectorized)
+
+        loop_ms = best_ms(lambda: estimate_loop(*columns), args.rounds)
+        columns_ms = best_ms(lambda: estimate_sales(prices, costs, ratings, reviews), args.rounds)
+        task_ms = best_ms(lambda: agent.process_task({"query": "profit", "products": products}), args.rounds)
+        print(json.dumps({
+            "products": size,
+            "loop_ms": loop_ms,
+            "columns_ms": columns_ms,
+            "task_ms": task_ms,
+            "columns_speedup": round(loop_ms / columns_ms, 1),
+        }))
+
+
+if __name__ == '__main__':
+    main()
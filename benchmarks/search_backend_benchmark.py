@@ -0,0 +1,86 @@
+"""Benchmark for hedged requests in the HTTP search backend.
+
+Runs the same seeded load against the local stand-in search server with
+hedging off and on, and reports the latency percentiles and the extra
+backend requests that hedging cost. The server's latency distribution has a
+log-normal body and a straggler tail, configurable below.
+
+Usage:
+    python benchmarks/search_backend_benchmark.py [--calls 1000] [--tail-probability 0.05]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents/specialized'))
+
+from search_backend import HTTPSearchBackend
+from search_stub import LatencyDistribution, StubSearchServer
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+
+def run(args, hedge: bool) -> dict:
+    latency = LatencyDistribution(args.median_ms / 1000, args.sigma, args.tail_probability, args.tail_ms / 1000,
+                                  seed=args.seed)
+    with StubSearchServer(latency=latency) as server:
+        backend = HTTPSearchBackend(server.url, max_concurrency=args.concurrency * 2, hedge=hedge)
+        # Warm the connection pool and the latency window the hedge delay comes from
+        for _ in range(50):
+            backend.search("market trends")
+        warmup_requests = server.requests
+
+        def timed_call(i):
+            start = time.perf_counter()
+            backend.search(f"market trends {i % 20}")
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            latencies = list(pool.map(timed_call, range(args.calls)))
+        elapsed = time.perf_counter() - start
+        stats = backend.stats()
+        backend.close()
+        requests = server.requests - warmup_requests
+
+    return {
+        "hedging": hedge,
+        "calls": args.calls,
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "max_ms": round(max(latencies) * 1000, 1),
+        "calls_per_sec": round(args.calls / elapsed, 1),
+        "backend_requests": requests,
+        "extra_requests_pct": round((requests - args.calls) / args.calls * 100, 1),
+        "hedge_wins": stats["hedge_wins"],
+        "hedge_delay_ms": stats["hedge_delay_ms"],
+        "connections_opened": stats["connections_opened"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=1000, help="searches per run")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent callers")
+    parser.add_argument("--median-ms", type=float, default=20.0, help="median server latency")
+    parser.add_argument("--sigma", type=float, default=0.25, help="spread of the log-normal body")
+    parser.add_argument("--tail-probability", type=float, default=0.03, help="share of straggler requests")
+    parser.add_argument("--tail-ms", type=float, default=400.0, help="extra latency of a straggler")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    for hedge in (False, True):
+        print(json.dumps(run(args, hedge)))
+
+
+if __name__ == '__main__':
+    main()
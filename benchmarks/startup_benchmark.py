@@ -0,0 +1,64 @@
+"""Cold-start benchmark for OrchestratorAgent.
+
+Each measurement runs in a fresh interpreter so that module imports are cold,
+like a new Cloud Run instance. For eager and lazy initialization it reports:
+
+- import_ms: importing the orchestrator module
+- routable_ms: import plus construction, i.e. until a request can be routed
+- first_request_ms: until the first keyword-routed request has been served
+- settled_ms: until Vertex AI initialization finished (ready or failed)
+
+Usage:
+    python benchmarks/startup_benchmark.py [--runs 3]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+AGENTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/agents'))
+
+CHILD_SCRIPT = r"""
+import json, sys, time
+start = time.perf_counter()
+sys.path.append(sys.argv[1])
+from orchestrator import OrchestratorAgent
+imported = time.perf_counter()
+agent = OrchestratorAgent(project_id="benchmark-project", location="us-central1", lazy_init=sys.argv[2] == "lazy")
+routable = time.perf_counter()
+agent.register_agent("ProductResearchAgent", type("Agent", (), {"process_task": lambda self, task: {"result": "success"}})())
+agent.route_request("research wireless headphones")
+first_request = time.perf_counter()
+agent.wait_until_ready(timeout=120)
+settled = time.perf_counter()
+ms = lambda t: round((t - start) * 1000, 1)
+print(json.dumps({"import_ms": ms(imported), "routable_ms": ms(routable), "first_request_ms": ms(first_request),
+                  "settled_ms": ms(settled), "init_state": agent.get_init_state()}))
+"""
+
+
+def run_once(mode: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT, AGENTS_DIR, mode],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="cold starts per mode")
+    args = parser.parse_args()
+
+    for mode in ("eager", "lazy"):
+        runs = [run_once(mode) for _ in range(args.runs)]
+        summary = {"mode": mode, "runs": args.runs, "init_state": runs[-1]["init_state"]}
+        for key in ("import_ms", "routable_ms", "first_request_ms", "settled_ms"):
+            summary[key] = sorted(run[key] for run in runs)[len(runs) // 2]
+        print(json.dumps(summary))
+
+
+if __name__ == '__main__':
+    main()
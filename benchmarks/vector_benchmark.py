@@ -0,0 +1,78 @@
+"""Benchmark for the NumPy vector store.
+
+Compares answering a batch of queries one search at a time with a single
+batched search (one matrix multiply per chunk), over a synthetic embedding
+matrix that is saved and memory-mapped like a production one.
+
+Usage:
+    python benchmarks/vector_benchmark.py [--rows 1000000] [--batch 64]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents/specialized'))
+
+from vector_store import DEFAULT_DIMENSIONS, VectorStore
+
+QUERIES = [
+    "wireless noise cancelling headphones",
+    "smart watch with gps",
+    "stainless steel electric kettle",
+    "water resistant fitness tracker",
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000, help="embeddings in the store")
+    parser.add_argument("--batch", type=int, default=64, help="queries per batch")
+    parser.add_argument("--k", type=int, default=10, help="results per query")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "embeddings.npy")
+        matrix = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(args.rows, DEFAULT_DIMENSIONS))
+        for start in range(0, args.rows, 100000):
+            block = rng.standard_normal((min(100000, args.rows - start), DEFAULT_DIMENSIONS)).astype(np.float32)
+            matrix[start:start + len(block)] = block / np.linalg.norm(block, axis=1, keepdims=True)
+        matrix.flush()
+        del matrix
+
+        start = time.perf_counter()
+        store = VectorStore.load(path)
+        load_ms = (time.perf_counter() - start) * 1000
+        queries = [QUERIES[i % len(QUERIES)] for i in range(args.batch)]
+        store.search_batch(queries[:1], args.k)  # page the matrix in
+
+        start = time.perf_counter()
+        for query in queries:
+            store.search(query, args.k)
+        single_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        store.search_batch(queries, args.k)
+        batch_s = time.perf_counter() - start
+
+        print(json.dumps({
+            "rows": args.rows,
+            "dimensions": DEFAULT_DIMENSIONS,
+            "batch": args.batch,
+            "load_ms": round(load_ms, 2),
+            "single_queries_ms": round(single_s * 1000, 1),
+            "batched_ms": round(batch_s * 1000, 1),
+            "single_queries_per_sec": round(args.batch / single_s, 1),
+            "batched_queries_per_sec": round(args.batch / batch_s, 1),
+        }))
+        del store
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Benchmark for workflow stage memoization in an interactive refine loop.
+
+Runs the product workflow with the real agents over a synthetic catalog
+(see catalog_benchmark.py): once for the initial query, then once per
+refinement, each adding or tightening catalog filters (max_price,
+min_rating) the way a user narrows results. The market search goes to a
+stand-in backend that takes --search-latency-ms, like a web search tool
+call would.
+
+Each loop runs once without and once with a stage cache, on a fresh
+orchestrator per round. Reports the initial and the mean refinement latency
+in milliseconds (best of --rounds rounds) and the stages reused per
+refinement.
+
+Usage:
+    python benchmarks/workflow_refine_benchmark.py [--skus 20000] [--search-latency-ms 300] [--rounds 3]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from unittest.mock import MagicMock, patch
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src/agents/specialized'))
+
+from catalog_benchmark import synthetic_products
+from market_analysis import MarketAnalysisAgent, simulated_search_results
+from orchestrator import OrchestratorAgent
+from product_evaluation import ProductEvaluationAgent
+from product_research import ProductResearchAgent
+from result_cache import TTLCache
+from sales_opportunity import SalesOpportunityAgent
+from search_backend import SearchBackend
+
+QUERY = "wireless headphones market trends"
+REFINEMENTS = [
+    {"max_price": 300},
+    {"max_price": 150},
+    {"max_price": 150, "min_rating": 4.0},
+    {"max_price": 100, "min_rating": 4.0},
+]
+
+
+class SlowSearchBackend(SearchBackend):
+    """Returns the simulated search results after a fixed delay."""
+
+    def __init__(self, latency_ms: float):
+        self.latency = latency_ms / 1000.0
+
+    def search(self, query, context="", timeout=None):
+        time.sleep(self.latency)
+        return simulated_search_results(query, context)
+
+
+def refine_loop(research: ProductResearchAgent, search_latency_ms: float, stage_cache: bool) -> dict:
+    with patch('google.cloud.aiplatform.init'), \
+            patch('google.auth.default', return_value=(MagicMock(), "bench-project")):
+        orchestrator = OrchestratorAgent(project_id="bench-project", location="us-central1",
+                                         stage_cache=TTLCache() if stage_cache else None)
+    orchestrator.register_agent("ProductResearchAgent", research)
+    orchestrator.register_agent("MarketAnalysisAgent",
+                                MarketAnalysisAgent(search_backend=SlowSearchBackend(search_latency_ms)))
+    orchestrator.register_agent("SalesOpportunityAgent", SalesOpportunityAgent())
+    orchestrator.register_agent("ProductEvaluationAgent", ProductEvaluationAgent())
+    try:
+        start = time.perf_counter()
+        orchestrator.execute_workflow(QUERY)
+        initial = time.perf_counter() - start
+        refinements, reused = [], []
+        for filters in REFINEMENTS:
+            start = time.perf_counter()
+            result = orchestrator.execute_workflow(QUERY, filters=filters)
+            refinements.append(time.perf_counter() - start)
+            reused.append(len(result["reused_stages"]))
+    finally:
+        orchestrator.close()
+    return {"initial": initial, "refine": statistics.mean(refinements), "reused": reused}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skus", type=int, default=20000, help="synthetic catalog size")
+    parser.add_argument("--search-latency-ms", type=float, default=300.0, help="latency of each market search")
+    parser.add_argument("--rounds", type=int, default=3, help="refine loops per mode; the fastest is reported")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog_path = os.path.join(tmp, "catalog.jsonl")
+        with open(catalog_path, "w", encoding="utf-8") as f:
+            for product in synthetic_products(args.skus):
+                f.write(json.dumps(product) + "\n")
+        research = ProductResearchAgent(catalog_path=catalog_path)
+
+    for stage_cache in (False, True):
+        loops = [refine_loop(research, args.search_latency_ms, stage_cache) for _ in range(args.rounds)]
+        best = min(loops, key=lambda loop: loop["refine"])
+        print(json.dumps({
+            "stage_cache": stage_cache,
+            "skus": args.skus,
+            "search_latency_ms": args.search_latency_ms,
+            "initial_ms": round(min(loop["initial"] for loop in loops) * 1000, 1),
+            "refine_ms": round(best["refine"] * 1000, 1),
+            "reused_stages_per_refinement": best["reused"],
+        }))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+"""Gunicorn settings for serving the ASGI app (src/agents/asgi.py).
+
+    gunicorn src.agents.asgi:app
+
+Gunicorn reads this file from the working directory. Each worker runs a
+uvicorn event loop and builds and warms its own orchestrator during the ASGI
+lifespan startup, before it accepts connections. With PRELOAD_APP on (the
+default), the app and service.preload()'s agents are loaded once in the
+master process and shared copy-on-write by the forked workers.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+# One worker per CPU unless WEB_CONCURRENCY says otherwise
+workers = int(os.environ.get("WEB_CONCURRENCY") or os.cpu_count() or 1)
+preload_app = os.environ.get("PRELOAD_APP", "1") != "0"
+# Seconds a silent worker is given before it is restarted
+timeout = int(os.environ.get("WORKER_TIMEOUT", "120"))
+# Cloud Run allows 10 s between SIGTERM and SIGKILL
+graceful_timeout = 8
+
+
+def on_starting(server):
+    # Runs in the master process, before any worker is forked
+    if preload_app:
+        from src.agents.service import preload
+
+        preload()
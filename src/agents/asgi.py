@@ -0,0 +1,308 @@
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+try:
+    from .logging_config import configure_logging
+    from .metrics import PROMETHEUS_MIMETYPE, metrics_json
+    from .service import DEFAULT_WARMUP_TIMEOUT, get_orchestrator, warm_up
+    from .streaming import NDJSON_MIMETYPE, SSE_MIMETYPE, format_ndjson, format_sse, wants_sse
+    from .workflow_checkpoint import UnknownWorkflowError
+except ImportError:  # Imported as a top-level module with src/agents on sys.path
+    from logging_config import configure_logging
+    from metrics import PROMETHEUS_MIMETYPE, metrics_json
+    from service import DEFAULT_WARMUP_TIMEOUT, get_orchestrator, warm_up
+    from streaming import NDJSON_MIMETYPE, SSE_MIMETYPE, format_ndjson, format_sse, wants_sse
+    from workflow_checkpoint import UnknownWorkflowError
+
+logger = logging.getLogger(__name__)
+
+# Largest request body accepted, in bytes
+MAX_BODY_BYTES = 1024 * 1024
+
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class HTTPError(Exception):
+    """Ends a request with an error status and a JSON {"error": message} body."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class OrchestratorApp:
+    """
+    ASGI application serving one orchestrator per process.
+
+    The orchestrator is built and warmed during the ASGI lifespan startup
+    (see service.warm_up), before the server accepts traffic, and every
+    request runs on the orchestrator's async path, so a worker serves many
+    concurrent requests on one event loop.
+
+    Routes:
+        GET  /                 Liveness text.
+        GET  /healthz          Initialization state; 503 until ready.
+        GET  /metrics          Prometheus histograms, or JSON with
+                               Accept: application/json (see metrics.py).
+        POST /route            {"query", "request_id"?, "timeout"?}
+        POST /batch            {"queries", "request_ids"?, "timeout"?}
+        POST /workflow         {"query", "timeout"?, "filters"?}, e.g.
+                               "filters": {"max_price": 100}
+        POST /workflow/resume  {"workflow_id", "timeout"?}; finishes a
+                               checkpointed workflow, 404 if unknown.
+        POST /stream           Like /route, streamed as NDJSON or SSE.
+        POST /workflow/stream  Like /workflow, streamed as NDJSON or SSE.
+
+    Serve with uvicorn, or with gunicorn and uvicorn workers (see
+    gunicorn.conf.py at the repository root).
+    """
+
+    def __init__(self, orchestrator_factory: Callable[[], Any] = get_orchestrator, setup_logging: bool = True,
+                 warmup_timeout: float = DEFAULT_WARMUP_TIMEOUT):
+        """
+        Args:
+            orchestrator_factory: Returns the orchestrator serving the requests.
+            setup_logging: Configure the process's logging (see
+                logging_config.py) at startup, i.e. once per worker.
+            warmup_timeout: Seconds startup waits for Vertex AI initialization.
+        """
+        self.orchestrator_factory = orchestrator_factory
+        self.setup_logging = setup_logging
+        self.warmup_timeout = warmup_timeout
+        self.orchestrator: Optional[Any] = None
+        self._routes: Dict[Tuple[str, str], Callable[[Dict[str, Any], Receive, Send], Awaitable[None]]] = {
+            ("GET", "/"): self._index,
+            ("GET", "/healthz"): self._health,
+            ("GET", "/metrics"): self._metrics,
+            ("POST", "/route"): self._route,
+            ("POST", "/batch"): self._batch,
+            ("POST", "/workflow"): self._workflow,
+            ("POST", "/workflow/resume"): self._resume_workflow,
+            ("POST", "/stream"): self._stream,
+            ("POST", "/workflow/stream"): self._workflow_stream,
+        }
+
+    async def __call__(self, scope: Dict[str, Any], receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
+
+        path = scope["path"].rstrip("/") or "/"
+        handler = self._routes.get((scope["method"], path))
+        try:
+            if handler is None:
+                if any(route_path == path for _, route_path in self._routes):
+                    raise HTTPError(405, f"Method {scope['method']} not allowed for {path}")
+                raise HTTPError(404, f"Unknown path {path}")
+            await handler(scope, receive, send)
+        except HTTPError as e:
+            await self._send_json(send, e.status, {"error": e.message})
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    await self.startup()
+                except Exception as e:
+                    logger.error(f"Startup failed: {e}", exc_info=True)
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def startup(self) -> None:
+        """Builds and warms the orchestrator; called once per worker process."""
+        if self.setup_logging:
+            configure_logging()
+        orchestrator = await asyncio.to_thread(self.orchestrator_factory)
+        ready = await asyncio.to_thread(warm_up, orchestrator, self.warmup_timeout)
+        self.orchestrator = orchestrator
+        logger.info(f"Orchestrator warmed with {len(orchestrator.specialized_agents)} agents (ready: {ready})")
+
+    def shutdown(self) -> None:
+        if self.orchestrator is not None:
+            self.orchestrator.close()
+            self.orchestrator = None
+
+    def _get_orchestrator(self) -> Any:
+        # Servers started without lifespan support build it on first use
+        if self.orchestrator is None:
+            self.orchestrator = self.orchestrator_factory()
+        return self.orchestrator
+
+    async def _index(self, scope: Dict[str, Any], receive: Receive, send: Send) -> None:
+        await self._send(send, 200, b"Orchestrator Agent is running!", "text/plain; charset=utf-8")
+
+    async def _health(self, scope: Dict[str, Any], receive: Receive, send: Send) -> None:
+        orchestrator = self._get_orchestrator()
+        await self._send_json(send, 200 if orchestrator.is_ready() else 503, {"state": orchestrator.get_init_state()})
+
+    async def _metrics(self, scope: Dict[str, Any], receive: Receive, send: Send) -> None:
+        orchestrator = self._get_orchestrator()
+        if "application/json" in _header(scope, b"accept"):
+            await self._send_json(send, 200, metrics_json(orchestrator))
+        else:
+            await self._send(send, 200, orchestrator.tracer.render_prometheus().encode("utf-8"), PROMETHEUS_MIMETYPE)
+
+    async def _route(self, scope: Dict[str, Any], receive: Receive, send: Send) -> None:
+        data = await _read_query(receive)
+        response = await self._get_orchestrator().route_request_async(
+            data["query"], data.get("request_id"), _timeout(data)
+        )
+        await self._send_json(send, 200, response)
+
+    async def _batch(self, scope: Dict[str, Any], receive: Receive, send: Send) -> None:
+        data = await _read_json(receive)
+        queries = data.get("queries")
+        if not isinstance(queries, list) or not queries or not all(isinstance(q, str) and q for q in queries):
+            raise HTTPError(400, "Request body must include non-empty 'queries'")
+        try:
+            responses = await self._get_orchestrator().route_batch_async(
+                queries, data.get("request_ids"), _timeout(data)
+            )
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        await self._send_json(send, 200, {"responses": responses})
+
+    async def _workflow(self, scope: Dict[str, Any], receive: Receive, send: Send) -> None:
+        data = await _read_query(receive)
+        result = await self._get_orchestrator().execute_workflow_async(data["query"], _timeout(data), _filters(data))
+        await self._send_json(send, 200, result)
+
+    async def _resume_workflow(self, scope: Dict[str, Any], receive: Receive, send: Send) -> None:
+        data = await _read_json(receive)
+        workflow_id = data.get("workflow_id")
+        if not isinstance(workflow_id, str) or not workflow_id:
+            raise HTTPError(400, "Request body must include a 'workflow_id'")
+        try:
+            result = await self._get_orchestrator().resume_workflow_async(workflow_id, _timeout(data))
+        except UnknownWorkflowError as e:
+            raise HTTPError(404, str(e))
+        await self._send_json(send, 200, result)
+
+    async def _stream(self, scope: Dict[str, Any], receive: Receive, send: Send) -> None:
+        data = await _read_query(receive)
+        events = self._get_orchestrator().route_request_stream_async(
+            data["query"], data.get("request_id"), _timeout(data)
+        )
+        await self._send_events(send, events, wants_sse(_header(scope, b"accept")))
+
+    async def _workflow_stream(self, scope: Dict[str, Any], receive: Receive, send: Send) -> None:
+        data = await _read_query(receive)
+        events = self._get_orchestrator().execute_workflow_stream_async(data["query"], _timeout(data), _filters(data))
+        await self._send_events(send, events, wants_sse(_header(scope, b"accept")))
+
+    async def _send(self, send: Send, status: int, body: bytes, content_type: str) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", content_type.encode("latin-1")),
+                        (b"content-length", str(len(body)).encode("latin-1"))],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def _send_json(self, send: Send, status: int, payload: Any) -> None:
+        await self._send(send, status, json.dumps(payload, default=str).encode("utf-8"), "application/json")
+
+    async def _send_events(self, send: Send, events: AsyncIterator[Dict[str, Any]], sse: bool) -> None:
+        """Writes each event as soon as it is produced, like streaming.stream_events."""
+        encode = format_sse if sse else format_ndjson
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", (SSE_MIMETYPE if sse else NDJSON_MIMETYPE).encode("latin-1")),
+                        (b"cache-control", b"no-cache"),
+                        (b"x-accel-buffering", b"no")],
+        })
+        try:
+            async for event in events:
+                await send({"type": "http.response.body", "body": encode(event).encode("utf-8"), "more_body": True})
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band
+            logger.error(f"Streaming failed: {e}")
+            error = {"event": "error", "status": "error", "message": str(e)}
+            await send({"type": "http.response.body", "body": encode(error).encode("utf-8"), "more_body": True})
+        finally:
+            await events.aclose()
+        await send({"type": "http.response.body", "body": b""})
+
+
+def _header(scope: Dict[str, Any], name: bytes) -> str:
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value.decode("latin-1")
+    return ""
+
+
+async def _read_json(receive: Receive) -> Dict[str, Any]:
+    """Reads the request body as a JSON object."""
+    chunks: List[bytes] = []
+    size = 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise HTTPError(400, "Client disconnected")
+        body = message.get("body", b"")
+        size += len(body)
+        if size > MAX_BODY_BYTES:
+            raise HTTPError(413, f"Request body exceeds {MAX_BODY_BYTES} bytes")
+        chunks.append(body)
+        if not message.get("more_body", False):
+            break
+    try:
+        data = json.loads(b"".join(chunks) or b"null")
+    except ValueError:
+        raise HTTPError(400, "Request body must be JSON")
+    if not isinstance(data, dict):
+        raise HTTPError(400, "Request body must be a JSON object")
+    return data
+
+
+async def _read_query(receive: Receive) -> Dict[str, Any]:
+    data = await _read_json(receive)
+    if not isinstance(data.get("query"), str) or not data["query"]:
+        raise HTTPError(400, "Request body must include a 'query'")
+    return data
+
+
+def _timeout(data: Dict[str, Any]) -> Optional[float]:
+    """Returns the request's optional "timeout" in seconds."""
+    timeout = data.get("timeout")
+    if timeout is None:
+        return None
+    if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0:
+        raise HTTPError(400, "'timeout' must be a positive number of seconds")
+    return float(timeout)
+
+
+def _filters(data: Dict[str, Any]) -> Optional[Dict[str, float]]:
+    """Returns the request's optional catalog "filters", e.g. {"max_price": 100}."""
+    filters = data.get("filters")
+    if filters is None:
+        return None
+    if not isinstance(filters, dict) or not all(
+            isinstance(value, (int, float)) and not isinstance(value, bool) for value in filters.values()):
+        raise HTTPError(400, "'filters' must map filter names to numbers")
+    return filters
+
+
+# The production entry point: gunicorn src.agents.asgi:app (see gunicorn.conf.py)
+app = OrchestratorApp()
+
+
+if __name__ == "__main__":
+    import os
+
+    import uvicorn
+
+    uvicorn.run(app, host="0.0.0.0", port=int(os.environ.get("PORT", "8080")))
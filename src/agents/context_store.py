@@ -0,0 +1,260 @@
+import abc
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Defaults shared by the context store backends
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_TTL_SECONDS = 3600.0
+
+
+class ContextStore(abc.ABC):
+    """
+    Storage for per-request conversation contexts used by the orchestrator.
+
+    Backends implement the abstract get, set, delete, __contains__ and
+    __len__. Entries expire ttl_seconds after they were last read or
+    written, and the least recently used entries are evicted once the store
+    is full.
+    """
+
+    @abc.abstractmethod
+    def get(self, request_id: str) -> Optional[str]:
+        """
+        Returns the context for a request and refreshes its expiry.
+
+        Args:
+            request_id: The request identifier.
+
+        Returns:
+            The stored context, or None if there is none or it expired.
+        """
+
+    @abc.abstractmethod
+    def set(self, request_id: str, context: str) -> None:
+        """
+        Stores the context for a request, evicting old entries if needed.
+
+        Args:
+            request_id: The request identifier.
+            context: The conversation context to store.
+        """
+
+    @abc.abstractmethod
+    def delete(self, request_id: str) -> None:
+        """Removes the context for a request if present."""
+
+    @abc.abstractmethod
+    def __contains__(self, request_id: str) -> bool:
+        """Checks for an unexpired context without refreshing it."""
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        """Returns the number of stored contexts, including expired ones not yet purged."""
+
+    def close(self) -> None:
+        """Releases any resources held by the store."""
+
+
+class InMemoryContextStore(ContextStore):
+    """
+    In-process LRU context store with a sliding TTL and an optional memory cap.
+
+    Each entry is kept as a (context, expires_at) tuple in an OrderedDict in
+    least-recently-used order. Because every access moves an entry to the end
+    and resets its expiry, expired entries always sit at the front and are
+    purged in amortized constant time.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_bytes: Optional[int] = None, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            max_entries: Maximum number of contexts kept.
+            ttl_seconds: Seconds of inactivity after which a context expires.
+            max_bytes: Optional cap on the approximate size of stored keys and
+                contexts, in bytes of UTF-8 text.
+            clock: Time source, injectable for tests.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    @staticmethod
+    def _entry_size(request_id: str, context: str) -> int:
+        return len(request_id.encode("utf-8")) + len(context.encode("utf-8"))
+
+    def _remove(self, request_id: str) -> None:
+        context, _ = self._entries.pop(request_id)
+        self._bytes -= self._entry_size(request_id, context)
+
+    def _purge_expired(self, now: float) -> None:
+        while self._entries:
+            request_id, (_, expires_at) = next(iter(self._entries.items()))
+            if expires_at > now:
+                break
+            self._remove(request_id)
+
+    def get(self, request_id: str) -> Optional[str]:
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(request_id)
+            if entry is None:
+                return None
+            context, expires_at = entry
+            if expires_at <= now:
+                self._remove(request_id)
+                return None
+            self._entries[request_id] = (context, now + self.ttl_seconds)
+            self._entries.move_to_end(request_id)
+            return context
+
+    def set(self, request_id: str, context: str) -> None:
+        now = self._clock()
+        with self._lock:
+            if request_id in self._entries:
+                self._remove(request_id)
+            self._entries[request_id] = (context, now + self.ttl_seconds)
+            self._bytes += self._entry_size(request_id, context)
+
+            self._purge_expired(now)
+            while len(self._entries) > self.max_entries or (
+                    self.max_bytes is not None and self._bytes > self.max_bytes and len(self._entries) > 1):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def delete(self, request_id: str) -> None:
+        with self._lock:
+            if request_id in self._entries:
+                self._remove(request_id)
+
+    def __contains__(self, request_id: str) -> bool:
+        entry = self._entries.get(request_id)
+        return entry is not None and entry[1] > self._clock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        """Approximate size of the stored keys and contexts."""
+        return self._bytes
+
+
+class SQLiteContextStore(ContextStore):
+    """
+    Context store backed by a local SQLite file.
+
+    Contexts survive process restarts and are not held in RAM. Expiry uses
+    wall-clock time so that it stays meaningful across restarts; LRU eviction
+    and expiry purges run every prune_interval writes.
+    """
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 prune_interval: int = 256, clock: Callable[[], float] = time.time):
+        """
+        Args:
+            path: Path of the SQLite database file.
+            max_entries: Maximum number of contexts kept after a prune.
+            ttl_seconds: Seconds of inactivity after which a context expires.
+            prune_interval: Number of writes between eviction passes.
+            clock: Time source, injectable for tests.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.prune_interval = prune_interval
+        self._clock = clock
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS conversation_contexts ("
+            " request_id TEXT PRIMARY KEY,"
+            " context TEXT NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS conversation_contexts_expires_at"
+            " ON conversation_contexts (expires_at)"
+        )
+        logger.info(f"Opened SQLite context store at {path}")
+
+    def get(self, request_id: str) -> Optional[str]:
+        now = self._clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT context, expires_at FROM conversation_contexts WHERE request_id = ?", (request_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            context, expires_at = row
+            if expires_at <= now:
+                self._conn.execute("DELETE FROM conversation_contexts WHERE request_id = ?", (request_id,))
+                return None
+            self._conn.execute(
+                "UPDATE conversation_contexts SET expires_at = ? WHERE request_id = ?",
+                (now + self.ttl_seconds, request_id)
+            )
+            return context
+
+    def set(self, request_id: str, context: str) -> None:
+        now = self._clock()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO conversation_contexts (request_id, context, expires_at) VALUES (?, ?, ?)",
+                (request_id, context, now + self.ttl_seconds)
+            )
+            self._writes += 1
+            if self._writes % self.prune_interval == 0:
+                self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        self._conn.execute("DELETE FROM conversation_contexts WHERE expires_at <= ?", (now,))
+        # Least recently used entries have the earliest expiry
+        self._conn.execute(
+            "DELETE FROM conversation_contexts WHERE request_id IN ("
+            " SELECT request_id FROM conversation_contexts ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def prune(self) -> None:
+        """Drops expired entries and enforces max_entries immediately."""
+        with self._lock:
+            self._prune(self._clock())
+
+    def delete(self, request_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM conversation_contexts WHERE request_id = ?", (request_id,))
+
+    def __contains__(self, request_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM conversation_contexts WHERE request_id = ? AND expires_at > ?",
+                (request_id, self._clock())
+            ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM conversation_contexts").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,241 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional, TextIO
+
+try:
+    from .tracing import Tracer
+except ImportError:  # Imported as a top-level module with src/agents on sys.path
+    from tracing import Tracer
+
+logger = logging.getLogger(__name__)
+
+# Records queued for the writer thread before new ones are dropped
+DEFAULT_QUEUE_SIZE = 10000
+# Share of high-frequency records kept per level; WARNING and above are never sampled
+DEFAULT_SAMPLE_RATES = {logging.DEBUG: 0.01, logging.INFO: 0.1}
+# Passed as extra= on per-request log lines so that they are subject to sampling
+SAMPLED = {"sampled": True}
+
+# LogRecord attributes that are not user-supplied structured fields
+_RECORD_ATTRIBUTES = frozenset(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_handler: Optional["_NonBlockingQueueHandler"] = None
+_lock = threading.Lock()
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a share of the records logged with extra=SAMPLED, per level.
+
+    Records without the marker, and records at WARNING or above, always pass.
+    Also stamps every record that passes with the id of the current trace
+    span, if any, so the record can be correlated with /metrics spans after
+    it has left the request's context.
+    """
+
+    def __init__(self, rates: Optional[Dict[int, float]] = None, seed: Optional[int] = None):
+        """
+        Args:
+            rates: Share of sampled records kept per level, between 0 and 1.
+                Levels missing from the mapping are kept in full.
+            seed: Seed for reproducible sampling.
+        """
+        super().__init__()
+        self.rates = dict(DEFAULT_SAMPLE_RATES if rates is None else rates)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "sampled", False) and record.levelno < logging.WARNING:
+            rate = self.rates.get(record.levelno, 1.0)
+            if rate < 1.0 and self._random.random() >= rate:
+                with self._lock:
+                    self.dropped += 1
+                return False
+        span = Tracer.current_span()
+        if span is not None:
+            record.trace_id = span.trace_id
+            record.span_id = span.span_id
+        return True
+
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to the writer thread without formatting or blocking.
+
+    The stock QueueHandler formats the message on the calling thread; here the
+    record is queued as logged and only formatted by the writer, and records
+    that do not fit in a full queue are counted and dropped.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+
+class _QueueListener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # The queue may be full; wait for the writer to make room
+        self.queue.put(self._sentinel)
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats a record as one JSON object per line.
+
+    Besides the timestamp, level, logger and message, every field passed with
+    extra= (and the trace and span ids stamped by SamplingFilter) is included.
+    """
+
+    converter = time.gmtime
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}Z",
+            "severity": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and key != "sampled":
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def _parse_sample_rates(spec: str) -> Dict[int, float]:
+    """Parses "DEBUG=0.01,INFO=0.1" into a level-to-rate mapping."""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        level, _, rate = item.partition("=")
+        rates[logging.getLevelName(level.strip().upper())] = float(rate)
+    return rates
+
+
+def configure_logging(level: Optional[str] = None, sample_rates: Optional[Dict[int, float]] = None,
+                      stream: Optional[TextIO] = None, json_format: bool = True,
+                      queue_size: int = DEFAULT_QUEUE_SIZE,
+                      caller_info: bool = False) -> logging.handlers.QueueListener:
+    """
+    Routes all logging through a bounded queue to a single writer thread.
+
+    Call once from the process entry point; modules only create loggers.
+    Request threads pay for the level check, the sampling decision and a
+    queue put: messages are formatted lazily (pass arguments instead of
+    f-strings) on the writer thread, and nothing blocks on stdout. Calling
+    it again replaces the previous configuration.
+
+    Args:
+        level: Root log level. Defaults to LOG_LEVEL or INFO.
+        sample_rates: Share of extra=SAMPLED records kept per level.
+            Defaults to LOG_SAMPLE_RATES (e.g. "DEBUG=0.01,INFO=0.1") or
+            DEFAULT_SAMPLE_RATES.
+        stream: Where the writer thread writes. Defaults to stdout.
+        json_format: Write one JSON object per record (structured logs for
+            Cloud Logging) instead of plain text.
+        queue_size: Records buffered before new ones are dropped.
+        caller_info: Record the calling file, function and line. Finding
+            them walks the stack on every call, so it is off by default,
+            as is the multiprocessing field.
+
+    Returns:
+        The running queue listener.
+    """
+    global _listener, _handler
+    if level is None:
+        level = os.environ.get("LOG_LEVEL", "INFO")
+    if sample_rates is None and os.environ.get("LOG_SAMPLE_RATES"):
+        sample_rates = _parse_sample_rates(os.environ["LOG_SAMPLE_RATES"])
+
+    writer = logging.StreamHandler(stream or sys.stdout)
+    writer.setFormatter(JsonFormatter() if json_format else
+                        logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    handler = _NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+    handler.addFilter(SamplingFilter(sample_rates))
+    listener = _QueueListener(handler.queue, writer, respect_handler_level=True)
+
+    # See "Optimization" in the logging HOWTO
+    logging._srcfile = os.path.normcase(logging.addLevelName.__code__.co_filename) if caller_info else None
+    logging.logMultiprocessing = False
+
+    with _lock:
+        root = logging.getLogger()
+        if _handler is not None:
+            root.removeHandler(_handler)
+            _listener.stop()
+        # Drop handlers installed by earlier basicConfig calls
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(handler)
+        root.setLevel(level.upper() if isinstance(level, str) else level)
+        listener.start()
+        _listener, _handler = listener, handler
+    return listener
+
+
+def shutdown_logging() -> None:
+    """Writes out queued records and stops the writer thread."""
+    global _listener, _handler
+    with _lock:
+        if _handler is None:
+            return
+        logging.getLogger().removeHandler(_handler)
+        _listener.stop()
+        _listener, _handler = None, None
+
+
+def _restart_after_fork() -> None:
+    """
+    Gives a forked child its own queue and writer thread.
+
+    Only the forking thread survives a fork, so the inherited writer thread
+    is gone and records queued in the child would never be written.
+    """
+    global _listener, _handler, _lock
+    _lock = threading.Lock()
+    if _handler is None:
+        return
+    sampler = next(f for f in _handler.filters if isinstance(f, SamplingFilter))
+    handler = _NonBlockingQueueHandler(queue.Queue(maxsize=_handler.queue.maxsize))
+    handler.addFilter(SamplingFilter(sampler.rates))
+    listener = _QueueListener(handler.queue, *_listener.handlers, respect_handler_level=True)
+    root = logging.getLogger()
+    root.removeHandler(_handler)
+    root.addHandler(handler)
+    listener.start()
+    _listener, _handler = listener, handler
+
+
+def logging_stats() -> Dict[str, int]:
+    """Returns the records dropped by sampling and by a full queue."""
+    with _lock:
+        if _handler is None:
+            return {"sampled_out": 0, "queue_full": 0}
+        sampler = next(f for f in _handler.filters if isinstance(f, SamplingFilter))
+        return {"sampled_out": sampler.dropped, "queue_full": _handler.dropped}
+
+
+atexit.register(shutdown_logging)
+os.register_at_fork(after_in_child=_restart_after_fork)
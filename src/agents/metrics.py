@@ -0,0 +1,55 @@
+import logging
+from typing import Any, Callable, Dict
+
+import flask
+
+try:
+    from .service import get_orchestrator
+except ImportError:  # Imported as a top-level module with src/agents on sys.path
+    from service import get_orchestrator
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_MIMETYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Most recent finished spans included in the JSON view
+RECENT_SPANS = 50
+
+
+def metrics_json(orchestrator: Any) -> Dict[str, Any]:
+    """Returns latency percentiles per span and agent, cache, stage cache and worker pool counters and recent spans."""
+    tracer = orchestrator.tracer
+    return {
+        "latency": tracer.latency_summary(),
+        "caches": orchestrator.get_cache_stats(),
+        "process_pools": orchestrator.get_process_pool_stats(),
+        "stage_cache": orchestrator.get_stage_cache_stats(),
+        "recent_spans": [span.to_dict() for span in tracer.exporter.get_finished_spans()[-RECENT_SPANS:]],
+    }
+
+
+def create_metrics_blueprint(orchestrator_factory: Callable[[], Any] = get_orchestrator) -> flask.Blueprint:
+    """
+    Creates the blueprint exposing the orchestrator's telemetry.
+
+    GET /metrics returns the latency histograms of the orchestrator's tracer
+    in the Prometheus text format. With an Accept header asking for
+    application/json it instead returns per-span and per-agent latency
+    percentiles, result cache, workflow stage cache and process pool
+    counters, and the most recent spans.
+
+    Args:
+        orchestrator_factory: Returns the orchestrator whose telemetry is served.
+
+    Returns:
+        A Flask blueprint.
+    """
+    blueprint = flask.Blueprint("metrics", __name__)
+
+    @blueprint.route("/metrics", methods=["GET"])
+    def metrics():
+        orchestrator = orchestrator_factory()
+        if "application/json" in (flask.request.headers.get("Accept") or ""):
+            return flask.jsonify(metrics_json(orchestrator))
+        return flask.Response(orchestrator.tracer.render_prometheus(), mimetype=PROMETHEUS_MIMETYPE)
+
+    return blueprint
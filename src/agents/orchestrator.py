@@ -1,67 +1,215 @@
 import os
-from google.cloud import aiplatform
-from google.auth import default
-from google.auth.exceptions import DefaultCredentialsError
+import asyncio
+import contextvars
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 import logging
 import uuid
 import json
-from typing import Dict, List, Any, Optional
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Any, Optional, Tuple
+
+try:
+    from .context_store import ContextStore, InMemoryContextStore
+    from .logging_config import SAMPLED, configure_logging
+    from .process_pool import DEFAULT_MAX_WORKER_MEMORY_MB, ProcessPoolAgent
+    from .result_cache import CachedAgent, TTLCache
+    from .routing import PLAN_TARGET, RoutingTable
+    from .tracing import Tracer
+    from .workflow import STAGE_ERROR, STAGE_SUCCESS, STAGE_TIMED_OUT, WorkflowEngine, build_product_workflow
+    from .workflow_checkpoint import UnknownWorkflowError, WorkflowCheckpointStore
+except ImportError:  # Imported as a top-level module with src/agents on sys.path
+    from context_store import ContextStore, InMemoryContextStore
+    from logging_config import SAMPLED, configure_logging
+    from process_pool import DEFAULT_MAX_WORKER_MEMORY_MB, ProcessPoolAgent
+    from result_cache import CachedAgent, TTLCache
+    from routing import PLAN_TARGET, RoutingTable
+    from tracing import Tracer
+    from workflow import STAGE_ERROR, STAGE_SUCCESS, STAGE_TIMED_OUT, WorkflowEngine, build_product_workflow
+    from workflow_checkpoint import UnknownWorkflowError, WorkflowCheckpointStore
 
-# Configure basic logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Vertex AI initialization states reported by get_init_state()
+INIT_INITIALIZING = "initializing"
+INIT_READY = "ready"
+INIT_FAILED = "failed"
+
+# Agent fields also copied to the top level of the workflow result, per
+# stage, for callers written against the original flat result
+LEGACY_WORKFLOW_FIELDS = {
+    "sales_opportunity": ("profit_potential",),
+    "product_evaluation": ("score",),
+}
+# task_data field carrying the request deadline, as a time.time() timestamp
+DEADLINE_KEY = "deadline"
+
+
+class AgentTimeoutError(TimeoutError):
+    """A delegated agent did not finish before the request deadline."""
+
+
+class _StreamFailure:
+    """Carries an exception from a streaming helper thread to the consumer."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
 class OrchestratorAgent:
     """
     Coordinates specialized agents for product research using Vertex AI.
     Initializes connection to Google Cloud Vertex AI.
     """
-    def __init__(self, project_id: str, location: str):
+    def __init__(self, project_id: str, location: str, max_workers: int = 32,
+                 context_store: Optional[ContextStore] = None, routing_config: Optional[str] = None,
+                 lazy_init: bool = False, request_timeout: Optional[float] = None,
+                 tracer: Optional[Tracer] = None, stage_cache: Optional[TTLCache] = None,
+                 checkpoint_store: Optional[WorkflowCheckpointStore] = None):
         """
         Initializes the agent and connects to Vertex AI.
 
         Args:
             project_id: Google Cloud project ID.
             location: Google Cloud region (e.g., 'us-central1').
+            max_workers: Maximum number of threads used to run agents that only
+                implement a synchronous process_task from the async API.
+            context_store: Where conversation contexts are kept. Defaults to a
+                bounded in-memory LRU store with a TTL (see context_store.py).
+            routing_config: Optional path of a JSON file declaring the keyword
+                routes (see routing.py). Defaults to the built-in routes.
+            lazy_init: If True, import and initialize the Vertex AI SDK on a
+                background thread. The agent routes requests immediately and
+                get_init_state() reports progress.
+            request_timeout: Default number of seconds a request or workflow
+                may take. Its deadline is passed to agents in task_data
+                ("deadline") and agents still running when it passes are
+                abandoned with a timed_out response. None means no limit.
+            tracer: Records spans around routing, context lookups and
+                delegation, and per-agent latency histograms (see
+                tracing.py). Defaults to a new in-process Tracer.
+            stage_cache: Memoizes workflow stage outputs by the content hash
+                of their inputs, so a refined workflow only reruns the stages
+                whose inputs changed (see workflow.py). None disables it.
+            checkpoint_store: Where workflow stage outputs are checkpointed
+                as they complete, so that resume_workflow can finish an
+                interrupted workflow (see workflow_checkpoint.py). None
+                disables checkpointing.
         """
         self.project_id = project_id
         self.location = location
-        self._initialized = False
+        self.request_timeout = request_timeout
+        self.tracer = tracer if tracer is not None else Tracer()
+        self._init_state = INIT_INITIALIZING
+        self._init_done = threading.Event()
         self._error_message = None
         self.specialized_agents = {}
-        self.conversation_contexts = {}
+        # Worker pools of agents registered with process_workers, by name
+        self._process_pools: Dict[str, ProcessPoolAgent] = {}
+        self.conversation_contexts = context_store if context_store is not None else InMemoryContextStore()
+        self.routing_table = RoutingTable.from_file(routing_config) if routing_config else RoutingTable()
+        # Bounded pool for sync-only agents called through the async API
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent-worker")
+        self.workflow_engine = WorkflowEngine(build_product_workflow(), stage_cache=stage_cache)
+        self.checkpoint_store = checkpoint_store
+
+        if lazy_init:
+            threading.Thread(target=self._initialize_vertex_ai, name="vertex-ai-init", daemon=True).start()
+        else:
+            self._initialize_vertex_ai()
+
+    def _initialize_vertex_ai(self) -> None:
+        """
+        Imports the Vertex AI SDK and verifies credentials.
+
+        The SDK is imported here rather than at module import because it adds
+        seconds to cold starts, even for requests that never need it.
+        """
+        try:
+            from google.auth.exceptions import DefaultCredentialsError
+        except ImportError as e:
+            self._fail_init(f"Failed to initialize Vertex AI SDK: {e}")
+            return
 
         try:
+            import google.auth
+            from google.cloud import aiplatform
+
             # Initialize Vertex AI SDK
             # Uses Application Default Credentials (ADC) by default
             aiplatform.init(project=self.project_id, location=self.location)
             logger.info(f"Vertex AI SDK initialized successfully for project {self.project_id} in {self.location}")
 
             # Optional: Verify credentials explicitly
-            credentials, project_id_from_creds = default()
+            credentials, project_id_from_creds = google.auth.default()
             if not credentials:
                 raise DefaultCredentialsError("Could not automatically determine credentials. Please run 'gcloud auth application-default login'.")
             logger.info(f"Using credentials for project: {project_id_from_creds}")
             # You might add a check here: if project_id_from_creds != self.project_id: logger.warning(...)
 
-            self._initialized = True
+            self._init_state = INIT_READY
+            self._init_done.set()
         except DefaultCredentialsError as e:
-            self._error_message = f"Authentication error: {e}. Please run 'gcloud auth application-default login' or configure service account credentials."
-            logger.error(self._error_message)
+            self._fail_init(f"Authentication error: {e}. Please run 'gcloud auth application-default login' or configure service account credentials.")
         except Exception as e:
-            self._error_message = f"Failed to initialize Vertex AI SDK: {e}"
-            logger.error(self._error_message, exc_info=True)
+            self._fail_init(f"Failed to initialize Vertex AI SDK: {e}", exc_info=True)
+
+    def _fail_init(self, message: str, exc_info: bool = False) -> None:
+        self._error_message = message
+        self._init_state = INIT_FAILED
+        self._init_done.set()
+        logger.error(self._error_message, exc_info=exc_info)
 
     def is_ready(self) -> bool:
         """
         Checks if the agent initialized successfully and is ready.
 
         Returns:
-            True if the agent is ready, False otherwise.
+            True if the agent is ready, False otherwise (still initializing
+            or failed; see get_init_state()).
         """
         # Basic check: Did aiplatform.init() succeed?
         # More complex checks could involve a lightweight API call
-        return self._initialized
+        return self._init_state == INIT_READY
+
+    def get_init_state(self) -> str:
+        """
+        Returns the Vertex AI initialization state.
+
+        Returns:
+            One of INIT_INITIALIZING, INIT_READY or INIT_FAILED.
+        """
+        return self._init_state
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks until background initialization has finished.
+
+        Args:
+            timeout: Maximum number of seconds to wait, or None to wait forever.
+
+        Returns:
+            True if the agent is ready, False if it failed or the wait timed out.
+        """
+        self._init_done.wait(timeout)
+        return self.is_ready()
+
+    def _not_ready_response(self) -> Optional[Dict[str, Any]]:
+        """
+        Returns the error response for requests that cannot be served.
+
+        Keyword routing does not need the Vertex AI SDK, so requests are only
+        refused once initialization has failed, not while it is in progress.
+        """
+        if self._init_state != INIT_FAILED:
+            return None
+        return {
+            "status": "error",
+            "message": "Orchestrator agent is not ready",
+            "error": self.get_status_message()
+        }
 
     def get_status_message(self) -> Optional[str]:
         """
@@ -72,73 +220,340 @@ class OrchestratorAgent:
         """
         return self._error_message
         
-    def register_agent(self, agent_name: str, agent_instance: Any) -> None:
+    def register_agent(self, agent_name: str, agent_instance: Any,
+                       routing_keywords: Optional[List[str]] = None,
+                       cache_ttl_seconds: Optional[float] = None,
+                       cache_max_entries: int = 1024,
+                       process_workers: Optional[int] = None,
+                       max_worker_memory_mb: Optional[float] = DEFAULT_MAX_WORKER_MEMORY_MB) -> None:
         """
         Registers a specialized agent with the orchestrator.
         
         Args:
             agent_name: The name/identifier for the specialized agent.
             agent_instance: The agent instance that implements a process_task method.
+            routing_keywords: Optional keywords that route requests to this agent,
+                added to the routing table after any existing routes.
+            cache_ttl_seconds: If set, results are cached per normalized task
+                data for this many seconds (see result_cache.py).
+            cache_max_entries: Maximum number of cached results for this agent.
+            process_workers: If set, the agent runs in this many warm worker
+                processes instead of the orchestrator's threads, for
+                CPU-bound agents (see process_pool.py). Task data and results
+                must be picklable. Cached results are served without a
+                round trip to the workers.
+            max_worker_memory_mb: Private memory after which a worker process
+                is replaced. None disables the check.
         """
+        if process_workers is not None:
+            agent_instance = ProcessPoolAgent(agent_instance, process_workers, max_worker_memory_mb)
+            self._process_pools[agent_name] = agent_instance
+        if cache_ttl_seconds is not None:
+            agent_instance = CachedAgent(agent_instance, TTLCache(cache_max_entries, cache_ttl_seconds))
         self.specialized_agents[agent_name] = agent_instance
+        if routing_keywords:
+            self.routing_table.add_rules(agent_name, routing_keywords)
         logger.info(f"Registered specialized agent: {agent_name}")
+
+    def ingest(self, agent_name: str, *args: Any, **kwargs: Any) -> Any:
+        """
+        Applies a feed through a registered agent's ingest(), e.g. the
+        ProductResearchAgent's supplier feeds, and invalidates what was
+        computed from the data before it: the agent's result cache and
+        process workers are refreshed by their wrappers, and the workflow
+        stage cache is cleared. Calling the agent's ingest() directly leaves
+        stage outputs stale until stage_cache's TTL expires.
+
+        Args:
+            agent_name: The registered agent that ingests the feed.
+            *args, **kwargs: Passed to the agent's ingest().
+
+        Returns:
+            The agent's ingest() result.
+
+        Raises:
+            ValueError: If the agent is not registered or cannot ingest.
+        """
+        agent = self._get_agent(agent_name)
+        if not callable(getattr(agent, "ingest", None)):
+            raise ValueError(f"Agent '{agent_name}' does not support ingest")
+        result = agent.ingest(*args, **kwargs)
+        if self.workflow_engine.stage_cache is not None:
+            self.workflow_engine.stage_cache.clear()
+        logger.info(f"Ingested into {agent_name}: {result}")
+        return result
+
+    def get_cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns result cache counters for every agent registered with a cache.
+        """
+        return {
+            name: agent.cache.stats()
+            for name, agent in self.specialized_agents.items()
+            if isinstance(agent, CachedAgent)
+        }
+
+    def get_stage_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """
+        Returns the workflow stage cache counters, or None without a stage cache.
+        """
+        stage_cache = self.workflow_engine.stage_cache
+        return stage_cache.stats() if stage_cache is not None else None
+
+    def get_process_pool_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns worker counters for every agent registered with process workers.
+        """
+        return {name: pool.stats() for name, pool in self._process_pools.items()}
         
-    def route_request(self, request: str, request_id: Optional[str] = None) -> Dict[str, Any]:
+    def route_request(self, request: str, request_id: Optional[str] = None,
+                      timeout: Optional[float] = None) -> Dict[str, Any]:
         """
         Routes a user request. May delegate to a specialized agent or generate a plan.
         
         Args:
             request: The user's request text.
             request_id: Optional identifier for maintaining conversation context.
+            timeout: Seconds the request may take. Defaults to the
+                orchestrator's request_timeout.
             
+        Returns:
+            A dictionary containing the response details. If the agent does
+            not finish in time, the status is "partial" and "timed_out" is True.
+        """
+        with self.tracer.span("route_request"):
+            response, agent_type, task_data = self._prepare_route(request, request_id, self._deadline(timeout))
+            if task_data is None:
+                return response
+
+            try:
+                logger.info("Delegating request %s to %s", response["request_id"], agent_type, extra=SAMPLED)
+                response["agent_response"] = self.delegate_task(agent_type, task_data)
+            except TimeoutError as e:
+                self._mark_timed_out(response, agent_type, e)
+            except Exception as e:
+                logger.error("Error delegating to %s: %s", agent_type, e)
+                response["agent_error"] = str(e)
+
+            return response
+
+    async def route_request_async(self, request: str, request_id: Optional[str] = None,
+                                  timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Async variant of route_request. The delegated agent is awaited so that
+        many requests can be in flight on a single event loop.
+
+        Args:
+            request: The user's request text.
+            request_id: Optional identifier for maintaining conversation context.
+            timeout: Seconds the request may take. Defaults to the
+                orchestrator's request_timeout.
+
         Returns:
             A dictionary containing the response details.
         """
-        if not self.is_ready():
-            return {
-                "status": "error",
-                "message": "Orchestrator agent is not ready",
-                "error": self.get_status_message()
-            }
+        with self.tracer.span("route_request"):
+            response, agent_type, task_data = self._prepare_route(request, request_id, self._deadline(timeout))
+            if task_data is None:
+                return response
+
+            try:
+                logger.info("Delegating request %s to %s", response["request_id"], agent_type, extra=SAMPLED)
+                response["agent_response"] = await self.delegate_task_async(agent_type, task_data)
+            except TimeoutError as e:
+                self._mark_timed_out(response, agent_type, e)
+            except Exception as e:
+                logger.error("Error delegating to %s: %s", agent_type, e)
+                response["agent_error"] = str(e)
+
+            return response
+
+    def route_request_stream(self, request: str, request_id: Optional[str] = None,
+                             timeout: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Routes a user request and yields results as soon as they are available.
+
+        The first event ("routed") carries the routing decision, or the final
+        response for plans and errors. When the request is delegated, an
+        "agent_response", "agent_error" or "agent_timed_out" event follows once
+        the agent is done or the deadline has passed.
+
+        Args:
+            request: The user's request text.
+            request_id: Optional identifier for maintaining conversation context.
+            timeout: Seconds the request may take. Defaults to the
+                orchestrator's request_timeout.
+
+        Yields:
+            Routing events.
+        """
+        return self._iterate_sync(self.route_request_stream_async(request, request_id, timeout))
+
+    async def route_request_stream_async(self, request: str, request_id: Optional[str] = None,
+                                         timeout: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Async generator variant of route_request_stream.
+        """
+        response, agent_type, task_data = self._prepare_route(request, request_id, self._deadline(timeout))
+        yield {"event": "routed", **response}
+        if task_data is None:
+            return
+
+        event = {"request_id": response["request_id"], "delegated_to": agent_type}
+        try:
+            logger.info("Delegating request %s to %s", response["request_id"], agent_type, extra=SAMPLED)
+            event["agent_response"] = await self.delegate_task_async(agent_type, task_data)
+            yield {"event": "agent_response", **event}
+        except TimeoutError as e:
+            self._mark_timed_out(event, agent_type, e)
+            yield {"event": "agent_timed_out", **event}
+        except Exception as e:
+            logger.error("Error delegating to %s: %s", agent_type, e)
+            event["agent_error"] = str(e)
+            yield {"event": "agent_error", **event}
+
+    def route_batch(self, requests: List[str], request_ids: Optional[List[Optional[str]]] = None,
+                    timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Routes many requests at once, grouping them by target agent.
+
+        Agents that implement process_batch(list_of_task_data) receive their
+        whole group in one call and return a list of results in the same
+        order, where an exception instance reports a per-item error. Other
+        agents handle their items concurrently.
+
+        Args:
+            requests: The user requests' text.
+            request_ids: Optional identifiers for maintaining conversation
+                context, aligned with requests.
+            timeout: Seconds the whole batch may take. Defaults to the
+                orchestrator's request_timeout.
+
+        Returns:
+            One response per request, in input order, shaped like the
+            responses of route_request (errors and timeouts are reported per
+            item).
+        """
+        return self._run_coroutine_sync(self.route_batch_async(requests, request_ids, timeout))
+
+    async def route_batch_async(self, requests: List[str], request_ids: Optional[List[Optional[str]]] = None,
+                                timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Async variant of route_batch.
+        """
+        with self.tracer.span("route_batch", size=len(requests)):
+            return await self._route_batch(requests, request_ids, self._deadline(timeout))
+
+    async def _route_batch(self, requests: List[str], request_ids: Optional[List[Optional[str]]],
+                           deadline: Optional[float]) -> List[Dict[str, Any]]:
+        if request_ids is None:
+            request_ids = [None] * len(requests)
+        if len(request_ids) != len(requests):
+            raise ValueError("request_ids must be aligned with requests")
+
+        responses: List[Dict[str, Any]] = []
+        groups: Dict[str, List[int]] = {}
+        tasks: List[Optional[Dict[str, Any]]] = []
+        for index, (request, request_id) in enumerate(zip(requests, request_ids)):
+            response, agent_type, task_data = self._prepare_route(request, request_id, deadline)
+            responses.append(response)
+            tasks.append(task_data)
+            if task_data is not None:
+                groups.setdefault(agent_type, []).append(index)
+
+        logger.info("Routing batch of %d requests to %d agents", len(requests), len(groups), extra=SAMPLED)
+        await asyncio.gather(*[
+            self._delegate_group(agent_type, indices, tasks, responses)
+            for agent_type, indices in groups.items()
+        ])
+        return responses
+
+    async def _delegate_group(self, agent_type: str, indices: List[int],
+                              tasks: List[Optional[Dict[str, Any]]], responses: List[Dict[str, Any]]) -> None:
+        """
+        Delegates one agent's share of a batch and stores results by index.
+        """
+        agent = self._get_agent(agent_type)
+        group_tasks = [tasks[index] for index in indices]
+
+        if callable(getattr(agent, "process_batch", None)):
+            loop = asyncio.get_running_loop()
+            try:
+                # Every task of a batch shares the batch's deadline
+                with self.tracer.span("delegate_batch", agent=agent_type, size=len(group_tasks)):
+                    call = loop.run_in_executor(self._executor, contextvars.copy_context().run,
+                                                agent.process_batch, group_tasks)
+                    results = await self._await_deadline(call, agent_type, self._time_left(agent_type, group_tasks[0]))
+                if len(results) != len(group_tasks):
+                    raise ValueError(f"{agent_type}.process_batch returned {len(results)} results for {len(group_tasks)} tasks")
+            except TimeoutError as e:
+                results = [e] * len(group_tasks)
+            except Exception as e:
+                logger.error("Error delegating batch to %s: %s", agent_type, e)
+                results = [e] * len(group_tasks)
+        else:
+            results = await asyncio.gather(
+                *[self.delegate_task_async(agent_type, task_data) for task_data in group_tasks],
+                return_exceptions=True
+            )
+
+        for index, result in zip(indices, results):
+            if isinstance(result, TimeoutError):
+                self._mark_timed_out(responses[index], agent_type, result)
+            elif isinstance(result, BaseException):
+                responses[index]["agent_error"] = str(result)
+            else:
+                responses[index]["agent_response"] = result
+
+    def _prepare_route(self, request: str, request_id: Optional[str],
+                       deadline: Optional[float] = None) -> Tuple[Dict[str, Any], Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Classifies a request and updates its conversation context.
+
+        Shared by the sync and async routing paths. When the returned task data
+        is None the response is final and no delegation should happen.
+
+        Args:
+            request: The user's request text.
+            request_id: Optional identifier for maintaining conversation context.
+            deadline: Optional time.time() deadline added to the task data.
+
+        Returns:
+            A tuple of (response, agent_type, task_data).
+        """
+        not_ready = self._not_ready_response()
+        if not_ready is not None:
+            return not_ready, None, None
             
         # Generate a request ID if none was provided
         if request_id is None:
             request_id = str(uuid.uuid4())
             
         # Check for existing context
-        context = None
-        if request_id in self.conversation_contexts:
-            context = self.conversation_contexts[request_id]
-            logger.info(f"Using existing context for request {request_id}: {context}")
+        with self.tracer.span("context.lookup"):
+            context = self.conversation_contexts.get(request_id)
+        if context is not None:
+            logger.debug("Using existing context for request %s: %s", request_id, context, extra=SAMPLED)
             
-        # Simple check for high-level planning requests
+        # Resolve the target in one pass over the compiled routing table.
+        # In a real implementation, we would use Vertex AI for routing
         request_lower = request.lower()
-        if "profitable niche" in request_lower or "drop shipping" in request_lower or "business plan" in request_lower:
+        with self.tracer.span("routing.match") as span:
+            agent_type = self.routing_table.match(request)
+            span.set_attribute("target", agent_type)
+
+        # High-level planning requests get a plan instead of a delegation
+        if agent_type == PLAN_TARGET:
             plan = "I will collaborate with experts to answer question"
-            logger.info(f"Request identified as high-level planning. Generating plan: {plan}")
+            logger.info("Request %s identified as high-level planning", request_id, extra=SAMPLED)
             # Update context if needed
-            self.conversation_contexts[request_id] = request # Store the original complex request
+            self.conversation_contexts.set(request_id, request) # Store the original complex request
             return {
                 "status": "success",
                 "action": "plan_generated",
                 "plan": plan,
                 "request_id": request_id
-            }
-            
-        # --- Existing Routing Logic --- 
-        # In a real implementation, we would use Vertex AI for routing
-        # For this implementation, we'll use keyword matching
-        agent_type = None
-        if "headphones" in request_lower or "product" in request_lower or "gadgets" in request_lower:
-            agent_type = "ProductResearchAgent"
-        elif "market" in request_lower or "watches" in request_lower:
-            agent_type = "MarketAnalysisAgent"
-        elif "profit" in request_lower or "sales" in request_lower:
-            agent_type = "SalesOpportunityAgent"
-        elif "evaluate" in request_lower or "score" in request_lower:
-            agent_type = "ProductEvaluationAgent"
-        else:
-            agent_type = "ProductResearchAgent"  # Default
+            }, None, None
             
         # Store or update context based on the request (if not a planning request)
         if context is None:
@@ -148,7 +563,8 @@ class OrchestratorAgent:
             context = " ".join(keywords)
             
         # Update the context
-        self.conversation_contexts[request_id] = context
+        with self.tracer.span("context.update"):
+            self.conversation_contexts.set(request_id, context)
             
         response = {
             "status": "success",
@@ -158,32 +574,34 @@ class OrchestratorAgent:
             "context": context
         }
         
-        # If we have a registered agent of this type, delegate the task
-        if agent_type in self.specialized_agents:
-            try:
-                logger.info(f"Delegating task to {agent_type} for request: {request}")
-                agent_response = self.delegate_task(agent_type, {
-                    "query": request,
-                    "context": context
-                })
-                response["agent_response"] = agent_response
-            except Exception as e:
-                logger.error(f"Error delegating to {agent_type}: {e}")
-                response["agent_error"] = str(e)
-        else:
-            logger.warning(f"Agent type {agent_type} determined but no agent registered.")
+        # If we have a registered agent of this type, the caller delegates the task
+        if agent_type not in self.specialized_agents:
+            logger.warning("Agent type %s determined but no agent registered.", agent_type)
             response["status"] = "error"
             response["message"] = f"No agent available for {agent_type}"
             # Remove delegation info if no agent available
             del response["delegated_to"]
             del response["action"]
-                
-        return response
+            return response, None, None
+
+        task_data = {
+            "query": request,
+            "context": context
+        }
+        if deadline is not None:
+            task_data[DEADLINE_KEY] = deadline
+        return response, agent_type, task_data
         
     def delegate_task(self, agent_type: str, task_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Delegates a task to a specialized agent.
         
+        When task_data carries a "deadline", the agent runs in the
+        orchestrator's thread pool and is abandoned once the deadline passes.
+        A Python thread cannot be killed, so the agent keeps its worker until
+        its own calls return; agents are expected to bound their tool calls
+        by the same deadline.
+
         Args:
             agent_type: The type/name of the agent to delegate to.
             task_data: The task data to send to the agent.
@@ -191,14 +609,117 @@ class OrchestratorAgent:
         Returns:
             The response from the specialized agent.
             
+        Raises:
+            ValueError: If the specified agent type is not registered.
+            AgentTimeoutError: If the deadline passes before the agent finishes.
+        """
+        agent = self._get_agent(agent_type)
+        with self.tracer.span("delegate", agent=agent_type):
+            remaining = self._time_left(agent_type, task_data)
+            if remaining is None:
+                return agent.process_task(task_data)
+
+            # The worker thread continues this trace
+            future = self._executor.submit(contextvars.copy_context().run, agent.process_task, task_data)
+            try:
+                return future.result(timeout=remaining)
+            except FuturesTimeoutError:
+                # Drops the task if it has not started yet
+                future.cancel()
+                raise AgentTimeoutError(f"{agent_type} did not finish before the request deadline") from None
+
+    async def delegate_task_async(self, agent_type: str, task_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Delegates a task to a specialized agent without blocking the event loop.
+
+        Agents that define a coroutine process_task_async are awaited directly.
+        Sync-only agents run their process_task in the orchestrator's bounded
+        thread pool. When task_data carries a "deadline", a coroutine agent
+        still running at the deadline is cancelled and a sync agent is
+        abandoned, as in delegate_task.
+
+        Args:
+            agent_type: The type/name of the agent to delegate to.
+            task_data: The task data to send to the agent.
+
+        Returns:
+            The response from the specialized agent.
+
+        Raises:
+            ValueError: If the specified agent type is not registered.
+            AgentTimeoutError: If the deadline passes before the agent finishes.
+        """
+        agent = self._get_agent(agent_type)
+        with self.tracer.span("delegate", agent=agent_type):
+            remaining = self._time_left(agent_type, task_data)
+            process_task_async = getattr(agent, "process_task_async", None)
+            if process_task_async is not None and asyncio.iscoroutinefunction(process_task_async):
+                return await self._await_deadline(process_task_async(task_data), agent_type, remaining)
+
+            loop = asyncio.get_running_loop()
+            call = loop.run_in_executor(self._executor, contextvars.copy_context().run, agent.process_task, task_data)
+            return await self._await_deadline(call, agent_type, remaining)
+
+    def _deadline(self, timeout: Optional[float]) -> Optional[float]:
+        """Returns the time.time() deadline of a request, or None without a limit."""
+        if timeout is None:
+            timeout = self.request_timeout
+        return None if timeout is None else time.time() + timeout
+
+    def _time_left(self, agent_type: str, task_data: Dict[str, Any]) -> Optional[float]:
+        """
+        Returns the seconds left before the task's deadline, or None without one.
+
+        Raises:
+            AgentTimeoutError: If the deadline has already passed.
+        """
+        deadline = task_data.get(DEADLINE_KEY)
+        if deadline is None:
+            return None
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            raise AgentTimeoutError(f"Request deadline passed before {agent_type} started")
+        return remaining
+
+    async def _await_deadline(self, call: Awaitable[Any], agent_type: str, remaining: Optional[float]) -> Any:
+        """Awaits an agent call, cancelling it when the remaining time runs out."""
+        if remaining is None:
+            return await call
+        try:
+            return await asyncio.wait_for(call, remaining)
+        except asyncio.TimeoutError:
+            raise AgentTimeoutError(f"{agent_type} did not finish before the request deadline") from None
+
+    def _mark_timed_out(self, response: Dict[str, Any], agent_type: str, error: BaseException) -> None:
+        """Turns a routing response into a partial one for an agent that ran out of time."""
+        logger.warning("Timed out waiting for %s: %s", agent_type, error)
+        response["status"] = "partial"
+        response["timed_out"] = True
+        response["message"] = str(error)
+
+    def _get_agent(self, agent_type: str) -> Any:
+        """
+        Looks up a registered specialized agent.
+
         Raises:
             ValueError: If the specified agent type is not registered.
         """
         if agent_type not in self.specialized_agents:
             raise ValueError(f"Agent '{agent_type}' is not registered with the orchestrator")
-            
-        agent = self.specialized_agents[agent_type]
-        return agent.process_task(task_data)
+        return self.specialized_agents[agent_type]
+
+    def close(self) -> None:
+        """
+        Releases the worker threads used by the async API, the worker
+        processes of process-pool agents, the context store and the
+        checkpoint store.
+        """
+        self._executor.shutdown(wait=False)
+        for pool in self._process_pools.values():
+            pool.close()
+        self.conversation_contexts.close()
+        if self.checkpoint_store is not None:
+            self.checkpoint_store.close()
         
     def has_conversation_context(self, request_id: str) -> bool:
         """
@@ -212,61 +733,295 @@ class OrchestratorAgent:
         """
         return request_id in self.conversation_contexts
         
-    def execute_workflow(self, query: str) -> Dict[str, Any]:
+    def execute_workflow(self, query: str, timeout: Optional[float] = None,
+                         filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Executes a complete product research workflow across all specialized agents.
         
         Args:
             query: The user's query to start the workflow.
+            timeout: Seconds the whole workflow may take. Defaults to the
+                orchestrator's request_timeout.
+            filters: Optional catalog filters for the product research, e.g.
+                {"max_price": 100}.
             
         Returns:
             A dictionary containing the combined results from all agents.
         """
-        if not self.is_ready():
-            return {
-                "status": "error",
-                "message": "Orchestrator agent is not ready",
-                "error": self.get_status_message()
-            }
+        return self._run_coroutine_sync(self.execute_workflow_async(query, timeout, filters))
+
+    async def execute_workflow_async(self, query: str, timeout: Optional[float] = None,
+                                     filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Async variant of execute_workflow.
+
+        Stages run as a DAG (see workflow.build_product_workflow): market
+        analysis and sales estimation only depend on product research, so they
+        run concurrently and the workflow takes as long as its critical path.
+        Stages whose agent is not registered are reported as skipped. Stages
+        still running at the deadline are reported as timed out, and the
+        stages that needed them as skipped; the result then has status
+        "partial" and "timed_out" set to True.
+
+        With a stage_cache, stages whose inputs hash the same as in an
+        earlier run reuse that run's output; they are listed in
+        "reused_stages". Refining a query with filters, for instance, reruns
+        product research and whatever depends on the products it finds, but
+        reuses the market analysis.
+
+        With a checkpoint_store, each stage's output is checkpointed as it
+        completes; a partial or interrupted workflow can be finished with
+        resume_workflow(workflow_id).
+
+        Args:
+            query: The user's query to start the workflow.
+            timeout: Seconds the whole workflow may take. Defaults to the
+                orchestrator's request_timeout.
+            filters: Optional catalog filters for the product research, e.g.
+                {"max_price": 100}.
+
+        Returns:
+            A dictionary containing the combined results from all agents and a
+            "stages" entry with the status and timing of every stage.
+        """
+        return await self._execute_workflow(query, deadline=self._deadline(timeout), filters=filters)
+
+    def resume_workflow(self, workflow_id: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Finishes a workflow started earlier, e.g. one cut short by a request
+        timeout or a crash.
+
+        Requires a checkpoint_store. The stages checkpointed by earlier
+        attempts are not rerun: their outputs are reported again and listed
+        in "resumed_stages", and only the remaining stages run, with the
+        original query and filters. Resuming a completed workflow returns its
+        result without calling any agent.
+
+        Args:
+            workflow_id: The "workflow_id" of the workflow's first result or
+                "workflow_started" event.
+            timeout: Seconds this attempt may take. Defaults to the
+                orchestrator's request_timeout.
+
+        Returns:
+            The same result as execute_workflow, under the same workflow_id.
+
+        Raises:
+            UnknownWorkflowError: If the workflow has no checkpoints, e.g.
+                it expired, ran on another instance, or checkpointing is off.
+        """
+        return self._run_coroutine_sync(self.resume_workflow_async(workflow_id, timeout))
+
+    async def resume_workflow_async(self, workflow_id: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Async variant of resume_workflow.
+        """
+        if self.checkpoint_store is None:
+            raise UnknownWorkflowError(f"Workflow checkpointing is not enabled; cannot resume '{workflow_id}'")
+        checkpoint = await asyncio.to_thread(self.checkpoint_store.load, workflow_id)
+        if checkpoint is None:
+            raise UnknownWorkflowError(f"No checkpoints for workflow '{workflow_id}'")
+        return await self._execute_workflow(
+            checkpoint["query"], deadline=self._deadline(timeout), filters=checkpoint["filters"],
+            workflow_id=workflow_id, completed=checkpoint["stages"],
+        )
+
+    def execute_workflow_stream(self, query: str, timeout: Optional[float] = None,
+                                filters: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Executes the workflow and yields each stage's result as it completes.
+
+        Events are dictionaries with an "event" key: "workflow_started", then
+        one "stage_completed" per stage in completion order, and finally
+        "workflow_completed" carrying the same result as execute_workflow.
+        If the orchestrator is not ready a single "error" event is yielded.
+
+        Args:
+            query: The user's query to start the workflow.
+            timeout: Seconds the whole workflow may take. Defaults to the
+                orchestrator's request_timeout.
+            filters: Optional catalog filters for the product research.
+
+        Yields:
+            Workflow events.
+        """
+        return self._iterate_sync(self.execute_workflow_stream_async(query, timeout, filters))
+
+    async def execute_workflow_stream_async(self, query: str, timeout: Optional[float] = None,
+                                            filters: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Async generator variant of execute_workflow_stream.
+
+        If the workflow fails, the stream ends with an "error" event.
+        """
+        events: asyncio.Queue = asyncio.Queue()
+        workflow = asyncio.ensure_future(
+            self._execute_workflow(query, on_event=events.put_nowait, deadline=self._deadline(timeout),
+                                   filters=filters)
+        )
+        # Wakes the reader when the workflow ends, also if it raised before its final event
+        workflow.add_done_callback(lambda _: events.put_nowait(None))
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    error = workflow.exception()
+                    logger.error(f"Workflow failed: {error}")
+                    yield {"event": "error", "status": "error", "message": str(error)}
+                    return
+                yield event
+                if event["event"] in ("workflow_completed", "error"):
+                    break
+            await workflow
+        finally:
+            # The caller stopped listening (e.g. the client disconnected)
+            if not workflow.done():
+                workflow.cancel()
+
+    async def _execute_workflow(self, query: str,
+                                on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+                                deadline: Optional[float] = None,
+                                filters: Optional[Dict[str, Any]] = None,
+                                workflow_id: Optional[str] = None,
+                                completed: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Runs the workflow, optionally reporting progress events to on_event.
+        Every stage's task data carries the workflow deadline, if any;
+        product research also receives the filters. With a checkpoint store,
+        every successful stage is checkpointed as soon as it completes.
+        Resuming passes the workflow_id and the completed stage records.
+        """
+        emit = on_event or (lambda event: None)
+        not_ready = self._not_ready_response()
+        if not_ready is not None:
+            emit({"event": "error", **not_ready})
+            return not_ready
             
-        workflow_id = str(uuid.uuid4())
-        logger.info(f"Starting workflow {workflow_id} for query: {query}")
-        
-        # In a real implementation with registered agents, we would:
-        # 1. Call the Product Research Agent to find products
-        # 2. Send those products to the Market Analysis Agent
-        # 3. Send market data to the Sales Opportunity Agent
-        # 4. Send all results to the Product Evaluation Agent
-        
-        # For this basic implementation without real agents, simulate the process
+        resumed = workflow_id is not None
+        workflow_id = workflow_id or str(uuid.uuid4())
+        logger.info("%s workflow %s", "Resuming" if resumed else "Starting", workflow_id, extra=SAMPLED)
+        checkpoints = self.checkpoint_store
+        if checkpoints is not None:
+            try:
+                await asyncio.to_thread(checkpoints.start, workflow_id, query, filters)
+            except Exception as e:
+                # Like a failed stage checkpoint: the workflow runs, it just can't be resumed
+                logger.warning("Could not checkpoint workflow %s, running without checkpoints: %s", workflow_id, e)
+                checkpoints = None
+        emit({"event": "workflow_started", "workflow_id": workflow_id, "query": query})
+
+        def stage_completed(name: str, record: Dict[str, Any]) -> None:
+            if checkpoints is not None and record["status"] == STAGE_SUCCESS and not record.get("resumed"):
+                try:
+                    checkpoints.save_stage(workflow_id, name, record)
+                except Exception as e:
+                    # The workflow goes on; a resume would only rerun this stage
+                    logger.warning("Could not checkpoint stage %s of workflow %s: %s", name, workflow_id, e)
+            event = {"event": "stage_completed", "workflow_id": workflow_id, "stage": name}
+            event.update({key: value for key, value in record.items() if key != "output"})
+            if record["status"] == STAGE_SUCCESS:
+                stage = self.workflow_engine.stages[name]
+                event["result_key"] = stage.result_key
+                event["result"] = stage.extract_result(record["output"])
+            emit(event)
+
+        async def run_stage(agent_type: str, task_data: Dict[str, Any]) -> Dict[str, Any]:
+            if deadline is not None:
+                task_data = {**task_data, DEADLINE_KEY: deadline}
+            return await self.delegate_task_async(agent_type, task_data)
+
+        started = time.perf_counter()
+        with self.tracer.span("workflow", workflow_id=workflow_id):
+            stage_records = await self.workflow_engine.run(
+                query, run_stage, available_agents=list(self.specialized_agents),
+                on_stage_complete=stage_completed, params=filters, completed=completed
+            )
+
         result = {
             "status": "success",
             "workflow_id": workflow_id,
             "query": query,
-            # Simulated results from specialized agents
-            "products": ["Wireless Headphone A", "Wireless Headphone B"],
-            "market_analysis": {
-                "market_size": "$8.7B",
-                "growth_rate": "12.3% annually",
-                "competitors": 7
-            },
-            "sales_potential": {
-                "profit_margin": "42%",
-                "estimated_demand": "High",
-                "price_sensitivity": "Medium"
-            },
-            "evaluation": {
-                "score": 87,
-                "recommendation": "Recommended for investment",
-                "risk_level": "Low"
-            }
         }
-        
-        logger.info(f"Completed workflow {workflow_id}")
+        # Each stage's result under its result key, e.g. "products" or "market_analysis"
+        for name, record in stage_records.items():
+            if record["status"] == STAGE_SUCCESS:
+                stage = self.workflow_engine.stages[name]
+                result[stage.result_key] = stage.extract_result(record["output"])
+                if isinstance(record["output"], dict):
+                    result.update((key, record["output"][key])
+                                  for key in LEGACY_WORKFLOW_FIELDS.get(name, ()) if key in record["output"])
+
+        errors = {name: record["error"] for name, record in stage_records.items() if record["status"] == STAGE_ERROR}
+        if errors:
+            result["status"] = "partial"
+            result["errors"] = errors
+        if any(record["status"] == STAGE_TIMED_OUT for record in stage_records.values()):
+            result["status"] = "partial"
+            result["timed_out"] = True
+        result["reused_stages"] = [name for name, record in stage_records.items() if record.get("reused")]
+        result["resumed_stages"] = [name for name, record in stage_records.items() if record.get("resumed")]
+        result["stages"] = {
+            name: {key: value for key, value in record.items() if key != "output"}
+            for name, record in stage_records.items()
+        }
+        result["duration_ms"] = round((time.perf_counter() - started) * 1000, 3)
+
+        if checkpoints is not None and result["status"] == "success":
+            try:
+                await asyncio.to_thread(checkpoints.finish, workflow_id)
+            except Exception as e:
+                logger.warning("Could not mark workflow %s as completed: %s", workflow_id, e)
+        logger.info("Completed workflow %s in %s ms", workflow_id, result["duration_ms"], extra=SAMPLED)
+        emit({"event": "workflow_completed", **result})
         return result
 
+    def _iterate_sync(self, events: AsyncIterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Turns an async generator into a blocking iterator for sync callers.
+
+        The async generator runs on its own event loop in a helper thread and
+        hands items over through a queue as soon as they are produced.
+        """
+        items: queue.Queue = queue.Queue()
+        finished = object()
+
+        async def pump() -> None:
+            try:
+                async for item in events:
+                    items.put(item)
+            except BaseException as e:
+                items.put(_StreamFailure(e))
+            finally:
+                items.put(finished)
+
+        threading.Thread(target=asyncio.run, args=(pump(),), name="orchestrator-stream", daemon=True).start()
+
+        def iterate() -> Iterator[Dict[str, Any]]:
+            while True:
+                item = items.get()
+                if item is finished:
+                    return
+                if isinstance(item, _StreamFailure):
+                    raise item.error
+                yield item
+
+        return iterate()
+
+    def _run_coroutine_sync(self, coro: Any) -> Any:
+        """
+        Runs a coroutine to completion from synchronous code.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+        # Already inside an event loop (e.g. an async server): use a helper thread
+        with ThreadPoolExecutor(max_workers=1) as runner:
+            return runner.submit(asyncio.run, coro).result()
+
 # Example usage (for direct script execution testing)
 if __name__ == '__main__':
+    configure_logging(json_format=False)
     # Load from environment variables for testing
     gcp_project = os.getenv('GCP_PROJECT_ID')
     gcp_location = os.getenv('GCP_LOCATION', 'us-central1') # Default location if not set
@@ -1,17 +1,33 @@
 """Main entrypoint for the Orchestrator Agent logic."""
 
+import logging
+import os
+import sys
+
 import flask
 
+# The agent modules live one directory up (src/agents)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from logging_config import SAMPLED, configure_logging
+from streaming import create_streaming_blueprint
+
+# Log through the non-blocking queue so request threads never wait on stdout
+configure_logging()
+logger = logging.getLogger(__name__)
+
 # Initialize Flask app (or FastAPI, etc.) - this will be the HTTP server
 # that Vertex AI Agent Engine interacts with.
 app = flask.Flask(__name__)
+# Incremental results: POST /stream and POST /workflow/stream
+app.register_blueprint(create_streaming_blueprint())
 
 @app.route('/', methods=['POST'])
 def handle_request():
     """Handles incoming requests from the Vertex AI Agent Engine."""
     request_json = flask.request.get_json(silent=True)
 
-    print(f"Received request: {request_json}")
+    logger.info("Received request: %s", request_json, extra=SAMPLED)
 
     # --- Agent Logic Placeholder --- 
     # TODO: Parse the request (session, input, etc.)
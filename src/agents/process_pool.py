@@ -0,0 +1,387 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Private memory, in MB, above which a worker is replaced after its current task
+DEFAULT_MAX_WORKER_MEMORY_MB = 1024.0
+# Seconds a worker may take to start and warm up
+WORKER_START_TIMEOUT = 120.0
+# task_data field carrying the request deadline, as a time.time() timestamp (see orchestrator.DEADLINE_KEY)
+DEADLINE_KEY = "deadline"
+
+# Held while a worker's pipe end is open in this process, so that no other
+# worker forked meanwhile (with the fork start method) inherits it and hides
+# the first worker's exit
+_start_lock = threading.Lock()
+
+
+class WorkerCrashedError(RuntimeError):
+    """A pool worker process died while running a task."""
+
+
+def _memory_mb() -> float:
+    """
+    Returns the memory private to this process, in MB.
+
+    Pages shared with other processes, copy-on-write or mapped from the same
+    file, are not counted, so a worker that maps a large catalog the other
+    workers also map does not count it. Falls back
+    to the resident set size where /proc/self/smaps_rollup is unavailable.
+    """
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            return sum(int(line.split()[1]) for line in f if line.startswith(("Private_Clean", "Private_Dirty"))) / 1024
+    except OSError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _worker_main(conn: Any, agent: Any) -> None:
+    """Runs in the worker process: warms the agent, then serves calls until told to stop."""
+    try:
+        warm_up = getattr(agent, "warm_up", None)
+        if callable(warm_up):
+            warm_up()
+        conn.send(("ready", None, _memory_mb()))
+    except Exception as e:
+        conn.send(("error", RuntimeError(f"Worker warm-up failed: {e}"), _memory_mb()))
+        return
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+        method, payload = message
+        try:
+            reply = ("ok", getattr(agent, method)(payload))
+        except Exception as e:
+            reply = ("error", e)
+        try:
+            conn.send(reply + (_memory_mb(),))
+        except Exception as e:
+            # The result or exception could not be pickled
+            conn.send(("error", RuntimeError(f"{method} returned an unpicklable result: {e}"), _memory_mb()))
+
+
+class _Worker:
+    """The parent's handle on one worker process."""
+
+    __slots__ = ("process", "conn", "tasks", "memory_mb", "generation")
+
+    def __init__(self, process: Any, conn: Any, generation: int):
+        self.process = process
+        self.conn = conn
+        self.tasks = 0
+        self.memory_mb = 0.0
+        self.generation = generation
+
+
+class ProcessPoolAgent:
+    """
+    Runs a CPU-bound agent in a pool of warm worker processes.
+
+    Each worker holds its own copy of the agent, calls its warm_up() (if any)
+    once at start, then serves process_task and process_batch calls shipped
+    over a pipe, so CPU-heavy agents no longer hold the orchestrator's GIL and
+    throughput scales with cores. A worker whose private memory exceeds
+    max_worker_memory_mb after a task, or that has run max_tasks_per_worker
+    tasks, is replaced by a fresh one; a worker that dies is replaced and
+    its task fails with WorkerCrashedError. A task still running past its
+    deadline (task_data["deadline"]) or task_timeout fails with TimeoutError
+    and its worker, presumed hung, is killed and replaced.
+
+    Workers are started with forkserver where the platform has it, else
+    spawn: each receives a pickled copy of the agent, which must therefore
+    be picklable, as must task data, results and exceptions. Catalogs and
+    embeddings opened memory-mapped are pickled by path and mapped again,
+    so the workers still share their pages; in-memory data is copied into
+    every worker. Passing a fork context instead lets the workers inherit
+    the agent copy-on-write without pickling it, but forking a parent that
+    already runs threads (the orchestrator's executor, the log writer,
+    cache refreshes) can leave a worker with a lock held by a thread that
+    no longer exists, and Python 3.12 warns about it. Use fork only when
+    the pool is created before any such thread starts.
+
+    The wrapper exposes process_task, process_task_async and, if the wrapped
+    agent has it, process_batch, and forwards any other attribute to the
+    parent's copy of the agent. Changes made through such attributes only
+    reach the parent's copy: an agent's ingest() is therefore followed by
+    recycle(), so that the workers are replaced by copies of the updated
+    agent. Call recycle() after mutating the agent in any other way.
+    """
+
+    def __init__(self, agent: Any, workers: Optional[int] = None,
+                 max_worker_memory_mb: Optional[float] = DEFAULT_MAX_WORKER_MEMORY_MB,
+                 max_tasks_per_worker: Optional[int] = None, mp_context: Optional[Any] = None,
+                 task_timeout: Optional[float] = None):
+        """
+        Args:
+            agent: The agent to run in the workers.
+            workers: Number of worker processes. Defaults to the CPU count.
+            max_worker_memory_mb: Private memory after which a worker is
+                recycled. None disables the check.
+            max_tasks_per_worker: Tasks after which a worker is recycled.
+                None means no limit.
+            mp_context: multiprocessing context used to start workers.
+                Defaults to forkserver where available, else spawn.
+            task_timeout: Seconds a call without a deadline may take. None
+                means no limit.
+        """
+        self.agent = agent
+        self.workers = workers or os.cpu_count() or 1
+        self.max_worker_memory_mb = max_worker_memory_mb
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.task_timeout = task_timeout
+        if mp_context is None:
+            mp_context = multiprocessing.get_context(
+                "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+        self._context = mp_context
+        self._name = type(agent).__name__
+        self._tasks: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._handles: List[Optional[_Worker]] = [None] * self.workers
+        self._ready = [threading.Event() for _ in range(self.workers)]
+        self._closed = False
+        # Bumped by recycle(); workers of an older generation are replaced before their next task
+        self._generation = 0
+        self.completed = 0
+        self.recycled = 0
+        self.crashed = 0
+        self.timed_out = 0
+        if callable(getattr(agent, "process_batch", None)):
+            self.process_batch = self._process_batch
+        if callable(getattr(agent, "ingest", None)):
+            self.ingest = self._ingest
+        self._threads = [
+            threading.Thread(target=self._serve, args=(slot,), name=f"{self._name}-pool-{slot}", daemon=True)
+            for slot in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes the wrapper lacks, e.g. agent-specific helpers
+        if name == "agent":
+            raise AttributeError(name)
+        return getattr(self.agent, name)
+
+    def submit(self, method: str, payload: Any) -> Future:
+        """
+        Queues a call of the agent's method for the next free worker.
+
+        Returns:
+            A future for the method's result. Cancelling it before a worker
+            picks the call up drops the call.
+        """
+        if self._closed:
+            raise RuntimeError(f"Process pool for {self._name} is closed")
+        future: Future = Future()
+        self._tasks.put((future, method, payload))
+        return future
+
+    def process_task(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
+        future = self.submit("process_task", task_data)
+        deadline = self._deadline(task_data)
+        try:
+            return future.result(timeout=None if deadline is None else max(deadline - time.time(), 0.0))
+        except FuturesTimeoutError:
+            # Drops the call if no worker has picked it up yet
+            future.cancel()
+            raise TimeoutError(f"{self._name} did not finish before the deadline") from None
+
+    async def process_task_async(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
+        return await asyncio.wrap_future(self.submit("process_task", task_data))
+
+    def _process_batch(self, tasks: List[Dict[str, Any]]) -> List[Any]:
+        """Splits the batch into one contiguous chunk per worker and runs the chunks in parallel."""
+        if not tasks:
+            return []
+        size = -(-len(tasks) // self.workers)
+        futures = [self.submit("process_batch", tasks[i:i + size]) for i in range(0, len(tasks), size)]
+        return [result for future in futures for result in future.result()]
+
+    def _ingest(self, *args: Any, **kwargs: Any) -> Any:
+        """Runs the agent's ingest in this process, then replaces the workers holding the old state."""
+        result = self.agent.ingest(*args, **kwargs)
+        self.recycle()
+        return result
+
+    def recycle(self) -> None:
+        """
+        Replaces every worker before its next task with a fresh one started
+        from the parent's current copy of the agent.
+        """
+        with self._lock:
+            self._generation += 1
+
+    def _deadline(self, payload: Any) -> Optional[float]:
+        """
+        Returns the time.time() by which a call must finish: its task's
+        deadline (the latest one for a batch), else task_timeout from now.
+        """
+        tasks = payload if isinstance(payload, list) else [payload]
+        deadlines = [task.get(DEADLINE_KEY) for task in tasks if isinstance(task, dict)]
+        if deadlines and all(deadline is not None for deadline in deadlines):
+            return max(deadlines)
+        return None if self.task_timeout is None else time.time() + self.task_timeout
+
+    def warm_up(self, timeout: Optional[float] = WORKER_START_TIMEOUT) -> bool:
+        """
+        Waits until every worker has started and warmed its agent.
+
+        Returns:
+            True if all workers are ready.
+        """
+        if not all(event.wait(timeout) for event in self._ready):
+            return False
+        with self._lock:
+            return all(handle is not None for handle in self._handles)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            handles = [handle for handle in self._handles if handle is not None]
+            return {
+                "workers": self.workers,
+                "alive": sum(handle.process.is_alive() for handle in handles),
+                "completed": self.completed,
+                "recycled": self.recycled,
+                "crashed": self.crashed,
+                "timed_out": self.timed_out,
+                "queued": self._tasks.qsize(),
+                "worker_memory_mb": [round(handle.memory_mb, 1) for handle in handles],
+            }
+
+    def close(self) -> None:
+        """Stops the workers once the calls already queued have run."""
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._threads:
+            self._tasks.put(None)
+        for thread in self._threads:
+            thread.join(timeout=WORKER_START_TIMEOUT)
+
+    def _start_worker(self) -> _Worker:
+        # Read before starting, so a recycle() during the start still replaces this worker
+        with self._lock:
+            generation = self._generation
+        with _start_lock:
+            parent_conn, child_conn = self._context.Pipe()
+            process = self._context.Process(target=_worker_main, args=(child_conn, self.agent),
+                                            name=f"{self._name}-worker", daemon=True)
+            process.start()
+            child_conn.close()
+        handle = _Worker(process, parent_conn, generation)
+        if not parent_conn.poll(WORKER_START_TIMEOUT):
+            self._stop_worker(handle)
+            raise WorkerCrashedError(f"{self._name} worker did not start within {WORKER_START_TIMEOUT} s")
+        status, error, handle.memory_mb = parent_conn.recv()
+        if status != "ready":
+            self._stop_worker(handle)
+            raise error
+        return handle
+
+    def _stop_worker(self, handle: _Worker) -> None:
+        try:
+            handle.conn.send(None)
+        except OSError:
+            pass
+        handle.process.join(timeout=5)
+        if handle.process.is_alive():
+            handle.process.terminate()
+            handle.process.join()
+        handle.conn.close()
+
+    def _replace(self, slot: int, handle: Optional[_Worker]) -> Optional[_Worker]:
+        """Stops a worker (if any) and starts its replacement in the same slot."""
+        if handle is not None:
+            self._stop_worker(handle)
+        try:
+            handle = self._start_worker()
+        except Exception as e:
+            logger.error("Could not start a %s worker: %s", self._name, e)
+            handle = None
+        with self._lock:
+            self._handles[slot] = handle
+        return handle
+
+    def _serve(self, slot: int) -> None:
+        """Feeds queued calls to the worker in one slot, one at a time."""
+        handle = self._replace(slot, None)
+        self._ready[slot].set()
+        while True:
+            item = self._tasks.get()
+            if item is None:
+                break
+            future, method, payload = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            if handle is not None and handle.generation != self._generation:
+                with self._lock:
+                    self.recycled += 1
+                handle = self._replace(slot, handle)
+            if handle is None:
+                handle = self._replace(slot, None)
+                if handle is None:
+                    future.set_exception(WorkerCrashedError(f"No {self._name} worker is running"))
+                    continue
+            try:
+                handle.conn.send((method, payload))
+            except Exception as e:
+                # Nothing reached the worker, e.g. unpicklable task data
+                future.set_exception(e)
+                continue
+            deadline = self._deadline(payload)
+            if deadline is not None and not handle.conn.poll(max(deadline - time.time(), 0.0)):
+                logger.error("%s worker still running %s past its deadline; replacing it", self._name, method)
+                future.set_exception(TimeoutError(f"{self._name} did not finish before the deadline"))
+                with self._lock:
+                    self.timed_out += 1
+                handle.process.kill()
+                handle = self._replace(slot, handle)
+                continue
+            try:
+                status, value, handle.memory_mb = handle.conn.recv()
+            except (EOFError, OSError):
+                handle.process.join(timeout=1)
+                exit_code = handle.process.exitcode
+                logger.error("%s worker died running %s (exit code %s)", self._name, method, exit_code)
+                future.set_exception(WorkerCrashedError(f"{self._name} worker died (exit code {exit_code})"))
+                with self._lock:
+                    self.crashed += 1
+                handle = self._replace(slot, handle)
+                continue
+
+            handle.tasks += 1
+            with self._lock:
+                self.completed += 1
+            if status == "ok":
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+            over_memory = self.max_worker_memory_mb is not None and handle.memory_mb > self.max_worker_memory_mb
+            if over_memory or (self.max_tasks_per_worker is not None and handle.tasks >= self.max_tasks_per_worker):
+                logger.info("Recycling %s worker after %d tasks at %.0f MB", self._name, handle.tasks, handle.memory_mb)
+                with self._lock:
+                    self.recycled += 1
+                handle = self._replace(slot, handle)
+
+        if handle is not None:
+            self._stop_worker(handle)
@@ -0,0 +1,213 @@
+import asyncio
+import copy
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# task_data fields echoed back in agent responses; restored on cache hits
+ECHOED_FIELDS = ("query", "context")
+# task_data fields that never affect the result, e.g. the request deadline
+TRANSIENT_FIELDS = ("deadline",)
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.lower().split())
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def normalize_task_data(task_data: Dict[str, Any], ignore_keys: Iterable[str] = ()) -> str:
+    """
+    Builds a cache key from task data.
+
+    Strings are lowercased with whitespace collapsed and dictionary keys are
+    sorted, so "Smart  Watch trends" and "smart watch trends" share a key.
+    TRANSIENT_FIELDS are always left out.
+
+    Args:
+        task_data: The task data sent to an agent.
+        ignore_keys: Top-level keys that do not affect the result.
+
+    Returns:
+        A canonical JSON string.
+    """
+    ignored = set(ignore_keys).union(TRANSIENT_FIELDS)
+    relevant = {k: v for k, v in task_data.items() if k not in ignored}
+    return json.dumps(_normalize(relevant), sort_keys=True, separators=(",", ":"), default=str)
+
+
+def restore_echoed_fields(value: Any, task_data: Dict[str, Any]) -> Any:
+    """
+    Replaces the ECHOED_FIELDS of a cached response with those of the task
+    being served, so a hit for "Smart watch" still echoes "Smart watch".
+    """
+    if isinstance(value, dict):
+        for field in ECHOED_FIELDS:
+            if field in value and field in task_data:
+                value[field] = task_data[field]
+    return value
+
+
+class TTLCache:
+    """
+    Size-bounded LRU cache whose entries expire ttl_seconds after being stored.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            max_entries: Maximum number of cached results.
+            ttl_seconds: Seconds after which a cached result is stale.
+            clock: Time source, injectable for tests.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Looks up a key.
+
+        Returns:
+            A (hit, value) tuple; value is None on a miss.
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[0]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def set(self, key: str, value: Any) -> None:
+        """Stores a value, evicting the least recently used entries if full."""
+        expires_at = self._clock() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss counters and the current size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+class CachedAgent:
+    """
+    Wraps a specialized agent so that repeated tasks are served from a TTLCache.
+
+    The wrapper exposes the same process_task (and process_task_async and
+    process_batch, if the wrapped agent has them) and forwards any other
+    attribute to the agent. If the agent has an ingest(), the wrapper's
+    ingest() runs it and then clears the cache, whose results were computed
+    from the data before the ingest.
+    Cached results are copied on the way in and out so callers can't mutate them.
+    """
+
+    def __init__(self, agent: Any, cache: Optional[TTLCache] = None, ignore_keys: Iterable[str] = ()):
+        """
+        Args:
+            agent: The agent to wrap.
+            cache: The cache to use. Defaults to a new TTLCache.
+            ignore_keys: task_data keys excluded from the cache key.
+        """
+        self.agent = agent
+        self.cache = cache if cache is not None else TTLCache()
+        self.ignore_keys = tuple(ignore_keys)
+        if asyncio.iscoroutinefunction(getattr(agent, "process_task_async", None)):
+            self.process_task_async = self._process_task_async
+        if callable(getattr(agent, "process_batch", None)):
+            self.process_batch = self._process_batch
+        if callable(getattr(agent, "ingest", None)):
+            self.ingest = self._ingest
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes the wrapper lacks, e.g. agent-specific helpers
+        if name == "agent":
+            raise AttributeError(name)
+        return getattr(self.agent, name)
+
+    def _lookup(self, task_data: Dict[str, Any]) -> Tuple[str, bool, Any]:
+        key = normalize_task_data(task_data, self.ignore_keys)
+        hit, value = self.cache.get(key)
+        if hit:
+            value = restore_echoed_fields(copy.deepcopy(value), task_data)
+        return key, hit, value
+
+    def process_task(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
+        key, hit, value = self._lookup(task_data)
+        if hit:
+            return value
+        result = self.agent.process_task(task_data)
+        self.cache.set(key, copy.deepcopy(result))
+        return result
+
+    async def _process_task_async(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
+        key, hit, value = self._lookup(task_data)
+        if hit:
+            return value
+        result = await self.agent.process_task_async(task_data)
+        self.cache.set(key, copy.deepcopy(result))
+        return result
+
+    def _ingest(self, *args: Any, **kwargs: Any) -> Any:
+        """Runs the agent's ingest, then drops the results computed from the old data."""
+        result = self.agent.ingest(*args, **kwargs)
+        self.cache.clear()
+        return result
+
+    def _process_batch(self, tasks: List[Dict[str, Any]]) -> List[Any]:
+        """Serves cached items and sends only the misses to the agent's process_batch."""
+        results: List[Any] = [None] * len(tasks)
+        misses: List[Tuple[int, str]] = []
+        for index, task_data in enumerate(tasks):
+            key, hit, value = self._lookup(task_data)
+            if hit:
+                results[index] = value
+            else:
+                misses.append((index, key))
+
+        if misses:
+            computed = self.agent.process_batch([tasks[index] for index, _ in misses])
+            for (index, key), result in zip(misses, computed):
+                results[index] = result
+                if not isinstance(result, BaseException):
+                    self.cache.set(key, copy.deepcopy(result))
+        return results
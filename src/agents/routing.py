@@ -0,0 +1,164 @@
+import json
+import logging
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Routing target for high-level planning requests
+PLAN_TARGET = "plan"
+
+# Built-in routes, highest priority first. A request goes to the first route
+# with a keyword that occurs anywhere in the lowercased request text.
+DEFAULT_ROUTES = [
+    {"target": PLAN_TARGET, "keywords": ["profitable niche", "drop shipping", "business plan"]},
+    {"target": "ProductResearchAgent", "keywords": ["headphones", "product", "gadgets"]},
+    {"target": "MarketAnalysisAgent", "keywords": ["market", "watches"]},
+    {"target": "SalesOpportunityAgent", "keywords": ["profit", "sales"]},
+    {"target": "ProductEvaluationAgent", "keywords": ["evaluate", "score"]},
+]
+DEFAULT_TARGET = "ProductResearchAgent"
+
+
+class _KeywordAutomaton:
+    """
+    Aho-Corasick automaton over the routing keywords.
+
+    Each state records the best (lowest) route priority among the keywords
+    ending there, including those reached through failure links, so a single
+    pass over the text finds the winning route regardless of how many
+    keywords are installed.
+    """
+
+    def __init__(self, keywords: Dict[str, int]):
+        """
+        Args:
+            keywords: Mapping of lowercased keyword to route priority.
+        """
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.best: List[Optional[int]] = [None]
+
+        for keyword, priority in keywords.items():
+            state = 0
+            for ch in keyword:
+                next_state = self.goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.best.append(None)
+                    self.goto[state][ch] = next_state
+                state = next_state
+            if self.best[state] is None or priority < self.best[state]:
+                self.best[state] = priority
+
+        # Breadth-first construction of failure links
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(ch, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                inherited = self.best[self.fail[next_state]]
+                if inherited is not None and (self.best[next_state] is None or inherited < self.best[next_state]):
+                    self.best[next_state] = inherited
+
+    def best_priority(self, text: str) -> Optional[int]:
+        """Returns the lowest priority of any keyword found in text."""
+        goto, fail, best_at = self.goto, self.fail, self.best
+        state = 0
+        best = None
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            found = best_at[state]
+            if found is not None and (best is None or found < best):
+                best = found
+                if best == 0:
+                    break
+        return best
+
+
+class RoutingTable:
+    """
+    Declarative keyword routes compiled into a single multi-pattern matcher.
+
+    Routes are kept in priority order. Keywords can be added per target at any
+    time (e.g. when an agent is registered); the matcher is recompiled lazily
+    on the next lookup.
+    """
+
+    def __init__(self, routes: Optional[Iterable[Dict[str, Any]]] = None, default_target: Optional[str] = DEFAULT_TARGET):
+        """
+        Args:
+            routes: Route declarations of the form {"target": str, "keywords": [str]},
+                highest priority first. Defaults to DEFAULT_ROUTES.
+            default_target: Target returned when no keyword matches.
+        """
+        self.default_target = default_target
+        self._targets: List[str] = []
+        self._keywords: Dict[str, int] = {}
+        self._automaton: Optional[_KeywordAutomaton] = None
+        for route in (DEFAULT_ROUTES if routes is None else routes):
+            self.add_rules(route["target"], route.get("keywords", []))
+
+    @classmethod
+    def from_file(cls, path: str) -> "RoutingTable":
+        """
+        Loads routes from a JSON config file.
+
+        The file holds {"routes": [{"target": ..., "keywords": [...]}, ...],
+        "default": ...}; routes are listed highest priority first.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        logger.info(f"Loaded {len(config.get('routes', []))} routes from {path}")
+        return cls(config.get("routes", []), config.get("default", DEFAULT_TARGET))
+
+    def add_rules(self, target: str, keywords: Iterable[str]) -> None:
+        """
+        Adds keywords for a target. A new target gets the lowest priority so far.
+
+        If a keyword is already declared, the higher-priority target keeps it.
+        """
+        if target not in self._targets:
+            self._targets.append(target)
+        priority = self._targets.index(target)
+        for keyword in keywords:
+            keyword = keyword.lower()
+            if keyword and (keyword not in self._keywords or priority < self._keywords[keyword]):
+                self._keywords[keyword] = priority
+        self._automaton = None
+
+    @property
+    def rule_count(self) -> int:
+        return len(self._keywords)
+
+    def compile(self) -> None:
+        """Builds the matcher now rather than on the next lookup."""
+        self._automaton = _KeywordAutomaton(self._keywords)
+
+    def match(self, text: str) -> Optional[str]:
+        """
+        Resolves the target for a request in one pass over its text.
+
+        Args:
+            text: The request text; matching is case-insensitive.
+
+        Returns:
+            The target of the highest-priority matching route, or the default target.
+        """
+        automaton = self._automaton
+        if automaton is None:
+            automaton = _KeywordAutomaton(self._keywords)
+            self._automaton = automaton
+        priority = automaton.best_priority(text.lower())
+        if priority is None:
+            return self.default_target
+        return self._targets[priority]
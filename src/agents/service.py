@@ -0,0 +1,169 @@
+import os
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+try:
+    from .orchestrator import OrchestratorAgent
+    from .process_pool import DEFAULT_MAX_WORKER_MEMORY_MB
+    from .result_cache import TTLCache
+    from .specialized.market_analysis import MarketAnalysisAgent
+    from .specialized.product_evaluation import ProductEvaluationAgent
+    from .specialized.product_research import ProductResearchAgent
+    from .specialized.sales_opportunity import SalesOpportunityAgent
+    from .specialized.search_backend import HTTPSearchBackend
+    from .specialized.search_cache import SearchCache
+    from .workflow_checkpoint import WorkflowCheckpointStore
+except ImportError:  # Imported as a top-level module with src/agents on sys.path
+    from orchestrator import OrchestratorAgent
+    from process_pool import DEFAULT_MAX_WORKER_MEMORY_MB
+    from result_cache import TTLCache
+    from specialized.market_analysis import MarketAnalysisAgent
+    from specialized.product_evaluation import ProductEvaluationAgent
+    from specialized.product_research import ProductResearchAgent
+    from specialized.sales_opportunity import SalesOpportunityAgent
+    from specialized.search_backend import HTTPSearchBackend
+    from specialized.search_cache import SearchCache
+    from workflow_checkpoint import WorkflowCheckpointStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOCATION = "us-central1"
+# Seconds a request may take, well under Cloud Run's default 300 s request timeout
+DEFAULT_REQUEST_TIMEOUT = 60.0
+# Seconds warm_up waits for Vertex AI initialization
+DEFAULT_WARMUP_TIMEOUT = 30.0
+# Seconds workflow stage outputs are reused by later runs with the same stage inputs
+DEFAULT_STAGE_CACHE_TTL = 300.0
+# Workflow stage outputs kept for reuse
+STAGE_CACHE_MAX_ENTRIES = 512
+
+_orchestrator: Optional[OrchestratorAgent] = None
+_orchestrator_lock = threading.Lock()
+# Agents built by preload() in the server's master process, by name
+_preloaded_agents: Dict[str, Any] = {}
+
+
+def build_product_research_agent() -> ProductResearchAgent:
+    """Creates the ProductResearchAgent from PRODUCT_CATALOG_PATH and PRODUCT_EMBEDDINGS_PATH."""
+    return ProductResearchAgent(
+        catalog_path=os.environ.get("PRODUCT_CATALOG_PATH"),
+        embeddings_path=os.environ.get("PRODUCT_EMBEDDINGS_PATH"),
+    )
+
+
+def preload() -> None:
+    """
+    Loads the expensive, fork-safe parts of the service before server
+    workers fork, so that every worker shares them copy-on-write instead of
+    loading its own copy.
+
+    That is the Vertex AI SDK import and the ProductResearchAgent with its
+    catalog, keyword index and embeddings. The orchestrator itself holds
+    threads, SQLite connections and HTTP connection pools, which must not
+    cross a fork; each worker builds it after forking and reuses the
+    preloaded agent.
+    """
+    try:
+        import google.cloud.aiplatform  # noqa: F401  (the slowest import of a cold start)
+    except ImportError as e:
+        logger.warning(f"Could not preload the Vertex AI SDK: {e}")
+    _preloaded_agents["ProductResearchAgent"] = build_product_research_agent()
+    logger.info(f"Preloaded agents: {', '.join(_preloaded_agents)}")
+
+
+def build_orchestrator() -> OrchestratorAgent:
+    """
+    Creates an orchestrator with the specialized agents registered.
+
+    The Google Cloud project comes from GCP_PROJECT_ID (or GOOGLE_CLOUD_PROJECT)
+    and the region from GCP_LOCATION. PRODUCT_CATALOG_PATH optionally points
+    the ProductResearchAgent at a JSONL or CSV catalog, and
+    PRODUCT_EMBEDDINGS_PATH at the .npy embeddings used for vector retrieval
+    over it. PRODUCT_RESEARCH_PROCESS_WORKERS runs the ProductResearchAgent
+    in that many worker processes (0, the default, keeps it in-process), each
+    replaced once its private memory exceeds WORKER_MAX_MEMORY_MB.
+    MARKET_SEARCH_CACHE_PATH optionally enables the persistent
+    search cache of the MarketAnalysisAgent; place it on a volume that
+    outlives the instance so that new instances start warm, and
+    MARKET_SEARCH_URL points it at an HTTP search service instead of the
+    simulated search. REQUEST_TIMEOUT_SECONDS bounds every request and
+    workflow (0 disables the deadline); agents still running when it passes
+    are abandoned and the response is marked timed_out.
+    WORKFLOW_STAGE_CACHE_TTL_SECONDS is how long workflow stage outputs are
+    reused by reruns with the same stage inputs (0 disables it).
+    WORKFLOW_CHECKPOINT_PATH optionally enables checkpointing of workflow
+    stages to that SQLite file, so that interrupted workflows can be
+    finished with resume_workflow; like the search cache, it should live on
+    a volume that outlives the instance. Vertex AI is
+    initialized in the background so the HTTP server can start serving
+    immediately. Agents loaded by preload() are reused.
+
+    Returns:
+        A new OrchestratorAgent.
+    """
+    project_id = os.environ.get("GCP_PROJECT_ID") or os.environ.get("GOOGLE_CLOUD_PROJECT")
+    location = os.environ.get("GCP_LOCATION", DEFAULT_LOCATION)
+    request_timeout = float(os.environ.get("REQUEST_TIMEOUT_SECONDS", DEFAULT_REQUEST_TIMEOUT))
+    stage_cache_ttl = float(os.environ.get("WORKFLOW_STAGE_CACHE_TTL_SECONDS", DEFAULT_STAGE_CACHE_TTL))
+    checkpoint_path = os.environ.get("WORKFLOW_CHECKPOINT_PATH")
+    orchestrator = OrchestratorAgent(
+        project_id=project_id, location=location, lazy_init=True, request_timeout=request_timeout or None,
+        stage_cache=TTLCache(STAGE_CACHE_MAX_ENTRIES, stage_cache_ttl) if stage_cache_ttl else None,
+        checkpoint_store=WorkflowCheckpointStore(checkpoint_path) if checkpoint_path else None,
+    )
+    product_research = _preloaded_agents.get("ProductResearchAgent") or build_product_research_agent()
+    process_workers = int(os.environ.get("PRODUCT_RESEARCH_PROCESS_WORKERS", "0"))
+    orchestrator.register_agent(
+        "ProductResearchAgent", product_research, process_workers=process_workers or None,
+        max_worker_memory_mb=float(os.environ.get("WORKER_MAX_MEMORY_MB", DEFAULT_MAX_WORKER_MEMORY_MB)),
+    )
+    search_cache_path = os.environ.get("MARKET_SEARCH_CACHE_PATH")
+    search_url = os.environ.get("MARKET_SEARCH_URL")
+    orchestrator.register_agent("MarketAnalysisAgent", MarketAnalysisAgent(
+        search_cache=SearchCache(search_cache_path) if search_cache_path else None,
+        search_backend=HTTPSearchBackend(search_url) if search_url else None,
+        tracer=orchestrator.tracer,
+    ))
+    orchestrator.register_agent("SalesOpportunityAgent", SalesOpportunityAgent())
+    orchestrator.register_agent("ProductEvaluationAgent", ProductEvaluationAgent())
+    return orchestrator
+
+
+def get_orchestrator() -> OrchestratorAgent:
+    """
+    Returns the process-wide orchestrator, creating it on first use.
+    """
+    global _orchestrator
+    if _orchestrator is None:
+        with _orchestrator_lock:
+            if _orchestrator is None:
+                logger.info("Creating orchestrator for HTTP requests")
+                _orchestrator = build_orchestrator()
+    return _orchestrator
+
+
+def warm_up(orchestrator: OrchestratorAgent, timeout: float = DEFAULT_WARMUP_TIMEOUT) -> bool:
+    """
+    Prepares an orchestrator for traffic: compiles the routing table, waits
+    for Vertex AI initialization and calls warm_up() on every registered
+    agent that defines one.
+
+    Args:
+        orchestrator: The orchestrator to warm.
+        timeout: Seconds to wait for Vertex AI initialization.
+
+    Returns:
+        True if the orchestrator is ready to serve.
+    """
+    orchestrator.routing_table.compile()
+    if not orchestrator.wait_until_ready(timeout):
+        logger.warning(f"Orchestrator not ready for traffic: {orchestrator.get_init_state()}")
+    for name, agent in orchestrator.specialized_agents.items():
+        agent_warm_up = getattr(agent, "warm_up", None)
+        if callable(agent_warm_up):
+            try:
+                agent_warm_up()
+            except Exception as e:
+                logger.error(f"Warm-up of {name} failed: {e}")
+    return orchestrator.is_ready()
@@ -0,0 +1,380 @@
+import csv
+import heapq
+import json
+import logging
+import math
+import re
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Relative weight of a term occurrence in each indexed field (BM25F-style)
+DEFAULT_FIELD_WEIGHTS = {"name": 3.0, "type": 2.0, "features": 1.0}
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Postings read from each list in the first round of a query; doubles per round
+INITIAL_BLOCK_SIZE = 256
+# Approximate cost of rescoring one document exactly, in postings read
+RESCORE_COST = 64
+# Share of a query's postings after which reading them all at once is cheaper
+EXHAUSTIVE_FRACTION = 0.25
+# Separators accepted between features in a CSV features column
+CSV_FEATURE_SEPARATORS = re.compile(r"\s*[;|]\s*")
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+_STOP_WORDS = frozenset([
+    "a", "an", "and", "are", "as", "at", "be", "best", "by", "find", "for", "from", "i", "in",
+    "is", "it", "me", "my", "of", "on", "or", "show", "some", "that", "the", "these", "this",
+    "to", "what", "which", "with",
+])
+_PRICE_PATTERN = re.compile(r"[0-9]+(?:\.[0-9]+)?")
+
+
+def _stem(token: str) -> str:
+    """Folds simple English plurals so "watches" matches "watch"."""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 4 and token.endswith(("ches", "shes", "xes")):
+        return token[:-2]
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Splits text into lowercased, plural-folded terms without stop words."""
+    return [_stem(token) for token in _TOKEN_PATTERN.findall(text.lower()) if token not in _STOP_WORDS]
+
+
+def parse_price(value: Any) -> float:
+    """
+    Reads a price such as 129.99, "129.99" or "$1,299.99".
+
+    Returns:
+        The price, or NaN if it cannot be read.
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _PRICE_PATTERN.search(str(value or "").replace(",", ""))
+    return float(match.group()) if match else math.nan
+
+
+def _parse_rating(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class CatalogIndex:
+    """
+    In-memory inverted index over a product catalog with BM25 ranking.
+
+    Every term maps to a postings list of (document id, impact), where the
+    impact is the term's full BM25 contribution for that product, computed
+    once at build time. Postings are sorted by impact, highest first, so a
+    query reads each list only until no unread posting can change the top k
+    (see _top_k). Products are kept as their JSON text and decoded only when
+    returned, which keeps a million-SKU catalog compact.
+    """
+
+    def __init__(self, products: Iterable[Any] = (), field_weights: Optional[Dict[str, float]] = None,
+                 records: Optional[Any] = None):
+        """
+        Builds the index.
+
+        Args:
+            products: Product dictionaries (or their JSON text) with name,
+                type, features, price and rating fields.
+            field_weights: Weight of each indexed field. Defaults to
+                DEFAULT_FIELD_WEIGHTS.
+            records: Index an already stored catalog instead of products,
+                such as a ProductStore (see product_store.py). Its records and
+                price and rating columns are used in place rather than copied.
+        """
+        self.field_weights = dict(field_weights or DEFAULT_FIELD_WEIGHTS)
+        self._records = records
+        self._documents: List[str] = []
+        self._count = 0
+        self._lengths = array("f")
+        self._norms = array("d")
+        self._idf: Dict[str, float] = {}
+        self.prices = array("d") if records is None else records.prices
+        self.ratings = array("d") if records is None else records.ratings
+        self._postings: Dict[str, Tuple[array, array]] = {}
+
+        if records is not None:
+            products = (records.get(row) for row in range(len(records)))
+        for product in products:
+            self._add(product)
+        self._compute_impacts()
+
+    @classmethod
+    def from_file(cls, path: str, field_weights: Optional[Dict[str, float]] = None) -> "CatalogIndex":
+        """
+        Loads a catalog from a JSONL file (one product per line) or a CSV file
+        with a header row. CSV features are separated by ";" or "|".
+
+        Raises:
+            ValueError: If the file extension is neither .jsonl/.ndjson nor .csv.
+        """
+        index = cls(read_catalog(path), field_weights)
+        logger.info(f"Loaded {len(index)} products from {path}")
+        return index
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        if self._records is not None:
+            # The price and rating columns are views of the store, which is pickled on its own
+            del state["prices"], state["ratings"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        if self._records is not None:
+            self.prices = self._records.prices
+            self.ratings = self._records.ratings
+
+    @property
+    def vocabulary_size(self) -> int:
+        """Number of distinct indexed terms."""
+        return len(self._postings)
+
+    def _term_weights(self, product: Dict[str, Any]) -> Tuple[Dict[str, float], float]:
+        """Returns the field-weighted frequency of each term and the weighted length."""
+        term_weights: Dict[str, float] = {}
+        length = 0.0
+        for field, weight in self.field_weights.items():
+            value = product.get(field)
+            if isinstance(value, (list, tuple)):
+                value = " ".join(str(item) for item in value)
+            for term in tokenize(str(value or "")):
+                term_weights[term] = term_weights.get(term, 0.0) + weight
+                length += weight
+        return term_weights, length
+
+    def _add(self, product: Any) -> None:
+        if isinstance(product, str):
+            document, product = product.strip(), json.loads(product)
+        else:
+            document = None if self._records is not None else json.dumps(product)
+        doc_id = self._count
+        self._count += 1
+
+        term_weights, length = self._term_weights(product)
+        for term, weight in term_weights.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = (array("I"), array("d"))
+            postings[0].append(doc_id)
+            postings[1].append(weight)
+
+        self._lengths.append(length)
+        if self._records is None:
+            self._documents.append(document)
+            self.prices.append(parse_price(product.get("price")))
+            self.ratings.append(_parse_rating(product.get("rating")))
+
+    def _compute_impacts(self) -> None:
+        """Replaces the weighted term frequencies with BM25 impacts, highest first."""
+        count = self._count
+        if not count:
+            return
+        average_length = (sum(self._lengths) / count) or 1.0
+        # Per-document part of the BM25 denominator
+        self._norms = array("d", (BM25_K1 * (1 - BM25_B + BM25_B * length / average_length) for length in self._lengths))
+        for term, (doc_ids, weights) in self._postings.items():
+            self._idf[term] = math.log(1 + (count - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5))
+            impacts = [self._impact(term, doc_id, tf) for doc_id, tf in zip(doc_ids, weights)]
+            order = sorted(range(len(impacts)), key=impacts.__getitem__, reverse=True)
+            self._postings[term] = (array("I", (doc_ids[i] for i in order)), array("d", (impacts[i] for i in order)))
+
+    def _impact(self, term: str, doc_id: int, tf: float) -> float:
+        """BM25 contribution of a term with weighted frequency tf to a document."""
+        return self._idf[term] * (BM25_K1 + 1) * tf / (tf + self._norms[doc_id])
+
+    def _score(self, doc_id: int, terms: List[str]) -> float:
+        """Exact BM25 score of one document, recomputed from its stored text."""
+        term_weights, _ = self._term_weights(self.get(doc_id))
+        return sum(self._impact(term, doc_id, term_weights[term]) for term in terms if term in term_weights)
+
+    def get(self, doc_id: int) -> Dict[str, Any]:
+        """Returns the product stored under doc_id."""
+        if self._records is not None:
+            return self._records.get(doc_id)
+        return json.loads(self._documents[doc_id])
+
+    def search(self, query: str, limit: int = 10, min_price: Optional[float] = None,
+               max_price: Optional[float] = None, min_rating: Optional[float] = None,
+               mask: Optional[Sequence[Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Returns the products that best match the query.
+
+        Products without a price or rating are excluded by filters on that
+        field. A query without any terms (e.g. empty) ranks the filtered
+        products by rating instead.
+
+        Args:
+            query: Free-text query.
+            limit: Maximum number of products to return.
+            min_price: Lowest accepted price.
+            max_price: Highest accepted price.
+            min_rating: Lowest accepted rating.
+            mask: Optional per-document flags; documents whose flag is false
+                (e.g. deleted products) are skipped.
+
+        Returns:
+            Product dictionaries with a "score" field, best match first.
+        """
+        accept = self._filter(min_price, max_price, min_rating)
+        if mask is not None:
+            accept = mask.__getitem__ if accept is None else (lambda doc_id, inner=accept: mask[doc_id] and inner(doc_id))
+        query_terms = tokenize(query)
+        terms = [term for term in dict.fromkeys(query_terms) if term in self._postings]
+
+        if not query_terms:
+            candidates = range(self._count)
+            if accept is not None:
+                candidates = filter(accept, candidates)
+            ratings = self.ratings
+            top = heapq.nlargest(limit, candidates, key=lambda doc_id: -1.0 if math.isnan(ratings[doc_id]) else ratings[doc_id])
+            return [dict(self.get(doc_id), score=0.0) for doc_id in top]
+        if not terms or limit <= 0:
+            return []
+
+        return [dict(self.get(doc_id), score=round(score, 4)) for doc_id, score in self._top_k(terms, limit, accept)]
+
+    def _top_k(self, terms: List[str], limit: int, accept) -> List[Tuple[int, float]]:
+        """
+        Exact top-k over impact-ordered postings.
+
+        The lists are read in growing blocks, accumulating a partial score per
+        document and the set of lists it was seen in. A document's final
+        score is at most its partial score plus the next unread impact of each
+        list it was not seen in; a document not seen at all can score at most
+        the sum of those next impacts. After each block the best documents by
+        partial score are rescored exactly, and reading stops once no unseen
+        document can beat the k-th exact score. The few seen documents whose
+        bound still could are rescored too. Common terms are therefore only
+        read as deep as the ranking needs; when that turns out to be most of
+        the postings, the rest of the query scores every posting instead.
+        """
+        lists = [self._postings[term] for term in terms]
+        budget = EXHAUSTIVE_FRACTION * sum(len(doc_ids) for doc_ids, _ in lists)
+        positions = [0] * len(lists)
+        frontier = [impacts[0] for _, impacts in lists]
+        scores: Dict[int, float] = {}
+        seen: Dict[int, int] = {}
+        block = INITIAL_BLOCK_SIZE
+
+        while True:
+            if block * len(lists) > budget:
+                # Pruning is not paying off for these terms
+                return self._top_k_exhaustive(lists, limit, accept)
+            for i, (doc_ids, impacts) in enumerate(lists):
+                start = positions[i]
+                if start >= len(doc_ids):
+                    continue
+                end = min(start + block, len(doc_ids))
+                bit = 1 << i
+                get_score, get_seen = scores.get, seen.get
+                for doc_id, impact in zip(doc_ids[start:end], impacts[start:end]):
+                    scores[doc_id] = get_score(doc_id, 0.0) + impact
+                    seen[doc_id] = get_seen(doc_id, 0) | bit
+                positions[i] = end
+                frontier[i] = impacts[end] if end < len(doc_ids) else 0.0
+            block *= 2
+
+            candidates = list(scores) if accept is None else [doc_id for doc_id in scores if accept(doc_id)]
+            top = heapq.nlargest(limit, candidates, key=scores.__getitem__)
+            if not any(frontier):
+                # Every list is exhausted, so the partial scores are exact
+                return [(doc_id, scores[doc_id]) for doc_id in top]
+            if len(top) < limit:
+                continue
+
+            exact = {doc_id: self._score(doc_id, terms) for doc_id in top}
+            threshold = min(exact.values())
+            unread: Dict[int, float] = {}
+
+            def upper_bound(mask: int) -> float:
+                # Sum of the next impacts of the lists not in mask
+                if mask not in unread:
+                    unread[mask] = sum(f for i, f in enumerate(frontier) if not mask >> i & 1)
+                return unread[mask]
+
+            if upper_bound(0) > threshold:
+                continue
+            contenders = [doc_id for doc_id in candidates
+                          if doc_id not in exact and scores[doc_id] + upper_bound(seen[doc_id]) > threshold]
+            if len(contenders) * RESCORE_COST > block * len(lists):
+                # Cheaper to read the next block and tighten the bounds
+                continue
+            for doc_id in contenders:
+                exact[doc_id] = self._score(doc_id, terms)
+            return heapq.nlargest(limit, exact.items(), key=lambda item: item[1])
+
+    @staticmethod
+    def _top_k_exhaustive(lists: List[Tuple[array, array]], limit: int, accept) -> List[Tuple[int, float]]:
+        """Scores every posting, starting from the longest list built at C speed."""
+        lists = sorted(lists, key=lambda postings: len(postings[0]), reverse=True)
+        scores = dict(zip(*lists[0]))
+        for doc_ids, impacts in lists[1:]:
+            get = scores.get
+            for doc_id, impact in zip(doc_ids, impacts):
+                scores[doc_id] = get(doc_id, 0.0) + impact
+        candidates = scores if accept is None else filter(accept, scores)
+        top = heapq.nlargest(limit, candidates, key=scores.__getitem__)
+        return [(doc_id, scores[doc_id]) for doc_id in top]
+
+    def _filter(self, min_price: Optional[float], max_price: Optional[float], min_rating: Optional[float]):
+        """Builds a predicate over document ids, or None if nothing is filtered."""
+        if min_price is None and max_price is None and min_rating is None:
+            return None
+        prices, ratings = self.prices, self.ratings
+        low = -math.inf if min_price is None else min_price
+        high = math.inf if max_price is None else max_price
+        if min_rating is None:
+            return lambda doc_id: low <= prices[doc_id] <= high
+        if min_price is None and max_price is None:
+            return lambda doc_id: ratings[doc_id] >= min_rating
+        return lambda doc_id: low <= prices[doc_id] <= high and ratings[doc_id] >= min_rating
+
+
+def read_catalog(path: str) -> Iterator[Any]:
+    """
+    Reads the products of a JSONL file (one product per line, yielded as JSON
+    text) or a CSV file with a header row (yielded as dictionaries). CSV
+    features are separated by ";" or "|".
+
+    Raises:
+        ValueError: If the file extension is neither .jsonl/.ndjson nor .csv.
+    """
+    lowered = path.lower()
+    if not lowered.endswith((".jsonl", ".ndjson", ".csv")):
+        raise ValueError(f"Unsupported catalog format: {path}")
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if lowered.endswith(".csv"):
+            for row in csv.DictReader(f):
+                yield _product_from_csv(row)
+        else:
+            for line in f:
+                if line.strip():
+                    yield line
+
+
+def _product_from_csv(row: Dict[str, str]) -> Dict[str, Any]:
+    product: Dict[str, Any] = {key: value for key, value in row.items() if key}
+    features = product.get("features")
+    if isinstance(features, str):
+        product["features"] = [feature for feature in CSV_FEATURE_SEPARATORS.split(features.strip()) if feature]
+    if product.get("rating"):
+        rating = _parse_rating(product["rating"])
+        if not math.isnan(rating):
+            product["rating"] = rating
+    return product
@@ -0,0 +1,412 @@
+import heapq
+import itertools
+import json
+import logging
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from .catalog_index import CatalogIndex, read_catalog
+    from .vector_store import HashedNgramEmbedder, VectorStore, product_text
+except ImportError:  # Imported as a top-level module with src/agents/specialized on sys.path
+    from catalog_index import CatalogIndex, read_catalog
+    from vector_store import HashedNgramEmbedder, VectorStore, product_text
+
+logger = logging.getLogger(__name__)
+
+# Feed records read and applied per chunk
+INGEST_CHUNK_SIZE = 1000
+# Incremental segments allowed before a background compaction merges them
+MAX_DELTA_SEGMENTS = 8
+# Feed operations; a record without an "op" field is an upsert
+FEED_OPERATIONS = ("upsert", "delete")
+
+_segment_ids = itertools.count()
+
+
+def read_feed(path: str, chunk_size: int = INGEST_CHUNK_SIZE) -> Iterator[List[Tuple[str, Optional[str], Dict[str, Any]]]]:
+    """
+    Reads a supplier feed lazily, in chunks of changes.
+
+    Every JSONL line or CSV row is a product keyed by its "sku" field. An
+    optional "op" field (or CSV column) set to "delete" removes the product;
+    otherwise the record replaces or adds it.
+
+    Args:
+        path: A .jsonl/.ndjson or .csv feed (see catalog_index.read_catalog).
+        chunk_size: Changes per yielded chunk.
+
+    Yields:
+        Lists of (op, sku, product) changes, in feed order.
+    """
+    chunk = []
+    for record in read_catalog(path):
+        if isinstance(record, str):
+            record = json.loads(record)
+        op = str(record.pop("op", None) or "upsert").lower()
+        sku = record.get("sku")
+        chunk.append((op, None if sku in (None, "") else str(sku), record))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def filter_mask(prices: np.ndarray, ratings: np.ndarray, filters: Dict[str, float]) -> Optional[np.ndarray]:
+    """Boolean mask of the rows that pass min_price/max_price/min_rating filters, or None."""
+    if not filters:
+        return None
+    mask = np.ones(len(prices), dtype=bool)
+    if "min_price" in filters:
+        mask &= prices >= filters["min_price"]
+    if "max_price" in filters:
+        mask &= prices <= filters["max_price"]
+    if "min_rating" in filters:
+        mask &= ratings >= filters["min_rating"]
+    return mask
+
+
+class Segment:
+    """
+    An immutable part of a live catalog: product records, the sku of every
+    row, and a keyword index and/or embeddings over them.
+    """
+
+    def __init__(self, records: Any, skus: Sequence[Optional[str]], index: Optional[CatalogIndex] = None,
+                 vectors: Optional[VectorStore] = None):
+        """
+        Args:
+            records: Row store with get(), prices and ratings, e.g. a
+                CatalogIndex or a ProductStore.
+            skus: The sku of every row (None if the product has none).
+            index: Keyword index over the rows.
+            vectors: Embeddings of the rows.
+        """
+        self.id = next(_segment_ids)
+        self.records = records
+        self.skus = skus
+        self.index = index
+        self.vectors = vectors
+        self.prices = np.asarray(records.prices, dtype=np.float64)
+        self.ratings = np.asarray(records.ratings, dtype=np.float64)
+
+    @classmethod
+    def build(cls, products: List[Dict[str, Any]], skus: List[str], embedder: Optional[HashedNgramEmbedder] = None,
+              matrix: Optional[np.ndarray] = None) -> "Segment":
+        """
+        Indexes new products.
+
+        Args:
+            products: The products, one per row.
+            skus: Their skus.
+            embedder: Also embed the products with this embedder.
+            matrix: Embeddings of the products, if already computed.
+        """
+        index = CatalogIndex(products)
+        vectors = None
+        if matrix is not None:
+            vectors = VectorStore(matrix, embedder)
+        elif embedder is not None:
+            vectors = VectorStore.build((product_text(product) for product in products), embedder)
+        return cls(index, skus, index, vectors)
+
+    @classmethod
+    def from_catalog(cls, records: Any, index: Optional[CatalogIndex] = None,
+                     vectors: Optional[VectorStore] = None) -> "Segment":
+        """Wraps an already loaded catalog, reading the sku of every record once."""
+        skus = []
+        for row in range(len(records)):
+            sku = records.get(row).get("sku")
+            skus.append(None if sku in (None, "") else str(sku))
+        return cls(records, skus, index, vectors)
+
+    def __len__(self) -> int:
+        return len(self.skus)
+
+
+class CatalogSnapshot:
+    """
+    A consistent, read-only view of a live catalog.
+
+    Segments are never modified and a snapshot's liveness flags are never
+    changed after it is published, so a query that runs against one
+    snapshot sees the catalog exactly as it was when the query started,
+    however much is ingested meanwhile.
+    """
+
+    def __init__(self, segments: Sequence[Segment], live: Sequence[Optional[bytes]]):
+        """
+        Args:
+            segments: The segments, base catalog first.
+            live: Per segment, one byte per row that is 1 while the row is
+                the current version of its product, or None if all rows are.
+        """
+        self.segments = tuple(segments)
+        self.live = tuple(live)
+        self.size = sum(len(segment) if flags is None else flags.count(1)
+                        for segment, flags in zip(self.segments, self.live))
+
+    def search(self, query: str, limit: int = 10, **filters: float) -> List[Dict[str, Any]]:
+        """
+        Keyword search over every segment; see CatalogIndex.search.
+
+        Each segment ranks with its own BM25 statistics, so scores of recently
+        ingested products are approximate until compaction merges them.
+        """
+        results = []
+        for segment, flags in zip(self.segments, self.live):
+            results.extend(segment.index.search(query, limit, mask=flags, **filters))
+        return heapq.nlargest(limit, results, key=_rank)
+
+    def search_vectors(self, vectors: np.ndarray, limit: int = 10,
+                       filters: Optional[Dict[str, float]] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Vector search over every segment; see VectorStore.search_vectors.
+
+        Returns:
+            For each query vector, up to limit products with a "score"
+            field, most similar first.
+        """
+        candidates: List[List[Tuple[float, int, int]]] = [[] for _ in range(len(vectors))]
+        for position, (segment, flags) in enumerate(zip(self.segments, self.live)):
+            mask = filter_mask(segment.prices, segment.ratings, filters or {})
+            if flags is not None:
+                live = np.frombuffer(flags, dtype=np.bool_)
+                mask = live if mask is None else mask & live
+            for hits, found in zip(segment.vectors.search_vectors(vectors, limit, mask), candidates):
+                found.extend((score, position, row) for row, score in hits)
+        return [
+            [dict(self.segments[position].records.get(row), score=round(score, 4))
+             for score, position, row in heapq.nlargest(limit, found)]
+            for found in candidates
+        ]
+
+
+class LiveCatalog:
+    """
+    Product catalog that takes upserts and deletes while it serves queries.
+
+    Changes are applied as an LSM-style log of segments: every ingested chunk
+    becomes a new, small segment, and the rows it replaces or deletes are
+    flagged dead in copies of the older segments' liveness flags. Each change
+    publishes a new CatalogSnapshot with one reference swap, so readers never
+    lock and never see half a chunk. When more than max_segments incremental
+    segments pile up, a background compaction merges them into one, dropping
+    dead rows; embeddings are copied, not recomputed. The base catalog (a
+    product store or catalog file loaded at startup) is never rewritten here;
+    rebuild it offline when it has accumulated many dead rows.
+    """
+
+    def __init__(self, base: Optional[Segment] = None, embedder: Optional[HashedNgramEmbedder] = None,
+                 max_segments: int = MAX_DELTA_SEGMENTS):
+        """
+        Args:
+            base: The catalog loaded at startup, if any.
+            embedder: Embed ingested products with this embedder, for vector
+                search. Without it the catalog is searched by keyword.
+            max_segments: Incremental segments allowed before compaction.
+        """
+        self.embedder = embedder
+        self.max_segments = max_segments
+        self._base_id = None if base is None else base.id
+        # sku -> (segment id, row) of the product's current version
+        self._locations: Dict[str, Tuple[int, int]] = {}
+        self._write_lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._compaction: Optional[threading.Thread] = None
+
+        segments, live = [], []
+        if base is not None:
+            flags = bytearray(b"\x01") * len(base)
+            for row, sku in enumerate(base.skus):
+                if sku is not None:
+                    previous = self._locations.get(sku)
+                    if previous is not None:
+                        # A later duplicate in the catalog wins
+                        flags[previous[1]] = 0
+                    self._locations[sku] = (base.id, row)
+            segments.append(base)
+            live.append(None if all(flags) else bytes(flags))
+        self._snapshot = CatalogSnapshot(segments, live)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Locks and the compaction thread stay with this process, e.g. when pickled for a pool worker
+        state = self.__dict__.copy()
+        for name in ("_write_lock", "_compact_lock", "_compaction"):
+            del state[name]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._write_lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._compaction = None
+
+    def snapshot(self) -> CatalogSnapshot:
+        """Returns the current snapshot."""
+        return self._snapshot
+
+    def __len__(self) -> int:
+        return self._snapshot.size
+
+    @property
+    def segment_count(self) -> int:
+        """Number of segments in the current snapshot, including the base."""
+        return len(self._snapshot.segments)
+
+    def search(self, query: str, limit: int = 10, **filters: float) -> List[Dict[str, Any]]:
+        """Keyword search over the current snapshot; see CatalogSnapshot.search."""
+        return self._snapshot.search(query, limit, **filters)
+
+    def search_batch(self, queries: Sequence[str], limit: int = 10,
+                     filters: Optional[Dict[str, float]] = None) -> List[List[Dict[str, Any]]]:
+        """Vector search for many queries over the current snapshot; see CatalogSnapshot.search_vectors."""
+        return self._snapshot.search_vectors(self.embedder.embed(queries), limit, filters)
+
+    def ingest(self, path: str, chunk_size: int = INGEST_CHUNK_SIZE) -> Dict[str, int]:
+        """
+        Streams a feed file into the catalog, one chunk at a time (see read_feed).
+
+        Returns:
+            Totals of the changes applied, as returned by apply().
+        """
+        totals = {"upserted": 0, "deleted": 0, "skipped": 0}
+        for chunk in read_feed(path, chunk_size):
+            for key, count in self.apply(chunk).items():
+                totals[key] += count
+        logger.info(f"Ingested {path}: {totals['upserted']} upserted, {totals['deleted']} deleted, "
+                    f"{totals['skipped']} skipped; {len(self)} live products in {self.segment_count} segments")
+        return totals
+
+    def apply(self, changes: Sequence[Tuple[str, Optional[str], Dict[str, Any]]]) -> Dict[str, int]:
+        """
+        Applies a chunk of changes as one atomic update.
+
+        Args:
+            changes: (op, sku, product) tuples as yielded by read_feed. When a
+                sku appears more than once, its last change wins.
+
+        Returns:
+            The number of products upserted and deleted, and of changes
+            skipped for lacking a sku or having an unknown op.
+        """
+        latest: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        skipped = 0
+        for op, sku, product in changes:
+            if sku is None or op not in FEED_OPERATIONS:
+                skipped += 1
+                continue
+            latest.pop(sku, None)
+            latest[sku] = (op, product)
+        if skipped:
+            logger.warning(f"Skipped {skipped} feed records without a sku or with an unknown op")
+
+        upserts = [(sku, product) for sku, (op, product) in latest.items() if op == "upsert"]
+        # Indexing and embedding happen outside the lock; readers keep using the current snapshot
+        segment = None
+        if upserts:
+            segment = Segment.build([product for _, product in upserts], [sku for sku, _ in upserts], self.embedder)
+
+        deleted = 0
+        with self._write_lock:
+            current = self._snapshot
+            positions = {existing.id: i for i, existing in enumerate(current.segments)}
+            segments, live = list(current.segments), list(current.live)
+            edited: Dict[int, bytearray] = {}
+            for sku, (op, _) in latest.items():
+                location = self._locations.pop(sku, None)
+                if location is None:
+                    continue
+                i = positions[location[0]]
+                if i not in edited:
+                    edited[i] = bytearray(b"\x01") * len(segments[i]) if live[i] is None else bytearray(live[i])
+                edited[i][location[1]] = 0
+                deleted += op == "delete"
+            for i, flags in edited.items():
+                live[i] = bytes(flags)
+            if segment is not None:
+                for row, sku in enumerate(segment.skus):
+                    self._locations[sku] = (segment.id, row)
+                segments.append(segment)
+                live.append(None)
+            self._snapshot = CatalogSnapshot(segments, live)
+
+        self._maybe_compact()
+        return {"upserted": len(upserts), "deleted": deleted, "skipped": skipped}
+
+    def compact(self) -> bool:
+        """
+        Merges the incremental segments into one, dropping dead rows.
+
+        Ingestion and queries continue while the merged segment is built.
+        Changes applied meanwhile to products in the merged segments are
+        carried over when it is published.
+
+        Returns:
+            Whether there was anything to merge.
+        """
+        with self._compact_lock:
+            snapshot = self._snapshot
+            deltas = [(segment, flags) for segment, flags in zip(snapshot.segments, snapshot.live)
+                      if segment.id != self._base_id]
+            if not deltas or (len(deltas) == 1 and deltas[0][1] is None):
+                return False
+
+            sources: List[Tuple[Segment, int]] = []
+            matrices = []
+            for segment, flags in deltas:
+                rows = np.arange(len(segment)) if flags is None else np.flatnonzero(np.frombuffer(flags, dtype=np.bool_))
+                sources.extend((segment, int(row)) for row in rows)
+                if self.embedder is not None:
+                    matrices.append(np.asarray(segment.vectors.matrix)[rows])
+            merged = None
+            if sources:
+                merged = Segment.build([segment.records.get(row) for segment, row in sources],
+                                       [segment.skus[row] for segment, row in sources], self.embedder,
+                                       np.concatenate(matrices) if matrices else None)
+
+            with self._write_lock:
+                current = self._snapshot
+                merged_ids = {segment.id for segment, _ in deltas}
+                segments, live = [], []
+                for segment, flags in zip(current.segments, current.live):
+                    if segment.id not in merged_ids:
+                        segments.append(segment)
+                        live.append(flags)
+                if merged is not None:
+                    flags = bytearray(len(merged))
+                    for new_row, (segment, row) in enumerate(sources):
+                        sku = segment.skus[row]
+                        if self._locations.get(sku) == (segment.id, row):
+                            self._locations[sku] = (merged.id, new_row)
+                            flags[new_row] = 1
+                    position = 1 if self._base_id is not None else 0
+                    segments.insert(position, merged)
+                    live.insert(position, None if all(flags) else bytes(flags))
+                self._snapshot = CatalogSnapshot(segments, live)
+
+        logger.info(f"Compacted {len(deltas)} segments into {0 if merged is None else len(merged)} rows")
+        return True
+
+    def _maybe_compact(self) -> None:
+        """Starts a background compaction if too many segments have piled up."""
+        deltas = self.segment_count - (self._base_id is not None)
+        if deltas <= self.max_segments or (self._compaction is not None and self._compaction.is_alive()):
+            return
+        self._compaction = threading.Thread(target=self._compact_in_background, name="catalog-compaction", daemon=True)
+        self._compaction.start()
+
+    def _compact_in_background(self) -> None:
+        try:
+            self.compact()
+        except Exception as e:
+            logger.error(f"Catalog compaction failed: {e}")
+
+
+def _rank(product: Dict[str, Any]) -> Tuple[float, float]:
+    """Merge order of keyword results: score, then rating (which orders term-less queries)."""
+    rating = product.get("rating")
+    return product["score"], rating if isinstance(rating, (int, float)) else -1.0
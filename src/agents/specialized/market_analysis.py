@@ -1,19 +1,106 @@
+import asyncio
+import contextlib
+import contextvars
 import logging
-from typing import Dict, Any
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
 import time # Added for simulation
 
-# Configure basic logging
-logging.basicConfig(level=logging.INFO)
+try:
+    from ..logging_config import SAMPLED
+except ImportError:  # Imported from a top-level specialized package or module, with src/agents on sys.path
+    from logging_config import SAMPLED
+try:
+    from .search_backend import SearchBackend, SearchTimeoutError
+    from .search_cache import SearchCache
+    from .single_flight import SingleFlight
+except ImportError:  # Imported as a top-level module with src/agents/specialized on sys.path
+    from search_backend import SearchBackend, SearchTimeoutError
+    from search_cache import SearchCache
+    from single_flight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
+# Simulated latency of a Google Search tool call, in seconds
+SIMULATED_SEARCH_LATENCY = 0.5
+# Maximum number of searches process_batch runs at the same time
+MAX_BATCH_SEARCHES = 16
+
+def _normalize_search_text(text: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+def _search_timeout(query: str, deadline: Optional[float]) -> Optional[float]:
+    """
+    Returns the seconds a search may take before the request deadline (a
+    time.time() timestamp from task_data), or None without a deadline.
+
+    Raises:
+        SearchTimeoutError: If the deadline has already passed.
+    """
+    if deadline is None:
+        return None
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        raise SearchTimeoutError(f"Request deadline passed before searching: '{query}'")
+    return remaining
+
+@contextlib.contextmanager
+def _search_wait(query: str):
+    """Reports a caller's wait for a search that outlasted its deadline as a SearchTimeoutError."""
+    try:
+        yield
+    except SearchTimeoutError:
+        raise
+    except TimeoutError as e:
+        raise SearchTimeoutError(f"Search did not complete before the deadline: '{query}'") from e
+
+def simulated_search_results(query: str, context: str) -> Dict[str, Any]:
+    """Returns simulated Google Search results for the query."""
+    # Generate more dynamic simulated results based on the query
+    # (This part remains basic for now)
+    if "headphone" in query.lower() or "headphone" in context.lower():
+        return {
+            "summary": "Recent search results indicate strong growth in wireless headphones, especially noise-cancelling models. Key players mentioned include Sony, Bose, and Apple.",
+            "trends_found": ["True wireless dominance", "Longer battery life focus", "AI features in audio"],
+            "competitors_found": ["Sony", "Bose", "Apple", "Sennheiser", "Jabra"]
+        }
+    elif "watch" in query.lower() or "watch" in context.lower():
+        return {
+            "summary": "Search results highlight the health and fitness focus in the smartwatch market. Apple and Samsung lead, with Garmin strong in specialized niches.",
+            "trends_found": ["Advanced health sensors (ECG, SpO2)", "Focus on ecosystem integration", "Longer battery performance"],
+            "competitors_found": ["Apple", "Samsung", "Garmin", "Fitbit (Google)", "Amazfit"]
+        }
+    return {
+        "summary": f"Generic search results summary related to '{query}'.",
+        "trends_found": ["Generic Trend A", "Generic Trend B"],
+        "competitors_found": ["Competitor X", "Competitor Y"]
+    }
+
 class MarketAnalysisAgent:
     """
     Specialized agent for market analysis using Google Search grounding.
     """
     
-    def __init__(self):
-        """Initialize the Market Analysis Agent."""
+    def __init__(self, search_cache: Optional[SearchCache] = None,
+                 search_backend: Optional[SearchBackend] = None, tracer: Optional[Any] = None):
+        """
+        Initialize the Market Analysis Agent.
+
+        Args:
+            search_cache: Optional persistent cache of search results, served
+                stale-while-revalidate (see search_cache.py).
+            search_backend: Optional external search tool client (see
+                search_backend.py). Without one, searches are simulated.
+            tracer: Optional tracer (see tracing.py) that records a
+                "tool.search" span around every search tool call.
+        """
         logger.info("Initializing Market Analysis Agent")
+        # Concurrent identical searches share one in-flight call
+        self._search_flights = SingleFlight()
+        self.search_cache = search_cache
+        self.search_backend = search_backend
+        self.tracer = tracer
         
     def process_task(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -28,10 +115,8 @@ class MarketAnalysisAgent:
         """
         query = task_data.get('query', '')
         context = task_data.get('context', '')
-        products = task_data.get('products', [])
         
-        logger.info(f"Processing market analysis task: {query}")
-        logger.info(f"With context: {context}")
+        logger.debug("Processing market analysis task: %s (context: %s)", query, context, extra=SAMPLED)
         
         # --- Conceptual Google Search Integration Point ---
         # In a real implementation with Vertex AI Agent Engine/ADK:
@@ -44,36 +129,202 @@ class MarketAnalysisAgent:
         # 5. The LLM would then synthesize these results into the final response.
 
         # Simulating the process:
-        logger.info("Simulating call to Google Search tool...")
-        search_needed = "market" in query.lower() or "trends" in query.lower() or "competitors" in query.lower()
+        logger.debug("Simulating call to Google Search tool...", extra=SAMPLED)
+        search_needed = self._search_needed(query)
         simulated_search_results = {}
         if search_needed:
-            # Simulate network delay/processing time
-            time.sleep(0.5)
-            logger.info(f"Simulated Google Search results received for query: '{query}'")
-            # Generate more dynamic simulated results based on the query
-            # (This part remains basic for now)
-            if "headphone" in query.lower() or "headphone" in context.lower():
-                 simulated_search_results = {
-                     "summary": "Recent search results indicate strong growth in wireless headphones, especially noise-cancelling models. Key players mentioned include Sony, Bose, and Apple.",
-                     "trends_found": ["True wireless dominance", "Longer battery life focus", "AI features in audio"],
-                     "competitors_found": ["Sony", "Bose", "Apple", "Sennheiser", "Jabra"]
-                 }
-            elif "watch" in query.lower() or "watch" in context.lower():
-                 simulated_search_results = {
-                     "summary": "Search results highlight the health and fitness focus in the smartwatch market. Apple and Samsung lead, with Garmin strong in specialized niches.",
-                     "trends_found": ["Advanced health sensors (ECG, SpO2)", "Focus on ecosystem integration", "Longer battery performance"],
-                     "competitors_found": ["Apple", "Samsung", "Garmin", "Fitbit (Google)", "Amazfit"]
-                 }
-            else:
-                 simulated_search_results = {
-                    "summary": f"Generic search results summary related to '{query}'.",
-                    "trends_found": ["Generic Trend A", "Generic Trend B"],
-                    "competitors_found": ["Competitor X", "Competitor Y"]
-                 }
+            simulated_search_results = self._search(query, context, task_data.get('deadline'))
         else:
-            logger.info("Query did not seem to require external web search.")
+            logger.debug("Query did not seem to require external web search.", extra=SAMPLED)
+
+        return self._build_response(task_data, search_needed, simulated_search_results)
+
+    async def process_task_async(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Async variant of process_task used by the orchestrator's async API.
+
+        The simulated search yields to the event loop instead of blocking a thread.
+
+        Args:
+            task_data: A dictionary containing the task details.
+                Must include a 'query' key with the user's request.
+
+        Returns:
+            A dictionary containing the market analysis results.
+        """
+        query = task_data.get('query', '')
+        context = task_data.get('context', '')
+
+        logger.debug("Processing market analysis task (async): %s (context: %s)", query, context, extra=SAMPLED)
+
+        search_needed = self._search_needed(query)
+        simulated_search_results = {}
+        if search_needed:
+            simulated_search_results = await self._search_async(query, context, task_data.get('deadline'))
+        else:
+            logger.debug("Query did not seem to require external web search.", extra=SAMPLED)
+
+        return self._build_response(task_data, search_needed, simulated_search_results)
 
+    def process_batch(self, tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Process several market analysis tasks in one call.
+
+        Tasks that need the same normalized search share a single search, and
+        the distinct searches run concurrently. The wait for a shared search
+        is bounded by the latest deadline of the tasks that need it, and not
+        at all if one of them has none.
+
+        Args:
+            tasks: Task dictionaries, each shaped like process_task's task_data.
+
+        Returns:
+            One result per task, in the same order. A task whose search failed
+            gets the exception instead of a result.
+        """
+        searches = {}
+        keys = []
+        for task_data in tasks:
+            query = task_data.get('query', '')
+            context = task_data.get('context', '')
+            key = self._search_key(query, context) if self._search_needed(query) else None
+            if key is not None:
+                deadline = task_data.get('deadline')
+                if key in searches:
+                    query, context, earlier = searches[key]
+                    deadline = None if deadline is None or earlier is None else max(deadline, earlier)
+                searches[key] = (query, context, deadline)
+            keys.append(key)
+
+        logger.info("Processing market analysis batch: %d tasks, %d distinct searches", len(tasks), len(searches),
+                    extra=SAMPLED)
+        search_results = {}
+        if searches:
+            with ThreadPoolExecutor(max_workers=min(len(searches), MAX_BATCH_SEARCHES)) as pool:
+                # Each search continues the caller's trace in its own context copy
+                futures = {
+                    key: pool.submit(contextvars.copy_context().run, self._search, query, context, deadline)
+                    for key, (query, context, deadline) in searches.items()
+                }
+                for key, future in futures.items():
+                    try:
+                        search_results[key] = future.result()
+                    except Exception as e:
+                        logger.error("Search failed for batch key '%s': %s", key, e)
+                        search_results[key] = e
+
+        # A failed search is reported in place of the results that needed it
+        results = []
+        for task_data, key in zip(tasks, keys):
+            search_result = search_results.get(key, {})
+            if isinstance(search_result, Exception):
+                results.append(search_result)
+            else:
+                results.append(self._build_response(task_data, key is not None, search_result))
+        return results
+
+    def _search_needed(self, query: str) -> bool:
+        """Decides whether the query requires an external web search."""
+        query_lower = query.lower()
+        return "market" in query_lower or "trends" in query_lower or "competitors" in query_lower
+
+    def _search_key(self, query: str, context: str) -> str:
+        """
+        Normalizes a search so that equivalent requests share one call.
+
+        Case, punctuation and extra whitespace do not change the search.
+        """
+        return f"{_normalize_search_text(query)}|{_normalize_search_text(context)}"
+
+    def _search(self, query: str, context: str, deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Searches through the cache, if any, with concurrent identical searches
+        coalesced. A coalesced search serves callers with different
+        deadlines, so it runs under the backend's own timeout; each caller's
+        wait for it is bounded by that caller's request deadline. Background
+        cache refreshes are not bounded by any request.
+
+        Raises:
+            SearchTimeoutError: If the search does not finish before the deadline.
+        """
+        key = self._search_key(query, context)
+
+        def run(search_deadline):
+            timeout = _search_timeout(query, search_deadline)
+            with _search_wait(query):
+                return self._search_flights.do(key, lambda: self._run_search(query, context), timeout)
+
+        if self.search_cache is None:
+            return run(deadline)
+        return self.search_cache.fetch(key, lambda: run(deadline), refresh=lambda: run(None))
+
+    async def _search_async(self, query: str, context: str, deadline: Optional[float] = None) -> Dict[str, Any]:
+        """Async variant of _search."""
+        key = self._search_key(query, context)
+
+        async def run(search_deadline):
+            timeout = _search_timeout(query, search_deadline)
+            with _search_wait(query):
+                return await self._search_flights.do_async(
+                    key, lambda: self._run_search_async(query, context), timeout)
+
+        if self.search_cache is None:
+            return await run(deadline)
+        return await self.search_cache.fetch_async(key, lambda: run(deadline), refresh=lambda: run(None))
+
+    def _run_search(self, query: str, context: str) -> Dict[str, Any]:
+        """
+        Runs the (simulated) Google Search tool call, under the backend's own timeout.
+
+        Raises:
+            SearchTimeoutError: If the backend's timeout passes first.
+        """
+        with self._tool_span("tool.search"):
+            if self.search_backend is not None:
+                return self.search_backend.search(query, context)
+            # Simulate network delay/processing time
+            time.sleep(SIMULATED_SEARCH_LATENCY)
+            return self._simulated_search_results(query, context)
+
+    async def _run_search_async(self, query: str, context: str) -> Dict[str, Any]:
+        """Runs the (simulated) Google Search tool call without blocking the loop."""
+        with self._tool_span("tool.search"):
+            if self.search_backend is not None:
+                return await asyncio.to_thread(self.search_backend.search, query, context)
+            await asyncio.sleep(SIMULATED_SEARCH_LATENCY)
+            return self._simulated_search_results(query, context)
+
+    def _tool_span(self, name: str):
+        """Returns a span around a tool call, or a no-op context without a tracer."""
+        if self.tracer is None:
+            return contextlib.nullcontext()
+        backend = type(self.search_backend).__name__ if self.search_backend is not None else "simulated"
+        return self.tracer.span(name, agent=type(self).__name__, backend=backend)
+
+    def get_search_metrics(self) -> Dict[str, int]:
+        """
+        Returns search counters: calls requested, searches executed, and calls
+        coalesced onto another in-flight search. The counters of a search
+        cache and search backend are included with "cache_" and "backend_"
+        prefixes.
+        """
+        metrics = self._search_flights.stats()
+        if self.search_cache is not None:
+            metrics.update({f"cache_{name}": value for name, value in self.search_cache.stats().items()})
+        if self.search_backend is not None:
+            metrics.update({f"backend_{name}": value for name, value in self.search_backend.stats().items()})
+        return metrics
+
+    def _simulated_search_results(self, query: str, context: str) -> Dict[str, Any]:
+        """Returns simulated Google Search results for the query."""
+        logger.debug("Simulated Google Search results received for query: '%s'", query, extra=SAMPLED)
+        return simulated_search_results(query, context)
+
+    def _build_response(self, task_data: Dict[str, Any], search_needed: bool, simulated_search_results: Dict[str, Any]) -> Dict[str, Any]:
+        """Synthesizes the agent response from the (simulated) search results."""
+        query = task_data.get('query', '')
+        context = task_data.get('context', '')
+        products = task_data.get('products', [])
 
         # --- Synthesize Response (using simulated search results) ---
         # In a real implementation, the LLM would do this synthesis.
@@ -84,8 +335,9 @@ class MarketAnalysisAgent:
         }
         if simulated_search_results:
              market_data["search_summary"] = simulated_search_results.get("summary", "N/A")
-             market_data["identified_trends"] = simulated_search_results.get("trends_found", [])
-             market_data["identified_competitors"] = simulated_search_results.get("competitors_found", [])
+             # Copy the lists: coalesced calls share one set of search results
+             market_data["identified_trends"] = list(simulated_search_results.get("trends_found", []))
+             market_data["identified_competitors"] = list(simulated_search_results.get("competitors_found", []))
              # Add other hypothetical analysis based on search
              market_data["estimated_growth"] = "10-20% (based on recent search)"
              market_data["overall_sentiment"] = "Positive (based on recent search)"
@@ -104,4 +356,4 @@ class MarketAnalysisAgent:
             "market_data": market_data,
             "product_count_analyzed": len(products) if products else 0,
             "source": f"Market Analysis Agent ({ 'simulated search' if search_needed else 'internal knowledge'})"
-        } 
\ No newline at end of file
+        } 
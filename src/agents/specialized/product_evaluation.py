@@ -0,0 +1,343 @@
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from ..logging_config import SAMPLED
+except ImportError:  # Imported from a top-level specialized package or module, with src/agents on sys.path
+    from logging_config import SAMPLED
+try:
+    from .catalog_index import tokenize
+    from .sales_opportunity import estimate_sales, product_column
+    from .vector_store import product_text
+except ImportError:  # Imported as a top-level module with src/agents/specialized on sys.path
+    from catalog_index import tokenize
+    from sales_opportunity import estimate_sales, product_column
+    from vector_store import product_text
+
+logger = logging.getLogger(__name__)
+
+# Signals combined into a candidate's score, in score matrix row order
+SIGNALS = ("relevance", "quality", "margin", "demand", "market_fit")
+# Weight of each signal; every signal is scaled to [0, 1]
+DEFAULT_WEIGHTS = {"relevance": 0.25, "quality": 0.20, "margin": 0.25, "demand": 0.15, "market_fit": 0.15}
+# Candidates returned per task unless the task asks for a different limit
+DEFAULT_TOP_K = 10
+# Evaluations kept for incremental re-scoring, least recently used first out
+MAX_EVALUATIONS = 64
+# Reviews at which a rating is fully trusted; fewer pull it towards neutral
+REVIEW_CONFIDENCE = 50.0
+# Margin that earns the full margin signal
+FULL_MARGIN = 0.6
+# Market terms shorter than this are ignored
+MIN_MARKET_TERM_LENGTH = 3
+
+
+class ScoreMatrix:
+    """
+    Weighted scores of many candidates over a few signals.
+
+    Signals are stored one row per signal, so replacing a signal or its
+    weight touches a single contiguous row: the scores are adjusted by the
+    difference (O(candidates)) instead of recomputing the whole weighted
+    sum (O(candidates x signals)).
+    """
+
+    def __init__(self, signals: np.ndarray, weights: Dict[str, float], names: Sequence[str] = SIGNALS):
+        """
+        Args:
+            signals: Array of shape (len(names), candidates).
+            weights: Weight per signal name; missing names weigh 0.
+            names: Signal names, in row order.
+        """
+        self.names = tuple(names)
+        self.signals = np.ascontiguousarray(signals, dtype=np.float64)
+        self.weights = np.array([weights.get(name, 0.0) for name in self.names], dtype=np.float64)
+        self.scores = self.weights @ self.signals
+
+    def __len__(self) -> int:
+        return self.signals.shape[1]
+
+    def update_signal(self, name: str, values: np.ndarray) -> None:
+        """Replaces one signal's values and adjusts the scores by the change."""
+        row = self.names.index(name)
+        values = np.asarray(values, dtype=np.float64)
+        self.scores += self.weights[row] * (values - self.signals[row])
+        self.signals[row] = values
+
+    def set_weights(self, weights: Dict[str, float]) -> None:
+        """Changes the weights of the given signals and adjusts the scores by the change."""
+        for name, weight in weights.items():
+            row = self.names.index(name)
+            if weight != self.weights[row]:
+                self.scores += (weight - self.weights[row]) * self.signals[row]
+                self.weights[row] = weight
+
+    def top_k(self, k: int) -> np.ndarray:
+        """
+        Returns the indices of the k best candidates, best first.
+
+        Only the k winners are sorted: argpartition selects them in linear
+        time, so ranking 100k candidates costs little more than reading them.
+        """
+        if k <= 0:
+            return np.empty(0, dtype=np.intp)
+        if k < len(self):
+            top = np.argpartition(-self.scores, k - 1)[:k]
+        else:
+            top = np.arange(len(self))
+        return top[np.argsort(-self.scores[top], kind="stable")]
+
+
+def market_terms(market_analysis: Optional[Dict[str, Any]]) -> List[str]:
+    """Terms of the trends and competitors found by the MarketAnalysisAgent."""
+    market_data = (market_analysis or {}).get("market_data") or {}
+    phrases = list(market_data.get("identified_trends") or []) + list(market_data.get("identified_competitors") or [])
+    terms = dict.fromkeys(term for phrase in phrases for term in tokenize(str(phrase))
+                          if len(term) >= MIN_MARKET_TERM_LENGTH)
+    return list(terms)
+
+
+class _Evaluation:
+    """State kept between the first scoring of a candidate set and its re-scorings."""
+
+    __slots__ = ("products", "texts", "matrix")
+
+    def __init__(self, products: Sequence[Dict[str, Any]], texts: np.ndarray, matrix: ScoreMatrix):
+        self.products = products
+        self.texts = texts
+        self.matrix = matrix
+
+
+class ProductEvaluationAgent:
+    """
+    Specialized agent ranking candidate products on research, market and sales signals.
+
+    Every candidate gets one value per signal in [0, 1] (see SIGNALS):
+
+    - relevance: the product research score, or the research rank
+    - quality: the rating, pulled towards neutral for few reviews
+    - margin and demand: the SalesOpportunityAgent estimates, taken from
+      its output when the task carries it, else computed over all
+      candidates with sales_opportunity.estimate_sales
+    - market_fit: the share of the market analysis' trend and competitor
+      terms found in the product's name, type and features
+
+    The weighted sum of the signals is the candidate's score, and the top k
+    candidates are selected with a partial sort. An evaluation is kept under
+    its evaluation_id so that a later task can change one signal (new market
+    analysis, or explicit values) or the weights and re-score incrementally.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, top_k: int = DEFAULT_TOP_K,
+                 max_evaluations: int = MAX_EVALUATIONS):
+        """
+        Initialize the Product Evaluation Agent.
+
+        Args:
+            weights: Weight per signal. Defaults to DEFAULT_WEIGHTS.
+            top_k: Candidates returned per task unless the task sets "limit".
+            max_evaluations: Evaluations kept for re-scoring.
+        """
+        logger.info("Initializing Product Evaluation Agent")
+        self.weights = dict(DEFAULT_WEIGHTS if weights is None else weights)
+        self.top_k = top_k
+        self.max_evaluations = max_evaluations
+        self._evaluations: "OrderedDict[str, _Evaluation]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def process_task(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Process a product evaluation task.
+
+        Args:
+            task_data: A dictionary containing the task details:
+                - 'products': candidates to evaluate, as returned by the
+                  ProductResearchAgent; or 'evaluation_id' of an earlier
+                  evaluation to re-score.
+                - 'market_analysis': optional MarketAnalysisAgent output.
+                - 'sales_opportunity': optional SalesOpportunityAgent output,
+                  matched to the candidates by name.
+                - 'signals': optional {signal: values per candidate}
+                  replacing computed signals.
+                - 'weights': optional {signal: weight} overrides.
+                - 'limit': optional number of candidates returned.
+
+        Returns:
+            A dictionary with the ranked top candidates, the best score
+            (0-100) and the evaluation_id for re-scoring.
+
+        Raises:
+            ValueError: If evaluation_id is unknown (or was evicted), or a
+                signal is unknown or has the wrong length.
+        """
+        query = task_data.get('query', '')
+        limit = int(task_data.get('limit') or self.top_k)
+        evaluation_id = task_data.get('evaluation_id')
+
+        if evaluation_id is not None:
+            evaluation = self._get(evaluation_id)
+            logger.debug("Re-scoring evaluation %s", evaluation_id, extra=SAMPLED)
+            # Invalid overrides are rejected before the stored evaluation changes
+            signals, weights = self._overrides(task_data, len(evaluation.matrix))
+            # Only the signals that changed are recomputed
+            with self._lock:
+                if task_data.get('market_analysis') is not None:
+                    evaluation.matrix.update_signal(
+                        "market_fit", self._market_fit(evaluation.texts, task_data['market_analysis']))
+                self._apply_overrides(evaluation, signals, weights)
+                top = evaluation.matrix.top_k(limit)
+        else:
+            products = task_data.get('products') or []
+            logger.debug("Processing product evaluation task: %s (%d candidates)", query, len(products),
+                         extra=SAMPLED)
+            evaluation = self._evaluate(products, task_data.get('market_analysis'),
+                                        task_data.get('sales_opportunity'))
+            self._apply_overrides(evaluation, *self._overrides(task_data, len(evaluation.matrix)))
+            top = evaluation.matrix.top_k(limit)
+            evaluation_id = self._store(evaluation)
+
+        return self._build_response(task_data, evaluation_id, evaluation, top)
+
+    def _evaluate(self, products: Sequence[Dict[str, Any]], market_analysis: Optional[Dict[str, Any]],
+                  sales_opportunity: Optional[Dict[str, Any]] = None) -> _Evaluation:
+        """Computes every signal of a candidate set."""
+        n = len(products)
+        texts = np.char.lower(np.array([product_text(product) for product in products] or [""], dtype=str))[:n]
+        ratings = product_column(products, ("rating",))
+        reviews = product_column(products, ("reviews", "review_count"))
+        if sales_opportunity and sales_opportunity.get("opportunities") is not None:
+            sales = self._sales_from(products, sales_opportunity["opportunities"])
+        else:
+            sales = estimate_sales(product_column(products, ("price",)),
+                                   product_column(products, ("cost", "unit_cost")), ratings, reviews)
+
+        signals = np.empty((len(SIGNALS), n))
+        signals[SIGNALS.index("relevance")] = self._relevance(product_column(products, ("score",)))
+        signals[SIGNALS.index("quality")] = self._quality(ratings, reviews)
+        signals[SIGNALS.index("margin")] = np.clip(np.nan_to_num(sales["margin"], nan=0.0) / FULL_MARGIN, 0.0, 1.0)
+        signals[SIGNALS.index("demand")] = self._scaled(np.log1p(np.nan_to_num(sales["monthly_units"], nan=0.0)))
+        signals[SIGNALS.index("market_fit")] = self._market_fit(texts, market_analysis)
+        return _Evaluation(products, texts, ScoreMatrix(signals, self.weights))
+
+    @staticmethod
+    def _sales_from(products: Sequence[Dict[str, Any]],
+                    opportunities: Sequence[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Margin and monthly units per candidate from SalesOpportunityAgent opportunities; NaN where none."""
+        by_name = {opportunity.get("name"): opportunity for opportunity in opportunities}
+        matched = [by_name.get(product.get("name"), {}) for product in products]
+        return {
+            "margin": product_column(matched, ("margin",)),
+            "monthly_units": product_column(matched, ("estimated_monthly_units",)),
+        }
+
+    @staticmethod
+    def _scaled(values: np.ndarray) -> np.ndarray:
+        """Scales non-negative values to [0, 1] by their maximum."""
+        top = values.max() if len(values) else 0.0
+        return values / top if top > 0 else np.zeros(len(values))
+
+    def _relevance(self, scores: np.ndarray) -> np.ndarray:
+        """Research scores scaled to [0, 1]; by research rank where there are none."""
+        n = len(scores)
+        by_rank = 1.0 - np.arange(n) / n if n else np.empty(0)
+        if n == 0 or np.isnan(scores).all():
+            return by_rank
+        low, high = np.nanmin(scores), np.nanmax(scores)
+        scaled = (scores - low) / (high - low) if high > low else np.ones(n)
+        return np.where(np.isnan(scaled), by_rank, scaled)
+
+    @staticmethod
+    def _quality(ratings: np.ndarray, reviews: np.ndarray) -> np.ndarray:
+        """Ratings scaled to [0, 1], shrunk towards 0.5 when they rest on few reviews."""
+        rating = np.where(np.isnan(ratings), 0.5, np.clip(ratings, 0.0, 5.0) / 5.0)
+        confidence = np.where(np.isnan(reviews), 1.0, reviews / (np.maximum(reviews, 0.0) + REVIEW_CONFIDENCE))
+        return 0.5 + (rating - 0.5) * np.where(np.isnan(ratings), 0.0, confidence)
+
+    @staticmethod
+    def _market_fit(texts: np.ndarray, market_analysis: Optional[Dict[str, Any]]) -> np.ndarray:
+        """Share of the market terms found in each candidate's text; 0.5 for all without terms."""
+        terms = market_terms(market_analysis)
+        if not terms:
+            return np.full(len(texts), 0.5)
+        hits = np.zeros(len(texts))
+        # One vectorized substring search per term, not per candidate
+        for term in terms:
+            hits += np.char.find(texts, term) >= 0
+        return np.minimum(hits / min(len(terms), 3), 1.0)
+
+    @staticmethod
+    def _overrides(task_data: Dict[str, Any], n: int) -> Tuple[Dict[str, np.ndarray], Dict[str, float]]:
+        """
+        Validates the task's explicit signal values and weights for n candidates.
+
+        Raises:
+            ValueError: If a signal is unknown or has the wrong length.
+        """
+        signals = {}
+        for name, values in (task_data.get('signals') or {}).items():
+            if name not in SIGNALS:
+                raise ValueError(f"Unknown signal '{name}'; expected one of {', '.join(SIGNALS)}")
+            values = np.asarray(values, dtype=np.float64)
+            if values.shape != (n,):
+                raise ValueError(f"Signal '{name}' has {values.size} values for {n} candidates")
+            signals[name] = values
+        weights = task_data.get('weights') or {}
+        unknown = set(weights) - set(SIGNALS)
+        if unknown:
+            raise ValueError(f"Unknown signals in weights: {', '.join(sorted(unknown))}")
+        return signals, {name: float(weight) for name, weight in weights.items()}
+
+    @staticmethod
+    def _apply_overrides(evaluation: _Evaluation, signals: Dict[str, np.ndarray], weights: Dict[str, float]) -> None:
+        """Applies validated signal values and weights (see _overrides)."""
+        for name, values in signals.items():
+            evaluation.matrix.update_signal(name, values)
+        if weights:
+            evaluation.matrix.set_weights(weights)
+
+    def _store(self, evaluation: _Evaluation) -> str:
+        evaluation_id = str(uuid.uuid4())
+        with self._lock:
+            self._evaluations[evaluation_id] = evaluation
+            while len(self._evaluations) > self.max_evaluations:
+                self._evaluations.popitem(last=False)
+        return evaluation_id
+
+    def _get(self, evaluation_id: str) -> _Evaluation:
+        with self._lock:
+            evaluation = self._evaluations.get(evaluation_id)
+            if evaluation is None:
+                raise ValueError(f"Unknown or expired evaluation_id '{evaluation_id}'")
+            self._evaluations.move_to_end(evaluation_id)
+            return evaluation
+
+    def _build_response(self, task_data: Dict[str, Any], evaluation_id: str, evaluation: _Evaluation,
+                        top: np.ndarray) -> Dict[str, Any]:
+        """Formats the ranked candidates with their score and signals."""
+        matrix = evaluation.matrix
+        ranked: List[Dict[str, Any]] = []
+        for rank, row in enumerate(top, start=1):
+            product = evaluation.products[row]
+            ranked.append({
+                "rank": rank,
+                "name": product.get("name"),
+                "price": product.get("price"),
+                "score": round(float(matrix.scores[row]) * 100, 1),
+                "signals": {name: round(float(matrix.signals[i, row]), 3) for i, name in enumerate(matrix.names)},
+            })
+        return {
+            "result": "success",
+            "query": task_data.get('query', ''),
+            "context": task_data.get('context', ''),
+            "evaluation_id": evaluation_id,
+            "score": ranked[0]["score"] if ranked else None,
+            "top_products": ranked,
+            "candidates_evaluated": len(matrix),
+            "weights": {name: float(weight) for name, weight in zip(matrix.names, matrix.weights)},
+            "source": f"Product Evaluation Agent (weighted {len(matrix.names)}-signal score over {len(matrix)} candidates)",
+        }
@@ -1,18 +1,148 @@
+import os
 import logging
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from ..logging_config import SAMPLED
+except ImportError:  # Imported from a top-level specialized package or module, with src/agents on sys.path
+    from logging_config import SAMPLED
+try:
+    from .catalog_index import CatalogIndex
+    from .live_catalog import INGEST_CHUNK_SIZE, LiveCatalog, Segment, filter_mask
+    from .product_store import STORE_EXTENSION, ProductStore
+    from .vector_store import VectorStore, product_text
+except ImportError:  # Imported as a top-level module with src/agents/specialized on sys.path
+    from catalog_index import CatalogIndex
+    from live_catalog import INGEST_CHUNK_SIZE, LiveCatalog, Segment, filter_mask
+    from product_store import STORE_EXTENSION, ProductStore
+    from vector_store import VectorStore, product_text
 
-# Configure basic logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Products returned per query unless the task asks for a different limit
+DEFAULT_MAX_RESULTS = 10
+# Optional task_data filters passed to the catalog search
+CATALOG_FILTERS = ("min_price", "max_price", "min_rating")
+
 class ProductResearchAgent:
     """
     Specialized agent for product research using a RAG-based approach.
     """
     
-    def __init__(self):
-        """Initialize the Product Research Agent."""
+    def __init__(self, catalog_path: Optional[str] = None, max_results: int = DEFAULT_MAX_RESULTS,
+                 embeddings_path: Optional[str] = None):
+        """
+        Initialize the Product Research Agent.
+
+        Args:
+            catalog_path: Optional product catalog to search: a JSONL or CSV
+                file (see catalog_index.py), or a memory-mapped product store
+                ending in STORE_EXTENSION (see product_store.py) that worker
+                processes share. Without a catalog the agent returns
+                simulated results.
+            max_results: Products returned per query unless the task sets "limit".
+            embeddings_path: Optional .npy file of catalog embeddings (see
+                vector_store.py). When set, products are retrieved by vector
+                similarity instead of keyword ranking, and a product store
+                catalog is used without building a keyword index. The file is
+                memory-mapped, and created from the catalog if it does not
+                exist yet.
+
+        Raises:
+            ValueError: If embeddings_path is given without a catalog, or the
+                embeddings do not match the catalog.
+        """
         logger.info("Initializing Product Research Agent")
+        self.max_results = max_results
+        # Keyword index, and the records that results are read from
+        self.catalog = None
+        self.products = None
+        if catalog_path and catalog_path.endswith(STORE_EXTENSION):
+            self.products = ProductStore(catalog_path)
+            if not embeddings_path:
+                self.catalog = CatalogIndex(records=self.products)
+        elif catalog_path:
+            self.catalog = self.products = CatalogIndex.from_file(catalog_path)
+
+        self.vector_store = None
+        if embeddings_path:
+            if self.products is None:
+                raise ValueError("embeddings_path requires a catalog_path")
+            self.vector_store = self._open_vector_store(embeddings_path)
+            # Zero-copy for a product store's columns
+            self._prices = np.asarray(self.products.prices, dtype=np.float64)
+            self._ratings = np.asarray(self.products.ratings, dtype=np.float64)
+
+        # Created by the first ingest(); from then on it answers every search
+        self.live_catalog: Optional[LiveCatalog] = None
+        self._live_catalog_lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Pickled for process pool workers: the catalog files are mapped again, not copied
+        state = self.__dict__.copy()
+        for name in ("_live_catalog_lock", "_prices", "_ratings"):
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._live_catalog_lock = threading.Lock()
+        if self.vector_store is not None:
+            self._prices = np.asarray(self.products.prices, dtype=np.float64)
+            self._ratings = np.asarray(self.products.ratings, dtype=np.float64)
+
+    def _open_vector_store(self, path: str) -> VectorStore:
+        """Maps the catalog embeddings, building and saving them first if needed."""
+        if not os.path.exists(path):
+            logger.info(f"Embedding {len(self.products)} catalog products into {path}")
+            VectorStore.build(product_text(self.products.get(row)) for row in range(len(self.products))).save(path)
+        store = VectorStore.load(path)
+        if len(store) != len(self.products):
+            raise ValueError(f"{path} holds {len(store)} embeddings for {len(self.products)} catalog products")
+        return store
+
+    def ingest(self, feed_path: str, chunk_size: int = INGEST_CHUNK_SIZE) -> Dict[str, int]:
+        """
+        Applies a supplier feed of upserts and deletes to the searchable catalog.
+
+        The feed is streamed in chunks (see live_catalog.read_feed) and each
+        chunk is indexed, and embedded in vector mode, as a small new segment
+        instead of rebuilding the catalog. Searches that run meanwhile are
+        answered from a consistent snapshot. Results cached from before the
+        feed are only invalidated when it is applied through
+        OrchestratorAgent.ingest.
+
+        Args:
+            feed_path: JSONL or CSV feed of products keyed by "sku".
+            chunk_size: Feed records applied per chunk.
+
+        Returns:
+            The number of products upserted, deleted and skipped.
+        """
+        return self._live_catalog().ingest(feed_path, chunk_size)
+
+    def warm_up(self) -> None:
+        """
+        Runs one catalog search so that the index, the memory-mapped columns
+        and the embedding model are paged in and initialized before the first
+        request.
+        """
+        if self.products is not None:
+            self.process_task({"query": "warm up", "limit": 1})
+
+    def _live_catalog(self) -> LiveCatalog:
+        """Wraps the loaded catalog in a LiveCatalog on first use."""
+        with self._live_catalog_lock:
+            if self.live_catalog is None:
+                base = None
+                if self.products is not None:
+                    base = Segment.from_catalog(self.products, self.catalog, self.vector_store)
+                embedder = self.vector_store.embedder if self.vector_store is not None else None
+                self.live_catalog = LiveCatalog(base, embedder)
+            return self.live_catalog
         
     def process_task(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -28,10 +158,17 @@ class ProductResearchAgent:
         query = task_data.get('query', '')
         context = task_data.get('context', '')
         
-        logger.info(f"Processing product research task: {query}")
-        logger.info(f"With context: {context}")
+        logger.debug("Processing product research task: %s (context: %s)", query, context, extra=SAMPLED)
+
+        if self.vector_store is not None:
+            result = self.process_batch([task_data])[0]
+            if isinstance(result, Exception):
+                raise result
+            return result
+        if self.catalog is not None or self.live_catalog is not None:
+            return self._search_catalog(task_data, query, context)
         
-        # For now, return simulated results
+        # Without a catalog, return simulated results
         # In a real implementation, this would:
         # 1. Use a RAG approach to search product databases
         # 2. Retrieve relevant product information
@@ -106,4 +243,78 @@ class ProductResearchAgent:
             "products": products,
             "total_found": len(products),
             "source": "Product Research Agent (simulated)"
-        } 
\ No newline at end of file
+        } 
+
+    def process_batch(self, tasks: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Process several product research tasks in one call.
+
+        With vector retrieval, all tasks that share the same filters and limit
+        are answered by a single batched similarity search.
+
+        Args:
+            tasks: Task dictionaries, each shaped like process_task's task_data.
+
+        Returns:
+            One result per task, in the same order. A task that failed gets
+            the exception instead of a result.
+        """
+        results: List[Any] = [None] * len(tasks)
+        if self.vector_store is None:
+            for i, task_data in enumerate(tasks):
+                try:
+                    results[i] = self.process_task(task_data)
+                except Exception as e:
+                    results[i] = e
+            return results
+
+        groups: Dict[Tuple[Tuple[Tuple[str, float], ...], int], List[int]] = {}
+        for i, task_data in enumerate(tasks):
+            try:
+                filters, limit = self._search_options(task_data)
+            except (TypeError, ValueError) as e:
+                results[i] = e
+                continue
+            groups.setdefault((tuple(sorted(filters.items())), limit), []).append(i)
+
+        logger.info("Processing product research batch: %d tasks, %d vector searches", len(tasks), len(groups),
+                    extra=SAMPLED)
+        for (filters, limit), indices in groups.items():
+            texts = [f"{tasks[i].get('query', '')} {tasks[i].get('context', '')}" for i in indices]
+            if self.live_catalog is not None:
+                matches = self.live_catalog.search_batch(texts, limit, dict(filters))
+            else:
+                matches = [[dict(self.products.get(row), score=round(score, 4)) for row, score in hits]
+                           for hits in self.vector_store.search_batch(texts, limit, self._filter_mask(dict(filters)))]
+            for i, products in zip(indices, matches):
+                results[i] = self._catalog_response(tasks[i], products, "vector search over")
+        return results
+
+    def _search_options(self, task_data: Dict[str, Any]) -> Tuple[Dict[str, float], int]:
+        """Reads the optional filters and result limit of a task."""
+        filters = {key: float(task_data[key]) for key in CATALOG_FILTERS if task_data.get(key) is not None}
+        return filters, int(task_data.get("limit") or self.max_results)
+
+    def _filter_mask(self, filters: Dict[str, float]) -> Optional[np.ndarray]:
+        """Boolean mask of the catalog rows that pass the filters, or None."""
+        return filter_mask(self._prices, self._ratings, filters)
+
+    def _search_catalog(self, task_data: Dict[str, Any], query: str, context: str) -> Dict[str, Any]:
+        """Ranks catalog products against the query and the conversation context."""
+        filters, limit = self._search_options(task_data)
+        catalog = self.catalog if self.live_catalog is None else self.live_catalog
+        products: List[Dict[str, Any]] = catalog.search(f"{query} {context}", limit=limit, **filters)
+        return self._catalog_response(task_data, products, "catalog of")
+
+    def _catalog_response(self, task_data: Dict[str, Any], products: List[Dict[str, Any]], method: str) -> Dict[str, Any]:
+        """Formats catalog results like the simulated response, naming the retrieval method."""
+        size = len(self.products) if self.live_catalog is None else len(self.live_catalog)
+        return {
+            "result": "success",
+            "query": task_data.get('query', ''),
+            "context": task_data.get('context', ''),
+            "products": products,
+            "total_found": len(products),
+            "source": f"Product Research Agent ({method} {size} products)"
+        }
+
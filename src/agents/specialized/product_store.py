@@ -0,0 +1,220 @@
+import os
+import sys
+import json
+import math
+import mmap
+import struct
+import logging
+from array import array
+from typing import Any, Dict, Iterable, List, Tuple
+
+try:
+    from .catalog_index import parse_price, read_catalog
+except ImportError:  # Imported as a top-level module with src/agents/specialized on sys.path
+    from catalog_index import parse_price, read_catalog
+
+logger = logging.getLogger(__name__)
+
+# File extension that ProductResearchAgent recognizes as a product store
+STORE_EXTENSION = ".pstore"
+
+_MAGIC = b"PSTORE01"
+# magic, version, reserved, rows, feature references, strings, string bytes
+_HEADER = struct.Struct("<8sIIQQQQ")
+_VERSION = 1
+# String id of an absent name or type
+_NO_STRING = 0xFFFFFFFF
+# Fields with their own columns; everything else is kept as a JSON string
+_COLUMN_FIELDS = ("name", "type", "features", "rating")
+
+
+def _aligned(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _layout(rows: int, feature_refs: int, strings: int) -> Dict[str, Tuple[int, int, str]]:
+    """Byte offset, item count and array typecode of every section of a store file."""
+    sections = [
+        ("prices", rows, "d"),
+        ("ratings", rows, "d"),
+        ("names", rows, "I"),
+        ("types", rows, "I"),
+        ("extras", rows, "I"),
+        ("feature_offsets", rows + 1, "Q"),
+        ("feature_ids", feature_refs, "I"),
+        ("string_offsets", strings + 1, "Q"),
+    ]
+    layout = {}
+    offset = _HEADER.size
+    for name, count, typecode in sections:
+        offset = _aligned(offset)
+        layout[name] = (offset, count, typecode)
+        offset += count * array(typecode).itemsize
+    layout["string_data"] = (_aligned(offset), 0, "B")
+    return layout
+
+
+def write_product_store(path: str, products: Iterable[Any]) -> int:
+    """
+    Writes products to a columnar store file.
+
+    Prices (parsed for filtering) and ratings are float64 columns; names,
+    types, features and a JSON string of the remaining fields live in a
+    deduplicated string pool addressed by offset. The file is written to a
+    temporary name and renamed, so processes that have the previous version
+    mapped keep a consistent view.
+
+    Args:
+        path: Destination file, conventionally ending in STORE_EXTENSION.
+        products: Product dictionaries or their JSON text.
+
+    Returns:
+        The number of products written.
+    """
+    string_ids: Dict[str, int] = {}
+    strings: List[bytes] = []
+
+    def intern(value: str) -> int:
+        string_id = string_ids.get(value)
+        if string_id is None:
+            string_id = string_ids[value] = len(strings)
+            strings.append(value.encode("utf-8"))
+        return string_id
+
+    columns = {name: array(typecode) for name, (_, _, typecode) in _layout(0, 0, 0).items() if name != "string_data"}
+    columns["feature_offsets"].append(0)
+    for product in products:
+        if isinstance(product, str):
+            product = json.loads(product)
+        rating = product.get("rating")
+        numeric_rating = isinstance(rating, (int, float)) and not isinstance(rating, bool)
+        features = product.get("features") or []
+        if isinstance(features, str):
+            features = [features]
+        extras = {key: value for key, value in product.items()
+                  if key not in _COLUMN_FIELDS or (key == "rating" and not numeric_rating)}
+
+        columns["prices"].append(parse_price(product.get("price")))
+        columns["ratings"].append(float(rating) if numeric_rating else math.nan)
+        columns["names"].append(_NO_STRING if product.get("name") is None else intern(str(product["name"])))
+        columns["types"].append(_NO_STRING if product.get("type") is None else intern(str(product["type"])))
+        columns["extras"].append(intern(json.dumps(extras)))
+        columns["feature_ids"].extend(intern(str(feature)) for feature in features)
+        columns["feature_offsets"].append(len(columns["feature_ids"]))
+
+    offset = 0
+    for string in strings:
+        columns["string_offsets"].append(offset)
+        offset += len(string)
+    columns["string_offsets"].append(offset)
+
+    rows = len(columns["prices"])
+    layout = _layout(rows, len(columns["feature_ids"]), len(strings))
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, 0, rows, len(columns["feature_ids"]), len(strings), offset))
+        for name, (section_offset, _, _) in layout.items():
+            f.write(b"\0" * (section_offset - f.tell()))
+            if name == "string_data":
+                for string in strings:
+                    f.write(string)
+            else:
+                columns[name].tofile(f)
+    os.replace(temporary_path, path)
+    logger.info(f"Wrote {rows} products ({len(strings)} distinct strings) to {path}")
+    return rows
+
+
+class ProductStore:
+    """
+    Read-only, memory-mapped columnar product catalog.
+
+    Opening a store parses nothing: the columns are typed views over the
+    mapped file, so every process that opens the same file shares its pages
+    through the OS page cache instead of holding its own copy of the
+    catalog. A product is decoded into a dictionary only when get() is
+    called, i.e. when it is about to be returned.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: A file written by write_product_store().
+
+        Raises:
+            ValueError: If the file is not a product store.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER.size:
+                raise ValueError(f"{path} is not a product store")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, rows, feature_refs, strings, string_bytes = _HEADER.unpack_from(self._mmap)
+        if magic != _MAGIC or version != _VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a product store (version {_VERSION})")
+
+        self._views = []
+        buffer = memoryview(self._mmap)
+        self._views.append(buffer)
+        for name, (offset, count, typecode) in _layout(rows, feature_refs, strings).items():
+            if name == "string_data":
+                view = buffer[offset:offset + string_bytes]
+            else:
+                view = buffer[offset:offset + count * array(typecode).itemsize].cast(typecode)
+            self._views.append(view)
+            setattr(self, f"_{name}", view)
+        self._rows = rows
+        # Public numeric columns, e.g. for filters or numpy.asarray() without copying
+        self.prices = self._prices
+        self.ratings = self._ratings
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def __reduce__(self):
+        # Pickled by path: the unpickling process, e.g. a pool worker, maps the same file
+        return ProductStore, (self.path,)
+
+    def _string(self, string_id: int) -> str:
+        start, end = self._string_offsets[string_id], self._string_offsets[string_id + 1]
+        return str(self._string_data[start:end], "utf-8")
+
+    def get(self, row: int) -> Dict[str, Any]:
+        """Decodes the product stored in a row."""
+        if not 0 <= row < self._rows:
+            raise IndexError(f"Product row {row} out of range")
+        product = json.loads(self._string(self._extras[row]))
+        if self._names[row] != _NO_STRING:
+            product["name"] = self._string(self._names[row])
+        if self._types[row] != _NO_STRING:
+            product["type"] = self._string(self._types[row])
+        rating = self._ratings[row]
+        if not math.isnan(rating):
+            product["rating"] = rating
+        features = self._feature_ids[self._feature_offsets[row]:self._feature_offsets[row + 1]]
+        product["features"] = [self._string(feature_id) for feature_id in features]
+        return product
+
+    def close(self) -> None:
+        """
+        Unmaps the file. Arrays that still share the columns (e.g. numpy
+        views) must be released first.
+        """
+        for view in reversed(self._views):
+            view.release()
+        self._mmap.close()
+
+    def __enter__(self) -> "ProductStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+if __name__ == "__main__":
+    # Convert a JSONL or CSV catalog: python product_store.py catalog.jsonl catalog.pstore
+    if len(sys.argv) != 3:
+        sys.exit(f"usage: {sys.argv[0]} CATALOG.(jsonl|csv) OUTPUT{STORE_EXTENSION}")
+    write_product_store(sys.argv[2], read_catalog(sys.argv[1]))
@@ -0,0 +1,269 @@
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    from ..logging_config import SAMPLED
+except ImportError:  # Imported from a top-level specialized package or module, with src/agents on sys.path
+    from logging_config import SAMPLED
+try:
+    from .catalog_index import parse_price
+except ImportError:  # Imported as a top-level module with src/agents/specialized on sys.path
+    from catalog_index import parse_price
+
+logger = logging.getLogger(__name__)
+
+# Opportunities returned per task unless the task asks for a different limit
+DEFAULT_MAX_RESULTS = 10
+# Share of the price assumed to be the product cost when a product has none
+DEFAULT_COST_RATIO = 0.6
+# Marketplace and payment fees, as a share of the price
+FEE_RATE = 0.15
+# Per-unit shipping and handling cost
+FULFILMENT_COST = 3.0
+# Rating assumed for products without one, on the usual 0-5 scale
+NEUTRAL_RATING = 3.0
+# Price elasticity of demand of a product priced at the median of its set with a neutral rating
+BASE_ELASTICITY = 1.5
+# Bounds of the estimated elasticities
+ELASTICITY_RANGE = (0.3, 4.0)
+# Relative demand change per rating star above or below neutral
+RATING_DEMAND_WEIGHT = 0.6
+# Monthly units sold by a product at the set's median price with a neutral rating and no reviews
+BASE_MONTHLY_UNITS = 50.0
+# Bounds of the suggested price relative to the current price, beyond which the demand curve is not trusted
+SUGGESTED_PRICE_RANGE = (0.5, 2.0)
+# Margin thresholds of the "high" and "medium" profit potential labels
+PROFIT_POTENTIAL_MARGINS = {"high": 0.30, "medium": 0.15}
+
+
+def estimate_sales(prices: np.ndarray, costs: Optional[np.ndarray] = None, ratings: Optional[np.ndarray] = None,
+                   reviews: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Estimates margins, price sensitivity and demand for a whole product set.
+
+    Everything is computed with array operations over the columns, so the
+    cost grows with the number of products but not with Python overhead per
+    product. The model is a deliberately simple heuristic:
+
+    - unit profit is the price less cost, fees (FEE_RATE) and fulfilment;
+    - price elasticity grows with the price relative to the set's median
+      and shrinks with the rating;
+    - demand follows a constant-elasticity curve around the median price,
+      scaled by the rating and by the number of reviews;
+    - the suggested price maximizes unit profit times demand on that curve,
+      within SUGGESTED_PRICE_RANGE of the current price.
+
+    Args:
+        prices: Selling prices. NaN marks an unknown price.
+        costs: Unit costs. NaN, or no column at all, means DEFAULT_COST_RATIO
+            of the price.
+        ratings: Ratings on a 0-5 scale. NaN means NEUTRAL_RATING.
+        reviews: Review counts, used as a popularity signal. NaN means 0.
+
+    Returns:
+        Columns aligned with the input: "cost", "cost_estimated",
+        "unit_profit", "margin", "elasticity", "monthly_units",
+        "monthly_profit", "suggested_price" and "opportunity_score" (0-100
+        relative to the best product of the set). Products without a price
+        get NaN estimates and a score of 0.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    n = len(prices)
+    costs = np.full(n, np.nan) if costs is None else np.asarray(costs, dtype=np.float64)
+    ratings = np.full(n, np.nan) if ratings is None else np.asarray(ratings, dtype=np.float64)
+    reviews = np.zeros(n) if reviews is None else np.asarray(reviews, dtype=np.float64)
+
+    priced = prices > 0
+    cost_estimated = np.isnan(costs)
+    costs = np.where(cost_estimated, prices * DEFAULT_COST_RATIO, costs)
+    ratings = np.where(np.isnan(ratings), NEUTRAL_RATING, np.clip(ratings, 0.0, 5.0))
+    reviews = np.where(np.isnan(reviews), 0.0, np.maximum(reviews, 0.0))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        unit_profit = prices * (1 - FEE_RATE) - costs - FULFILMENT_COST
+        margin = unit_profit / prices
+
+        median_price = np.median(prices[priced]) if priced.any() else np.nan
+        relative_price = prices / median_price
+        elasticity = np.clip(
+            BASE_ELASTICITY * np.sqrt(relative_price) * (1 - 0.1 * (ratings - NEUTRAL_RATING)),
+            *ELASTICITY_RANGE,
+        )
+        monthly_units = (BASE_MONTHLY_UNITS
+                         * np.exp(RATING_DEMAND_WEIGHT * (ratings - NEUTRAL_RATING))
+                         * (1 + np.log1p(reviews))
+                         * relative_price ** -elasticity)
+        monthly_profit = monthly_units * unit_profit
+
+        # argmax of (p (1 - fee) - cost - fulfilment) p^-e; inelastic demand always favors a higher price
+        optimal_price = np.where(
+            elasticity > 1,
+            elasticity * (costs + FULFILMENT_COST) / ((elasticity - 1) * (1 - FEE_RATE)),
+            np.inf,
+        )
+        suggested_price = np.clip(optimal_price, prices * SUGGESTED_PRICE_RANGE[0], prices * SUGGESTED_PRICE_RANGE[1])
+
+    monthly_profit = np.where(priced, monthly_profit, np.nan)
+    best = np.nanmax(monthly_profit) if priced.any() else np.nan
+    if best > 0:
+        opportunity_score = np.clip(np.nan_to_num(monthly_profit, nan=0.0) / best * 100, 0.0, 100.0)
+    else:
+        opportunity_score = np.zeros(n)
+
+    invalid = ~priced
+    return {
+        "cost": np.where(invalid, np.nan, costs),
+        "cost_estimated": cost_estimated,
+        "unit_profit": np.where(invalid, np.nan, unit_profit),
+        "margin": np.where(invalid, np.nan, margin),
+        "elasticity": np.where(invalid, np.nan, elasticity),
+        "monthly_units": np.where(invalid, np.nan, monthly_units),
+        "monthly_profit": monthly_profit,
+        "suggested_price": np.where(invalid, np.nan, suggested_price),
+        "opportunity_score": opportunity_score,
+    }
+
+
+def profit_potential(margin: float) -> str:
+    """Labels a margin as "high", "medium" or "low" (see PROFIT_POTENTIAL_MARGINS)."""
+    for label, threshold in PROFIT_POTENTIAL_MARGINS.items():
+        if margin >= threshold:
+            return label
+    return "low"
+
+
+def _to_float(value: Any) -> float:
+    """Reads a number, or a price string such as "$1,299.99"; NaN if it cannot be read."""
+    if value is None or value == "":
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return float(str(value).replace("$", "").replace(",", ""))
+    except ValueError:
+        return parse_price(value)
+
+
+def product_column(products: Sequence[Dict[str, Any]], keys: Sequence[str]) -> np.ndarray:
+    """
+    Reads the first present field of every product into a float column, NaN
+    where missing. Numeric fields are converted by NumPy in one call; only
+    columns holding strings are parsed value by value.
+    """
+    values = [product.get(keys[0]) for product in products]
+    for key in keys[1:]:
+        if any(value is None for value in values):
+            values = [product.get(key) if value is None else value for value, product in zip(values, products)]
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.fromiter((_to_float(value) for value in values), dtype=np.float64, count=len(values))
+
+
+def _round(value: float, digits: int = 2) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+class SalesOpportunityAgent:
+    """
+    Specialized agent estimating the sales opportunity of candidate products.
+
+    Given the products found by product research (task_data["products"]), it
+    estimates margin, price sensitivity and demand for all of them at once
+    (see estimate_sales) and returns the best opportunities.
+    """
+
+    def __init__(self, max_results: int = DEFAULT_MAX_RESULTS):
+        """
+        Initialize the Sales Opportunity Agent.
+
+        Args:
+            max_results: Opportunities returned per task unless the task sets "limit".
+        """
+        logger.info("Initializing Sales Opportunity Agent")
+        self.max_results = max_results
+
+    def process_task(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Process a sales opportunity task.
+
+        Args:
+            task_data: A dictionary containing the task details: the user's
+                'query' and the candidate 'products', each with a "price"
+                and optionally "cost", "rating" and "reviews" (or
+                "review_count"). An optional 'limit' caps the opportunities
+                returned.
+
+        Returns:
+            A dictionary with the best opportunities, ordered by
+            opportunity score, the overall profit potential (that of the
+            best opportunity) and summary statistics over all products.
+        """
+        query = task_data.get('query', '')
+        products = task_data.get('products') or []
+        limit = int(task_data.get('limit') or self.max_results)
+
+        logger.debug("Processing sales opportunity task: %s (%d products)", query, len(products), extra=SAMPLED)
+
+        estimates = estimate_sales(
+            product_column(products, ("price",)),
+            product_column(products, ("cost", "unit_cost")),
+            product_column(products, ("rating",)),
+            product_column(products, ("reviews", "review_count")),
+        )
+        return self._build_response(task_data, products, estimates, limit)
+
+    def _build_response(self, task_data: Dict[str, Any], products: Sequence[Dict[str, Any]],
+                        estimates: Dict[str, np.ndarray], limit: int) -> Dict[str, Any]:
+        """Formats the top opportunities and set-wide statistics."""
+        scores = estimates["opportunity_score"]
+        priced = ~np.isnan(estimates["margin"])
+        top = self._top(scores, priced, limit)
+
+        opportunities: List[Dict[str, Any]] = []
+        for row in top:
+            product = products[row]
+            opportunities.append({
+                "name": product.get("name"),
+                "price": product.get("price"),
+                "cost": _round(estimates["cost"][row]),
+                "cost_estimated": bool(estimates["cost_estimated"][row]),
+                "unit_profit": _round(estimates["unit_profit"][row]),
+                "margin": _round(estimates["margin"][row], 3),
+                "price_elasticity": _round(estimates["elasticity"][row]),
+                "suggested_price": _round(estimates["suggested_price"][row]),
+                "estimated_monthly_units": _round(estimates["monthly_units"][row], 1),
+                "estimated_monthly_profit": _round(estimates["monthly_profit"][row]),
+                "opportunity_score": _round(scores[row], 1),
+                "profit_potential": profit_potential(estimates["margin"][row]),
+            })
+
+        margins = estimates["margin"][priced]
+        return {
+            "result": "success",
+            "query": task_data.get('query', ''),
+            "context": task_data.get('context', ''),
+            "profit_potential": opportunities[0]["profit_potential"] if opportunities else "unknown",
+            "opportunities": opportunities,
+            "products_analyzed": int(priced.sum()),
+            "summary": {
+                "median_margin": _round(np.median(margins), 3) if len(margins) else None,
+                "profitable_share": _round(np.mean(margins > 0), 3) if len(margins) else None,
+                "mean_price_elasticity": _round(np.mean(estimates["elasticity"][priced])) if len(margins) else None,
+            },
+            "source": f"Sales Opportunity Agent (estimates over {len(products)} products)",
+        }
+
+    @staticmethod
+    def _top(scores: np.ndarray, valid: np.ndarray, limit: int) -> np.ndarray:
+        """Rows of the highest-scoring valid products, best first."""
+        rows = np.flatnonzero(valid)
+        if limit <= 0:
+            return rows[:0]
+        if len(rows) > limit:
+            rows = rows[np.argpartition(-scores[rows], limit - 1)[:limit]]
+        return rows[np.argsort(-scores[rows], kind="stable")]
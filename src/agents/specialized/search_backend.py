@@ -0,0 +1,324 @@
+import abc
+import http.client
+import json
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Seconds a search may take unless the caller passes a timeout
+DEFAULT_SEARCH_TIMEOUT = 5.0
+# Requests in flight at once, hedges included
+DEFAULT_MAX_CONCURRENCY = 8
+# Recent successful latencies kept for the hedge delay
+LATENCY_WINDOW = 512
+# Latencies needed before the hedge delay is derived from them
+MIN_HEDGE_SAMPLES = 20
+# Percentile of recent latencies after which a hedged request is sent
+DEFAULT_HEDGE_PERCENTILE = 95.0
+
+# Errors of a reused keep-alive connection that the server closed while idle
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class SearchError(Exception):
+    """A search backend call failed."""
+
+
+class SearchTimeoutError(SearchError, TimeoutError):
+    """A search backend call did not complete before its deadline."""
+
+
+class SearchBackend(abc.ABC):
+    """
+    External search tool used by the MarketAnalysisAgent.
+
+    Backends return a dictionary with "summary", "trends_found" and
+    "competitors_found" fields, like the agent's simulated search.
+    """
+
+    @abc.abstractmethod
+    def search(self, query: str, context: str = "", timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Runs a search.
+
+        Args:
+            query: The user's request.
+            context: Conversation context.
+            timeout: Seconds the call may take; backend default if None.
+
+        Raises:
+            SearchTimeoutError: If the deadline passes first.
+            SearchError: If the search fails.
+        """
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns backend counters."""
+        return {}
+
+    def close(self) -> None:
+        """Releases connections and threads."""
+
+
+class _RateLimiter:
+    """Token bucket: rate requests per second with bursts of up to burst."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self) -> float:
+        """Takes a token if one is available; otherwise returns the wait for the next one."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self, deadline: float) -> bool:
+        """Waits for a token until the deadline; False if none became available."""
+        while True:
+            delay = self._take()
+            if delay == 0.0:
+                return True
+            if time.monotonic() + delay > deadline:
+                return False
+            time.sleep(delay)
+
+    def try_acquire(self) -> bool:
+        return self._take() == 0.0
+
+
+class _ConnectionPool:
+    """Idle keep-alive connections to one host, most recently used first."""
+
+    def __init__(self, scheme: str, host: str, port: Optional[int], max_idle: int):
+        self._connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        self._host = host
+        self._port = port
+        self._max_idle = max_idle
+        self._idle: List[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+        self.opened = 0
+
+    def acquire(self, timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+        """Returns a connection and whether it was reused."""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+            self.opened += 1
+        return self._connection_class(self._host, self._port, timeout=timeout), False
+
+    def release(self, connection: http.client.HTTPConnection) -> None:
+        with self._lock:
+            if len(self._idle) < self._max_idle:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+class HTTPSearchBackend(SearchBackend):
+    """
+    Search backend that calls an HTTP search service.
+
+    GET {base_url}/search?q=...&context=... must return the result as JSON.
+    Connections are kept alive and reused from a pool, at most
+    max_concurrency requests are in flight at once (hedges included), and
+    an optional token bucket caps the request rate. Every call has a
+    deadline: waiting for a slot, connecting and reading all count against
+    it.
+
+    With hedging, a call still running after the hedge delay (by default the
+    95th percentile of recent latencies) sends one duplicate request and
+    returns whichever response arrives first. That trades a few percent more
+    backend requests for cutting the latency tail that a slow server or
+    connection adds to an otherwise fast call. A hedge is only sent if a
+    concurrency slot and a rate token are free right away, so hedging never
+    queues behind regular traffic.
+    """
+
+    def __init__(self, base_url: str, timeout: float = DEFAULT_SEARCH_TIMEOUT,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY, max_requests_per_second: Optional[float] = None,
+                 hedge: bool = True, hedge_delay: Optional[float] = None,
+                 hedge_percentile: float = DEFAULT_HEDGE_PERCENTILE):
+        """
+        Args:
+            base_url: Root URL of the search service, e.g. http://127.0.0.1:8099.
+            timeout: Default deadline of a call, in seconds.
+            max_concurrency: Requests in flight at once; also the size of the
+                connection pool.
+            max_requests_per_second: Optional cap on the request rate.
+            hedge: Send hedged requests for slow calls.
+            hedge_delay: Fixed hedge delay in seconds, instead of the
+                percentile of recent latencies.
+            hedge_percentile: Percentile of recent latencies used as the
+                hedge delay.
+        """
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Unsupported search backend URL: {base_url}")
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self.hedge_percentile = hedge_percentile
+        self._path = parts.path.rstrip("/") + "/search"
+        self._pool = _ConnectionPool(parts.scheme, parts.hostname, parts.port, max_concurrency)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._rate_limiter = (_RateLimiter(max_requests_per_second, max_concurrency)
+                              if max_requests_per_second else None)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="search-backend")
+        self._latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def search(self, query: str, context: str = "", timeout: Optional[float] = None) -> Dict[str, Any]:
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        target = f"{self._path}?{urlencode({'q': query, 'context': context})}"
+        with self._lock:
+            self.calls += 1
+
+        if self._rate_limiter is not None and not self._rate_limiter.acquire(deadline):
+            self._count("timeouts")
+            raise SearchTimeoutError(f"Search rate limit left no request before the deadline: '{query}'")
+        if not self._slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            self._count("timeouts")
+            raise SearchTimeoutError(f"No free search connection before the deadline: '{query}'")
+        primary = self._executor.submit(self._attempt, target, deadline)
+        attempts = [primary]
+
+        delay = self.current_hedge_delay()
+        if delay is not None:
+            done, _ = wait(attempts, timeout=max(0.0, min(delay, deadline - time.monotonic())))
+            if not done and time.monotonic() < deadline and self._try_hedge_slot():
+                self._count("hedges")
+                attempts.append(self._executor.submit(self._attempt, target, deadline))
+
+        pending = set(attempts)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    if future is not primary:
+                        self._count("hedge_wins")
+                    return future.result()
+                error = future.exception()
+
+        if pending or isinstance(error, SearchTimeoutError):
+            self._count("timeouts")
+            raise SearchTimeoutError(f"Search did not complete before the deadline: '{query}'")
+        self._count("errors")
+        raise error
+
+    def _try_hedge_slot(self) -> bool:
+        if not self._slots.acquire(blocking=False):
+            return False
+        if self._rate_limiter is not None and not self._rate_limiter.try_acquire():
+            self._slots.release()
+            return False
+        return True
+
+    def _attempt(self, target: str, deadline: float) -> Dict[str, Any]:
+        """Sends one request; runs in the executor and holds one concurrency slot."""
+        started = time.monotonic()
+        try:
+            result = self._request(target, deadline)
+        finally:
+            self._slots.release()
+        with self._lock:
+            self._latencies.append(time.monotonic() - started)
+        return result
+
+    def _request(self, target: str, deadline: float) -> Dict[str, Any]:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise SearchTimeoutError("Search deadline passed")
+            connection, reused = self._pool.acquire(remaining)
+            connection.timeout = remaining
+            if connection.sock is not None:
+                connection.sock.settimeout(remaining)
+            try:
+                connection.request("GET", target, headers={"Accept": "application/json"})
+                response = connection.getresponse()
+                body = response.read()
+            except TimeoutError as e:
+                connection.close()
+                raise SearchTimeoutError("Search deadline passed") from e
+            except _STALE_CONNECTION_ERRORS as e:
+                connection.close()
+                if reused:
+                    # The server closed the idle connection; retry on another one
+                    continue
+                raise SearchError(f"Search request failed: {e}") from e
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                raise SearchError(f"Search request failed: {e}") from e
+
+            if response.will_close:
+                connection.close()
+            else:
+                self._pool.release(connection)
+            if response.status != 200:
+                raise SearchError(f"Search request failed with HTTP {response.status}")
+            return json.loads(body)
+
+    def current_hedge_delay(self) -> Optional[float]:
+        """Seconds after which a call is hedged, or None while hedging is off or unwarmed."""
+        if not self.hedge:
+            return None
+        if self.hedge_delay is not None:
+            return self.hedge_delay
+        with self._lock:
+            if len(self._latencies) < MIN_HEDGE_SAMPLES:
+                return None
+            latencies = sorted(self._latencies)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * self.hedge_percentile / 100))]
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns call, hedge, timeout and error counters, and connections opened."""
+        with self._lock:
+            stats = {
+                "calls": self.calls,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "timeouts": self.timeouts,
+                "errors": self.errors,
+                "connections_opened": self._pool.opened,
+            }
+        delay = self.current_hedge_delay()
+        stats["hedge_delay_ms"] = None if delay is None else round(delay * 1000, 1)
+        return stats
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        self._pool.close()
@@ -0,0 +1,233 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Age up to which a cached search is served without refreshing it
+DEFAULT_SOFT_TTL_SECONDS = 3600.0
+# Age after which a cached search is no longer served at all
+DEFAULT_HARD_TTL_SECONDS = 86400.0
+DEFAULT_MAX_ENTRIES = 10000
+# Background refreshes that run at the same time
+DEFAULT_REFRESH_WORKERS = 4
+
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+
+class SearchCache:
+    """
+    Persistent stale-while-revalidate cache for search results, backed by SQLite.
+
+    A result younger than the soft TTL is served as is. Between the soft and
+    the hard TTL it is still served immediately, and one refresh per key runs
+    in the background so that later callers get fresh data. Past the hard TTL
+    the caller waits for a new search. Results are stored as JSON with their
+    wall-clock write time, so a restarted process, or a new instance that
+    opens the same file, starts warm.
+    """
+
+    def __init__(self, path: str, soft_ttl_seconds: float = DEFAULT_SOFT_TTL_SECONDS,
+                 hard_ttl_seconds: float = DEFAULT_HARD_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 refresh_workers: int = DEFAULT_REFRESH_WORKERS, prune_interval: int = 256,
+                 clock: Callable[[], float] = time.time):
+        """
+        Args:
+            path: Path of the SQLite database file.
+            soft_ttl_seconds: Age after which a hit triggers a background refresh.
+            hard_ttl_seconds: Age after which a hit is treated as a miss.
+            max_entries: Maximum number of results kept after a prune.
+            refresh_workers: Threads running background refreshes.
+            prune_interval: Number of writes between eviction passes.
+            clock: Time source, injectable for tests.
+
+        Raises:
+            ValueError: If the soft TTL is longer than the hard TTL.
+        """
+        if soft_ttl_seconds > hard_ttl_seconds:
+            raise ValueError(f"Soft TTL ({soft_ttl_seconds}s) must not exceed hard TTL ({hard_ttl_seconds}s)")
+        self.path = path
+        self.soft_ttl_seconds = soft_ttl_seconds
+        self.hard_ttl_seconds = hard_ttl_seconds
+        self.max_entries = max_entries
+        self.prune_interval = prune_interval
+        self._clock = clock
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._refreshing: Set[str] = set()
+        self._refresh_pool = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="search-refresh")
+        self.fresh_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS search_results ("
+            " search_key TEXT PRIMARY KEY,"
+            " result TEXT NOT NULL,"
+            " stored_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS search_results_stored_at ON search_results (stored_at)")
+        logger.info(f"Opened search cache at {path}")
+
+    def lookup(self, key: str) -> Tuple[str, Any]:
+        """
+        Looks up a search.
+
+        Returns:
+            A (state, result) tuple where state is FRESH, STALE or MISS; the
+            result is None on a miss.
+        """
+        now = self._clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, stored_at FROM search_results WHERE search_key = ?", (key,)
+            ).fetchone()
+            age = None if row is None else now - row[1]
+            if age is None or age >= self.hard_ttl_seconds:
+                self.misses += 1
+                return MISS, None
+            if age < self.soft_ttl_seconds:
+                self.fresh_hits += 1
+                state = FRESH
+            else:
+                self.stale_hits += 1
+                state = STALE
+        return state, json.loads(row[0])
+
+    def store(self, key: str, result: Any) -> None:
+        """Stores a search result, stamped with the current time."""
+        now = self._clock()
+        value = json.dumps(result)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_results (search_key, result, stored_at) VALUES (?, ?, ?)",
+                (key, value, now)
+            )
+            self._writes += 1
+            if self._writes % self.prune_interval == 0:
+                self._prune(now)
+
+    def fetch(self, key: str, search: Callable[[], Any], refresh: Optional[Callable[[], Any]] = None) -> Any:
+        """
+        Returns the result of a search, serving it from the cache when possible.
+
+        Args:
+            key: Identifies equivalent searches.
+            search: Zero-argument function that runs the search.
+            refresh: Zero-argument function used for background refreshes,
+                e.g. one that is not bound by the caller's deadline.
+                Defaults to search.
+
+        Returns:
+            The cached or newly searched result.
+        """
+        state, result = self.lookup(key)
+        if state == STALE and self._claim_refresh(key):
+            self._refresh_pool.submit(self._refresh, key, refresh or search)
+        if state != MISS:
+            return result
+        result = search()
+        self.store(key, result)
+        return result
+
+    async def fetch_async(self, key: str, search: Callable[[], Awaitable[Any]],
+                          refresh: Optional[Callable[[], Awaitable[Any]]] = None) -> Any:
+        """
+        Async variant of fetch().
+
+        Background refreshes run on the cache's refresh threads, each on its
+        own event loop, not as tasks on the caller's loop: sync callers run
+        that loop with asyncio.run, which would cancel a pending refresh as
+        soon as the request finishes.
+
+        Args:
+            key: Identifies equivalent searches.
+            search: Zero-argument coroutine function that runs the search.
+            refresh: Zero-argument coroutine function used for background
+                refreshes. Defaults to search.
+
+        Returns:
+            The cached or newly searched result.
+        """
+        state, result = self.lookup(key)
+        if state == STALE and self._claim_refresh(key):
+            refresh = refresh or search
+            self._refresh_pool.submit(self._refresh, key, lambda: asyncio.run(refresh()))
+        if state != MISS:
+            return result
+        result = await search()
+        self.store(key, result)
+        return result
+
+    def _claim_refresh(self, key: str) -> bool:
+        """Marks a key as being refreshed; False if a refresh is already running."""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            self.refreshes += 1
+            return True
+
+    def _refresh(self, key: str, search: Callable[[], Any]) -> None:
+        try:
+            self.store(key, search())
+        except Exception as e:
+            self._refresh_failed(key, e)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _refresh_failed(self, key: str, error: Exception) -> None:
+        # The stale result keeps being served until the hard TTL
+        with self._lock:
+            self.refresh_failures += 1
+        logger.warning(f"Background refresh failed for search '{key}': {error}")
+
+    def _prune(self, now: float) -> None:
+        self._conn.execute("DELETE FROM search_results WHERE stored_at <= ?", (now - self.hard_ttl_seconds,))
+        self._conn.execute(
+            "DELETE FROM search_results WHERE search_key IN ("
+            " SELECT search_key FROM search_results ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def prune(self) -> None:
+        """Drops results past the hard TTL and enforces max_entries immediately."""
+        with self._lock:
+            self._prune(self._clock())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM search_results").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit, miss and refresh counters."""
+        with self._lock:
+            return {
+                "fresh_hits": self.fresh_hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+                "refresh_failures": self.refresh_failures,
+            }
+
+    def close(self) -> None:
+        """Waits for background refreshes, then closes the database."""
+        self._refresh_pool.shutdown(wait=True)
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,167 @@
+import argparse
+import json
+import logging
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+try:
+    from .market_analysis import simulated_search_results
+except ImportError:  # Imported as a top-level module with src/agents/specialized on sys.path
+    from market_analysis import simulated_search_results
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyDistribution:
+    """
+    Service time of the stand-in search server.
+
+    Most requests take a log-normally distributed time around a median; a
+    tail_probability share of them are stragglers that take tail_seconds on
+    top (a cold shard, a GC pause, a retransmit). That tail is what hedged
+    requests are meant to cut.
+    """
+
+    def __init__(self, median_seconds: float = 0.02, sigma: float = 0.25, tail_probability: float = 0.0,
+                 tail_seconds: float = 0.5, seed: Optional[int] = None):
+        """
+        Args:
+            median_seconds: Median service time.
+            sigma: Spread of the log-normal body.
+            tail_probability: Share of requests that are stragglers.
+            tail_seconds: Extra time a straggler takes.
+            seed: Seed for reproducible runs.
+        """
+        self.median_seconds = median_seconds
+        self.sigma = sigma
+        self.tail_probability = tail_probability
+        self.tail_seconds = tail_seconds
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        """Draws the service time of one request, in seconds."""
+        with self._lock:
+            latency = self._random.lognormvariate(math.log(self.median_seconds), self.sigma)
+            if self._random.random() < self.tail_probability:
+                latency += self.tail_seconds
+        return latency
+
+
+class _SearchHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so that clients can reuse connections
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; don't let Nagle hold the body back
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.stub._count("connections")
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path.rstrip("/") != "/search":
+            self._reply(404, {"error": f"Unknown path {url.path}"})
+            return
+        params = parse_qs(url.query)
+        query = params.get("q", [""])[0]
+        context = params.get("context", [""])[0]
+        stub = self.server.stub
+        stub._count("requests")
+        time.sleep(stub.latency.sample())
+        self._reply(200, simulated_search_results(query, context))
+
+    def _reply(self, status: int, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up (deadline) or a hedged request won elsewhere
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        # Per-request access logs would dominate load tests
+        pass
+
+
+class StubSearchServer:
+    """
+    Local stand-in for the external search service, for tests and benchmarks.
+
+    Serves GET /search?q=...&context=... with the same results as the
+    MarketAnalysisAgent's simulated search, after a delay drawn from a
+    LatencyDistribution.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: Optional[LatencyDistribution] = None):
+        """
+        Args:
+            host: Interface to listen on.
+            port: Port to listen on; 0 picks a free one.
+            latency: Service time distribution; any object with a sample()
+                method returning seconds. Defaults to LatencyDistribution().
+        """
+        self.latency = latency or LatencyDistribution()
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _SearchHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def start(self) -> "StubSearchServer":
+        """Serves requests on a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={"poll_interval": 0.05},
+                                        name="stub-search-server", daemon=True)
+        self._thread.start()
+        logger.info(f"Stub search server listening on {self.url}")
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "StubSearchServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in search server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--median-ms", type=float, default=20.0, help="median service time")
+    parser.add_argument("--sigma", type=float, default=0.25, help="spread of the log-normal body")
+    parser.add_argument("--tail-probability", type=float, default=0.0, help="share of straggler requests")
+    parser.add_argument("--tail-ms", type=float, default=500.0, help="extra time of a straggler")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    server = StubSearchServer(args.host, args.port, LatencyDistribution(
+        args.median_ms / 1000, args.sigma, args.tail_probability, args.tail_ms / 1000))
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,167 @@
+import asyncio
+import contextvars
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    """A call in progress that later callers with the same key wait on."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the function; callers that arrive while it
+    is in flight wait for it and receive the same result (or exception).
+    Works for threads via do() and for coroutines via do_async(); the two
+    paths do not coalesce with each other. Each caller may bound its own
+    wait with a timeout, independently of the shared call and of the other
+    callers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._async_flights: Dict[Tuple[int, Hashable], asyncio.Future] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.calls = 0
+        self.executions = 0
+
+    @property
+    def coalesced(self) -> int:
+        """Number of calls that were served by another call's execution."""
+        return self.calls - self.executions
+
+    def do(self, key: Hashable, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """
+        Runs fn once per key across concurrent callers.
+
+        Args:
+            key: Identifies equivalent calls.
+            fn: Zero-argument function producing the result.
+            timeout: Seconds this caller waits for the result; None waits
+                until the call completes. It bounds only this caller's wait,
+                not the shared call, which other callers may still be
+                waiting on. A leader with a timeout runs fn on its own
+                thread so that its wait is bounded too.
+
+        Returns:
+            The result of the (possibly shared) execution.
+
+        Raises:
+            TimeoutError: If the result is not available within timeout.
+        """
+        with self._lock:
+            self.calls += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+                self.executions += 1
+
+        if leader and timeout is None:
+            self._run(key, flight, fn)
+        elif leader:
+            # The call continues the leader's trace in its own context copy
+            context = contextvars.copy_context()
+            threading.Thread(target=context.run, args=(self._run, key, flight, fn),
+                             name="single-flight", daemon=True).start()
+
+        if not flight.done.wait(timeout):
+            raise TimeoutError(f"Call for '{key}' did not complete within {timeout:.3f}s")
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def _run(self, key: Hashable, flight: _Flight, fn: Callable[[], Any]) -> None:
+        try:
+            flight.result = fn()
+        except BaseException as e:
+            flight.error = e
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]], timeout: Optional[float] = None) -> Any:
+        """
+        Awaits fn() once per key across concurrent coroutines on the same loop.
+
+        The call runs as a task of its own rather than in the first caller,
+        so cancelling any caller, the first one included, only stops that
+        caller's wait; the others still receive the result.
+
+        Args:
+            key: Identifies equivalent calls.
+            fn: Zero-argument coroutine function producing the result.
+            timeout: Seconds this caller waits for the result; None waits
+                until the call completes. It bounds only this caller's wait.
+
+        Returns:
+            The result of the (possibly shared) execution.
+
+        Raises:
+            TimeoutError: If the result is not available within timeout.
+        """
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        with self._lock:
+            self.calls += 1
+            future = self._async_flights.get(flight_key)
+            leader = future is None
+            if leader:
+                future = loop.create_future()
+                self._async_flights[flight_key] = future
+                self.executions += 1
+
+        if leader:
+            task = loop.create_task(self._run_async(flight_key, future, fn))
+            # The loop only keeps weak references to its tasks
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        try:
+            # shield() so that a caller's cancellation or timeout doesn't cancel the shared call
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            if future.done():
+                # The shared call itself raised a TimeoutError
+                raise
+            raise TimeoutError(f"Call for '{key}' did not complete within {timeout:.3f}s") from None
+
+    async def _run_async(self, flight_key: Tuple[int, Hashable], future: asyncio.Future,
+                         fn: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            future.set_result(await fn())
+        except asyncio.CancelledError:
+            # Only the loop shutting down cancels the call; waiting callers get an ordinary error
+            future.set_exception(RuntimeError(f"Call for '{flight_key[1]}' was cancelled"))
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved in case no caller is waiting any more
+            future.exception()
+        finally:
+            with self._lock:
+                del self._async_flights[flight_key]
+
+    def stats(self) -> Dict[str, int]:
+        """Returns call, execution and coalesced counters."""
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,216 @@
+import logging
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from .catalog_index import tokenize
+except ImportError:  # Imported as a top-level module with src/agents/specialized on sys.path
+    from catalog_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIMENSIONS = 384
+# Character n-gram sizes hashed for every token, in addition to the token itself
+DEFAULT_NGRAM_SIZES = (3, 4)
+# Weight of a whole-token feature relative to one character n-gram
+WORD_FEATURE_WEIGHT = 2.0
+# Rows scored per matrix multiply; bounds the temporary score matrix
+SEARCH_CHUNK_ROWS = 65536
+# Texts embedded per batch when building a store
+BUILD_BATCH_SIZE = 4096
+
+
+def product_text(product: Dict[str, Any]) -> str:
+    """Text embedded for a product: its name, type and features."""
+    features = product.get("features") or []
+    if isinstance(features, (list, tuple)):
+        features = " ".join(str(feature) for feature in features)
+    return f"{product.get('name', '')} {product.get('type', '')} {features}"
+
+
+class HashedNgramEmbedder:
+    """
+    Deterministic local text embedding based on feature hashing.
+
+    Every token and its character n-grams are hashed (CRC32, so the result is
+    the same in every process) into a fixed number of signed buckets, and
+    the vector is L2-normalized. Texts that share words or word fragments get
+    a high cosine similarity, with no model download or network call.
+    """
+
+    def __init__(self, dimensions: int = DEFAULT_DIMENSIONS, ngram_sizes: Sequence[int] = DEFAULT_NGRAM_SIZES):
+        """
+        Args:
+            dimensions: Length of the embedding vectors.
+            ngram_sizes: Character n-gram sizes hashed for every token.
+        """
+        self.dimensions = dimensions
+        self.ngram_sizes = tuple(ngram_sizes)
+
+    def _features(self, text: str) -> Tuple[List[int], List[float]]:
+        """Returns the bucket and signed weight of every feature of a text."""
+        buckets, weights = [], []
+        dimensions = self.dimensions
+        for token in tokenize(text):
+            hashed = zlib.crc32(token.encode())
+            buckets.append(hashed % dimensions)
+            weights.append(WORD_FEATURE_WEIGHT if hashed & 0x80000000 else -WORD_FEATURE_WEIGHT)
+            padded = f"<{token}>"
+            for size in self.ngram_sizes:
+                for start in range(len(padded) - size + 1):
+                    hashed = zlib.crc32(padded[start:start + size].encode())
+                    buckets.append(hashed % dimensions)
+                    weights.append(1.0 if hashed & 0x80000000 else -1.0)
+        return buckets, weights
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Embeds texts into a (len(texts), dimensions) float32 matrix of unit rows.
+
+        Texts without any features map to the zero vector.
+        """
+        rows, buckets, weights = [], [], []
+        for row, text in enumerate(texts):
+            text_buckets, text_weights = self._features(text)
+            rows.extend([row] * len(text_buckets))
+            buckets.extend(text_buckets)
+            weights.extend(text_weights)
+
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        np.add.at(matrix, (np.asarray(rows, dtype=np.intp), np.asarray(buckets, dtype=np.intp)),
+                  np.asarray(weights, dtype=np.float32))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+
+class VectorStore:
+    """
+    Dense-vector retrieval over a matrix of unit-length embeddings.
+
+    Cosine similarity is one matrix multiply per batch of queries, computed
+    in row chunks so that memory stays bounded, and the top k of every query
+    is selected with argpartition. The matrix can be saved as a .npy file
+    and opened memory-mapped, so that it is neither parsed nor copied at
+    startup and processes share its pages.
+    """
+
+    def __init__(self, matrix: np.ndarray, embedder: Optional[HashedNgramEmbedder] = None):
+        """
+        Args:
+            matrix: (rows, dimensions) float32 embeddings with unit-length rows.
+            embedder: Embeds query text. Defaults to a HashedNgramEmbedder of
+                the matrix's dimensionality.
+
+        Raises:
+            ValueError: If the matrix is not two-dimensional or does not match
+                the embedder's dimensionality.
+        """
+        if matrix.ndim != 2:
+            raise ValueError(f"Embedding matrix must be two-dimensional, got shape {matrix.shape}")
+        self.matrix = matrix
+        self.embedder = embedder or HashedNgramEmbedder(dimensions=matrix.shape[1])
+        if self.embedder.dimensions != matrix.shape[1]:
+            raise ValueError(f"Embedder produces {self.embedder.dimensions} dimensions, "
+                             f"matrix has {matrix.shape[1]}")
+
+    @classmethod
+    def build(cls, texts: Iterable[str], embedder: Optional[HashedNgramEmbedder] = None) -> "VectorStore":
+        """Embeds texts into a new store; row i holds the i-th text."""
+        embedder = embedder or HashedNgramEmbedder()
+        chunks, batch = [], []
+        for text in texts:
+            batch.append(text)
+            if len(batch) == BUILD_BATCH_SIZE:
+                chunks.append(embedder.embed(batch))
+                batch = []
+        chunks.append(embedder.embed(batch))
+        return cls(np.concatenate(chunks), embedder)
+
+    @classmethod
+    def load(cls, path: str, embedder: Optional[HashedNgramEmbedder] = None, mmap: bool = True) -> "VectorStore":
+        """
+        Opens a matrix saved with save().
+
+        Args:
+            path: The .npy file.
+            embedder: Must match the embedder that built the matrix.
+            mmap: Map the file read-only instead of reading it into memory.
+        """
+        matrix = np.load(path, mmap_mode="r" if mmap else None)
+        logger.info(f"Loaded {matrix.shape[0]} embeddings of {matrix.shape[1]} dimensions from {path}")
+        return cls(matrix, embedder)
+
+    def save(self, path: str) -> None:
+        """Writes the matrix as a .npy file."""
+        np.save(path, np.ascontiguousarray(self.matrix, dtype=np.float32))
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    def __reduce__(self):
+        if isinstance(self.matrix, np.memmap) and self.matrix.filename:
+            # Pickled by path: the unpickling process, e.g. a pool worker, maps the same file
+            return _load_mapped, (self.matrix.filename, self.embedder)
+        return VectorStore, (self.matrix, self.embedder)
+
+    def search(self, query: str, k: int = 10, mask: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """Returns the k rows most similar to the query; see search_vectors."""
+        return self.search_batch([query], k, mask)[0]
+
+    def search_batch(self, queries: Sequence[str], k: int = 10,
+                     mask: Optional[np.ndarray] = None) -> List[List[Tuple[int, float]]]:
+        """Searches many queries with one matrix multiply per chunk; see search_vectors."""
+        return self.search_vectors(self.embedder.embed(queries), k, mask)
+
+    def search_vectors(self, vectors: np.ndarray, k: int = 10,
+                       mask: Optional[np.ndarray] = None) -> List[List[Tuple[int, float]]]:
+        """
+        Finds the rows with the highest cosine similarity to each vector.
+
+        Args:
+            vectors: (queries, dimensions) unit-length query embeddings.
+            k: Results per query.
+            mask: Optional boolean array over the rows; False rows are skipped.
+
+        Returns:
+            For each query, up to k (row, similarity) pairs, most similar
+            first. Only rows with a positive similarity are returned.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        rows = len(self)
+        if k <= 0 or rows == 0 or len(vectors) == 0:
+            return [[] for _ in range(len(vectors))]
+
+        candidate_scores, candidate_rows = [], []
+        for start in range(0, rows, SEARCH_CHUNK_ROWS):
+            end = min(start + SEARCH_CHUNK_ROWS, rows)
+            scores = vectors @ np.asarray(self.matrix[start:end]).T
+            if mask is not None:
+                scores[:, ~mask[start:end]] = -np.inf
+            chunk_k = min(k, end - start)
+            top = np.argpartition(scores, -chunk_k, axis=1)[:, -chunk_k:]
+            candidate_scores.append(np.take_along_axis(scores, top, axis=1))
+            candidate_rows.append(top + start)
+
+        scores = np.concatenate(candidate_scores, axis=1)
+        rows_found = np.concatenate(candidate_rows, axis=1)
+        if scores.shape[1] > k:
+            top = np.argpartition(scores, -k, axis=1)[:, -k:]
+            scores = np.take_along_axis(scores, top, axis=1)
+            rows_found = np.take_along_axis(rows_found, top, axis=1)
+        order = np.argsort(-scores, axis=1, kind="stable")
+        scores = np.take_along_axis(scores, order, axis=1)
+        rows_found = np.take_along_axis(rows_found, order, axis=1)
+
+        return [
+            [(int(row), float(score)) for row, score in zip(query_rows, query_scores) if score > 0]
+            for query_rows, query_scores in zip(rows_found, scores)
+        ]
+
+
+def _load_mapped(path: str, embedder: HashedNgramEmbedder) -> VectorStore:
+    """Unpickles a memory-mapped VectorStore by mapping its file again."""
+    return VectorStore(np.load(path, mmap_mode="r"), embedder)
@@ -0,0 +1,103 @@
+import json
+import logging
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+import flask
+
+try:
+    from .service import get_orchestrator
+except ImportError:  # Imported as a top-level module with src/agents on sys.path
+    from service import get_orchestrator
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+SSE_MIMETYPE = "text/event-stream"
+
+
+def format_ndjson(event: Dict[str, Any]) -> str:
+    """Encodes an event as one line of newline-delimited JSON."""
+    return json.dumps(event, default=str) + "\n"
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Encodes an event as a Server-Sent Events message named after its type."""
+    return f"event: {event.get('event', 'message')}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+def wants_sse(accept_header: Optional[str]) -> bool:
+    """Returns True if the client asked for Server-Sent Events."""
+    return SSE_MIMETYPE in (accept_header or "")
+
+
+def stream_events(events: Iterable[Dict[str, Any]], sse: bool) -> flask.Response:
+    """
+    Wraps an event iterator in a streaming response.
+
+    Each event is written and flushed as soon as it is produced, so the caller
+    sees the fastest agent's result without waiting for the slowest one.
+
+    Args:
+        events: The events to send.
+        sse: Encode as Server-Sent Events instead of NDJSON.
+
+    Returns:
+        A streaming Flask response.
+    """
+    encode = format_sse if sse else format_ndjson
+
+    def generate() -> Iterator[str]:
+        try:
+            for event in events:
+                yield encode(event)
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band
+            logger.error(f"Streaming failed: {e}")
+            yield encode({"event": "error", "status": "error", "message": str(e)})
+
+    response = flask.Response(generate(), mimetype=SSE_MIMETYPE if sse else NDJSON_MIMETYPE)
+    # Stop proxies such as nginx from buffering the stream
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+def create_streaming_blueprint(orchestrator_factory: Callable[[], Any] = get_orchestrator) -> flask.Blueprint:
+    """
+    Creates the blueprint exposing the orchestrator's streaming endpoints.
+
+    POST /stream routes one request ({"query", "request_id"}) and POST
+    /workflow/stream runs the full workflow ({"query"}). Responses are NDJSON
+    unless the Accept header asks for text/event-stream.
+
+    Args:
+        orchestrator_factory: Returns the orchestrator serving the requests.
+
+    Returns:
+        A Flask blueprint.
+    """
+    blueprint = flask.Blueprint("streaming", __name__)
+
+    def read_query() -> Optional[Dict[str, Any]]:
+        data = flask.request.get_json(silent=True)
+        if not data or not data.get("query"):
+            return None
+        return data
+
+    @blueprint.route("/stream", methods=["POST"])
+    def stream_request():
+        data = read_query()
+        if data is None:
+            return flask.jsonify({"error": "Request body must include a 'query'"}), 400
+        events = orchestrator_factory().route_request_stream(data["query"], data.get("request_id"))
+        return stream_events(events, wants_sse(flask.request.headers.get("Accept")))
+
+    @blueprint.route("/workflow/stream", methods=["POST"])
+    def stream_workflow():
+        data = read_query()
+        if data is None:
+            return flask.jsonify({"error": "Request body must include a 'query'"}), 400
+        events = orchestrator_factory().execute_workflow_stream(data["query"])
+        return stream_events(events, wants_sse(flask.request.headers.get("Accept")))
+
+    return blueprint
@@ -0,0 +1,248 @@
+import bisect
+import contextvars
+import logging
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+DEFAULT_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+# Finished spans kept by the in-memory exporter
+MAX_FINISHED_SPANS = 2048
+
+# Span statuses, as in OpenTelemetry
+STATUS_UNSET = "UNSET"
+STATUS_OK = "OK"
+STATUS_ERROR = "ERROR"
+
+# Span attribute that labels latency histograms, e.g. the delegated agent
+HISTOGRAM_LABEL = "agent"
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """
+    A timed operation within a trace.
+
+    Follows the OpenTelemetry data model: 128-bit trace ids and 64-bit span
+    ids in hex, a parent span id, string-keyed attributes, a status and
+    nanosecond start and end timestamps.
+    """
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.status = STATUS_UNSET
+        self.status_description: Optional[str] = None
+        self.start_time_ns = time.time_ns()
+        self.end_time_ns: Optional[int] = None
+        self._started = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_status(self, status: str, description: Optional[str] = None) -> None:
+        self.status = status
+        self.status_description = description
+
+    def end(self) -> None:
+        self.duration_ms = (time.perf_counter() - self._started) * 1000
+        self.end_time_ns = self.start_time_ns + int(self.duration_ms * 1e6)
+
+    @property
+    def traceparent(self) -> str:
+        """W3C Trace Context header value that continues this span's trace."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the span with OTLP JSON field names."""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "startTimeUnixNano": self.start_time_ns,
+            "endTimeUnixNano": self.end_time_ns,
+            "attributes": dict(self.attributes),
+            "status": {"code": self.status, "message": self.status_description or ""},
+        }
+
+
+class InMemorySpanExporter:
+    """Keeps the most recent finished spans in a bounded buffer."""
+
+    def __init__(self, max_spans: int = MAX_FINISHED_SPANS):
+        self._spans: deque = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    def get_finished_spans(self, trace_id: Optional[str] = None) -> List[Span]:
+        """Returns finished spans, oldest first, optionally of one trace."""
+        with self._lock:
+            spans = list(self._spans)
+        if trace_id is not None:
+            spans = [span for span in spans if span.trace_id == trace_id]
+        return spans
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+class LatencyHistogram:
+    """Cumulative-bucket latency histogram, in milliseconds."""
+
+    def __init__(self, buckets_ms: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        # One count per bucket plus the overflow bucket
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets_ms, value_ms)] += 1
+        self.count += 1
+        self.sum_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Estimates a percentile as the upper bound of the bucket it falls in
+        (the largest observation for the overflow bucket).
+        """
+        if self.count == 0:
+            return None
+        rank = self.count * q / 100
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.buckets_ms[index] if index < len(self.buckets_ms) else self.max_ms
+        return self.max_ms
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.sum_ms / self.count, 3) if self.count else None,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+class Tracer:
+    """
+    Lightweight in-process tracer.
+
+    span() opens a child of the current span (tracked in a context variable,
+    so it follows asyncio tasks and context-copying thread hand-offs) or
+    starts a new trace. Finished spans go to the exporter, and their
+    durations to a latency histogram per span name and "agent" attribute.
+    """
+
+    def __init__(self, exporter: Optional[InMemorySpanExporter] = None,
+                 buckets_ms: Sequence[float] = DEFAULT_BUCKETS_MS):
+        """
+        Args:
+            exporter: Receives finished spans. Defaults to a new
+                InMemorySpanExporter.
+            buckets_ms: Upper bounds of the latency histogram buckets.
+        """
+        self.exporter = exporter if exporter is not None else InMemorySpanExporter()
+        self.buckets_ms = tuple(buckets_ms)
+        self._histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """
+        Times the enclosed block as a span.
+
+        An exception escaping the block marks the span as an error and is
+        re-raised.
+
+        Args:
+            name: Operation name, e.g. "delegate" or "tool.search".
+            **attributes: Span attributes.
+
+        Yields:
+            The open span.
+        """
+        parent = _current_span.get()
+        trace_id = parent.trace_id if parent is not None else f"{random.getrandbits(128):032x}"
+        span = Span(name, trace_id, parent.span_id if parent is not None else None, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_status(STATUS_ERROR, f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+            self._record(span)
+
+    def _record(self, span: Span) -> None:
+        key = (span.name, str(span.attributes.get(HISTOGRAM_LABEL, "")))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LatencyHistogram(self.buckets_ms)
+            histogram.observe(span.duration_ms)
+        self.exporter.export(span)
+
+    @staticmethod
+    def current_span() -> Optional[Span]:
+        """Returns the span open in the current context, if any."""
+        return _current_span.get()
+
+    def latency_summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns count, mean and estimated percentiles per span name, and per
+        "name{agent}" for spans labelled with an agent.
+        """
+        with self._lock:
+            return {
+                f"{name}{{{label}}}" if label else name: histogram.summary()
+                for (name, label), histogram in sorted(self._histograms.items())
+            }
+
+    def render_prometheus(self) -> str:
+        """Renders the latency histograms in the Prometheus text format."""
+        metric = "agent_span_duration_seconds"
+        lines = [
+            f"# HELP {metric} Duration of traced operations.",
+            f"# TYPE {metric} histogram",
+        ]
+        with self._lock:
+            for (name, label), histogram in sorted(self._histograms.items()):
+                labels = f'span="{name}"' + (f',{HISTOGRAM_LABEL}="{label}"' if label else "")
+                cumulative = 0
+                for bound, count in zip(self.buckets_ms + (float("inf"),), histogram.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound / 1000)
+                    lines.append(f'{metric}_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f"{metric}_sum{{{labels}}} {histogram.sum_ms / 1000}")
+                lines.append(f"{metric}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Drops all histograms and finished spans."""
+        with self._lock:
+            self._histograms.clear()
+        self.exporter.clear()
@@ -0,0 +1,295 @@
+import asyncio
+import copy
+import hashlib
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+try:
+    from .result_cache import TTLCache, normalize_task_data, restore_echoed_fields
+except ImportError:  # Imported as a top-level module with src/agents on sys.path
+    from result_cache import TTLCache, normalize_task_data, restore_echoed_fields
+
+logger = logging.getLogger(__name__)
+
+# Stage statuses reported in the workflow result
+STAGE_SUCCESS = "success"
+STAGE_ERROR = "error"
+STAGE_SKIPPED = "skipped"
+STAGE_TIMED_OUT = "timed_out"
+
+# Catalog filters understood by the ProductResearchAgent, passed as workflow params
+CATALOG_FILTERS = ("min_price", "max_price", "min_rating")
+
+# Signature of the callable the engine uses to run one stage on an agent
+StageRunner = Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class WorkflowStage:
+    """
+    A single step of a workflow: the agent that runs it and the stages it consumes.
+    """
+
+    def __init__(self, name: str, agent_type: str, inputs: Sequence[str] = (),
+                 build_task: Optional[Callable[[str, Dict[str, Any]], Dict[str, Any]]] = None,
+                 result_key: Optional[str] = None,
+                 extract_result: Optional[Callable[[Dict[str, Any]], Any]] = None,
+                 key_fields: Optional[Sequence[str]] = None, params: Sequence[str] = (),
+                 refresh_output: Optional[Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]]] = None,
+                 optional_inputs: Sequence[str] = ()):
+        """
+        Args:
+            name: Unique stage name within the workflow.
+            agent_type: Name of the registered agent that runs this stage.
+            inputs: Names of the stages whose outputs this stage needs.
+            optional_inputs: Names of the stages whose outputs this stage
+                uses when available. The stage waits for them, but runs
+                without their output if they do not succeed.
+            build_task: Builds the agent's task_data from the query and the
+                outputs of the input stages. Defaults to the query plus each
+                input stage's output under its stage name.
+            result_key: Key under which this stage's result appears in the
+                workflow result. Defaults to the stage name.
+            extract_result: Picks the part of the agent output stored under
+                result_key. Defaults to the whole output.
+            key_fields: The task_data fields the agent's output depends on,
+                hashed to memoize the stage (see WorkflowEngine). Defaults to
+                the whole task.
+            params: Names of the workflow params (see WorkflowEngine.run)
+                added to this stage's task.
+            refresh_output: Called with (memoized output, current task) when
+                the stage is reused, to recompute the output fields derived
+                from task fields outside key_fields.
+        """
+        self.name = name
+        self.agent_type = agent_type
+        self.inputs = tuple(inputs) + tuple(optional_inputs)
+        self.optional_inputs = tuple(optional_inputs)
+        self.build_task = build_task or _default_task
+        self.result_key = result_key or name
+        self.extract_result = extract_result or (lambda output: output)
+        self.key_fields = tuple(key_fields) if key_fields is not None else None
+        self.params = tuple(params)
+        self.refresh_output = refresh_output
+
+    def input_hash(self, task_data: Dict[str, Any]) -> str:
+        """
+        Returns the content hash of the task under which the stage's output
+        is memoized: the agent type and the normalized key fields, so that
+        tasks differing only in case, whitespace or fields the agent ignores
+        share a hash.
+        """
+        if self.key_fields is not None:
+            task_data = {key: task_data[key] for key in self.key_fields if key in task_data}
+        content = f"{self.agent_type}\n{normalize_task_data(task_data)}"
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _default_task(query: str, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    task_data = {"query": query}
+    task_data.update(inputs)
+    return task_data
+
+
+class WorkflowEngine:
+    """
+    Runs workflow stages as a DAG: every stage starts as soon as all of its
+    inputs are available, so independent stages run concurrently and the
+    end-to-end latency follows the critical path.
+
+    With a stage cache, every successful stage output is stored under the
+    content hash of the stage's task (see WorkflowStage.input_hash). A rerun
+    whose stage task hashes the same, e.g. because a refined query only
+    changed what a later stage reads, reuses the stored output instead of
+    calling the agent, so only the stages whose inputs changed recompute.
+    """
+
+    def __init__(self, stages: List[WorkflowStage], stage_cache: Optional[TTLCache] = None):
+        """
+        Args:
+            stages: The workflow stages. Order does not matter.
+            stage_cache: Where stage outputs are memoized. None disables
+                memoization.
+
+        Raises:
+            ValueError: If stage names are duplicated, an input refers to an
+                unknown stage, or the stages contain a cycle.
+        """
+        self.stages = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate workflow stage '{stage.name}'")
+            self.stages[stage.name] = stage
+        self.stage_cache = stage_cache
+        for stage in stages:
+            for input_name in stage.inputs:
+                if input_name not in self.stages:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{input_name}'")
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        """Returns stage names so that every stage follows its inputs."""
+        order = []
+        state = {}  # name -> "visiting" | "done"
+
+        def visit(name: str) -> None:
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Workflow stages contain a cycle through '{name}'")
+            state[name] = "visiting"
+            for input_name in self.stages[name].inputs:
+                visit(input_name)
+            state[name] = "done"
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    async def run(self, query: str, run_stage: StageRunner,
+                  available_agents: Optional[Sequence[str]] = None,
+                  on_stage_complete: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+                  params: Optional[Dict[str, Any]] = None,
+                  completed: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Executes every stage and records its outcome and timing.
+
+        A stage is skipped when its agent is not available or when one of its
+        inputs did not succeed. A stage whose run_stage raises TimeoutError is
+        reported as timed out rather than failed.
+
+        Args:
+            query: The user's query to start the workflow.
+            run_stage: Coroutine function called with (agent_type, task_data).
+            available_agents: Agent types that can run stages. None means all.
+            on_stage_complete: Optional callback invoked with (stage name,
+                record) as soon as each stage finishes or is skipped.
+            params: Extra task fields, e.g. catalog filters such as
+                max_price. Each stage receives those it lists in its params.
+            completed: Records of stages that succeeded in an earlier attempt
+                of this workflow (see workflow_checkpoint.py). They are
+                reported again, marked "resumed", instead of being rerun.
+
+        Returns:
+            A dictionary of stage name to a record with the stage status,
+            start offset and duration in milliseconds, and its output or error.
+            Records of stages that ran or were reused also carry the
+            "input_hash" of their task and whether they were "reused".
+        """
+        records: Dict[str, Dict[str, Any]] = {}
+        workflow_start = time.perf_counter()
+
+        async def execute(stage: WorkflowStage) -> Dict[str, Any]:
+            # Wait for every input; they run concurrently in their own tasks
+            input_records = [await tasks[input_name] for input_name in stage.inputs]
+            record = {"agent": stage.agent_type, "inputs": list(stage.inputs)}
+
+            checkpoint = (completed or {}).get(stage.name)
+            if checkpoint is not None and checkpoint.get("status") == STAGE_SUCCESS:
+                record = {**checkpoint, "resumed": True}
+                records[stage.name] = record
+                if on_stage_complete is not None:
+                    on_stage_complete(stage.name, record)
+                return record
+
+            failed_inputs = [r_name for r_name, r in zip(stage.inputs, input_records)
+                             if r["status"] != STAGE_SUCCESS and r_name not in stage.optional_inputs]
+            if failed_inputs:
+                record.update(status=STAGE_SKIPPED, reason=f"Inputs not available: {', '.join(failed_inputs)}")
+            elif available_agents is not None and stage.agent_type not in available_agents:
+                record.update(status=STAGE_SKIPPED, reason=f"No agent available for {stage.agent_type}")
+            else:
+                inputs = {name: r["output"] for name, r in zip(stage.inputs, input_records)
+                          if r["status"] == STAGE_SUCCESS}
+                started = time.perf_counter()
+                record["started_ms"] = round((started - workflow_start) * 1000, 3)
+                try:
+                    task_data = stage.build_task(query, inputs)
+                    task_data.update((key, params[key]) for key in stage.params if key in (params or {}))
+                    if self.stage_cache is not None:
+                        record["input_hash"] = stage.input_hash(task_data)
+                        hit, output = self.stage_cache.get(record["input_hash"])
+                        record["reused"] = hit
+                    else:
+                        hit = False
+                    if hit:
+                        record["output"] = restore_echoed_fields(copy.deepcopy(output), task_data)
+                        if stage.refresh_output is not None:
+                            record["output"] = stage.refresh_output(record["output"], task_data)
+                    else:
+                        record["output"] = await run_stage(stage.agent_type, task_data)
+                        if self.stage_cache is not None:
+                            self.stage_cache.set(record["input_hash"], copy.deepcopy(record["output"]))
+                    record["status"] = STAGE_SUCCESS
+                except TimeoutError as e:
+                    logger.warning("Workflow stage %s timed out: %s", stage.name, e)
+                    record.update(status=STAGE_TIMED_OUT, reason=str(e))
+                except Exception as e:
+                    logger.error("Workflow stage %s failed: %s", stage.name, e)
+                    record.update(status=STAGE_ERROR, error=str(e))
+                record["duration_ms"] = round((time.perf_counter() - started) * 1000, 3)
+
+            records[stage.name] = record
+            if on_stage_complete is not None:
+                on_stage_complete(stage.name, record)
+            return record
+
+        tasks: Dict[str, asyncio.Task] = {}
+        for name in self.order:
+            tasks[name] = asyncio.ensure_future(execute(self.stages[name]))
+        await asyncio.gather(*tasks.values())
+
+        # Report stages in dependency order
+        return {name: records[name] for name in self.order}
+
+
+def _products_from(inputs: Dict[str, Any]) -> List[Any]:
+    return inputs.get("product_research", {}).get("products", [])
+
+
+def _count_products(output: Dict[str, Any], task_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Updates a reused market analysis with the number of products of the current run."""
+    output["product_count_analyzed"] = len(task_data.get("products") or [])
+    return output
+
+
+def build_product_workflow() -> List[WorkflowStage]:
+    """
+    Returns the product research workflow: research first, then market
+    analysis and sales estimation concurrently, then evaluation of everything.
+    """
+    return [
+        WorkflowStage(
+            "product_research", "ProductResearchAgent",
+            result_key="products",
+            extract_result=lambda output: output.get("products", []),
+            params=CATALOG_FILTERS,
+        ),
+        WorkflowStage(
+            "market_analysis", "MarketAnalysisAgent", inputs=["product_research"],
+            build_task=lambda query, inputs: {"query": query, "products": _products_from(inputs)},
+            # The market search depends on the query, not on the products found;
+            # only the product count is, and it is recomputed on reuse
+            key_fields=("query", "context"),
+            refresh_output=_count_products,
+        ),
+        WorkflowStage(
+            "sales_opportunity", "SalesOpportunityAgent", inputs=["product_research"],
+            # Estimates for every product, which the evaluation consumes
+            build_task=lambda query, inputs: {"query": query, "products": _products_from(inputs),
+                                              "limit": max(len(_products_from(inputs)), 1)},
+            result_key="sales_potential",
+        ),
+        WorkflowStage(
+            "product_evaluation", "ProductEvaluationAgent",
+            inputs=["product_research"], optional_inputs=["market_analysis", "sales_opportunity"],
+            build_task=lambda query, inputs: {
+                "query": query,
+                "products": _products_from(inputs),
+                "market_analysis": inputs.get("market_analysis"),
+                "sales_opportunity": inputs.get("sales_opportunity"),
+            },
+            result_key="evaluation",
+        ),
+    ]
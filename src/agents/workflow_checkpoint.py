@@ -0,0 +1,168 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Seconds a workflow's checkpoints are kept after its last completed stage
+DEFAULT_TTL_SECONDS = 86400.0
+DEFAULT_MAX_WORKFLOWS = 10000
+
+# Workflow states recorded in the checkpoint store
+WORKFLOW_RUNNING = "running"
+WORKFLOW_COMPLETED = "completed"
+
+
+class UnknownWorkflowError(LookupError):
+    """No checkpoints exist for a workflow_id, e.g. it expired or never ran here."""
+
+
+class WorkflowCheckpointStore:
+    """
+    Durable record of workflow progress, backed by a local SQLite file.
+
+    The orchestrator writes a workflow's query and filters when it starts and
+    every successful stage record (status, timing and output) as soon as the
+    stage completes, so a run cut short by a request timeout or a crash
+    keeps the work it finished. resume_workflow then reruns only the stages
+    without a checkpoint. Outputs are stored as JSON; workflows expire
+    ttl_seconds after their last write and expiry purges run every
+    prune_interval writes.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_workflows: int = DEFAULT_MAX_WORKFLOWS, prune_interval: int = 256,
+                 clock: Callable[[], float] = time.time):
+        """
+        Args:
+            path: Path of the SQLite database file.
+            ttl_seconds: Seconds after its last write that a workflow expires.
+            max_workflows: Maximum number of workflows kept after a prune.
+            prune_interval: Number of writes between eviction passes.
+            clock: Time source, injectable for tests.
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_workflows = max_workflows
+        self.prune_interval = prune_interval
+        self._clock = clock
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS workflows ("
+            " workflow_id TEXT PRIMARY KEY,"
+            " query TEXT NOT NULL,"
+            " filters TEXT,"
+            " status TEXT NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS workflows_updated_at ON workflows (updated_at)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS workflow_stages ("
+            " workflow_id TEXT NOT NULL,"
+            " stage TEXT NOT NULL,"
+            " record TEXT NOT NULL,"
+            " PRIMARY KEY (workflow_id, stage))"
+        )
+        logger.info(f"Opened workflow checkpoint store at {path}")
+
+    def start(self, workflow_id: str, query: str, filters: Optional[Dict[str, Any]] = None) -> None:
+        """Records a workflow as running, keeping the checkpoints of an earlier attempt."""
+        now = self._clock()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO workflows (workflow_id, query, filters, status, updated_at) VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (workflow_id) DO UPDATE SET status = excluded.status, updated_at = excluded.updated_at",
+                (workflow_id, query, json.dumps(filters) if filters else None, WORKFLOW_RUNNING, now)
+            )
+            self._written(now)
+
+    def save_stage(self, workflow_id: str, stage: str, record: Dict[str, Any]) -> None:
+        """Checkpoints the record of a completed stage."""
+        now = self._clock()
+        value = json.dumps(record, default=str)
+        with self._lock:
+            # One transaction, so the stage and the workflow's expiry are written together
+            with self._conn:
+                self._conn.execute("BEGIN")
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO workflow_stages (workflow_id, stage, record) VALUES (?, ?, ?)",
+                    (workflow_id, stage, value)
+                )
+                self._conn.execute("UPDATE workflows SET updated_at = ? WHERE workflow_id = ?", (now, workflow_id))
+            self._written(now)
+
+    def finish(self, workflow_id: str) -> None:
+        """Marks a workflow as completed; its checkpoints stay until it expires."""
+        now = self._clock()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE workflows SET status = ?, updated_at = ? WHERE workflow_id = ?",
+                (WORKFLOW_COMPLETED, now, workflow_id)
+            )
+            self._written(now)
+
+    def load(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns a workflow's checkpoints.
+
+        Returns:
+            A dictionary with the workflow's "query", "filters" and "status"
+            and its checkpointed "stages" (stage name to record), or None if
+            the workflow is unknown or expired.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT query, filters, status, updated_at FROM workflows WHERE workflow_id = ?", (workflow_id,)
+            ).fetchone()
+            if row is None or row[3] + self.ttl_seconds <= self._clock():
+                return None
+            stages = self._conn.execute(
+                "SELECT stage, record FROM workflow_stages WHERE workflow_id = ?", (workflow_id,)
+            ).fetchall()
+        query, filters, status, _ = row
+        return {
+            "query": query,
+            "filters": json.loads(filters) if filters else None,
+            "status": status,
+            "stages": {stage: json.loads(record) for stage, record in stages},
+        }
+
+    def _written(self, now: float) -> None:
+        self._writes += 1
+        if self._writes % self.prune_interval == 0:
+            self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        self._conn.execute("DELETE FROM workflows WHERE updated_at <= ?", (now - self.ttl_seconds,))
+        self._conn.execute(
+            "DELETE FROM workflows WHERE workflow_id IN ("
+            " SELECT workflow_id FROM workflows ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_workflows,)
+        )
+        self._conn.execute(
+            "DELETE FROM workflow_stages WHERE workflow_id NOT IN (SELECT workflow_id FROM workflows)"
+        )
+
+    def prune(self) -> None:
+        """Drops expired workflows and enforces max_workflows immediately."""
+        with self._lock:
+            self._prune(self._clock())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM workflows").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()